@@ -1,17 +1,48 @@
 import os
-import json
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# The async mode must patch the standard library before anything else is imported
+import server_mode
+server_mode.monkey_patch()
+
+import itertools
 import uuid
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-from flask_socketio import SocketIO, emit
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, make_response
+from flask_socketio import SocketIO, emit, join_room
 from flask_cors import CORS
-from dotenv import load_dotenv
 import logging
 from pathlib import Path
 import time
-
-# Load environment variables
-load_dotenv()
+import threading
+import atexit
+import hmac
+from functools import wraps
+from transcript_writer import TranscriptWriter
+from state_coalescer import StateCoalescer
+from career_registry import CareerSessionRegistry
+from session_store import MemoryUserSessions, SQLiteBackend, SQLiteUserSessions, SQLiteCareerSessions
+from server_mode import run_blocking
+from key_pool import EphemeralKeyPool, KeyMintError
+from session_bundle import SessionBundle
+from question_scheduler import DEPTH_ACTIONS, scheduler as question_scheduler
+from summary_pipeline import SummaryPipeline
+from cohort_analytics import CohortAnalytics
+from transcript_index import TranscriptIndex, read_transcript
+from conversation_buffer import ConversationBuffer
+from career_journal import CareerJournal, apply_to_session
+from career_record import QUESTIONS, CareerSession
+from session_shards import KeyedLocks
+from latency_metrics import HANDLER_BUCKETS, MetricsRegistry, TurnMetrics
+from realtime_tools import CLIENT_SESSION_TOOLS
+from tool_schemas import SchemaError, validate_arguments, validate_payload
+from realtime_prompts import QUESTION_BANK
+from realtime_relay import RealtimeRelay
+from vad_tuning import load_turn_detection
+from handler_profiler import HandlerProfiler, sample_stacks
 
 # Create Flask app
 app = Flask(__name__)
@@ -20,7 +51,17 @@ app.config['SESSION_TYPE'] = 'filesystem'
 
 # Enable CORS and WebSocket support
 CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# A message queue (e.g. redis://) lets several server processes share rooms
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=server_mode.ASYNC_MODE,
+                    message_queue=os.getenv('SOCKETIO_MESSAGE_QUEUE'))
+
+# Coalesce animation/state fan-out to at most one message per frame per user
+state_coalescer = StateCoalescer(
+    socketio.emit,
+    socketio.start_background_task,
+    socketio.sleep,
+    frame_interval=float(os.getenv('STATE_FRAME_INTERVAL_MS', 50)) / 1000
+)
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +70,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The cohort analytics fork server imports this module as __mp_main__ before forking parser
+# processes; it skips the startup work that acts on shared state (journal recovery, key minting, relay)
+STARTUP = __name__ != '__mp_main__'
+
 # Create sessions directory if it doesn't exist
 SESSIONS_DIR = Path('sessions')
 SESSIONS_DIR.mkdir(exist_ok=True)
@@ -37,10 +82,58 @@ SESSIONS_DIR.mkdir(exist_ok=True)
 CAREER_DIR = Path('sessions/career_summaries')
 CAREER_DIR.mkdir(exist_ok=True, parents=True)
 
+# Background writer for session transcripts
+transcript_writer = TranscriptWriter(
+    flush_interval=float(os.getenv('TRANSCRIPT_FLUSH_INTERVAL', 0.5)),
+    max_batch_lines=int(os.getenv('TRANSCRIPT_BATCH_LINES', 256)),
+    max_queue=int(os.getenv('TRANSCRIPT_QUEUE_SIZE', 10000))
+)
+atexit.register(transcript_writer.stop)
+
+# Session storage: 'memory' (single process) or 'sqlite' (shared by several processes)
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory')
+CAREER_IDLE_TTL = int(os.getenv('CAREER_IDLE_TTL', 1800))
+SESSION_IDLE_TIMEOUT = int(os.getenv('SESSION_IDLE_TIMEOUT', 3600))
+CAREER_SPILL_TTL = int(os.getenv('CAREER_SPILL_TTL', 7 * 86400))
+
+if SESSION_BACKEND == 'sqlite':
+    sqlite_backend = SQLiteBackend(
+        os.getenv('SESSION_DB_PATH', str(SESSIONS_DIR / 'sessions.db')),
+        pool_size=int(os.getenv('SESSION_DB_POOL_SIZE', 8))
+    )
+    # Shared activity is written at most every tenth of the idle timeout, so it is never that stale
+    user_session_store = SQLiteUserSessions(sqlite_backend, touch_interval=max(1, min(30, SESSION_IDLE_TIMEOUT // 10)))
+    career_session_store = SQLiteCareerSessions(
+        sqlite_backend, idle_ttl=CAREER_IDLE_TTL, spill_ttl=CAREER_SPILL_TTL
+    )
+else:
+    user_session_store = MemoryUserSessions()
+    career_session_store = CareerSessionRegistry(
+        SESSIONS_DIR / 'paused',
+        idle_ttl=CAREER_IDLE_TTL,
+        paused_ttl=int(os.getenv('CAREER_PAUSED_TTL', 900)),
+        spill_ttl=CAREER_SPILL_TTL,
+        max_sessions=int(os.getenv('CAREER_MAX_SESSIONS', 10000))
+    )
+
 # Session management
+def read_transcript_turns(file_path, start, stop):
+    """Turns ``start``..``stop`` of a session transcript file"""
+    lines = itertools.islice(read_transcript(file_path), start, stop)
+    return [
+        {'timestamp': ts.strftime('%H:%M:%S'), 'role': role, 'message': message}
+        for _, _, ts, role, message in lines
+    ]
+
 class SessionManager:
-    def __init__(self):
-        self.active_sessions = {}
+    def __init__(self, writer, store, index=None, conversations=None):
+        self.active_sessions = store
+        self.writer = writer
+        self.index = index
+        # Recent conversation turns stay local to this process; the transcript file has them all
+        self.conversations = conversations if conversations is not None else ConversationBuffer()
+        # Per-session locks: logging and ending one session never interleave, other sessions never wait
+        self.locks = KeyedLocks()
     
     def create_session(self, user_email, user_name):
         """Create a new user session with logging file"""
@@ -56,158 +149,207 @@ class SessionManager:
             'email': user_email,
             'name': user_name,
             'start_time': datetime.now(),
-            'file_path': session_file,
-            'conversation': []
+            'file_path': session_file
         }
         
         # Write initial session info to file
-        with open(session_file, 'w', encoding='utf-8') as f:
-            f.write(f"Session Started: {datetime.now().isoformat()}\n")
-            f.write(f"User: {user_name} ({user_email})\n")
-            f.write(f"Session ID: {session_id}\n")
-            f.write("-" * 80 + "\n\n")
+        self.writer.write(session_file, f"Session Started: {datetime.now().isoformat()}\n")
+        self.writer.write(session_file, f"User: {user_name} ({user_email})\n")
+        self.writer.write(session_file, f"Session ID: {session_id}\n")
+        self.writer.write(session_file, "-" * 80 + "\n\n")
         
-        self.active_sessions[session_id] = session_data
+        self.active_sessions.add(session_data)
+        self.touch(session_id)
         logger.info(f"Created session {session_id} for {user_email}")
         return session_id
     
+    def touch(self, session_id):
+        """Record activity so the idle reaper leaves the session alone"""
+        self.active_sessions.touch(session_id)
+    
+    def idle_sessions(self, timeout):
+        """Sessions no worker has seen activity from for ``timeout`` seconds"""
+        return self.active_sessions.idle(time.time() - timeout)
+    
     def log_conversation(self, session_id, role, message):
-        """Log conversation to session file in real-time"""
-        if session_id not in self.active_sessions:
-            logger.warning(f"Session {session_id} not found")
-            return
-        
-        session_data = self.active_sessions[session_id]
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        
-        # Add to memory
-        session_data['conversation'].append({
-            'timestamp': timestamp,
-            'role': role,
-            'message': message
-        })
-        
-        # Write to file immediately
-        try:
-            with open(session_data['file_path'], 'a', encoding='utf-8') as f:
-                f.write(f"[{timestamp}] {role}: {message}\n")
-        except Exception as e:
-            logger.error(f"Error writing to session file: {e}")
+        """Log conversation to session file via the background writer"""
+        with self.locks.hold(session_id):
+            session_data = self.active_sessions.get(session_id)
+            if session_data is None:
+                logger.warning(f"Session {session_id} not found")
+                return
+            
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            
+            # Keep the recent turns in memory; older ones are served from the transcript.
+            # Other workers append to a shared session's transcript too, so there it is the only record
+            if not self.active_sessions.shared:
+                self.conversations.append(session_id, timestamp, role, message)
+            self.touch(session_id)
+            
+            # Queue for the writer thread; it batches lines per file
+            self.writer.write(session_data['file_path'], f"[{timestamp}] {role}: {message}\n")
+            if self.index is not None:
+                self.index.add(session_id, session_data['email'], role, message, session_data['file_path'])
     
-    def end_session(self, session_id):
-        """End a session and finalize the log file"""
-        if session_id not in self.active_sessions:
-            return
+    def history(self, session_id, before=None, limit=50):
+        """Conversation turns before turn number ``before``, reading evicted turns from the transcript"""
+        def read_older(start, stop):
+            session_data = self.active_sessions.get(session_id)
+            if session_data is None:
+                return []
+            self.writer.flush(session_data['file_path'])
+            return run_blocking(read_transcript_turns, session_data['file_path'], start, stop)
+        if self.active_sessions.shared:
+            return self._transcript_history(session_id, before, limit)
+        return self.conversations.history(session_id, read_older, before=before, limit=limit)
+    
+    def _transcript_history(self, session_id, before, limit):
+        """``history`` numbered from the transcript file, which holds the turns logged by every worker"""
+        session_data = self.active_sessions.get(session_id)
+        if session_data is None:
+            return {'turns': [], 'start': 0, 'total': 0}
+        self.writer.flush(session_data['file_path'])
+        turns = run_blocking(read_transcript_turns, session_data['file_path'], 0, None)
+        total = len(turns)
+        stop = total if before is None else min(max(int(before), 0), total)
+        start = max(stop - max(int(limit), 0), 0)
+        return {'turns': turns[start:stop], 'start': start, 'total': total}
+    
+    def end_session(self, session_id, idle_timeout=None):
+        """End a session and finalize the log file (False if it was not active).
         
-        session_data = self.active_sessions[session_id]
+        With ``idle_timeout``, the session is only ended if it is still idle
+        once its lock is held, so activity racing the reaper keeps it alive.
+        """
+        with self.locks.hold(session_id):
+            if idle_timeout is not None:
+                seen = self.active_sessions.last_seen(session_id)
+                if seen is not None and time.time() - seen < idle_timeout:
+                    return False
+            self.conversations.discard(session_id)
+            session_data = self.active_sessions.remove(session_id)
+        if session_data is None:
+            return False
         
-        # Write session end to file
-        try:
-            with open(session_data['file_path'], 'a', encoding='utf-8') as f:
-                f.write(f"\n{'-' * 80}\n")
-                f.write(f"Session Ended: {datetime.now().isoformat()}\n")
-                duration = datetime.now() - session_data['start_time']
-                f.write(f"Duration: {duration}\n")
-        except Exception as e:
-            logger.error(f"Error finalizing session file: {e}")
+        # Write session end to file, then flush and release its handle
+        file_path = session_data['file_path']
+        duration = datetime.now() - session_data['start_time']
+        self.writer.write(file_path, f"\n{'-' * 80}\n")
+        self.writer.write(file_path, f"Session Ended: {datetime.now().isoformat()}\n")
+        self.writer.write(file_path, f"Duration: {duration}\n")
+        if not self.writer.close(file_path):
+            logger.error(f"Timed out finalizing session file {file_path}")
         
-        del self.active_sessions[session_id]
         logger.info(f"Ended session {session_id}")
+        return True
+
+# Full-text index of transcript lines for the admin search endpoint
+transcript_index = None
+if os.getenv('TRANSCRIPT_INDEX', '1') == '1':
+    transcript_index = TranscriptIndex(os.getenv('TRANSCRIPT_INDEX_PATH', str(SESSIONS_DIR / 'transcripts.db')))
+    atexit.register(transcript_index.stop)
 
 # Initialize session manager
-session_manager = SessionManager()
+session_manager = SessionManager(
+    transcript_writer,
+    user_session_store,
+    transcript_index,
+    ConversationBuffer(max_turns=int(os.getenv('CONVERSATION_MEMORY_TURNS', 100)))
+)
 
 # Career Counseling Session Management
 class CareerCounselingManager:
-    def __init__(self):
-        self.career_sessions = {}
-        self.paused_sessions = {}
+    def __init__(self, store, pipeline, journal=None):
+        self.sessions = store
+        self.pipeline = pipeline
+        self.journal = journal
+    
+    def _record(self, op, career_session_id, **fields):
+        """Journal an operation (when journaling) and return its entry"""
+        if self.journal is not None:
+            return self.journal.append(op, career_session_id, **fields)
+        return {'op': op, 'id': career_session_id, **fields}
     
     def create_career_session(self, user_id, user_name, user_email):
         """Create a new career counseling session"""
         career_session_id = f"career_{int(time.time())}_{uuid.uuid4().hex[:8]}"
         
-        self.career_sessions[career_session_id] = {
-            'id': career_session_id,
-            'user_id': user_id,
-            'user_name': user_name,
-            'user_email': user_email,
-            'start_time': datetime.now(),
-            'completed_questions': [],
-            'responses': {},
-            'state': 'active',
-            'emotional_trajectory': []
-        }
+        session = CareerSession(career_session_id, user_id, user_name, user_email)
+        self._record('create', career_session_id, session=session.to_dict())
+        self.sessions.add(session)
         
         logger.info(f"Created career counseling session {career_session_id} for {user_name}")
         return career_session_id
     
+    def lock(self, career_session_id):
+        """The session's own (reentrant) lock; changes to one session are applied one at a time"""
+        return self.sessions.lock(career_session_id)
+    
     def save_response(self, career_session_id, question_id, response, emotion=None):
-        """Save a student's response to a question"""
-        if career_session_id not in self.career_sessions:
-            return False
-        
-        session = self.career_sessions[career_session_id]
-        session['responses'][question_id] = {
-            'response': response,
-            'timestamp': datetime.now().isoformat(),
-            'emotion': emotion or 'neutral'
-        }
-        
-        if question_id not in session['completed_questions']:
-            session['completed_questions'].append(question_id)
-        
-        if emotion:
-            session['emotional_trajectory'].append({
-                'question_id': question_id,
-                'emotion': emotion,
-                'timestamp': datetime.now().isoformat()
-            })
-        
-        return True
+        """Save a student's response to a question; returns the updated session, or None"""
+        if question_id not in QUESTIONS:
+            # A bit past the bank would break scheduling; nothing is journaled for it
+            logger.warning(f"Ignored response to unknown question {question_id!r} in {career_session_id}")
+            return None
+        with self.lock(career_session_id), self.sessions.modify(career_session_id) as session:
+            if session is None:
+                return None
+            
+            # Journaled first, then applied with the same code crash recovery replays;
+            # the session lock keeps journal order and apply order the same
+            entry = self._record('response', career_session_id, question_id=question_id, response=response,
+                                 emotion=emotion, at=time.time())
+            apply_to_session(session, entry)
+            return session
     
     def pause_session(self, career_session_id, current_question=None):
         """Pause a career counseling session"""
-        if career_session_id not in self.career_sessions:
-            return False
-        
-        session = self.career_sessions[career_session_id]
-        session['state'] = 'paused'
-        session['paused_at'] = datetime.now().isoformat()
-        session['current_question'] = current_question
-        
-        # Move to paused sessions
-        self.paused_sessions[career_session_id] = session
-        del self.career_sessions[career_session_id]
+        with self.lock(career_session_id):
+            # Move to paused sessions, applying the journaled pause in the same step
+            session = self.sessions.pause(career_session_id, change=lambda paused: apply_to_session(
+                paused, self._record('pause', career_session_id, current_question=current_question, at=time.time())))
+            if session is None:
+                return False
         
         logger.info(f"Paused career session {career_session_id}")
         return True
     
     def resume_session(self, career_session_id):
         """Resume a paused career counseling session"""
-        if career_session_id not in self.paused_sessions:
-            return None
-        
-        session = self.paused_sessions[career_session_id]
-        session['state'] = 'active'
-        session['resumed_at'] = datetime.now().isoformat()
-        
-        # Move back to active sessions
-        self.career_sessions[career_session_id] = session
-        del self.paused_sessions[career_session_id]
+        with self.lock(career_session_id):
+            # Move back to active sessions (restoring from disk if it was spilled)
+            session = self.sessions.resume(career_session_id, change=lambda resumed: apply_to_session(
+                resumed, self._record('resume', career_session_id, at=time.time())))
+            if session is None:
+                return None
         
         logger.info(f"Resumed career session {career_session_id}")
         return session
     
-    def save_summary(self, career_session_id, summary_data):
-        """Save career counseling summary to file"""
-        if career_session_id not in self.career_sessions:
-            return None
-        
-        session = self.career_sessions[career_session_id]
+    def complete_session(self, career_session_id, summary_data, room=None):
+        """Queue the summary and end the session in one step; returns (job_id, file) or None"""
+        with self.lock(career_session_id):
+            # The store claims the session first, so with several workers only one of them completes it
+            queued = self.sessions.complete(
+                career_session_id, lambda session: self._queue_summary(session, summary_data, room))
+            if queued:
+                self._record('end', career_session_id)
+            return queued
+    
+    def save_summary(self, career_session_id, summary_data, room=None):
+        """Queue the career counseling summary for writing; returns (job_id, file) or None"""
+        with self.lock(career_session_id):
+            session = self.sessions.get_active(career_session_id)
+            if session is None:
+                return None
+            return self._queue_summary(session, summary_data, room)
+    
+    def _queue_summary(self, session, summary_data, room):
+        career_session_id = session.id
         
         # Create filename
-        safe_email = session['user_email'].replace('@', '_at_').replace('.', '_')
+        safe_email = session.user_email.replace('@', '_at_').replace('.', '_')
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         summary_file = CAREER_DIR / f"{safe_email}_{timestamp}_summary.json"
         
@@ -215,50 +357,304 @@ class CareerCounselingManager:
         complete_summary = {
             'session_id': career_session_id,
             'user': {
-                'name': session['user_name'],
-                'email': session['user_email']
+                'name': session.user_name,
+                'email': session.user_email
             },
             'timing': {
-                'start': session['start_time'].isoformat(),
+                'start': session.started.isoformat(),
                 'end': datetime.now().isoformat(),
-                'duration_minutes': int((datetime.now() - session['start_time']).total_seconds() / 60)
+                'duration_minutes': int((time.time() - session.start_time) / 60)
             },
-            'questions_answered': len(session['completed_questions']),
-            'completed_questions': session['completed_questions'],
-            'responses': session['responses'],
-            'emotional_trajectory': session['emotional_trajectory'],
+            'questions_answered': session.question_count,
+            'completed_questions': session.completed_questions,
+            'responses': session.responses,
+            'emotional_trajectory': session.emotional_trajectory,
             'analysis': summary_data.get('session_data', {}),
             'recommendations': summary_data.get('recommendations', [])
         }
         
-        # Save to file
+        # Written in the background; the room is told once the file is in place
         try:
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                json.dump(complete_summary, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"Saved career summary to {summary_file}")
-            return str(summary_file)
+            job_id = self.pipeline.submit(summary_file, complete_summary, context=room)
         except Exception as e:
-            logger.error(f"Error saving career summary: {e}")
+            logger.error(f"Error queueing career summary: {e}")
             return None
+        
+        # Journaled once queued, so a crash before the file is written can still write it on
+        # restart, and a summary the student was told failed is never written behind their back
+        self._record('summary', career_session_id, file=str(summary_file), summary=complete_summary)
+        return job_id, str(summary_file)
+    
+    def get_session(self, career_session_id):
+        """Get an active career counseling session"""
+        return self.sessions.get_active(career_session_id)
+    
+    def find_paused_session(self, user_email):
+        """Find the most recent paused session id for a user"""
+        return self.sessions.find_paused_by_email(user_email)
+    
+    def set_depth_action(self, career_session_id, depth_action):
+        """Remember the latest adjust_conversation_depth action for a session"""
+        with self.lock(career_session_id), self.sessions.modify(career_session_id) as session:
+            if session is None:
+                return False
+            apply_to_session(session, self._record('depth', career_session_id, depth_action=depth_action))
+            return True
+    
+    def end_career_session(self, career_session_id):
+        """Remove a finished career counseling session"""
+        with self.lock(career_session_id):
+            if self.sessions.remove(career_session_id) is not None:
+                self._record('end', career_session_id)
+    
+    def restore(self, state):
+        """Load sessions recovered from the journal into the store; returns how many"""
+        for record in state['sessions'].values():
+            if self.sessions.is_spilled(record.id):
+                # The registry already resumes it from its spill file
+                continue
+            # Sessions that were active lost their connection with the process; resume them by email
+            if record.state != 'paused':
+                record.state = 'paused'
+                record.paused_at = state['touched'][record.id]
+            self.sessions.add(record)
+            self.sessions.pause(record.id)
+        
+        # Summaries journaled but never written before the crash
+        for summary_file, summary in state['summaries'].items():
+            if not Path(summary_file).exists():
+                self.pipeline.submit(summary_file, summary)
+        return len(state['sessions'])
+
+# Background persistence for career summaries
+def summary_persisted(job_id, summary_file, error, room):
+    """Tell the student's tabs whether their summary reached disk"""
+    if error:
+        payload = {'success': False, 'job_id': job_id, 'error': 'Failed to save summary'}
+    else:
+        logger.info(f"Saved career summary to {summary_file}")
+        payload = {'success': True, 'job_id': job_id, 'file': summary_file}
+    if room:
+        socketio.emit('summary_persisted', payload, to=room)
+
+summary_pipeline = SummaryPipeline(
+    workers=int(os.getenv('SUMMARY_WORKERS', 4)),
+    max_queue=int(os.getenv('SUMMARY_QUEUE_SIZE', 1000)),
+    on_done=summary_persisted,
+    fsync=os.getenv('SUMMARY_FSYNC', '1') == '1'
+)
+atexit.register(summary_pipeline.stop)
+
+# Career sessions in memory are journaled so a restart can recover them (SQLite is already durable)
+career_journal = None
+if STARTUP and SESSION_BACKEND != 'sqlite' and os.getenv('CAREER_JOURNAL', '1') == '1':
+    career_journal = CareerJournal(
+        os.getenv('CAREER_JOURNAL_DIR', str(SESSIONS_DIR / 'journal')),
+        segment_entries=int(os.getenv('CAREER_JOURNAL_SEGMENT_ENTRIES', 5000)),
+        fsync=os.getenv('CAREER_JOURNAL_FSYNC', '0') == '1',
+        retention=CAREER_SPILL_TTL
+    )
+    atexit.register(career_journal.stop)
 
 # Initialize career counseling manager
-career_manager = CareerCounselingManager()
+career_manager = CareerCounselingManager(career_session_store, summary_pipeline, career_journal)
+if career_journal is not None:
+    career_manager.restore(career_journal.recover())
+
+# Cohort reports over saved summaries (admin endpoints need ADMIN_TOKEN)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+cohort_analytics = CohortAnalytics(CAREER_DIR, workers=int(os.getenv('ANALYTICS_WORKERS', os.cpu_count() or 1)))
+
+# Realtime session configuration
+AZURE_OPENAI_API_KEY = os.getenv('AZURE_OPENAI_API_KEY', '')
+SESSIONS_URL = os.getenv('SESSIONS_URL',
+    'https://new-voice-assist.openai.azure.com/openai/realtimeapi/sessions?api-version=2025-04-01-preview')
+DEPLOYMENT = os.getenv('DEPLOYMENT', 'gpt-realtime')
+VOICE = os.getenv('VOICE', 'alloy')
+# server_vad settings recommended by vad_tuning.py (python vad_tuning.py --write ...); bundle defaults otherwise
+TURN_DETECTION = load_turn_detection(os.getenv('TURN_DETECTION_FILE', str(SESSIONS_DIR / 'turn_detection.json')))
+
+# Ephemeral keys are minted server-side so the API key never reaches the browser
+key_pool = EphemeralKeyPool(
+    SESSIONS_URL,
+    AZURE_OPENAI_API_KEY,
+    pool_size=int(os.getenv('KEY_POOL_SIZE', 2)),
+    min_ttl=int(os.getenv('KEY_POOL_MIN_TTL', 20))
+)
+if STARTUP and AZURE_OPENAI_API_KEY and int(os.getenv('KEY_POOL_SIZE', 2)) > 0:
+    key_pool.prewarm(DEPLOYMENT, VOICE)
+atexit.register(key_pool.stop)
+
+# Prompt and tool definitions compiled into one session.update payload (edits need a restart)
+session_bundle = SessionBundle()
+
+# Latency histograms and session gauges, scraped from /metrics
+metrics = MetricsRegistry()
+turn_metrics = TurnMetrics(metrics)
+socket_handler_seconds = metrics.histogram(
+    'socketio_handler_seconds', 'Socket.IO event handler time on the server', HANDLER_BUCKETS, ('event',)
+)
+connected_clients = set()
+metrics.gauge('socketio_connections', 'Socket.IO clients connected to this process', lambda: len(connected_clients))
+metrics.gauge('active_sessions', 'Sessions held by the session stores', lambda: {
+    'user': len(session_manager.active_sessions),
+    'career': len(career_session_store)
+}, labelname='kind')
+metrics.gauge('conversation_memory_bytes', 'Estimated bytes of conversation turns held in memory',
+              session_manager.conversations.total_bytes)
+metrics.gauge('summary_jobs_pending', 'Career summaries queued or being written', summary_pipeline.pending)
+
+def timed_handler(handler):
+    """Record a Socket.IO handler's run time under its event name"""
+    @wraps(handler)
+    def wrapper(*args):
+        start = time.perf_counter()
+        try:
+            return handler(*args)
+        finally:
+            socket_handler_seconds.observe(time.perf_counter() - start, request.event['message'])
+    return wrapper
+
+# Per-handler profiling, toggled by admins at runtime (HANDLER_PROFILING=1 turns it on at startup)
+handler_profiler = HandlerProfiler(enabled=os.getenv('HANDLER_PROFILING', '0') == '1')
+profiled = handler_profiler.wrap
+stack_sampler_lock = threading.Lock()
+
+# End user sessions nobody has touched for SESSION_IDLE_TIMEOUT (0 disables)
+def reap_idle_sessions():
+    """Background task: finalize idle sessions so abandoned tabs do not hold memory"""
+    interval = max(1, min(60, SESSION_IDLE_TIMEOUT // 4))
+    while True:
+        socketio.sleep(interval)
+        for session_id in session_manager.idle_sessions(SESSION_IDLE_TIMEOUT):
+            try:
+                if not session_manager.end_session(session_id, idle_timeout=SESSION_IDLE_TIMEOUT):
+                    continue
+            except Exception as e:
+                logger.error(f"Error ending idle session {session_id}: {e}")
+                continue
+            state_coalescer.discard(session_id)
+            socketio.emit('session_expired', {'redirect': '/register'}, to=session_id)
+            logger.info(f"Ended idle session {session_id}")
+
+if SESSION_IDLE_TIMEOUT > 0:
+    socketio.start_background_task(reap_idle_sessions)
+
+# Question scheduling shared by career_next_question and relayed tool calls
+def schedule_questions(career_session_id, completed_questions=None, depth_action=None, skip_optional=False):
+    """Next question and completion status from the client's answers plus the server-side session"""
+    completed = question_scheduler.mask(completed_questions)
+    if depth_action not in DEPTH_ACTIONS:
+        depth_action = None
+    
+    # Answers and depth recorded on the server-side career session count too
+    session_data = career_manager.get_session(career_session_id) if career_session_id else None
+    if session_data is not None:
+        # CareerSession and QuestionScheduler share the bank-order bit layout
+        completed |= session_data.completed
+        if depth_action and depth_action != session_data.depth_action:
+            career_manager.set_depth_action(career_session_id, depth_action)
+        depth_action = depth_action or session_data.depth_action
+    
+    skipped = question_scheduler.skip_mask(depth_action, bool(skip_optional))
+    return question_scheduler.schedule(completed, skipped)
+
+# Server-side versions of the client tools, for sessions relayed through this server
+def run_relay_tool(context, name, arguments):
+    """Run one function call of a relayed session; returns its function_call_output"""
+    try:
+        args = validate_arguments(name, arguments)
+    except SchemaError as e:
+        return {'success': False, 'error': f"Invalid arguments: {e}"}
+    career_session_id = context['career_session_id']
+    
+    if name in ('record_response_and_get_next', 'track_survey_response'):
+        question_id = args['question_id']
+        if career_manager.save_response(career_session_id, question_id, args['response'],
+                                        args.get('emotion_detected', 'neutral')) is None:
+            return {'success': False, 'error': 'No active career counseling session'}
+        session_manager.log_conversation(context['user_id'], 'Career Response',
+                                         f"Q:{question_id} - A:{args['response'][:100]}...")
+        schedule = schedule_questions(career_session_id, skip_optional=args.get('skip_optional'))
+        completed_count = len(schedule['completed_questions'])
+        if name == 'track_survey_response':
+            return {'success': True, 'message': f"Response recorded for {question_id}", 'completedCount': completed_count}
+        result = {
+            'success': True,
+            'recorded': question_id,
+            'completedCount': completed_count,
+            'complete': schedule['complete'],
+            'is_complete': schedule['is_complete'],
+            'percentage': schedule['percentage'],
+            'student_name': context['user_name']
+        }
+        if not schedule['complete']:
+            result.update({key: schedule[key] for key in (
+                'next_question', 'question_text', 'follow_up', 'is_optional', 'questions_remaining')})
+        return result
+    
+    if name in ('determine_next_question', 'check_completion_status'):
+        schedule = schedule_questions(career_session_id, args.get('completed_questions'),
+                                      skip_optional=args.get('skip_optional'))
+        del schedule['completed_mask']
+        return {'success': True, 'student_name': context['user_name'], **schedule}
+    
+    if name == 'end_session_summary':
+        queued = career_manager.complete_session(career_session_id, args, room=context['user_id'])
+        if not queued:
+            return {'success': False, 'error': 'Failed to save summary'}
+        session_manager.log_conversation(context['user_id'], 'Career Summary', 'Completed career counseling')
+        return {'success': True, 'summary_saved': True, 'session_id': career_session_id}
+    
+    if name == 'adjust_conversation_depth':
+        career_manager.set_depth_action(career_session_id, args['adjustment_action'])
+        return {'success': True, 'adjustment_made': True, 'action': args['adjustment_action']}
+    
+    if name == 'detect_user_language':
+        return {'success': True, 'language_updated': True, 'current_language': args['detected_language']}
+    
+    if name == 'provide_clarification':
+        question = QUESTION_BANK.get(args['question_id'], {})
+        return {'success': True, 'clarification_provided': True, 'question_id': args['question_id'],
+                'type': args['clarification_type'], 'follow_up': question.get('follow_up')}
+    
+    # The rest (emotions, stop, logout) only change the browser, which acts on relay_tool
+    return {'success': True, **args}
+
+# Browsers whose networks block WebRTC stream audio through this server instead (REALTIME_RELAY=1)
+REALTIME_WS_URL = os.getenv('REALTIME_WS_URL',
+    'wss://new-voice-assist.openai.azure.com/openai/realtime?api-version=2025-04-01-preview&deployment=gpt-realtime')
+realtime_relay = None
+if STARTUP and os.getenv('REALTIME_RELAY', '0') == '1':
+    if server_mode.ASYNC_MODE != 'threading':
+        # The relay's asyncio loop runs on a native thread and shares the app's locks and stores
+        logger.error("REALTIME_RELAY needs SOCKETIO_ASYNC_MODE=threading; relay disabled")
+    elif not RealtimeRelay.available or not AZURE_OPENAI_API_KEY:
+        logger.error("REALTIME_RELAY needs aiohttp and AZURE_OPENAI_API_KEY; relay disabled")
+    else:
+        realtime_relay = RealtimeRelay(REALTIME_WS_URL, AZURE_OPENAI_API_KEY, socketio.emit, run_relay_tool,
+                                       max_sessions=int(os.getenv('RELAY_MAX_SESSIONS', 200)))
+        realtime_relay.start()
+        atexit.register(realtime_relay.stop)
+        metrics.gauge('relay_sessions', 'Realtime sessions relayed through this process', lambda: len(realtime_relay))
 
 # Routes
 @app.route('/')
+@profiled
 def index():
     """Main page - check if user is registered"""
-    if 'user_id' not in session:
+    if 'user_id' not in session or session['user_id'] not in session_manager.active_sessions:
         return redirect(url_for('register'))
     return render_template('chat.html')
 
 @app.route('/register')
+@profiled
 def register():
     """User registration page"""
     return render_template('register.html')
 
 @app.route('/api/register', methods=['POST'])
+@profiled
 def api_register():
     """Handle user registration"""
     data = request.json
@@ -283,58 +679,289 @@ def api_register():
     })
 
 @app.route('/api/config')
+@profiled
 def get_config():
     """Get configuration for WebRTC"""
     return jsonify({
-        'api_key': os.getenv('AZURE_OPENAI_API_KEY', ''),
-        'sessions_url': os.getenv('SESSIONS_URL', 
-            'https://new-voice-assist.openai.azure.com/openai/realtimeapi/sessions?api-version=2025-04-01-preview'),
+        'realtime_configured': bool(AZURE_OPENAI_API_KEY),
+        'session_key_url': url_for('realtime_session_key'),
+        'session_bundle_url': url_for('session_bundle_payload', v=session_bundle.version),
         'webrtc_url': os.getenv('WEBRTC_URL', 
             'https://eastus2.realtimeapi-preview.ai.azure.com/v1/realtimertc'),
-        'deployment': os.getenv('DEPLOYMENT', 'gpt-realtime'),
-        'voice': os.getenv('VOICE', 'alloy')
+        'relay_enabled': realtime_relay is not None,
+        'turn_detection': TURN_DETECTION,
+        'deployment': DEPLOYMENT,
+        'voice': VOICE
+    })
+
+@app.route('/api/session-bundle')
+@profiled
+def session_bundle_payload():
+    """Serve the compiled session.update bundle with content-hash caching"""
+    use_gzip = 'gzip' in request.accept_encodings
+    response = make_response(session_bundle.gzip_body if use_gzip else session_bundle.body)
+    response.mimetype = 'application/json'
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.set_etag(session_bundle.gzip_etag if use_gzip else session_bundle.version)
+    
+    # Versioned URLs never change content; unversioned ones must revalidate
+    if request.args.get('v') == session_bundle.version:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/api/session-key', methods=['POST'])
+@profiled
+def realtime_session_key():
+    """Hand out an ephemeral realtime session key from the pre-warmed pool"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'User not authenticated'}), 401
+    if not AZURE_OPENAI_API_KEY:
+        return jsonify({'error': 'API key not configured'}), 503
+    
+    try:
+        session_data = key_pool.acquire(DEPLOYMENT, VOICE)
+    except KeyMintError as e:
+        logger.error(f"Error minting realtime session key: {e}")
+        return jsonify({'error': str(e)}), 502
+    
+    return jsonify({
+        'id': session_data.get('id'),
+        'client_secret': session_data['client_secret']
     })
 
+def is_admin_request():
+    """True when the request carries the configured ADMIN_TOKEN"""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+@app.route('/api/admin/analytics')
+@profiled
+def admin_analytics():
+    """Cohort report across all saved career summaries"""
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    try:
+        report = run_blocking(cohort_analytics.report)
+    except Exception as e:
+        logger.error(f"Error building cohort report: {e}")
+        return jsonify({'error': 'Failed to build cohort report'}), 500
+    return jsonify(report)
+
+def parse_time_param(name):
+    """Epoch seconds for an ISO date/datetime query parameter (None if absent)"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+@app.route('/api/admin/transcripts/search')
+@profiled
+def admin_transcript_search():
+    """Search transcript lines by words, phrase, email, role and date range (cursor-paginated)"""
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    if transcript_index is None:
+        return jsonify({'error': 'Transcript index is disabled'}), 503
+    
+    try:
+        start = parse_time_param('from')
+        end = parse_time_param('to')
+        cursor = request.args.get('cursor', type=int)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    except ValueError:
+        return jsonify({'error': 'Invalid from/to date'}), 400
+    
+    try:
+        page = run_blocking(
+            transcript_index.search,
+            text=request.args.get('q'),
+            phrase=request.args.get('phrase'),
+            email=request.args.get('email'),
+            role=request.args.get('role'),
+            start=start,
+            end=end,
+            cursor=cursor,
+            limit=limit
+        )
+    except Exception as e:
+        logger.error(f"Error searching transcripts: {e}")
+        return jsonify({'error': 'Search failed'}), 500
+    return jsonify(page)
+
+@app.route('/api/conversation/history')
+@profiled
+def conversation_history():
+    """Page back through the user's conversation (?before=<turn number>&limit=)"""
+    session_id = session.get('user_id')
+    if not session_id:
+        return jsonify({'error': 'User not authenticated'}), 401
+    session_manager.touch(session_id)
+    
+    before = request.args.get('before', type=int)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    try:
+        page = session_manager.history(session_id, before=before, limit=limit)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error reading conversation history for {session_id}: {e}")
+        return jsonify({'error': 'Failed to read conversation history'}), 500
+    return jsonify(page)
+
+@app.route('/api/admin/sessions/memory')
+@profiled
+def admin_session_memory():
+    """Conversation memory held per session, largest first (?limit=)"""
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    usage = session_manager.conversations.memory_usage()
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 1000)
+    largest = sorted(usage.items(), key=lambda item: -item[1]['bytes'])[:limit]
+    return jsonify({
+        'sessions': len(usage),
+        'total_bytes': sum(entry['bytes'] for entry in usage.values()),
+        'max_turns': session_manager.conversations.max_turns,
+        'idle_timeout': SESSION_IDLE_TIMEOUT,
+        'stats': session_manager.conversations.stats,
+        'largest': [dict(entry, session_id=session_id) for session_id, entry in largest]
+    })
+
+@app.route('/api/admin/profile', methods=['GET', 'POST'])
+@profiled
+def admin_profile():
+    """Per-handler profile; POST {"enabled": bool, "reset": bool} toggles or clears it"""
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        if 'enabled' in data:
+            handler_profiler.enabled = bool(data['enabled'])
+            logger.info(f"Handler profiling {'enabled' if handler_profiler.enabled else 'disabled'}")
+        if data.get('reset'):
+            handler_profiler.reset()
+    return jsonify(handler_profiler.report())
+
+@app.route('/api/admin/profile/sample', methods=['POST'])
+@profiled
+def admin_profile_sample():
+    """Sample all stacks for ?seconds=N (at ?hz=) and return them collapsed for flamegraph tools"""
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    seconds = request.args.get('seconds', 10, type=float)
+    hz = request.args.get('hz', 100, type=int)
+    if not stack_sampler_lock.acquire(blocking=False):
+        return jsonify({'error': 'A profile is already being sampled'}), 409
+    try:
+        stacks = run_blocking(sample_stacks, seconds, hz)
+    finally:
+        stack_sampler_lock.release()
+    
+    response = make_response(stacks)
+    response.headers['Content-Type'] = 'text/plain; charset=utf-8'
+    return response
+
+@app.route('/metrics')
+@profiled
+def prometheus_metrics():
+    """Latency histograms and session counts in Prometheus text format"""
+    response = make_response(run_blocking(metrics.render))
+    response.headers['Content-Type'] = MetricsRegistry.CONTENT_TYPE
+    return response
+
 @app.route('/api/logout', methods=['POST'])
+@profiled
 def logout():
     """End session and logout"""
     if 'user_id' in session:
         session_manager.end_session(session['user_id'])
+        state_coalescer.discard(session['user_id'])
         session.clear()
     return jsonify({'success': True, 'redirect': url_for('register')})
 
 # WebSocket events
 @socketio.on('connect')
-def handle_connect():
+@timed_handler
+@profiled
+def handle_connect(auth=None):
     """Handle client connection"""
     logger.info(f"Client connected: {request.sid}")
+    connected_clients.add(request.sid)
+    
+    # Each registered user gets a room so state only reaches their own tabs
+    user_id = session.get('user_id')
+    if user_id:
+        join_room(user_id)
+        session_manager.touch(user_id)
+    
     emit('connected', {'status': 'Connected to server'})
 
 @socketio.on('disconnect')
+@timed_handler
+@profiled
 def handle_disconnect():
     """Handle client disconnection"""
     logger.info(f"Client disconnected: {request.sid}")
+    connected_clients.discard(request.sid)
+    if realtime_relay is not None:
+        realtime_relay.close(request.sid)
+    
+    # Coalescing slots for this connection, and for its user once their last tab has gone
+    state_coalescer.discard(request.sid)
+    user_id = session.get('user_id')
+    if user_id and not any(sid != request.sid for sid, _ in socketio.server.manager.get_participants('/', user_id)):
+        state_coalescer.discard(user_id)
+
+@socketio.on('turn_timing')
+@timed_handler
+@profiled
+def handle_turn_timing(data):
+    """Aggregate one turn's client-side stage timestamps into the latency histograms"""
+    turn_metrics.record(data, CLIENT_SESSION_TOOLS)
 
 @socketio.on('conversation_update')
+@timed_handler
+@profiled
 def handle_conversation_update(data):
     """Handle conversation updates for logging"""
     session_id = session.get('user_id')
     if session_id:
+        raw_message = data.get('message') if isinstance(data, dict) else None
+        try:
+            data = validate_payload('conversation_update', data)
+        except SchemaError as e:
+            logger.warning(f"Dropped conversation update from {session_id}: {e}")
+            return
         role = data.get('role', 'Unknown')
         message = data.get('message', '')
+        if isinstance(raw_message, str) and len(raw_message) > len(message):
+            logger.warning(f"Truncated a {len(raw_message)}-character conversation update from {session_id}")
+            message += f" [truncated {len(raw_message) - len(message)} characters]"
         session_manager.log_conversation(session_id, role, message)
         
-        # Broadcast state change to update animations
-        emit('state_change', {'state': data.get('state', 'idle')}, broadcast=True)
+        # Send state change to this user's tabs to update animations
+        state_coalescer.submit(session_id, 'state_change', {'state': data.get('state', 'idle')})
 
 @socketio.on('state_change')
+@timed_handler
+@profiled
 def handle_state_change(data):
     """Handle state changes for animation updates"""
     state = data.get('state', 'idle')
-    emit('animation_state', {'state': state}, broadcast=True)
+    room = session.get('user_id') or request.sid
+    if session.get('user_id'):
+        session_manager.touch(room)
+    state_coalescer.submit(room, 'animation_state', {'state': state})
 
 # Career Counseling WebSocket Events
 @socketio.on('career_start')
+@timed_handler
+@profiled
 def handle_career_start():
     """Initialize a career counseling session"""
     user_id = session.get('user_id')
@@ -361,6 +988,8 @@ def handle_career_start():
     logger.info(f"Started career counseling for {user_name} ({career_session_id})")
 
 @socketio.on('career_response')
+@timed_handler
+@profiled
 def handle_career_response(data):
     """Handle career counseling survey responses"""
     career_session_id = session.get('career_session_id')
@@ -370,14 +999,20 @@ def handle_career_response(data):
         emit('career_error', {'error': 'No active career counseling session'})
         return
     
+    try:
+        data = validate_payload('career_response', data)
+    except SchemaError as e:
+        emit('career_error', {'error': f"Invalid response: {e}"})
+        return
+    
     question_id = data.get('question_id')
     response = data.get('response')
     emotion = data.get('emotion', 'neutral')
     
     # Save the response
-    success = career_manager.save_response(career_session_id, question_id, response, emotion)
+    career_session = career_manager.save_response(career_session_id, question_id, response, emotion)
     
-    if success:
+    if career_session is not None:
         # Log to main session
         session_manager.log_conversation(
             user_id, 
@@ -388,12 +1023,14 @@ def handle_career_response(data):
         emit('career_response_saved', {
             'success': True,
             'question_id': question_id,
-            'questions_completed': len(career_manager.career_sessions[career_session_id]['completed_questions'])
+            'questions_completed': career_session.question_count
         })
     else:
         emit('career_error', {'error': 'Failed to save response'})
 
 @socketio.on('career_pause')
+@timed_handler
+@profiled
 def handle_career_pause(data):
     """Pause the career counseling session"""
     career_session_id = session.get('career_session_id')
@@ -402,6 +1039,12 @@ def handle_career_pause(data):
         emit('career_error', {'error': 'No active career counseling session'})
         return
     
+    try:
+        data = validate_payload('career_pause', data)
+    except SchemaError as e:
+        emit('career_error', {'error': f"Invalid pause request: {e}"})
+        return
+    
     current_question = data.get('current_question')
     success = career_manager.pause_session(career_session_id, current_question)
     
@@ -416,17 +1059,21 @@ def handle_career_pause(data):
         emit('career_error', {'error': 'Failed to pause session'})
 
 @socketio.on('career_resume')
+@timed_handler
+@profiled
 def handle_career_resume(data):
     """Resume a paused career counseling session"""
+    try:
+        data = validate_payload('career_resume', data)
+    except SchemaError as e:
+        emit('career_error', {'error': f"Invalid resume request: {e}"})
+        return
+    
     career_session_id = data.get('career_session_id')
     
     if not career_session_id:
         # Try to find by user
-        user_email = session.get('user_email')
-        for sid, sess in career_manager.paused_sessions.items():
-            if sess['user_email'] == user_email:
-                career_session_id = sid
-                break
+        career_session_id = career_manager.find_paused_session(session.get('user_email'))
     
     if not career_session_id:
         emit('career_error', {'error': 'No paused session found'})
@@ -440,8 +1087,8 @@ def handle_career_resume(data):
         emit('career_resumed', {
             'success': True,
             'career_session_id': career_session_id,
-            'current_question': resumed_session.get('current_question'),
-            'completed_questions': resumed_session['completed_questions'],
+            'current_question': resumed_session.current_question_id,
+            'completed_questions': resumed_session.completed_questions,
             'message': 'Session resumed successfully'
         })
         logger.info(f"Resumed career session {career_session_id}")
@@ -449,19 +1096,28 @@ def handle_career_resume(data):
         emit('career_error', {'error': 'Failed to resume session'})
 
 @socketio.on('career_summary')
+@timed_handler
+@profiled
 def handle_career_summary(data):
     """Save career counseling summary"""
+    try:
+        data = validate_payload('career_summary', data)
+    except SchemaError as e:
+        emit('career_error', {'error': f"Invalid summary: {e}"})
+        return
+    
     career_session_id = session.get('career_session_id') or data.get('session_id')
     user_id = session.get('user_id')
     
-    if not career_session_id or career_session_id not in career_manager.career_sessions:
+    if not career_session_id or career_manager.get_session(career_session_id) is None:
         emit('career_error', {'error': 'No active career counseling session'})
         return
     
-    # Save the summary
-    summary_file = career_manager.save_summary(career_session_id, data)
+    # Queue the summary and end the session; summary_persisted follows once it is on disk
+    queued = career_manager.complete_session(career_session_id, data, room=user_id or request.sid)
     
-    if summary_file:
+    if queued:
+        job_id, summary_file = queued
         # Log to main session
         total_questions = data.get('total_questions_answered', 0)
         session_manager.log_conversation(
@@ -472,12 +1128,13 @@ def handle_career_summary(data):
         
         emit('summary_saved', {
             'success': True,
+            'job_id': job_id,
             'file': summary_file,
+            'status': 'queued',
             'message': 'Career counseling summary saved successfully'
         })
         
-        # Clean up the career session
-        del career_manager.career_sessions[career_session_id]
+        # The career session has ended
         if 'career_session_id' in session:
             del session['career_session_id']
         
@@ -486,11 +1143,15 @@ def handle_career_summary(data):
         emit('career_error', {'error': 'Failed to save summary'})
 
 @socketio.on('career_progress')
+@timed_handler
+@profiled
 def handle_career_progress():
     """Get current career counseling progress"""
     career_session_id = session.get('career_session_id')
     
-    if not career_session_id or career_session_id not in career_manager.career_sessions:
+    session_data = career_manager.get_session(career_session_id) if career_session_id else None
+    
+    if session_data is None:
         emit('career_progress', {
             'active': False,
             'questions_completed': 0,
@@ -498,19 +1159,88 @@ def handle_career_progress():
         })
         return
     
-    session_data = career_manager.career_sessions[career_session_id]
-    
     emit('career_progress', {
         'active': True,
         'career_session_id': career_session_id,
-        'questions_completed': len(session_data['completed_questions']),
-        'completed_questions': session_data['completed_questions'],
-        'emotional_trajectory': session_data['emotional_trajectory']
+        'questions_completed': session_data.question_count,
+        'completed_questions': session_data.completed_questions,
+        'emotional_trajectory': session_data.emotional_trajectory
     })
 
+@socketio.on('career_next_question')
+@timed_handler
+@profiled
+def handle_career_next_question(data=None):
+    """Pick the next survey question and report completion (returned as the event ack)"""
+    try:
+        data = validate_payload('career_next_question', data)
+    except SchemaError as e:
+        return {'success': False, 'error': f"Invalid request: {e}"}
+    
+    result = schedule_questions(session.get('career_session_id'), data.get('completed_questions'),
+                                data.get('adjustment_action'), data.get('skip_optional'))
+    result['success'] = True
+    return result
+
+# Realtime relay events (browsers that cannot use WebRTC)
+@socketio.on('relay_start')
+@timed_handler
+@profiled
+def handle_relay_start(data=None):
+    """Open this client's upstream realtime connection (result returned as the event ack)"""
+    user_id = session.get('user_id')
+    if realtime_relay is None:
+        return {'success': False, 'error': 'Relay is not enabled'}
+    if not user_id:
+        return {'success': False, 'error': 'User not authenticated'}
+    
+    events = (data or {}).get('events') or []
+    if not isinstance(events, list) or len(events) > 8:
+        return {'success': False, 'error': 'Invalid relay start events'}
+    
+    # Relayed tool calls are recorded on the server-side career session
+    career_session_id = session.get('career_session_id')
+    if not career_session_id or career_manager.get_session(career_session_id) is None:
+        career_session_id = career_manager.create_career_session(user_id, session.get('user_name'),
+                                                                 session.get('user_email'))
+        session['career_session_id'] = career_session_id
+    
+    context = {'user_id': user_id, 'user_name': session.get('user_name'), 'career_session_id': career_session_id}
+    if not realtime_relay.open(request.sid, context, events):
+        return {'success': False, 'error': 'Relay is busy, please try again later'}
+    
+    logger.info(f"Relaying realtime session for {request.sid} ({career_session_id})")
+    return {'success': True, 'career_session_id': career_session_id}
+
+@socketio.on('relay_audio')
+@timed_handler
+@profiled
+def handle_relay_audio(frame):
+    """Forward one binary PCM16 microphone frame upstream"""
+    if realtime_relay is not None and isinstance(frame, (bytes, bytearray)):
+        realtime_relay.send_audio(request.sid, frame)
+
+@socketio.on('relay_send')
+@timed_handler
+@profiled
+def handle_relay_send(event):
+    """Forward one client realtime event (session.update, response.create, ...) upstream"""
+    if realtime_relay is not None:
+        realtime_relay.send_event(request.sid, event)
+
+@socketio.on('relay_stop')
+@timed_handler
+@profiled
+def handle_relay_stop():
+    """Close this client's upstream realtime connection"""
+    if realtime_relay is not None:
+        realtime_relay.close(request.sid)
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_ENV', 'development') == 'development'
     
     logger.info(f"Starting Flask app on port {port}")
-    socketio.run(app, host='0.0.0.0', port=port, debug=debug)
+    # No reloader: its child process would import the app again and repeat the
+    # startup work above (journal recovery and compaction) a second time
+    socketio.run(app, host='0.0.0.0', port=port, debug=debug, use_reloader=False)
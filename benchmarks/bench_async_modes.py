@@ -0,0 +1,87 @@
+"""
+Benchmark: memory per connection and handler latency per async mode
+
+Starts the app once per SOCKETIO_ASYNC_MODE, opens N idle websocket
+connections, and measures server RSS/thread growth per connection. It then
+measures p50/p99 round-trip latency of the career_progress handler while all
+connections stay open. Requires python-socketio[asyncio_client] (aiohttp).
+
+    python benchmarks/bench_async_modes.py --connections 1000 --modes threading eventlet gevent
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import socketio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from harness import percentile, proc_status, raise_fd_limit, spawn_server  # noqa: E402
+
+
+async def connect_all(url, count, batch=100):
+    clients = []
+    for start in range(0, count, batch):
+        group = [socketio.AsyncClient(reconnection=False) for _ in range(min(batch, count - start))]
+        await asyncio.gather(*(c.connect(url, transports=['websocket']) for c in group))
+        clients.extend(group)
+    return clients
+
+
+async def probe(client, rounds):
+    latencies = []
+    reply = asyncio.Event()
+    client.on('career_progress', lambda data: reply.set())
+    for _ in range(rounds):
+        reply.clear()
+        start = time.perf_counter()
+        await client.emit('career_progress')
+        await asyncio.wait_for(reply.wait(), timeout=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def measure(mode, connections, probes, rounds):
+    server, url = spawn_server({'SOCKETIO_ASYNC_MODE': mode})
+    try:
+        warm = await connect_all(url, 1)
+        await asyncio.sleep(0.5)
+        rss_before, threads_before = proc_status(server.pid)
+
+        clients = await connect_all(url, connections)
+        await asyncio.sleep(1.0)
+        rss_after, threads_after = proc_status(server.pid)
+
+        results = await asyncio.gather(*(probe(c, rounds) for c in clients[:probes]))
+        latencies = [ms for result in results for ms in result]
+
+        await asyncio.gather(*(c.disconnect() for c in clients + warm))
+    finally:
+        server.terminate()
+        server.wait()
+
+    per_conn_kb = (rss_after - rss_before) / connections
+    print(f"{mode:<10} {connections:>6} {per_conn_kb:>12.1f} {threads_after - threads_before:>10}"
+          f" {percentile(latencies, 50):>9.2f} {percentile(latencies, 99):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--modes', nargs='+', default=['threading', 'eventlet', 'gevent'])
+    parser.add_argument('--probes', type=int, default=50, help='connections that send requests')
+    parser.add_argument('--rounds', type=int, default=20, help='requests per probing connection')
+    args = parser.parse_args()
+
+    raise_fd_limit()
+
+    print(f"{'mode':<10} {'conns':>6} {'KB/conn':>12} {'+threads':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for mode in args.modes:
+        asyncio.run(measure(mode, args.connections, args.probes, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: career journal append cost and startup recovery time
+
+Journals full counseling sessions (create, answers, a pause and resume,
+depth changes, and for finished sessions a summary and end), then measures
+recovery three ways: replaying every segment with no snapshot, loading the
+compacted snapshot alone, and snapshot plus a short journal tail.
+
+    python benchmarks/bench_career_journal.py --sessions 10000 --answers 15
+"""
+
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from career_journal import CareerJournal, orjson  # noqa: E402
+from career_record import CareerSession  # noqa: E402
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+
+EMOTIONS = ['neutral', 'anxious', 'confused', 'hopeful', 'excited', 'overwhelmed']
+
+
+def journal_sessions(journal, sessions, answers, prefix='career'):
+    """Write the operations of ``sessions`` counseling sessions; returns (ops, seconds)"""
+    rng = random.Random(prefix)
+    question_ids = list(QUESTION_BANK)[:answers]
+    ops = 0
+    start = time.perf_counter()
+    for n in range(sessions):
+        career_session_id = f'{prefix}_{n}'
+        now = time.time()
+        journal.append('create', career_session_id, session=CareerSession(
+            career_session_id, f'user_{n}', f'Student {n}', f'student{n}@example.com').to_dict())
+        for k, question_id in enumerate(question_ids):
+            journal.append('response', career_session_id, question_id=question_id,
+                           response=f'Simulated answer from student {n} to {question_id}. ' * 3,
+                           emotion=rng.choice(EMOTIONS), at=now)
+            if k == len(question_ids) // 2:
+                journal.append('pause', career_session_id, current_question=question_id, at=now)
+                journal.append('resume', career_session_id, at=now)
+                journal.append('depth', career_session_id, depth_action='go_deeper')
+                ops += 3
+        ops += 1 + len(question_ids)
+        # Half the students finish; their summary file "exists", so compaction drops it
+        if n % 2:
+            journal.append('summary', career_session_id, file=__file__, summary={'session_id': career_session_id})
+            journal.append('end', career_session_id)
+            ops += 2
+    return ops, time.perf_counter() - start
+
+
+def recover_ms(directory):
+    journal = CareerJournal(directory)
+    state = journal.recover()
+    # Recovery queues compaction of the segments it replayed; let it finish before the next step
+    journal.compact()
+    journal.stop()
+    return journal.stats['recovery_ms'], journal.stats['replayed_entries'], len(state['sessions'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sessions', type=int, default=10000)
+    parser.add_argument('--answers', type=int, default=15)
+    parser.add_argument('--segment-entries', type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    print(f"encoder {'orjson' if orjson else 'json'}")
+
+    for fsync in (False, True):
+        journal = CareerJournal(tempfile.mkdtemp(), fsync=fsync, segment_entries=10 ** 9)
+        journal.recover()
+        sessions = args.sessions if not fsync else max(1, args.sessions // 100)
+        ops, elapsed = journal_sessions(journal, sessions, args.answers)
+        journal.stop()
+        print(f"append {'with' if fsync else 'without'} fsync: {elapsed * 1e6 / ops:>8.1f} us/op ({ops} ops)")
+
+    # Everything in segments, nothing compacted yet
+    directory = Path(tempfile.mkdtemp())
+    journal = CareerJournal(directory, segment_entries=10 ** 9)
+    journal.recover()
+    ops, _ = journal_sessions(journal, args.sessions, args.answers)
+    journal.stop()
+    size = sum(path.stat().st_size for path in directory.iterdir())
+    ms, replayed, live = recover_ms(directory)
+    print(f"\n{args.sessions} sessions, {ops} ops, {size / 1e6:.1f} MB of journal")
+    print(f"{'replay all segments':<30} {ms:>8.1f} ms  ({replayed} entries, {live} live sessions)")
+
+    # That recovery compacted the segments into a snapshot
+    size = sum(path.stat().st_size for path in directory.iterdir())
+    ms, replayed, live = recover_ms(directory)
+    print(f"{'snapshot only':<30} {ms:>8.1f} ms  ({replayed} entries, {live} live sessions, {size / 1e6:.1f} MB)")
+
+    journal = CareerJournal(directory, segment_entries=args.segment_entries)
+    journal.recover()
+    # Half a segment, so the tail is not rotated and compacted away before it is replayed
+    journal_sessions(journal, max(1, args.segment_entries // (args.answers + 5) // 2), args.answers, prefix='tail')
+    journal.stop()
+    ms, replayed, live = recover_ms(directory)
+    print(f"{'snapshot + journal tail':<30} {ms:>8.1f} ms  ({replayed} entries, {live} live sessions)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: resident memory of career sessions as dicts vs slotted CareerSession records
+
+Builds the same sessions twice, once in the old dict-of-dicts layout
+(ISO timestamp strings, question ids repeated in completed_questions,
+responses and emotional_trajectory) and once as CareerSession records, and
+compares traced memory. Then times recording an answer and the lazy
+conversions back to the JSON shape.
+
+    python benchmarks/bench_career_records.py --sessions 100000 --answers 15
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from career_record import EMOTIONS, CareerSession  # noqa: E402
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+
+EMOTION_NAMES = [EMOTIONS.value(n) for n in range(len(EMOTIONS))]
+
+
+def answers(n, count):
+    rng = random.Random(n)
+    for question_id in list(QUESTION_BANK)[:count]:
+        # A third of the answers come without an emotion
+        emotion = rng.choice(EMOTION_NAMES) if rng.random() > 0.33 else None
+        yield question_id, f'Answer {n} to {question_id}: ' + 'pata nahi, maybe design ' * rng.randint(1, 4), emotion
+
+
+def dict_session(n, count):
+    """The pre-record layout, filled the way CareerCounselingManager used to"""
+    session = {
+        'id': f'career_{n}', 'user_id': f'user_{n}', 'user_name': f'Student {n}',
+        'user_email': f'student{n}@example.com', 'start_time': datetime.now(),
+        'completed_questions': [], 'responses': {}, 'state': 'active', 'emotional_trajectory': []
+    }
+    for question_id, text, emotion in answers(n, count):
+        session['responses'][question_id] = {
+            'response': text, 'timestamp': datetime.now().isoformat(), 'emotion': emotion or 'neutral'}
+        if question_id not in session['completed_questions']:
+            session['completed_questions'].append(question_id)
+        if emotion:
+            session['emotional_trajectory'].append({
+                'question_id': question_id, 'emotion': emotion, 'timestamp': datetime.now().isoformat()})
+    return session
+
+
+def record_session(n, count):
+    session = CareerSession(f'career_{n}', f'user_{n}', f'Student {n}', f'student{n}@example.com')
+    for question_id, text, emotion in answers(n, count):
+        session.record_response(question_id, text, emotion, time.time())
+    return session
+
+
+def resident(label, build, sessions, count):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = {n: build(n, count) for n in range(sessions)}
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {current / 1e6:>8.1f} MB  {current / sessions:>7.0f} B/session   build {elapsed:.1f}s")
+    return held, current
+
+
+def per_call_us(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) * 1e6 / len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sessions', type=int, default=100000)
+    parser.add_argument('--answers', type=int, default=15)
+    args = parser.parse_args()
+    print(f"{args.sessions} resident sessions x {args.answers} answers\n")
+
+    held, dict_bytes = resident('dict-of-dicts', dict_session, args.sessions, args.answers)
+    sample = list(held.values())[:10000]
+    to_json_dicts = per_call_us(lambda s: s['completed_questions'], sample)
+    del held, sample
+
+    held, record_bytes = resident('CareerSession records', record_session, args.sessions, args.answers)
+    print(f"{'':<28} {dict_bytes / record_bytes:>8.1f}x smaller\n")
+
+    sample = list(held.values())[:10000]
+    print(f"{'record_response':<28} {per_call_us(lambda s: s.record_response('intro', 'again', 'hopeful'), sample):>8.2f} us")
+    print(f"{'completed_questions (dict)':<28} {to_json_dicts:>8.2f} us")
+    print(f"{'completed_questions':<28} {per_call_us(lambda s: s.completed_questions, sample):>8.2f} us")
+    print(f"{'emotional_trajectory':<28} {per_call_us(lambda s: s.emotional_trajectory, sample):>8.2f} us")
+    print(f"{'to_dict':<28} {per_call_us(CareerSession.to_dict, sample):>8.2f} us")
+    states = [session.to_dict() for session in sample]
+    print(f"{'from_dict':<28} {per_call_us(CareerSession.from_dict, states):>8.2f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: cohort report over a directory of career summaries
+
+Writes N synthetic summaries, then times:
+  - a cold report (no cache) with one parser process and with --workers
+  - a warm re-run in a fresh CohortAnalytics (on-disk cache only)
+  - an incremental run after --new more summaries arrive
+
+    python benchmarks/bench_cohort_analytics.py --summaries 5000 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cohort_analytics import CohortAnalytics  # noqa: E402
+from harness import write_summaries  # noqa: E402
+
+
+def timed(label, analytics):
+    start = time.perf_counter()
+    report = analytics.report()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<28} {elapsed:>9.1f} ms   {report['sessions']:>7} sessions, parsed {report['cache']['parsed']}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--summaries', type=int, default=5000)
+    parser.add_argument('--new', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    summary_dir = Path(tempfile.mkdtemp())
+    write_summaries(summary_dir, args.summaries)
+    cache = summary_dir / '.analytics_cache.json'
+    print(f"{args.summaries} summaries, {os.cpu_count()} CPUs")
+
+    timed('cold, 1 process', CohortAnalytics(summary_dir, workers=1))
+    cache.unlink()
+    timed(f'cold, {args.workers} processes', CohortAnalytics(summary_dir, workers=args.workers))
+    timed('warm (disk cache)', CohortAnalytics(summary_dir, workers=args.workers))
+
+    analytics = CohortAnalytics(summary_dir, workers=args.workers)
+    analytics.report()
+    write_summaries(summary_dir, args.new, start=args.summaries)
+    timed(f'incremental (+{args.new} files)', analytics)
+    timed('unchanged (in memory)', analytics)
+
+
+if __name__ == '__main__':
+    main()
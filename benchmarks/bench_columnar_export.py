@@ -0,0 +1,98 @@
+"""
+Benchmark: scanning counseling responses from raw summary JSON vs the columnar export
+
+Writes N synthetic summaries, exports them (npz and csv), appends a nightly
+batch, then times the same query over each source: emotion counts per
+question plus mean response length across every answered question.
+
+    python benchmarks/bench_columnar_export.py --summaries 5000
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from columnar_export import ColumnarExporter, scan  # noqa: E402
+from harness import write_summaries  # noqa: E402
+
+
+def query_json(summary_dir):
+    counts, total_chars, rows = Counter(), 0, 0
+    for path in Path(summary_dir).glob('*_summary.json'):
+        with open(path, 'rb') as f:
+            summary = json.loads(f.read())
+        for question_id, response in summary['responses'].items():
+            counts[(question_id, response['emotion'])] += 1
+            total_chars += len(response['response'])
+            rows += 1
+    return rows, total_chars / rows, counts
+
+
+def query_columns(export_dir, with_text):
+    columns = ('question_id', 'emotion', 'response') if with_text else ('question_id', 'emotion')
+    data = scan(export_dir, columns=columns, as_codes=True)
+    question_codes, questions = data['question_id']
+    emotion_codes, emotions = data['emotion']
+    counts = np.bincount(question_codes * len(emotions) + emotion_codes, minlength=len(questions) * len(emotions))
+    mean_chars = float(np.mean([len(text) for text in data['response']])) if with_text else None
+    return len(question_codes), mean_chars, {
+        f'{q}|{e}': int(counts[i * len(emotions) + j])
+        for i, q in enumerate(questions) for j, e in enumerate(emotions) if counts[i * len(emotions) + j]
+    }
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print(f"{label:<34} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    return result
+
+
+def size_of(path):
+    return sum(p.stat().st_size for p in Path(path).rglob('*') if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--summaries', type=int, default=5000)
+    parser.add_argument('--nightly', type=int, default=200, help='summaries appended by the second run')
+    args = parser.parse_args()
+
+    summary_dir = Path(tempfile.mkdtemp())
+    write_summaries(summary_dir, args.summaries)
+    npz_dir, csv_dir = Path(tempfile.mkdtemp()), Path(tempfile.mkdtemp())
+    print(f"{args.summaries} summaries + {args.nightly} appended\n")
+
+    timed('export npz (initial)', ColumnarExporter(summary_dir, npz_dir).export)
+    timed('export csv (initial)', ColumnarExporter(summary_dir, csv_dir, fmt='csv').export)
+    write_summaries(summary_dir, args.nightly, start=args.summaries)
+    stats = timed('export npz (nightly append)', ColumnarExporter(summary_dir, npz_dir).export)
+    print(f"  appended {stats['sessions']} sessions, {stats['rows']} rows")
+    ColumnarExporter(summary_dir, csv_dir, fmt='csv').export()
+    timed('export npz (nothing new)', ColumnarExporter(summary_dir, npz_dir).export)
+
+    print(f"\nraw JSON {size_of(summary_dir) / 1e6:.1f} MB, npz {size_of(npz_dir) / 1e6:.1f} MB, "
+          f"csv.gz {size_of(csv_dir) / 1e6:.1f} MB\n")
+
+    rows, mean_chars, json_counts = timed('scan raw JSON directory', query_json, summary_dir)
+    npz_rows, npz_chars, npz_counts = timed('scan npz (with response text)', query_columns, npz_dir, True)
+    timed('scan npz (categorical columns only)', query_columns, npz_dir, False)
+    csv_rows, _, _ = timed('scan csv.gz (with response text)', query_columns, csv_dir, True)
+
+    assert rows == npz_rows == csv_rows
+    assert abs(mean_chars - npz_chars) < 1e-6
+    assert {f'{q}|{e}': n for (q, e), n in json_counts.items()} == npz_counts
+    print(f"\n{rows} rows, results match")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: conversation memory with unbounded lists vs the bounded ConversationBuffer
+
+Feeds the same long conversations into per-session lists of dicts (the old
+SessionManager layout) and into a ConversationBuffer, and compares traced
+memory, the buffer's own accounting, append cost, and paging older turns
+back from a transcript file.
+
+    python benchmarks/bench_conversation_buffer.py --sessions 2000 --turns 500
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from conversation_buffer import ConversationBuffer  # noqa: E402
+from transcript_index import read_transcript  # noqa: E402
+
+WORDS = ('i want to study design but my parents say engineering is safer and i am worried '
+         'about ai taking jobs so maybe data science or product management could work').split()
+
+
+def messages(count, seed):
+    rng = random.Random(seed)
+    for n in range(count):
+        yield ('User' if n % 2 else 'Assistant'), ' '.join(rng.choices(WORDS, k=rng.randint(8, 40)))
+
+
+def measure(label, fill):
+    start = time.perf_counter()
+    fill()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    holder = fill()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {current / 1e6:>8.1f} MB   fill {elapsed:.2f}s")
+    return holder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--turns', type=int, default=500)
+    parser.add_argument('--max-turns', type=int, default=100)
+    args = parser.parse_args()
+    timestamp = '12:00:00'
+    print(f"{args.sessions} sessions x {args.turns} turns, buffer keeps {args.max_turns}\n")
+
+    def fill_lists():
+        conversations = {}
+        for session in range(args.sessions):
+            for role, message in messages(args.turns, session):
+                conversations.setdefault(session, []).append(
+                    {'timestamp': timestamp, 'role': role, 'message': message})
+        return conversations
+
+    def fill_buffer():
+        buffer = ConversationBuffer(max_turns=args.max_turns)
+        for session in range(args.sessions):
+            for role, message in messages(args.turns, session):
+                buffer.append(session, timestamp, role, message)
+        return buffer
+
+    measure('unbounded lists of dicts', fill_lists)
+    buffer = measure('ConversationBuffer', fill_buffer)
+    print(f"{'  buffer accounting says':<34} {buffer.total_bytes() / 1e6:>8.1f} MB")
+
+    # Page a whole conversation back, the older part from its transcript
+    transcript = Path(tempfile.mkdtemp()) / 'session.txt'
+    started = datetime(2025, 6, 1, 10)
+    with open(transcript, 'w', encoding='utf-8') as f:
+        f.write(f"Session Started: {started.isoformat()}\nUser: Bench (bench@example.com)\n"
+                f"Session ID: 0\n{'-' * 80}\n\n")
+        for n, (role, message) in enumerate(messages(args.turns, 0)):
+            f.write(f"[{started + timedelta(seconds=n):%H:%M:%S}] {role}: {message}\n")
+
+    def read_older(start, stop):
+        return [
+            {'timestamp': ts.strftime('%H:%M:%S'), 'role': role, 'message': message}
+            for _, _, ts, role, message in islice(read_transcript(transcript), start, stop)
+        ]
+
+    start = time.perf_counter()
+    pages, before = 0, None
+    while before != 0:
+        page = buffer.history(0, read_older, before=before, limit=50)
+        before = page['start']
+        pages += 1
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"\npaged {args.turns} turns back in {pages} pages: {elapsed:.1f} ms "
+          f"({buffer.stats['disk_reads']} transcript reads)")
+
+
+if __name__ == '__main__':
+    main()
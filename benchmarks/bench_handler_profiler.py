@@ -0,0 +1,125 @@
+"""
+Benchmark: cost of the handler profiling hooks, disabled and enabled
+
+Times a trivial function bare, wrapped with profiling off, and wrapped with
+profiling on; then the same through Flask routes and Socket.IO events of
+the app; then how much a busy thread slows down while the stack sampler
+runs.
+
+    python benchmarks/bench_handler_profiler.py --calls 1000000 --requests 5000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from handler_profiler import HandlerProfiler, sample_stacks  # noqa: E402
+
+
+def handler(value):
+    return value
+
+
+def per_call_ns(func, calls):
+    start = time.perf_counter_ns()
+    for n in range(calls):
+        func(n)
+    return (time.perf_counter_ns() - start) / calls
+
+
+def micro(calls):
+    profiler = HandlerProfiler()
+    wrapped = profiler.wrap(handler)
+    bare = min(per_call_ns(handler, calls) for _ in range(3))
+    disabled = min(per_call_ns(wrapped, calls) for _ in range(3))
+    profiler.enabled = True
+    enabled = min(per_call_ns(wrapped, calls // 10) for _ in range(3))
+    print(f"{'bare function':<34} {bare:>8.0f} ns/call")
+    print(f"{'wrapped, profiling disabled':<34} {disabled:>8.0f} ns/call   (+{disabled - bare:.0f} ns)")
+    print(f"{'wrapped, profiling enabled':<34} {enabled:>8.0f} ns/call   (+{enabled - bare:.0f} ns)")
+
+
+def app_round_trips(requests):
+    os.chdir(tempfile.mkdtemp())
+    logging.disable(logging.INFO)
+    import app as server
+
+    http = server.app.test_client()
+    http.post('/api/register', json={'email': 'bench@example.com', 'name': 'Bench'})
+    socket = server.socketio.test_client(server.app, flask_test_client=http)
+
+    def run():
+        start = time.perf_counter()
+        for _ in range(requests):
+            http.get('/api/config')
+        route_us = (time.perf_counter() - start) * 1e6 / requests
+        start = time.perf_counter()
+        for _ in range(requests):
+            socket.emit('career_next_question', {'completed_questions': ['intro']}, callback=True)
+        socket_us = (time.perf_counter() - start) * 1e6 / requests
+        return route_us, socket_us
+
+    print()
+    run()
+    for enabled in (False, True, False, True):
+        server.handler_profiler.enabled = enabled
+        route_us, socket_us = run()
+        label = 'enabled' if enabled else 'disabled'
+        print(f"profiling {label:<9} GET /api/config {route_us:>7.1f} us   "
+              f"career_next_question {socket_us:>7.1f} us")
+    profile = server.handler_profiler.report()['handlers']
+    print(f"  profiled get_config: {profile['get_config']}")
+    socket.disconnect()
+
+
+def busy_loop(stop, counter):
+    total = 0
+    while not stop.is_set():
+        for n in range(1000):
+            total += n * n
+        counter[0] += 1
+
+
+def sampler(seconds, hz):
+    def throughput(sample):
+        stop, counter = threading.Event(), [0]
+        worker = threading.Thread(target=busy_loop, args=(stop, counter), name='busy')
+        worker.start()
+        stacks = sample_stacks(seconds, hz) if sample else time.sleep(seconds)
+        stop.set()
+        worker.join()
+        return counter[0] / seconds, stacks
+
+    base, _ = throughput(False)
+    sampled, stacks = throughput(True)
+    samples = sum(int(line.rsplit(' ', 1)[1]) for line in stacks.splitlines())
+    print(f"\nbusy thread {base:,.0f} loops/s alone, {sampled:,.0f} loops/s while sampling at {hz} Hz "
+          f"({(1 - sampled / base) * 100:.1f}% slower); {samples} samples, "
+          f"{len(stacks.splitlines())} distinct stacks")
+    busy = [line for line in stacks.splitlines() if line.startswith('busy;')]
+    print(f"  busy thread: {busy[0] if busy else 'no samples'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--calls', type=int, default=1000000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--hz', type=int, default=100)
+    args = parser.parse_args()
+
+    micro(args.calls)
+    app_round_trips(args.requests)
+    sampler(args.seconds, args.hz)
+
+
+if __name__ == '__main__':
+    main()
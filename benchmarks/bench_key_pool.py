@@ -0,0 +1,115 @@
+"""
+Benchmark: ephemeral key latency against a local stand-in sessions endpoint
+
+Starts a stand-in for the realtime sessions endpoint that adds a fixed mint
+delay, then compares:
+  - a new connection per mint (what the browser used to do)
+  - minting over the keep-alive pool
+  - handing out pre-warmed keys through /api/session-key
+
+    python benchmarks/bench_key_pool.py --mint-ms 80 --requests 50
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import percentile  # noqa: E402
+
+
+def make_stand_in(mint_delay, ttl):
+    class SessionsHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            if not self.headers.get('api-key'):
+                self.send_response(401)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            time.sleep(mint_delay)
+            payload = json.dumps({
+                'id': f'sess_{uuid.uuid4().hex[:12]}',
+                'model': body.get('model'),
+                'voice': body.get('voice'),
+                'client_secret': {'value': f'ek_{uuid.uuid4().hex}', 'expires_at': int(time.time()) + ttl},
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SessionsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed(label, func, count, gap=0.0):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(gap)
+    print(f"{label:<28} p50 {percentile(samples, 50):>8.2f} ms   p99 {percentile(samples, 99):>8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--mint-ms', type=float, default=80.0, help='stand-in processing time per mint')
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--gap-ms', type=float, default=200.0, help='time between key requests')
+    args = parser.parse_args()
+
+    stand_in = make_stand_in(args.mint_ms / 1000, ttl=60)
+    sessions_url = f'http://127.0.0.1:{stand_in.server_port}/openai/realtimeapi/sessions?api-version=test'
+
+    os.environ.update(AZURE_OPENAI_API_KEY='test-key', SESSIONS_URL=sessions_url, KEY_POOL_SIZE='2')
+    os.chdir(tempfile.mkdtemp())
+    import logging
+    logging.disable(logging.INFO)
+    import app as app_module
+    from key_pool import EphemeralKeyPool
+
+    def cold_mint():
+        EphemeralKeyPool(sessions_url, 'test-key', pool_size=0).mint('gpt-realtime', 'alloy')
+
+    warm = EphemeralKeyPool(sessions_url, 'test-key', pool_size=0)
+    warm.mint('gpt-realtime', 'alloy')
+
+    http = app_module.app.test_client()
+    http.post('/api/register', json={'email': 'bench@example.com', 'name': 'Bench'})
+    time.sleep(0.5)
+
+    def pooled():
+        response = http.post('/api/session-key')
+        assert response.status_code == 200, response.json
+        assert response.json['client_secret']['value'].startswith('ek_')
+
+    print(f"stand-in mint time {args.mint_ms:.0f} ms, {args.requests} requests")
+    timed('new connection per mint', cold_mint, args.requests)
+    timed('keep-alive mint', lambda: warm.mint('gpt-realtime', 'alloy'), args.requests)
+    # Requests arrive gap-ms apart, giving the refill thread time to top up the pool
+    timed('/api/session-key (pooled)', pooled, args.requests, args.gap_ms / 1000)
+    print(f"pool stats: {app_module.key_pool.stats}")
+    stand_in.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: throughput of pcm_audio in audio-seconds processed per CPU-second
+
+Generates a speech-like stream (noise bursts with a syllable-rate envelope
+between quiet pauses) at each rate and times, with process CPU time, each
+stage streamed in --chunk-ms chunks the way relayed microphone audio
+arrives, and as one block:
+
+  pcm16 -> float, float -> pcm16
+  resampling between 48k, 24k and 16k (plus SNR on a 1 kHz tone and how far
+  a tone above the new Nyquist frequency is suppressed)
+  per-frame RMS/peak, and SpeechSegmenter speech/silence segmentation
+
+A figure of 1000x means one core keeps up with 1000 live streams of that
+stage.
+
+    python benchmarks/bench_pcm_audio.py --seconds 60 --chunk-ms 20
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pcm_audio import (  # noqa: E402
+    FRAME_MS, SAMPLE_RATES, Resampler, SpeechSegmenter, float_to_pcm16, frame_levels, pcm16_to_float, to_dbfs
+)
+
+
+def speech_like(rate, seconds, rng):
+    """Float32 noise bursts of 0.3-3 s, shaped at a syllable rate, between 0.2-1.5 s pauses"""
+    parts, total = [], 0
+    while total < rate * seconds:
+        pause = int(rng.uniform(0.2, 1.5) * rate)
+        speech = int(rng.uniform(0.3, 3.0) * rate)
+        envelope = np.abs(np.sin(np.arange(speech) * (2 * np.pi * 4 / rate))) + 0.05
+        parts += [rng.normal(0, 0.001, pause), rng.normal(0, 0.1, speech) * envelope]
+        total += pause + speech
+    return np.concatenate(parts)[:rate * seconds].astype(np.float32)
+
+
+def throughput(func, chunks, seconds, repeat):
+    """Audio-seconds per CPU-second of calling func on every chunk, best of ``repeat``"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.process_time()
+        for chunk in chunks:
+            func(chunk)
+        best = min(best, time.process_time() - start)
+    return seconds / best if best else float('inf')
+
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def tone_quality(from_rate, to_rate):
+    """(SNR of a resampled 1 kHz tone in dB, level of a tone above the new Nyquist in dBFS)"""
+    t = np.arange(from_rate) / from_rate
+    resampler = Resampler(from_rate, to_rate)
+    out = resampler.process((0.5 * np.sin(2 * np.pi * 1000 * t)).astype(np.float32))
+    ideal = 0.5 * np.sin(2 * np.pi * 1000 * (np.arange(len(out)) - resampler.delay) / to_rate)
+    steady = slice(200, len(out) - 200)
+    snr = 10 * np.log10(np.mean(ideal[steady] ** 2) / np.mean((out[steady] - ideal[steady]) ** 2))
+    if to_rate >= from_rate:
+        return snr, None
+    alias = Resampler(from_rate, to_rate).process((0.5 * np.sin(2 * np.pi * 0.6 * to_rate * t)).astype(np.float32))
+    return snr, float(to_dbfs(np.sqrt(np.mean(alias[200:] ** 2))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--seconds', type=int, default=60, help='audio per stage')
+    parser.add_argument('--chunk-ms', type=int, default=20, help='streamed chunk size')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    rng = np.random.default_rng(7)
+    rows = []
+
+    def report(stage, rate, func, samples):
+        streamed = throughput(func, split(samples, rate * args.chunk_ms // 1000), args.seconds, args.repeat)
+        block = throughput(func, [samples], args.seconds, args.repeat)
+        rows.append((stage, rate, streamed, block))
+
+    for rate in SAMPLE_RATES:
+        audio = speech_like(rate, args.seconds, rng)
+        pcm = float_to_pcm16(audio)
+        report('pcm16 -> float', rate, pcm16_to_float, pcm)
+        report('float -> pcm16', rate, float_to_pcm16, audio)
+        frame_len = rate * FRAME_MS // 1000
+        report(f'rms + peak ({FRAME_MS} ms frames)', rate, lambda chunk: frame_levels(chunk, frame_len), audio)
+        segmenter = SpeechSegmenter(rate)
+        report('speech segmentation', rate, segmenter.feed, audio)
+        for to_rate in SAMPLE_RATES:
+            if to_rate != rate:
+                resampler = Resampler(rate, to_rate)
+                report(f'resample -> {to_rate // 1000}k', rate, resampler.process, audio)
+
+    print(f"{args.seconds}s of speech-like audio per stage, streamed in {args.chunk_ms} ms chunks or one block; "
+          f"audio-seconds per CPU-second (x realtime)\n")
+    print(f"{'stage':<28} {'rate':>6} {'streamed':>11} {'block':>11}")
+    for stage, rate, streamed, block in rows:
+        print(f"{stage:<28} {rate // 1000:>5}k {streamed:>10.0f}x {block:>10.0f}x")
+
+    print(f"\n{'resampler':<16} {'taps/phase':>10} {'1 kHz SNR':>10} {'alias':>11}")
+    for from_rate in SAMPLE_RATES:
+        for to_rate in SAMPLE_RATES:
+            if to_rate != from_rate:
+                snr, alias = tone_quality(from_rate, to_rate)
+                alias = '' if alias is None else f"{alias:.1f} dBFS"
+                print(f"{f'{from_rate // 1000}k -> {to_rate // 1000}k':<16} "
+                      f"{Resampler(from_rate, to_rate).taps_per_phase:>10} {snr:>7.1f} dB {alias:>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: next-question and completion checks, list scans vs the bitmask scheduler
+
+The list version is a direct port of the old browser logic (getNextQuestion
+filtering requiredQuestions with includes, checkCompletion testing a core list).
+The scheduler version goes through QuestionScheduler.schedule, which also builds
+the full reply returned to the client.
+
+    python benchmarks/bench_question_scheduler.py --states 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from question_scheduler import scheduler  # noqa: E402
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+
+REQUIRED = [q for q, spec in QUESTION_BANK.items() if spec['required']]
+OPTIONAL = [q for q, spec in QUESTION_BANK.items() if not spec['required']]
+CORE = ['intro', 'academic_status', 'career_confusion', 'ai_fears', 'immediate_need']
+
+
+def list_next_and_completion(completed, skip_optional):
+    unanswered = [q for q in REQUIRED if q not in completed]
+    if not unanswered and not skip_optional:
+        unanswered = [q for q in OPTIONAL if q not in completed]
+    is_complete = len(completed) >= 8 and all(q in completed for q in CORE)
+    answered_required = [q for q in completed if q in REQUIRED]
+    return unanswered[0] if unanswered else None, is_complete, round(len(answered_required) * 100 / len(REQUIRED))
+
+
+def bitmask_next_and_completion(completed, skip_optional):
+    return scheduler.schedule(scheduler.mask(completed), scheduler.skip_mask(None, skip_optional))
+
+
+def bitmask_only(completed_mask, skipped):
+    return scheduler.next_question(completed_mask, skipped), scheduler.is_complete(completed_mask, skipped)
+
+
+def run(label, func, states):
+    start = time.perf_counter()
+    for args in states:
+        func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed / len(states) * 1e6:>8.2f} us/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--states', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    question_ids = list(QUESTION_BANK)
+    states = []
+    for _ in range(args.states):
+        completed = rng.sample(question_ids, rng.randint(0, len(question_ids)))
+        states.append((completed, rng.random() < 0.3))
+
+    # Same answers from both implementations (completion differs by design: see checkCompletion drift)
+    for completed, skip_optional in states[:1000]:
+        expected = list_next_and_completion(completed, skip_optional)[0]
+        assert bitmask_next_and_completion(completed, skip_optional).get('next_question') == expected
+
+    masks = [(scheduler.mask(completed), scheduler.skip_mask(None, skip)) for completed, skip in states]
+    print(f"{args.states} random session states, {len(question_ids)} questions")
+    run('list scans (old JS logic)', list_next_and_completion, states)
+    run('scheduler.schedule (full reply)', bitmask_next_and_completion, states)
+    run('bitmask next + completion only', bitmask_only, masks)
+
+
+if __name__ == '__main__':
+    main()
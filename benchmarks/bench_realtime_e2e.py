@@ -0,0 +1,307 @@
+"""
+Benchmark: time-to-first-audio and per-turn latency of the voice path against the mock realtime server
+
+Starts benchmarks/mock_realtime.py in-process and the app as a real server
+pointed at it (AZURE_OPENAI_API_KEY and SESSIONS_URL), then runs headless
+students that do what career_chat_integrated.js does:
+
+  page load   register, connect Socket.IO, GET /api/config and the session
+              bundle, career_start
+  Start       POST /api/session-key, open the realtime connection with the
+              ephemeral key (a WebSocket to the mock where the browser would
+              do the WebRTC offer/answer), send the filled-in session.update
+              and response.create
+  each turn   speak an answer (PCM16 appended and committed, server VAD
+              starts the response; --text-turns sends a text item and
+              response.create instead), run the tool calls the way the client
+              does (record_response_and_get_next asks the app's
+              career_next_question, end_session_summary emits career_summary),
+              send the outputs and one response.create per response, and
+              report turn_timing to the app like the browser
+
+It reports time-to-first-audio after Start (with the key and connect steps)
+and per-turn latency from the end of speech to each stage, next to what the
+mock's scripted latency alone accounts for; the difference is what the app
+and client add. The last turn also runs end_session_summary, one more model
+response, so it shows up in the tail percentiles.
+
+    python benchmarks/bench_realtime_e2e.py --students 20 --first-event-ms 300
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import aiohttp
+import socketio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import percentile, spawn_server  # noqa: E402
+from mock_realtime import AUDIO_RATE, Latency, MockRealtimeServer  # noqa: E402
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+
+FRAME_MS = 20
+SPEECH_FRAME = base64.b64encode(bytes(AUDIO_RATE * 2 * FRAME_MS // 1000)).decode('ascii')
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+class HeadlessBrowser:
+    """One student's tab, playing career_chat_integrated.js against the app and the mock"""
+
+    def __init__(self, index, app_url, realtime_url, args, results):
+        self.index = index
+        self.app_url = app_url
+        self.realtime_url = realtime_url
+        self.args = args
+        self.results = results
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.ws = None
+        self.completed = []
+        self.summary = None
+        self.sio.on('summary_saved', self._summary_reply('summary_saved'))
+        self.sio.on('career_error', self._summary_reply('career_error'))
+
+    def _summary_reply(self, name):
+        async def handler(data=None):
+            if self.summary is not None and not self.summary.done():
+                self.summary.set_result(name)
+        return handler
+
+    def session_update(self, bundle, name):
+        values = {
+            'current_language': 'ENGLISH', 'previous_language': 'ENGLISH',
+            'language_instructions': bundle['language_instructions']['english'],
+            'student_first_name': name.split(' ')[0],
+            'session_state': f"# Current Session State\nCompleted Questions: {json.dumps(self.completed)}\n",
+        }
+        template = bundle['session_update']
+        instructions = PLACEHOLDER.sub(lambda m: values.get(m.group(1), m.group(0)),
+                                       template['session']['instructions'])
+        return {**template, 'session': {**template['session'], 'instructions': instructions}}
+
+    async def send(self, event):
+        await self.ws.send_str(json.dumps(event))
+
+    async def receive(self):
+        message = await asyncio.wait_for(self.ws.receive(), timeout=30)
+        if message.type != aiohttp.WSMsgType.TEXT:
+            raise RuntimeError(f"realtime connection closed ({message.type.name})")
+        return json.loads(message.data)
+
+    async def run(self, http):
+        name = f'Student {self.index}'
+        async with http.post(f'{self.app_url}/api/register', json={'email': f'student{self.index}@example.com',
+                                                                   'name': name}) as r:
+            r.raise_for_status()
+        cookie = '; '.join(f'{c.key}={c.value}' for c in http.cookie_jar)
+        await self.sio.connect(self.app_url, headers={'Cookie': cookie}, transports=['websocket'])
+        try:
+            async with http.get(f'{self.app_url}/api/config') as r:
+                config = await r.json()
+            async with http.get(self.app_url + config['session_bundle_url']) as r:
+                bundle = await r.json()
+            await self.sio.emit('career_start')
+
+            # The student presses Start
+            started = time.perf_counter()
+            async with http.post(self.app_url + config['session_key_url']) as r:
+                r.raise_for_status()
+                key = (await r.json())['client_secret']['value']
+            keyed = time.perf_counter()
+            self.ws = await http.ws_connect(f"{self.realtime_url}?deployment={config['deployment']}",
+                                            headers={'Authorization': f'Bearer {key}'})
+            connected = time.perf_counter()
+            self.results['start: session key'].append((keyed - started) * 1000)
+            self.results['start: realtime connect'].append((connected - keyed) * 1000)
+
+            await self.send(self.session_update(bundle, name))
+            await self.send({'type': 'response.create'})
+            first_audio, _, _ = await self.play_response(started)
+            self.results['start: first audio'].append(first_audio)
+
+            for question_id in QUESTION_BANK:
+                if self.summary is not None:
+                    break
+                spoken_at = await self.speak(f'My answer about {question_id}, from student {self.index}. ' * 2)
+                first_audio, marks, tools = await self.play_response(spoken_at)
+                self.results['turn: first audio'].append(first_audio)
+                for mark, value in marks.items():
+                    self.results[f'turn: {mark}'].append(value)
+                for tool in tools:
+                    self.results[f"tool: {tool['name']}"].append(tool['ms'])
+                await self.sio.emit('turn_timing', {'marks': {'speech_stopped': 0, **marks}, 'tools': tools})
+
+            if self.summary is None:
+                self.results['errors'].append('survey never completed')
+            elif await asyncio.wait_for(self.summary, timeout=30) != 'summary_saved':
+                self.results['errors'].append('summary rejected')
+        finally:
+            if self.ws is not None:
+                await self.ws.close()
+            await self.sio.disconnect()
+
+    async def speak(self, text):
+        """Send one answer; returns the time the student stopped speaking"""
+        if self.args.text_turns:
+            spoken_at = time.perf_counter()
+            await self.send({'type': 'conversation.item.create', 'item': {
+                'type': 'message', 'role': 'user', 'content': [{'type': 'input_text', 'text': text}]}})
+            await self.send({'type': 'response.create'})
+        else:
+            # The mic streams while the student talks; server VAD commits when they stop
+            for _ in range(self.args.speech_ms // FRAME_MS):
+                await self.send({'type': 'input_audio_buffer.append', 'audio': SPEECH_FRAME})
+            spoken_at = time.perf_counter()
+            await self.send({'type': 'input_audio_buffer.commit'})
+        await self.sio.emit('conversation_update', {'role': 'User', 'message': text, 'state': 'user-speaking'})
+        return spoken_at
+
+    async def play_response(self, since):
+        """Handle events until the model is done with this turn; returns (first audio ms, marks, tools)"""
+        first_audio, marks, tools = None, {}, []
+        outputs_pending = False
+        while True:
+            event = await self.receive()
+            kind = event['type']
+            at = (time.perf_counter() - since) * 1000
+            if kind == 'response.audio.delta':
+                if first_audio is None:
+                    first_audio = at
+            elif kind == 'conversation.item.input_audio_transcription.completed':
+                marks.setdefault('transcription_completed', at)
+            elif kind == 'response.function_call_arguments.done':
+                marks.setdefault('first_tool_call', at)
+                tool_started = time.perf_counter()
+                result = await self.call_tool(event['name'], json.loads(event['arguments']))
+                await self.send({'type': 'conversation.item.create', 'item': {
+                    'type': 'function_call_output', 'call_id': event['call_id'], 'output': json.dumps(result)}})
+                tools.append({'name': event['name'], 'ms': (time.perf_counter() - tool_started) * 1000})
+                outputs_pending = True
+            elif kind == 'response.done':
+                marks.setdefault('first_response_done', at)
+                marks['response_done'] = at
+                transcript = [part.get('transcript') for item in event['response']['output']
+                              for part in item.get('content', ()) if part.get('transcript')]
+                if transcript:
+                    await self.sio.emit('conversation_update', {
+                        'role': 'Assistant', 'message': transcript[0], 'state': 'ai-speaking'})
+                if not outputs_pending:
+                    return first_audio, marks, tools
+                outputs_pending = False
+                await self.send({'type': 'response.create'})
+            elif kind == 'error':
+                self.results['errors'].append(event['error'].get('code'))
+
+    async def call_tool(self, name, args):
+        if name == 'detect_user_language':
+            return {'success': True, 'language': args.get('detected_language')}
+        if name == 'record_response_and_get_next':
+            if args['question_id'] not in self.completed:
+                self.completed.append(args['question_id'])
+            schedule = await self.sio.call('career_next_question', {
+                'completed_questions': self.completed, 'adjustment_action': None,
+                'skip_optional': bool(args.get('skip_optional'))}, timeout=5)
+            return {**schedule, 'recorded': args['question_id'], 'completedCount': len(self.completed),
+                    'student_name': f'Student {self.index}'}
+        if name == 'end_session_summary':
+            # The browser emits and returns at once; the reply is checked after the session
+            self.summary = asyncio.get_running_loop().create_future()
+            await self.sio.emit('career_summary', {
+                'student_name': args.get('student_name'), 'total_questions_answered': len(self.completed),
+                'session_data': args.get('session_data') or {}, 'recommendations': args.get('recommendations', [])})
+            return {'success': True, 'message': 'Session summary generated and saved'}
+        return {'success': True}
+
+
+async def run(args):
+    latency = Latency(args.mint_ms, args.first_event_ms, args.tool_ms, args.audio_ms, args.transcription_ms,
+                      args.jitter, seed=1)
+    mock = MockRealtimeServer(latency)
+    await mock.start()
+    process, app_url = spawn_server({
+        'AZURE_OPENAI_API_KEY': mock.api_key, 'SESSIONS_URL': mock.sessions_url,
+        'KEY_POOL_SIZE': str(args.key_pool_size), 'SOCKETIO_ASYNC_MODE': args.async_mode,
+    })
+    results = defaultdict(list)
+    try:
+        async def student(index):
+            await asyncio.sleep(index * args.ramp / max(1, args.students))
+            jar = aiohttp.CookieJar(unsafe=True)
+            async with aiohttp.ClientSession(cookie_jar=jar) as http:
+                try:
+                    await HeadlessBrowser(index, app_url, mock.realtime_url, args, results).run(http)
+                except Exception as e:
+                    results['errors'].append(repr(e))
+
+        # Let the key pool fill before the first Start, as it would on a running server
+        await asyncio.sleep(1.0)
+        started = time.perf_counter()
+        await asyncio.gather(*(student(n) for n in range(args.students)))
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+        await mock.stop()
+    return results, mock.stats, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--students', type=int, default=10)
+    parser.add_argument('--ramp', type=float, default=2.0, help='seconds over which students press Start')
+    parser.add_argument('--text-turns', action='store_true', help='answer with text items instead of audio')
+    parser.add_argument('--speech-ms', type=int, default=1000, help='audio sent per answer')
+    parser.add_argument('--mint-ms', type=float, default=150)
+    parser.add_argument('--first-event-ms', type=float, default=300)
+    parser.add_argument('--tool-ms', type=float, default=40)
+    parser.add_argument('--audio-ms', type=float, default=400)
+    parser.add_argument('--transcription-ms', type=float, default=150)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--key-pool-size', type=int, default=2)
+    parser.add_argument('--async-mode', default='threading')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results, stats, elapsed = asyncio.run(run(args))
+    errors = results.pop('errors', [])
+
+    transcription = 0 if args.text_turns else args.transcription_ms
+    # What the mock alone spends before each mark, with no jitter
+    scripted = {
+        'start: first audio': args.first_event_ms,
+        'turn: transcription_completed': transcription,
+        'turn: first_tool_call': transcription + args.first_event_ms + args.tool_ms,
+        'turn: first audio': transcription + 2 * args.first_event_ms + 2 * args.tool_ms,
+        'turn: response_done': transcription + 2 * args.first_event_ms + 2 * args.tool_ms + args.audio_ms,
+    }
+    print(f"{args.students} students, {len(results['turn: first audio'])} turns in {elapsed:.1f}s "
+          f"({args.async_mode}, {'text' if args.text_turns else 'audio'} turns, key pool {args.key_pool_size})")
+    print(f"mock: first event {args.first_event_ms:.0f} ms, tool {args.tool_ms:.0f} ms, "
+          f"audio {args.audio_ms:.0f} ms, mint {args.mint_ms:.0f} ms, jitter {args.jitter:.0%}\n")
+    print(f"{'stage (ms)':<44} {'p50':>8} {'p95':>8} {'p99':>8} {'scripted':>9} {'added p50':>10}")
+    for label in sorted(results, key=lambda name: (not name.startswith('start'), name.startswith('tool'), name)):
+        samples = results[label]
+        p50 = percentile(samples, 50)
+        row = f"{label:<44} {p50:>8.1f} {percentile(samples, 95):>8.1f} {percentile(samples, 99):>8.1f}"
+        if label in scripted:
+            row += f" {scripted[label]:>9.0f} {p50 - scripted[label]:>10.1f}"
+        print(row)
+    print(f"\nmock: {stats['minted']} keys minted, {stats['connections']} connections, "
+          f"{stats['responses']} responses, {stats['rejected']} rejected response.create, "
+          f"{stats['unknown_call_ids']} unknown call ids")
+    if errors:
+        print(f"{len(errors)} errors, e.g. {errors[:3]}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
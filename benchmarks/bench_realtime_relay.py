@@ -0,0 +1,216 @@
+"""
+Benchmark: latency the realtime relay adds and how many relayed sessions one core carries
+
+Starts benchmarks/mock_realtime.py in-process (stamping every audio delta
+and timing every appended chunk) and the app with REALTIME_RELAY=1 pointed
+at it, then runs N students that do what the relay fallback in
+career_chat_integrated.js does: relay_start with the session.update
+(server VAD on), stream 20 ms PCM16 microphone frames as binary relay_audio
+messages in real time, and end each answer with an
+input_audio_buffer.commit. The mock answers every turn with tool calls,
+which the app runs server-side, then speaks the next question back as
+relay_audio.
+
+Every frame up and every delta down starts with a perf_counter stamp, so it
+reports per-frame upstream latency (browser to the mock's input buffer),
+downstream latency (the mock's delta to the browser) and the commit to
+first audio of each turn. The same students then connect to the mock
+directly, as WebRTC would, for the baseline; the difference is what the
+relay adds. The app's CPU time over each relayed run gives sessions per
+core.
+
+    python benchmarks/bench_realtime_relay.py --sessions 10,25,50 --seconds 10
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import aiohttp
+import socketio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import percentile, proc_status, raise_fd_limit, spawn_server  # noqa: E402
+from mock_realtime import AUDIO_RATE, Latency, MockRealtimeServer, stamp, stamped_at  # noqa: E402
+
+FRAME_MS = 20
+FRAME_BYTES = AUDIO_RATE * 2 * FRAME_MS // 1000
+SESSION_UPDATE = {'type': 'session.update', 'session': {
+    'modalities': ['audio', 'text'], 'input_audio_format': 'pcm16', 'output_audio_format': 'pcm16',
+    'turn_detection': {'type': 'server_vad', 'create_response': True},
+}}
+TICKS = os.sysconf('SC_CLK_TCK')
+
+
+def cpu_seconds(pid):
+    """utime + stime of a process from /proc/<pid>/stat"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rpartition(')')[2].split()
+    return (int(fields[11]) + int(fields[12])) / TICKS
+
+
+def frame():
+    return stamp() + bytes(FRAME_BYTES - 8)
+
+
+class Student:
+    """Streams microphone frames for ``seconds`` and commits every ``turn_ms``; collects first-audio times"""
+
+    def __init__(self, args, results):
+        self.args = args
+        self.results = results
+        self.committed_at = None
+
+    def on_audio(self, chunk):
+        age = stamped_at(chunk)
+        self.results['down'].append(age * 1000)
+        # Only audio the mock sent after the commit answers it; the rest is the previous turn's tail
+        if self.committed_at is not None and time.perf_counter() - age >= self.committed_at:
+            self.results['turn first audio'].append((time.perf_counter() - self.committed_at) * 1000)
+            self.committed_at = None
+
+    async def stream(self, send_frame, commit):
+        frames_per_turn = self.args.turn_ms // FRAME_MS
+        start = time.perf_counter()
+        for n in range(self.args.seconds * 1000 // FRAME_MS):
+            # Real-time pacing against the start, so a slow send does not drift the schedule
+            await asyncio.sleep(max(0.0, start + n * FRAME_MS / 1000 - time.perf_counter()))
+            await send_frame(frame())
+            if n % frames_per_turn == frames_per_turn - 1:
+                self.committed_at = time.perf_counter()
+                await commit()
+        # Let the last turn's response come back
+        await asyncio.sleep(2.0)
+
+
+async def relayed(index, app_url, args, results):
+    student = Student(args, results)
+    sio = socketio.AsyncClient(reconnection=False)
+    sio.on('relay_audio', student.on_audio)
+    sio.on('relay_tool', lambda data: results['tool calls'].append(data['ms']))
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as http:
+        async with http.post(f'{app_url}/api/register', json={'email': f'relay{index}@example.com',
+                                                              'name': f'Relay {index}'}) as r:
+            r.raise_for_status()
+        cookie = '; '.join(f'{c.key}={c.value}' for c in http.cookie_jar)
+    await sio.connect(app_url, headers={'Cookie': cookie}, transports=['websocket'])
+    try:
+        ack = await sio.call('relay_start', {'events': [SESSION_UPDATE]}, timeout=10)
+        if not ack.get('success'):
+            raise RuntimeError(ack.get('error'))
+        await student.stream(lambda data: sio.emit('relay_audio', data),
+                             lambda: sio.emit('relay_send', {'type': 'input_audio_buffer.commit'}))
+        await sio.emit('relay_stop')
+    finally:
+        await sio.disconnect()
+
+
+async def direct(index, realtime_url, api_key, args, results):
+    student = Student(args, results)
+
+    async def read(ws):
+        async for message in ws:
+            event = json.loads(message.data)
+            if event['type'] == 'response.audio.delta':
+                student.on_audio(base64.b64decode(event['delta']))
+            elif event['type'] == 'response.function_call_arguments.done':
+                # What the browser does for a tool with no server round trip
+                await ws.send_str(json.dumps({'type': 'conversation.item.create', 'item': {
+                    'type': 'function_call_output', 'call_id': event['call_id'], 'output': '{"success": true}'}}))
+            elif event['type'] == 'response.done' and event['response']['output'] and \
+                    event['response']['output'][-1]['type'] == 'function_call':
+                await ws.send_str('{"type": "response.create"}')
+
+    async with aiohttp.ClientSession() as http:
+        async with http.ws_connect(realtime_url, headers={'api-key': api_key}) as ws:
+            reader = asyncio.create_task(read(ws))
+            await ws.send_str(json.dumps(SESSION_UPDATE))
+
+            async def send_frame(data):
+                await ws.send_str(json.dumps({'type': 'input_audio_buffer.append',
+                                              'audio': base64.b64encode(data).decode('ascii')}))
+            await student.stream(send_frame, lambda: ws.send_str('{"type": "input_audio_buffer.commit"}'))
+            reader.cancel()
+
+
+async def run(args, sessions):
+    results = {'relay': defaultdict(list), 'direct': defaultdict(list)}
+    phase = {'name': 'relay'}
+    latency = Latency(first_event_ms=args.first_event_ms, tool_ms=args.tool_ms, audio_ms=args.audio_ms,
+                      transcription_ms=args.transcription_ms)
+    mock = MockRealtimeServer(latency, stamp_audio=True,
+                              audio_hook=lambda chunk: results[phase['name']]['up'].append(stamped_at(chunk) * 1000))
+    await mock.start()
+    process, app_url = spawn_server({
+        'AZURE_OPENAI_API_KEY': mock.api_key, 'REALTIME_RELAY': '1', 'REALTIME_WS_URL': mock.realtime_url,
+        'KEY_POOL_SIZE': '0', 'SOCKETIO_ASYNC_MODE': 'threading',
+    })
+    try:
+        async def gather(factory):
+            outcomes = await asyncio.gather(*(factory(n) for n in range(sessions)), return_exceptions=True)
+            results[phase['name']]['errors'] = [repr(e) for e in outcomes if isinstance(e, Exception)]
+
+        cpu = cpu_seconds(process.pid)
+        started = time.perf_counter()
+        await gather(lambda n: relayed(n, app_url, args, results['relay']))
+        wall = time.perf_counter() - started
+        cpu = cpu_seconds(process.pid) - cpu
+        rss, threads = proc_status(process.pid)
+
+        phase['name'] = 'direct'
+        await gather(lambda n: direct(n, mock.realtime_url, mock.api_key, args, results['direct']))
+    finally:
+        process.terminate()
+        process.wait()
+        await mock.stop()
+    return results, {'cpu': cpu, 'wall': wall, 'rss': rss, 'threads': threads}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sessions', default='10,25,50', help='comma-separated concurrent students per run')
+    parser.add_argument('--seconds', type=int, default=10, help='microphone audio streamed per student')
+    parser.add_argument('--turn-ms', type=int, default=2500, help='audio per answer before its commit')
+    parser.add_argument('--first-event-ms', type=float, default=300)
+    parser.add_argument('--tool-ms', type=float, default=40)
+    parser.add_argument('--audio-ms', type=float, default=400)
+    parser.add_argument('--transcription-ms', type=float, default=150)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    raise_fd_limit()
+    print(f"{args.seconds}s of {FRAME_MS} ms frames per student, a turn every {args.turn_ms} ms; "
+          f"mock first event {args.first_event_ms:.0f} ms, tool {args.tool_ms:.0f} ms\n")
+    print(f"{'sessions':>8} {'path':<7} {'metric (ms)':<18} {'p50':>8} {'p95':>8} {'p99':>8} {'added p50':>10}")
+    for sessions in [int(n) for n in args.sessions.split(',')]:
+        results, usage = asyncio.run(run(args, sessions))
+        for metric in ('up', 'down', 'turn first audio'):
+            base = percentile(results['direct'][metric], 50) if results['direct'][metric] else 0.0
+            for path in ('relay', 'direct'):
+                samples = results[path][metric]
+                if not samples:
+                    continue
+                p50 = percentile(samples, 50)
+                added = f"{p50 - base:>10.1f}" if path == 'relay' else ''
+                print(f"{sessions:>8} {path:<7} {metric:<18} {p50:>8.1f} {percentile(samples, 95):>8.1f} "
+                      f"{percentile(samples, 99):>8.1f} {added}")
+        load = usage['cpu'] / usage['wall']
+        per_core = sessions / load if load else float('inf')
+        errors = results['relay'].get('errors', []) + results['direct'].get('errors', [])
+        print(f"{sessions:>8} app CPU {load:.0%} of a core over {usage['wall']:.1f}s -> {per_core:.0f} sessions/core; "
+              f"RSS {usage['rss'] / 1024:.0f} MB, {usage['threads']} threads; "
+              f"{len(results['relay']['up'])} frames relayed, {len(results['relay']['tool calls'])} tools run"
+              + (f"; errors: {errors[:3]}" if errors else '') + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: session.update payload size and bundle serving cost
+
+Compares the prompt and tool payload the browser used to assemble in
+career_chat_integrated.js with the compiled bundle served by
+/api/session-bundle, then times a full compile, a cached request, a gzip
+request and a conditional (ETag) request.
+
+    python benchmarks/bench_session_bundle.py --requests 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import percentile  # noqa: E402
+
+
+def timed(label, func, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<28} p50 {percentile(samples, 50):>8.3f} ms   p99 {percentile(samples, 99):>8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--compiles', type=int, default=50)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    import logging
+    logging.disable(logging.INFO)
+    import app as app_module
+    import realtime_prompts
+    import realtime_tools
+    from session_bundle import SESSION_SETTINGS, compile_session_bundle
+
+    # Unminified equivalent of what the browser built and sent before
+    tools_by_name = {tool['name']: tool for tool in realtime_tools.CAREER_COUNSELING_TOOLS}
+    pretty = json.dumps({'type': 'session.update', 'session': {
+        'instructions': realtime_prompts.CAREER_COUNSELING_PROMPT,
+        **SESSION_SETTINGS,
+        'tools': [tools_by_name[name] for name in realtime_tools.CLIENT_SESSION_TOOLS],
+    }}, indent=2).encode('utf-8')
+
+    bundle = app_module.session_bundle
+    print(f"pretty session.update      {len(pretty):>8,} bytes")
+    print(f"compiled bundle            {len(bundle.body):>8,} bytes")
+    print(f"compiled bundle (gzip)     {len(bundle.gzip_body):>8,} bytes")
+    print(f"startup build              {bundle.build_ms:>8.1f} ms\n")
+
+    http = app_module.app.test_client()
+    url = f'/api/session-bundle?v={bundle.version}'
+    etag = http.get(url).headers['ETag']
+
+    timed('compile_session_bundle()', compile_session_bundle, args.compiles)
+    timed('GET bundle', lambda: http.get(url), args.requests)
+    timed('GET bundle (gzip)', lambda: http.get(url, headers={'Accept-Encoding': 'gzip'}), args.requests)
+    timed('GET bundle (If-None-Match)', lambda: http.get(url, headers={'If-None-Match': etag}), args.requests)
+
+
+if __name__ == '__main__':
+    main()
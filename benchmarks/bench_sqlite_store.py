@@ -0,0 +1,126 @@
+"""
+Benchmark: SQLite session store shared by two worker processes
+
+Worker A creates career sessions, records responses and pauses them; worker B
+finds each paused session by email, resumes it and finishes it. Both then
+race to pause/resume the same sessions, and only one may win each move.
+Exits non-zero if the workers disagree about any session state.
+
+    python benchmarks/bench_sqlite_store.py --sessions 2000
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from career_record import CareerSession  # noqa: E402
+from session_store import SQLiteBackend, SQLiteCareerSessions  # noqa: E402
+
+
+def new_session(i):
+    return CareerSession(f'career_{i}', f'user_{i}', f'Student {i}', f'student{i}@example.com')
+
+
+def producer(db_path, count, results):
+    store = SQLiteCareerSessions(SQLiteBackend(db_path))
+    start = time.perf_counter()
+    for i in range(count):
+        store.add(new_session(i))
+        session = store.get_active(f'career_{i}')
+        session.record_response('intro', 'hello')
+        store.save(session)
+        store.pause(f'career_{i}')
+    results['producer'] = (count * 4) / (time.perf_counter() - start)
+
+
+def consumer(db_path, count, results):
+    store = SQLiteCareerSessions(SQLiteBackend(db_path))
+    start = time.perf_counter()
+    done = 0
+    ops = 0
+    pending = set(range(count))
+    while pending:
+        for i in list(pending):
+            career_session_id = store.find_paused_by_email(f'student{i}@example.com')
+            ops += 1
+            if career_session_id is None:
+                continue
+            session = store.resume(career_session_id)
+            assert session.completed_questions == ['intro'], session.to_dict()
+            store.remove(career_session_id)
+            ops += 2
+            pending.discard(i)
+            done += 1
+    results['consumer'] = ops / (time.perf_counter() - start)
+    results['consumed'] = done
+
+
+def racer(db_path, ids, results, name):
+    store = SQLiteCareerSessions(SQLiteBackend(db_path))
+    moves = {career_session_id: 0 for career_session_id in ids}
+    for _ in range(20):
+        for career_session_id in ids:
+            if store.pause(career_session_id) is not None:
+                moves[career_session_id] += 1
+            if store.resume(career_session_id) is not None:
+                moves[career_session_id] -= 1
+    results[name] = moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sessions', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / 'sessions.db')
+        SQLiteBackend(db_path).close()
+
+        with multiprocessing.Manager() as manager:
+            results = manager.dict()
+            workers = [
+                multiprocessing.Process(target=producer, args=(db_path, args.sessions, results)),
+                multiprocessing.Process(target=consumer, args=(db_path, args.sessions, results)),
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            if any(worker.exitcode for worker in workers):
+                raise SystemExit('a worker failed')
+
+            store = SQLiteCareerSessions(SQLiteBackend(db_path))
+            print(f"producer: {results['producer']:,.0f} ops/s  consumer: {results['consumer']:,.0f} ops/s")
+            print(f"sessions handed over: {results['consumed']}/{args.sessions}, left in store: {len(store)}")
+            if results['consumed'] != args.sessions or len(store) != 0:
+                raise SystemExit('workers disagree about session state')
+
+            ids = [f'career_{i}' for i in range(50)]
+            for i in range(50):
+                store.add(new_session(i))
+            racers = [multiprocessing.Process(target=racer, args=(db_path, ids, results, name))
+                      for name in ('racer_a', 'racer_b')]
+            for worker in racers:
+                worker.start()
+            for worker in racers:
+                worker.join()
+
+            # Every won pause must be matched by exactly one won resume unless the
+            # session ended up paused, whichever worker won each move
+            broken = [
+                career_session_id for career_session_id in ids
+                if results['racer_a'][career_session_id] + results['racer_b'][career_session_id]
+                != (0 if store.get_active(career_session_id) else 1)
+            ]
+            print(f"pause/resume race over {len(ids)} sessions: {len(broken)} inconsistent")
+            if broken:
+                raise SystemExit('concurrent pause/resume lost an update')
+
+
+if __name__ == '__main__':
+    main()
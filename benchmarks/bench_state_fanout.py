@@ -0,0 +1,75 @@
+"""
+Load test: animation/state fan-out message counts
+
+Connects N registered Socket.IO test clients, has each emit a burst of
+state_change events, and counts the animation_state messages delivered.
+The broadcast=True column is what the previous implementation sent
+(every state to every connected client).
+
+    python benchmarks/bench_state_fanout.py --connections 10 100 1000 --burst 20
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def run(app_module, connections, burst):
+    app, socketio = app_module.app, app_module.socketio
+    coalescer = app_module.state_coalescer
+    coalescer.stats.update(submitted=0, emitted=0, dropped=0)
+
+    clients = []
+    for i in range(connections):
+        http = app.test_client()
+        http.post('/api/register', json={'email': f'user{i}@example.com', 'name': f'User {i}'})
+        clients.append(socketio.test_client(app, flask_test_client=http))
+    for client in clients:
+        client.get_received()
+
+    start = time.perf_counter()
+    states = ['user-speaking', 'processing', 'ai-speaking', 'idle']
+    for client in clients:
+        for n in range(burst):
+            client.emit('state_change', {'state': states[n % len(states)]})
+    elapsed = time.perf_counter() - start
+
+    # Let trailing-edge frames go out
+    time.sleep(coalescer.frame_interval * 3)
+    received = sum(
+        1 for client in clients for msg in client.get_received() if msg['name'] == 'animation_state'
+    )
+
+    for client in clients:
+        client.disconnect()
+
+    broadcast = connections * connections * burst
+    print(f"{connections:>6} {connections * burst:>10} {broadcast:>14,} {received:>12,}"
+          f" {coalescer.stats['dropped']:>10,} {elapsed * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--connections', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--burst', type=int, default=20, help='state_change events per client')
+    args = parser.parse_args()
+
+    # app.py writes session transcripts relative to the working directory
+    os.chdir(tempfile.mkdtemp())
+    import logging
+    logging.disable(logging.INFO)
+    import app as app_module
+
+    print(f"{'conns':>6} {'emitted':>10} {'broadcast=True':>14} {'rooms':>12} {'coalesced':>10} {'emit ms':>10}")
+    for connections in args.connections:
+        run(app_module, connections, args.burst)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: a burst of simultaneous career_summary completions
+
+N handler threads finish their sessions at the same moment. Compared:
+  - inline: json.dump(indent=2) straight to the final file inside the handler (before)
+  - pipeline: SummaryPipeline.submit, acknowledged at once, written by the pool
+
+For each it reports the handler acknowledgement latency (what the student
+waits for before summary_saved) and the time until every file is on disk.
+
+    python benchmarks/bench_summary_pipeline.py --burst 500 --workers 4
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import make_summary, percentile  # noqa: E402
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+from summary_pipeline import SummaryPipeline, orjson  # noqa: E402
+
+
+def write_inline(path, summary):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+
+def burst(label, handle, summaries, wait_for_disk):
+    acks = [0.0] * len(summaries)
+    barrier = threading.Barrier(len(summaries) + 1)
+
+    def handler(n):
+        barrier.wait()
+        start = time.perf_counter()
+        handle(n, summaries[n])
+        acks[n] = (time.perf_counter() - start) * 1000
+
+    threads = [threading.Thread(target=handler, args=(n,)) for n in range(len(summaries))]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wait_for_disk()
+    durable = time.perf_counter() - start
+
+    print(f"{label:<22} ack p50 {percentile(acks, 50):>8.2f} ms  p99 {percentile(acks, 99):>8.2f} ms"
+          f"  all on disk {durable * 1000:>8.0f} ms  ({len(summaries) / durable:,.0f} summaries/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--burst', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--no-fsync', action='store_true', help='skip fsync before the rename')
+    args = parser.parse_args()
+
+    summaries = [make_summary(n, answered=list(QUESTION_BANK)) for n in range(args.burst)]
+    print(f"{args.burst} simultaneous summaries, encoder {'orjson' if orjson else 'json'}, "
+          f"fsync {'off' if args.no_fsync else 'on'}")
+
+    inline_dir = Path(tempfile.mkdtemp())
+    burst('inline json.dump', lambda n, s: write_inline(inline_dir / f'{n}_summary.json', s),
+          summaries, lambda: None)
+
+    pipeline_dir = Path(tempfile.mkdtemp())
+    pipeline = SummaryPipeline(workers=args.workers, max_queue=1000, fsync=not args.no_fsync)
+    burst(f'pipeline ({args.workers} workers)',
+          lambda n, s: pipeline.submit(pipeline_dir / f'{n}_summary.json', s),
+          summaries, pipeline.drain)
+    pipeline.stop()
+
+    assert len(list(pipeline_dir.glob('*_summary.json'))) == args.burst
+    assert not list(pipeline_dir.glob('.*.tmp'))
+    print(f"pipeline stats: {pipeline.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: per-event cost of the compiled tool-schema validators
+
+Times validate_payload on realistic Socket.IO payloads (a career_response,
+a full career_summary, a career_next_question ack request and a transcript
+line), rejecting malformed and oversized ones, and validate_arguments on a
+model's JSON function-call arguments. Compiling the schemas happens once
+at import and is timed once.
+
+    python benchmarks/bench_tool_schemas.py --iterations 200000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import make_summary  # noqa: E402
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+from realtime_tools import CAREER_COUNSELING_TOOLS  # noqa: E402
+from tool_schemas import (  # noqa: E402
+    PAYLOAD_SCHEMAS, SchemaError, compile_schema, validate_arguments, validate_payload
+)
+
+
+def payloads():
+    summary = make_summary(7)
+    return {
+        'career_response': {
+            'question_id': 'career_confusion', 'emotion': 'anxious',
+            'response': 'Too many options and my parents want engineering, but I like design. ' * 3,
+        },
+        'career_summary': {
+            'session_id': summary['session_id'], 'timestamp': summary['timing']['end'],
+            'student_name': 'Asha', 'total_questions_answered': 12,
+            'session_data': {
+                'academic_info': {'year': 'second', 'major': 'mechanical engineering'},
+                'career_concerns': ['too many options', 'AI replacing jobs'], 'interests': ['design', 'biology'],
+                'skills': ['sketching', 'python'], 'ai_automation_fears': 'Worried about design tools with AI',
+                'preferred_industries': ['product design'], 'work_values': ['creativity', 'salary'],
+                'obstacles': ['parents', 'no portfolio'], 'immediate_needs': 'Choosing electives',
+            },
+            'recommendations': ['Build a small portfolio', 'Talk to a product designer'],
+            # Sent by the browser, not used by the server; dropped
+            'raw_responses': summary['responses'],
+        },
+        'career_next_question': {
+            'completed_questions': list(QUESTION_BANK)[:8], 'adjustment_action': 'speed_up', 'skip_optional': False,
+        },
+        'conversation_update': {
+            'role': 'User', 'message': 'Honestly pata nahi, the job market looks really tough', 'state': 'user-speaking',
+            'session_id': summary['session_id'], 'question_context': 'ai_fears',
+        },
+    }
+
+
+def per_call_us(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+
+def rejects(func):
+    def call():
+        try:
+            func()
+        except SchemaError:
+            return
+        raise AssertionError('payload was accepted')
+    return call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    schemas = [tool['parameters'] for tool in CAREER_COUNSELING_TOOLS] + list(PAYLOAD_SCHEMAS.values())
+    start = time.perf_counter()
+    for schema in schemas:
+        compile_schema(schema)
+    print(f"compile {len(schemas)} schemas (once, at import): {(time.perf_counter() - start) * 1000:.2f} ms\n")
+
+    print(f"{'event':<50} {'us/event':>9}")
+    for event, data in payloads().items():
+        print(f"{event:<50} {per_call_us(lambda: validate_payload(event, data), n):>9.2f}")
+
+    cases = {
+        'career_response, unknown question_id': ('career_response', {'question_id': 'bogus', 'response': 'x'}),
+        'career_response, 1 MB response': ('career_response', {'question_id': 'intro', 'response': 'x' * 1_000_000}),
+        'career_summary, session_data is a string': ('career_summary', {'session_data': 'everything'}),
+        'career_next_question, 10k completed ids': ('career_next_question', {'completed_questions': ['intro'] * 10000}),
+    }
+    for label, (event, data) in cases.items():
+        print(f"{'rejected: ' + label:<50} {per_call_us(rejects(lambda: validate_payload(event, data)), n):>9.2f}")
+
+    arguments = ('{"question_id": "skills", "response": "I can sketch and I know some python", '
+                 '"emotion_detected": "hopeful"}')
+    print(f"{'arguments: record_response_and_get_next':<50} "
+          f"{per_call_us(lambda: validate_arguments('record_response_and_get_next', arguments), n):>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: transcript search latency, FTS5 index vs grep over sessions/*.txt
+
+Generates N synthetic transcript lines spread over many students and days,
+writes them both as SessionManager-style .txt files and into a
+TranscriptIndex, then times typical support queries against each.
+
+    python benchmarks/bench_transcript_search.py --lines 1000000
+"""
+
+import argparse
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import percentile  # noqa: E402
+from transcript_index import TranscriptIndex  # noqa: E402
+
+WORDS = ('career design engineering biology research internship salary loan parents confused anxious '
+         'excited future automation replace skills experience mentor python data marketing finance law '
+         'medicine teaching startup remote hybrid abroad scholarship exam placement hostel coding').split()
+ROLES = ('User', 'Assistant', 'Career Response')
+
+
+def generate(lines, students, txt_dir, index, lines_per_session=60):
+    rng = random.Random(3)
+    base = datetime(2025, 1, 1)
+    batch, written, session_no = [], 0, 0
+    while written < lines:
+        student = rng.randrange(students)
+        email = f'student{student}@example.com'
+        started = base + timedelta(minutes=rng.randrange(300 * 24 * 60))
+        session_id = f'session-{session_no}'
+        path = txt_dir / f'student{student}_at_example_com_{started:%Y%m%d_%H%M%S}_{session_no}.txt'
+        session_no += 1
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Session Started: {started.isoformat()}\nUser: Student ({email})\n"
+                    f"Session ID: {session_id}\n{'-' * 80}\n\n")
+            for n in range(min(lines_per_session, lines - written)):
+                ts = started + timedelta(seconds=20 * n)
+                role = rng.choice(ROLES)
+                message = ' '.join(rng.choices(WORDS, k=rng.randint(6, 18)))
+                f.write(f"[{ts:%H:%M:%S}] {role}: {message}\n")
+                batch.append((session_id, email, ts.timestamp(), role, message, str(path)))
+                written += 1
+        if len(batch) >= 20000:
+            index._insert(batch)
+            batch = []
+    if batch:
+        index._insert(batch)
+
+
+def timed(label, func, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<40} p50 {percentile(samples, 50):>9.2f} ms   p99 {percentile(samples, 99):>9.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--lines', type=int, default=1000000)
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp())
+    txt_dir = work / 'sessions'
+    txt_dir.mkdir()
+    index = TranscriptIndex(work / 'transcripts.db')
+
+    start = time.perf_counter()
+    generate(args.lines, args.students, txt_dir, index)
+    print(f"indexed {len(index):,} lines in {time.perf_counter() - start:.1f}s\n")
+
+    rng = random.Random(5)
+    email = lambda: f'student{rng.randrange(args.students)}@example.com'  # noqa: E731
+    june, july = datetime(2025, 6, 1).timestamp(), datetime(2025, 7, 1).timestamp()
+
+    timed('words "salary loan"', lambda: index.search(text='salary loan'), args.rounds)
+    timed('phrase "replace skills"', lambda: index.search(phrase='replace skills'), args.rounds)
+    timed('email (random student)', lambda: index.search(email=email()), args.rounds)
+    timed('email + word', lambda: index.search(text='internship', email=email()), args.rounds)
+    timed('word + role + June', lambda: index.search(text='abroad', role='User', start=june, end=july),
+          args.rounds)
+
+    def deep_pages():
+        page = index.search(text='coding', limit=50)
+        for _ in range(20):
+            page = index.search(text='coding', limit=50, cursor=page['next_cursor'])
+        return page
+    timed('21 pages of "coding" (cursor)', deep_pages, max(1, args.rounds // 5))
+
+    timed('grep -rl phrase over .txt', lambda: subprocess.run(
+        ['grep', '-rlF', 'replace skills', str(txt_dir)], capture_output=True), 3)
+    timed('grep -rl email over .txt', lambda: subprocess.run(
+        ['grep', '-rlF', email(), str(txt_dir)], capture_output=True), 3)
+    index.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: transcript logging throughput
+
+Compares the original open/append/close per event against TranscriptWriter.
+Reports events/sec as seen by the handler threads and the time until every
+line is on disk.
+
+    python benchmarks/bench_transcript_writer.py --sessions 300 --events 50 --threads 16
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from transcript_writer import TranscriptWriter  # noqa: E402
+
+
+def direct_append(path, line):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(line)
+
+
+def run(label, log, paths, events, threads, finish=None):
+    def worker(path):
+        for i in range(events):
+            log(path, f"[12:00:00] User: message number {i} for this session\n")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, paths))
+    handler_elapsed = time.perf_counter() - start
+    if finish:
+        finish()
+    total_elapsed = time.perf_counter() - start
+
+    total = len(paths) * events
+    print(f"{label:<20} {total / handler_elapsed:>12,.0f} ev/s (handler)"
+          f" {total / total_elapsed:>12,.0f} ev/s (on disk)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sessions', type=int, default=300)
+    parser.add_argument('--events', type=int, default=50)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print(f"{args.sessions} sessions x {args.events} events, {args.threads} handler threads")
+
+        paths = [tmp / f"direct_{i}.txt" for i in range(args.sessions)]
+        run('open/append/close', direct_append, paths, args.events, args.threads)
+
+        writer = TranscriptWriter()
+        paths = [tmp / f"writer_{i}.txt" for i in range(args.sessions)]
+        run('TranscriptWriter', writer.write, paths, args.events, args.threads, writer.flush)
+        writer.stop()
+        print(f"writer stats: {writer.stats}")
+
+        expected = args.events
+        short = [p for p in paths if len(p.read_text(encoding='utf-8').splitlines()) != expected]
+        if short:
+            raise SystemExit(f"{len(short)} transcripts are missing lines")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: speed of the vad_tuning sweep, on synthetic labeled student recordings
+
+Writes --conversations WAV files (48 kHz, so loading includes resampling)
+with <name>.json turn labels: student turns of several phrases, each
+phrase at its own loudness with a fading tail, separated by hesitation
+pauses (mostly short, some long thinking pauses) inside a turn and by the
+counselor's turn (room noise with faint echo) between turns. It times
+loading and the full sweep in audio-seconds per CPU-second, then prints
+vad_tuning's report on the set.
+
+    python benchmarks/bench_vad_tuning.py --conversations 20 --minutes 5
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import vad_tuning  # noqa: E402
+from pcm_audio import float_to_pcm16  # noqa: E402
+
+RATE = 48000
+
+
+def phrase(rng, seconds):
+    """Voiced noise at a syllable rate, at a random level, with a fading tail"""
+    n = int(seconds * RATE)
+    tail = int(rng.uniform(0.08, 0.3) * RATE)
+    envelope = 0.3 + 0.7 * np.abs(np.sin(np.arange(n) * (2 * np.pi * rng.uniform(3, 5) / RATE)))
+    envelope = np.concatenate((envelope, np.exp(-np.arange(tail) / (tail / 4))))
+    level = 10 ** (rng.uniform(-32, -12) / 20)
+    # Half the tail is labeled speech: the rest is below what a listener hears as talking
+    return rng.normal(0, level, n + tail) * envelope, n + tail // 2
+
+
+def conversation(rng, minutes):
+    """Float samples and [[start_ms, end_ms], ...] student turns"""
+    noise = 10 ** (rng.uniform(-65, -50) / 20)
+    parts, turns, position = [], [], 0
+
+    def add(samples):
+        nonlocal position
+        parts.append(samples)
+        position += len(samples)
+
+    while position < minutes * 60 * RATE:
+        # The counselor talks: the mic hears the room and a little echo
+        listening = int(rng.uniform(2, 6) * RATE)
+        add(rng.normal(0, noise, listening) * (1 + 3 * (rng.random(listening) < 0.002)))
+        start = position
+        for index in range(rng.integers(1, 7)):
+            if index:
+                # Hesitations: mostly brief, one in ten a longer thinking pause
+                pause = rng.uniform(0.4, 0.9) if rng.random() < 0.1 else rng.uniform(0.08, 0.35)
+                add(rng.normal(0, noise, int(pause * RATE)))
+            samples, spoken = phrase(rng, rng.uniform(0.3, 2.5))
+            end = position + spoken
+            add(samples + rng.normal(0, noise, len(samples)))
+        turns.append([start * 1000 // RATE, end * 1000 // RATE])
+    add(rng.normal(0, noise, 2 * RATE))
+    return np.concatenate(parts).astype(np.float32), turns
+
+
+def write_set(directory, count, minutes, seed):
+    rng = np.random.default_rng(seed)
+    for n in range(count):
+        samples, turns = conversation(rng, minutes)
+        with wave.open(str(directory / f'conversation_{n:03}.wav'), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(RATE)
+            wav.writeframes(float_to_pcm16(samples).tobytes())
+        (directory / f'conversation_{n:03}.json').write_text(json.dumps({'turns': turns}), encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--conversations', type=int, default=20)
+    parser.add_argument('--minutes', type=float, default=5, help='length of each conversation')
+    parser.add_argument('--seed', type=int, default=3)
+    parser.add_argument('--keep', help='write the recordings here and keep them')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    directory = Path(args.keep or tempfile.mkdtemp(prefix='vad_recordings_'))
+    directory.mkdir(parents=True, exist_ok=True)
+    write_set(directory, args.conversations, args.minutes, args.seed)
+
+    start = time.process_time()
+    recordings = [vad_tuning.Recording.load(path) for path in sorted(directory.glob('*.wav'))]
+    loaded = time.process_time()
+    grid = vad_tuning.sweep(recordings)
+    swept = time.process_time()
+    audio = sum(recording.seconds for recording in recordings)
+    settings = len(vad_tuning.THRESHOLDS) * len(vad_tuning.SILENCE_DURATIONS_MS) * len(vad_tuning.PREFIX_PADDINGS_MS)
+    print(f"{audio / 60:.0f} min of 48 kHz audio in {len(recordings)} files, {len(grid)} threshold x silence cells "
+          f"({settings} settings with prefix padding)")
+    print(f"load (read + resample to 24k + 10 ms levels): {audio / (loaded - start):>9.0f} audio-s per CPU-s")
+    print(f"sweep (all settings):                        {audio / (swept - loaded):>9.0f} audio-s per CPU-s "
+          f"({(swept - loaded) * 1000:.0f} ms)\n")
+    vad_tuning.main(['--dir', str(directory)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: upstream model responses per counseling session, before/after the fused tool
+
+Replays the data-channel traffic of one full session (one answer per
+QUESTION_BANK question) for each client version and counts what reaches the
+realtime API:
+
+  before  track_survey_response + determine_next_question, and a
+          response.create after every function_call_output
+  after   record_response_and_get_next, and one response.create per model
+          response once all of its tool outputs are sent
+
+Each answer turn starts with the server-VAD response, in which the model
+calls detect_user_language first as the prompt requires. With --sequential
+the model makes one tool call per response instead of batching independent
+calls. Every model response costs roughly --response-ms of time-to-first-token
+before the student hears the next question.
+
+    python benchmarks/count_upstream_responses.py --response-ms 700
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+from realtime_tools import CLIENT_SESSION_TOOLS  # noqa: E402
+
+
+def turn_plan(fused, sequential):
+    """Tool calls the model makes per response for one answer, ending with the spoken question"""
+    if fused:
+        calls = [['detect_user_language', 'record_response_and_get_next']]
+    else:
+        # determine_next_question needs the track_survey_response result first
+        calls = [['detect_user_language', 'track_survey_response'], ['determine_next_question']]
+    if sequential:
+        calls = [[call] for stage in calls for call in stage]
+    return calls
+
+
+def replay(questions, fused, per_response, sequential):
+    totals = {'tool_calls': 0, 'response_create': 0, 'rejected': 0, 'responses': 0, 'responses_per_turn': 0}
+
+    # Session start: the client sends response.create so the counselor greets the student
+    totals['response_create'] += 1
+    totals['responses'] += 1
+
+    for _ in questions:
+        # Server VAD starts the first response of the turn on its own
+        responses = 1
+        for stage in turn_plan(fused, sequential):
+            totals['tool_calls'] += len(stage)
+            creates = 1 if per_response else len(stage)
+            totals['response_create'] += creates
+            # Only one response can be active; extra creates come back as errors
+            totals['rejected'] += creates - 1
+            responses += 1
+        totals['responses'] += responses
+        totals['responses_per_turn'] = responses
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--response-ms', type=float, default=700.0, help='model time-to-first-token per response')
+    parser.add_argument('--sequential', action='store_true', help='model makes one tool call per response')
+    args = parser.parse_args()
+
+    assert 'record_response_and_get_next' in CLIENT_SESSION_TOOLS
+    questions = list(QUESTION_BANK)
+    before = replay(questions, fused=False, per_response=False, sequential=args.sequential)
+    after = replay(questions, fused=True, per_response=True, sequential=args.sequential)
+
+    print(f"{len(questions)} answers per session, {'sequential' if args.sequential else 'batched'} tool calls\n")
+    print(f"{'':<10} {'tool calls':>11} {'resp.create':>12} {'rejected':>9} {'responses':>10} {'per turn':>9}"
+          f" {'wait/turn ms':>13}")
+    for label, totals in (('before', before), ('after', after)):
+        per_turn = totals['responses_per_turn']
+        # The first response of a turn is paid either way; the rest delay the next question
+        print(f"{label:<10} {totals['tool_calls']:>11} {totals['response_create']:>12} {totals['rejected']:>9}"
+              f" {totals['responses']:>10} {per_turn:>9} {(per_turn - 1) * args.response_ms:>13.0f}")
+    saved = before['responses'] - after['responses']
+    print(f"\n{saved} fewer upstream responses per session "
+          f"(~{saved * args.response_ms / 1000:.1f} s of model latency)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Shared helpers for the benchmarks: running the app as a real server process and synthetic data
+"""
+
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SERVER = (
+    "import app; "
+    "app.socketio.run(app.app, host='127.0.0.1', port={port}, allow_unsafe_werkzeug=True)"
+)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def spawn_server(env=None, quiet=True, cwd=None):
+    """Start app.py on a free port in ``cwd`` (default: a scratch directory); returns (process, url)"""
+    port = free_port()
+    server_env = dict(os.environ, PYTHONPATH=str(ROOT), FLASK_ENV='production', **(env or {}))
+    output = subprocess.DEVNULL if quiet else None
+    process = subprocess.Popen([sys.executable, '-c', SERVER.format(port=port)], cwd=cwd or tempfile.mkdtemp(),
+                               env=server_env, stdout=output, stderr=output)
+    wait_for_port(port)
+    return process, f'http://127.0.0.1:{port}'
+
+
+def proc_status(pid):
+    """Return (RSS in KB, thread count) for a running process"""
+    fields = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            fields[key] = value.strip()
+    return int(fields['VmRSS'].split()[0]), int(fields['Threads'])
+
+
+def raise_fd_limit():
+    """Each connection needs a descriptor on both ends"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# Building blocks for synthetic career summaries
+_ANSWER_PHRASES = [
+    "There are too many options and I don't know which path to choose",
+    "My parents want me to do engineering but I'm more interested in design",
+    "I'm worried AI will replace the jobs I'm studying for",
+    "I don't have enough skills or experience for internships yet",
+    "Honestly pata nahi, the job market looks really tough",
+    "I enjoy biology and I'm curious about research",
+    "I think AI is an opportunity if I learn to use it as a tool",
+    "Salary matters to me because of my education loan",
+]
+_EMOTIONS = ['neutral', 'anxious', 'confused', 'frustrated', 'hopeful', 'excited', 'overwhelmed']
+
+
+def make_summary(n, rng=None, answered=None):
+    """A career summary shaped like CareerCounselingManager.save_summary output"""
+    from realtime_prompts import QUESTION_BANK
+
+    rng = rng or random.Random(n)
+    question_ids = list(QUESTION_BANK)
+    if answered is None:
+        answered = question_ids[:rng.randint(len(question_ids) // 2, len(question_ids))]
+    start = datetime(2025, 9, 1) + timedelta(days=n % 60, minutes=n)
+    end = start + timedelta(minutes=rng.randint(8, 40))
+    responses = {
+        q: {
+            'response': '. '.join(rng.sample(_ANSWER_PHRASES, 2)) + f'. (student {n})',
+            'timestamp': (start + timedelta(minutes=i)).isoformat(),
+            'emotion': rng.choice(_EMOTIONS),
+        }
+        for i, q in enumerate(answered)
+    }
+    return {
+        'session_id': f'career_{int(start.timestamp())}_{n:08x}',
+        'user': {'name': f'Student {n}', 'email': f'student{n}@example.com'},
+        'timing': {'start': start.isoformat(), 'end': end.isoformat(),
+                   'duration_minutes': int((end - start).total_seconds() / 60)},
+        'questions_answered': len(answered),
+        'completed_questions': answered,
+        'responses': responses,
+        'emotional_trajectory': [
+            {'question_id': q, 'emotion': r['emotion'], 'timestamp': r['timestamp']} for q, r in responses.items()
+        ],
+        'analysis': {'career_concerns': ['uncertainty about AI'], 'interests': ['design', 'biology']},
+        'recommendations': ['Talk to a mentor', 'Try a short internship'],
+    }
+
+
+def write_summaries(directory, count, start=0):
+    """Write ``count`` synthetic summary files the way the summary pipeline names them"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for n in range(start, start + count):
+        summary = make_summary(n)
+        stamp = datetime.fromisoformat(summary['timing']['end']).strftime('%Y%m%d_%H%M%S')
+        path = directory / f"student{n}_at_example_com_{stamp}_summary.json"
+        path.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding='utf-8')
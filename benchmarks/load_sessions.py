@@ -0,0 +1,192 @@
+"""
+Load test: replay full career counseling sessions over Socket.IO
+
+Each simulated student registers through /api/register, connects with that
+session cookie, and then runs a full counseling session:
+
+    career_start -> career_response (one per QUESTION_BANK id, in order)
+    with career_pause / career_resume / career_progress halfway through
+    -> career_summary
+
+It reports throughput, p50/p95/p99 latency per event type and the server's
+RSS over time. By default it starts its own server; pass --url and
+--server-pid to load an existing one instead.
+
+    python benchmarks/load_sessions.py --clients 200 --ramp 5
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import aiohttp
+import socketio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import percentile, proc_status, raise_fd_limit, spawn_server  # noqa: E402
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+
+# Event sent -> event the server answers with
+REPLIES = {
+    'career_start': 'career_started',
+    'career_response': 'career_response_saved',
+    'career_pause': 'career_paused',
+    'career_resume': 'career_resumed',
+    'career_progress': 'career_progress',
+    'career_summary': 'summary_saved',
+}
+
+EMOTIONS = ['neutral', 'anxious', 'confused', 'hopeful', 'excited', 'overwhelmed']
+
+
+class SimulatedStudent:
+    def __init__(self, index, url, latencies, errors, think_time):
+        self.index = index
+        self.url = url
+        self.latencies = latencies
+        self.errors = errors
+        self.think_time = think_time
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.waiting = None
+
+        for reply in set(REPLIES.values()) | {'career_error'}:
+            self.client.on(reply, self._make_handler(reply))
+
+    def _make_handler(self, reply):
+        async def handler(data=None):
+            if self.waiting and not self.waiting[1].done() and reply in (self.waiting[0], 'career_error'):
+                self.waiting[1].set_result((reply, data))
+        return handler
+
+    async def call(self, event, data=None):
+        future = asyncio.get_running_loop().create_future()
+        self.waiting = (REPLIES[event], future)
+        start = time.perf_counter()
+        if data is None:
+            await self.client.emit(event)
+        else:
+            await self.client.emit(event, data)
+        reply, payload = await asyncio.wait_for(future, timeout=30)
+        self.latencies[event].append((time.perf_counter() - start) * 1000)
+        if reply == 'career_error':
+            self.errors[event] += 1
+        if self.think_time:
+            await asyncio.sleep(random.uniform(0, self.think_time))
+        return payload
+
+    async def run(self, http):
+        email = f'student{self.index}@example.com'
+        async with http.post(f'{self.url}/api/register', json={'email': email, 'name': f'Student {self.index}'}) as r:
+            r.raise_for_status()
+        cookie = '; '.join(f'{c.key}={c.value}' for c in http.cookie_jar)
+        await self.client.connect(self.url, headers={'Cookie': cookie}, transports=['websocket'])
+
+        try:
+            await self.call('career_start')
+            question_ids = list(QUESTION_BANK)
+            halfway = len(question_ids) // 2
+            for n, question_id in enumerate(question_ids):
+                if n == halfway:
+                    await self.call('career_pause', {'current_question': question_id})
+                    await self.call('career_resume', {})
+                    await self.call('career_progress')
+                await self.call('career_response', {
+                    'question_id': question_id,
+                    'response': f'Simulated answer from student {self.index} to {question_id}. ' * 3,
+                    'emotion': random.choice(EMOTIONS),
+                })
+            await self.call('career_summary', {
+                'student_name': f'Student {self.index}',
+                'total_questions_answered': len(question_ids),
+                'session_data': {'career_concerns': ['load test'], 'interests': ['benchmarks']},
+                'recommendations': ['keep testing'],
+            })
+        finally:
+            await self.client.disconnect()
+
+
+async def sample_rss(pid, interval, timeline, start):
+    while True:
+        rss_kb, threads = proc_status(pid)
+        timeline.append((time.perf_counter() - start, rss_kb / 1024, threads))
+        await asyncio.sleep(interval)
+
+
+async def run_load(url, server_pid, clients, ramp, think_time, sample_interval):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    timeline = []
+    start = time.perf_counter()
+    sampler = None
+    if server_pid:
+        sampler = asyncio.create_task(sample_rss(server_pid, sample_interval, timeline, start))
+
+    async def launch(index):
+        await asyncio.sleep(ramp * index / max(1, clients))
+        # One cookie jar per student so every client is its own registered user;
+        # unsafe=True lets the jar keep cookies set by a bare IP address
+        async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as http:
+            await SimulatedStudent(index, url, latencies, errors, think_time).run(http)
+
+    results = await asyncio.gather(*(launch(i) for i in range(clients)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    if sampler:
+        sampler.cancel()
+        rss_kb, threads = proc_status(server_pid)
+        timeline.append((elapsed, rss_kb / 1024, threads))
+
+    failed = [r for r in results if isinstance(r, Exception)]
+    total = sum(len(v) for v in latencies.values())
+    print(f"{clients} sessions in {elapsed:.1f}s: {total} events, {total / elapsed:,.0f} events/s, "
+          f"{clients - len(failed)} completed, {len(failed)} failed")
+    if failed:
+        print(f"first failure: {failed[0]!r}")
+
+    print(f"\n{'event':<18} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for event in REPLIES:
+        samples = latencies.get(event)
+        if samples:
+            print(f"{event:<18} {len(samples):>7} {errors[event]:>7} {percentile(samples, 50):>9.2f}"
+                  f" {percentile(samples, 95):>9.2f} {percentile(samples, 99):>9.2f}")
+
+    if timeline:
+        print(f"\n{'t (s)':>8} {'RSS MB':>9} {'threads':>8}")
+        for t, rss_mb, threads in timeline:
+            print(f"{t:>8.1f} {rss_mb:>9.1f} {threads:>8}")
+        print(f"RSS growth: {timeline[-1][1] - timeline[0][1]:+.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--ramp', type=float, default=2.0, help='seconds over which clients start')
+    parser.add_argument('--think-time', type=float, default=0.0, help='max random pause between events')
+    parser.add_argument('--sample-interval', type=float, default=1.0)
+    parser.add_argument('--url', help='existing server to load instead of spawning one')
+    parser.add_argument('--server-pid', type=int, help='pid of --url server for RSS sampling')
+    parser.add_argument('--async-mode', default='threading', help='SOCKETIO_ASYNC_MODE for a spawned server')
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    server = None
+    url, server_pid = args.url, args.server_pid
+    if not url:
+        server, url = spawn_server({'SOCKETIO_ASYNC_MODE': args.async_mode})
+        server_pid = server.pid
+
+    try:
+        asyncio.run(run_load(url, server_pid, args.clients, args.ramp, args.think_time, args.sample_interval))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,454 @@
+"""
+Mock realtime server: a local stand-in for the Azure realtime sessions and event endpoints
+
+Serves what the voice path needs from Azure, with scripted model behaviour
+and configurable latency, so it can be benchmarked offline:
+
+  POST /openai/realtimeapi/sessions   mints a session with an ephemeral
+                                      client_secret (what key_pool.mint calls)
+  GET  /openai/realtime               WebSocket speaking the realtime event
+                                      protocol of the browser's data channel
+
+The browser reaches Azure over WebRTC, which cannot run headlessly here, so
+the mock carries the same JSON events over a WebSocket (the realtime API's
+other transport). Clients authenticate with ``Authorization: Bearer <key>``
+using a minted ephemeral key, or with the ``api-key`` header.
+
+Client events handled: session.update, conversation.item.create (messages
+and function_call_output), response.create, response.cancel and
+input_audio_buffer.append / commit / clear. A second response.create while
+one is active is rejected the way the API does. Responses come from
+CounselorScript, which plays the counselor the prompt describes: it greets
+with the first question, answers each student turn with
+detect_user_language + record_response_and_get_next calls, speaks the next
+question from the tool output, and calls end_session_summary once the
+survey is complete.
+
+    python benchmarks/mock_realtime.py --port 8765 --first-event-ms 300
+"""
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import random
+import struct
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from aiohttp import WSMsgType, web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import free_port  # noqa: E402
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+
+SESSIONS_PATH = '/openai/realtimeapi/sessions'
+REALTIME_PATH = '/openai/realtime'
+
+# 24 kHz mono PCM16, sent as response.audio.delta chunks of AUDIO_CHUNK_MS
+AUDIO_RATE = 24000
+AUDIO_CHUNK_MS = 100
+SILENCE_BYTES = bytes(AUDIO_RATE * 2 * AUDIO_CHUNK_MS // 1000)
+SILENCE_CHUNK = base64.b64encode(SILENCE_BYTES).decode('ascii')
+
+
+def stamp():
+    """8 bytes of time.perf_counter(); the same clock in every process on a machine"""
+    return struct.pack('<d', time.perf_counter())
+
+
+def stamped_at(chunk):
+    """Seconds since the stamp at the start of a chunk was taken"""
+    return time.perf_counter() - struct.unpack_from('<d', chunk)[0]
+
+
+class Latency:
+    """Scripted delays in milliseconds, each scaled by a random factor in [1 - jitter, 1 + jitter]
+
+      mint_ms           sessions endpoint, per minted key
+      first_event_ms    response.create (or committed audio) to response.created
+      tool_ms           streaming one function call's arguments
+      audio_ms          spoken audio per message, streamed in AUDIO_CHUNK_MS deltas
+      transcription_ms  committed audio to its input transcription
+    """
+
+    def __init__(self, mint_ms=150, first_event_ms=300, tool_ms=40, audio_ms=400, transcription_ms=150,
+                 jitter=0.0, seed=None):
+        self.mint_ms = mint_ms
+        self.first_event_ms = first_event_ms
+        self.tool_ms = tool_ms
+        self.audio_ms = audio_ms
+        self.transcription_ms = transcription_ms
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+
+    def ms(self, name):
+        value = getattr(self, name)
+        if self.jitter:
+            value *= self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+        return value
+
+    async def sleep(self, name):
+        await asyncio.sleep(self.ms(name) / 1000)
+
+
+class CounselorScript:
+    """Decides each response from the items the client added since the previous one.
+
+    Outputs are ``('function_call', name, arguments)`` or ``('message', text)``.
+    """
+
+    def __init__(self):
+        self.question_id = next(iter(QUESTION_BANK))
+        self.student_name = None
+
+    def next_response(self, items):
+        outputs = {}
+        for item in items:
+            if item.get('type') == 'function_call_output':
+                try:
+                    outputs[item['name']] = json.loads(item.get('output') or '{}')
+                except ValueError:
+                    outputs[item['name']] = {}
+        said = [part.get('text') or part.get('transcript') or ''
+                for item in items if item.get('type') == 'message' and item.get('role') == 'user'
+                for part in item.get('content', ())]
+
+        if 'end_session_summary' in outputs:
+            return [('message', 'Thank you for sharing all of this. Your summary is saved. All the best!')]
+        if 'record_response_and_get_next' in outputs:
+            result = outputs['record_response_and_get_next']
+            self.student_name = result.get('student_name') or self.student_name
+            if result.get('complete'):
+                return [('function_call', 'end_session_summary', {
+                    'student_name': self.student_name or 'Student',
+                    'session_data': {'career_concerns': ['choosing a path'], 'interests': ['design']},
+                    'recommendations': ['Talk to a mentor in your field of interest'],
+                })]
+            if result.get('next_question'):
+                self.question_id = result['next_question']
+            return [('message', result.get('question_text') or 'Could you tell me a bit more?')]
+        if outputs:
+            return [('message', 'Okay, let us continue.')]
+        if said:
+            text = ' '.join(said)
+            return [
+                ('function_call', 'detect_user_language', {
+                    'user_text': text, 'detected_language': 'english', 'confidence': 'high'}),
+                ('function_call', 'record_response_and_get_next', {
+                    'question_id': self.question_id, 'response': text, 'emotion_detected': 'neutral'}),
+            ]
+        return [('message', QUESTION_BANK[self.question_id]['question'])]
+
+
+class RealtimeConnection:
+    """One client WebSocket: its session config, conversation and at most one active response"""
+
+    def __init__(self, server, ws):
+        self.server = server
+        self.ws = ws
+        self.script = server.script()
+        self.session = {'id': f'sess_{uuid.uuid4().hex[:20]}', 'object': 'realtime.session',
+                        'model': server.deployment, 'turn_detection': None, 'tools': []}
+        self.items = []
+        self.new_items = []
+        self.calls = {}
+        self.audio = bytearray()
+        self.response = None
+        self._event_ids = itertools.count(1)
+
+    async def send(self, event):
+        event['event_id'] = f'event_{next(self._event_ids)}'
+        self.server.stats['events_out'] += 1
+        try:
+            await self.ws.send_str(json.dumps(event))
+        except ConnectionResetError:
+            # The client left mid-response; run() cancels it once the close is read
+            pass
+
+    async def error(self, code, message, event):
+        await self.send({'type': 'error', 'error': {
+            'type': 'invalid_request_error', 'code': code, 'message': message, 'event_id': event.get('event_id')}})
+
+    async def run(self):
+        await self.send({'type': 'session.created', 'session': self.session})
+        async for message in self.ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            try:
+                event = json.loads(message.data)
+            except ValueError:
+                await self.error('invalid_json', 'Event is not valid JSON', {})
+                continue
+            self.server.stats['events_in'] += 1
+            handler = getattr(self, 'on_' + str(event.get('type')).replace('.', '_'), None)
+            if handler is None:
+                await self.error('invalid_event', f"Unsupported event type {event.get('type')!r}", event)
+                continue
+            await handler(event)
+        if self.response is not None:
+            self.response.cancel()
+
+    async def on_session_update(self, event):
+        self.session.update(event.get('session') or {})
+        await self.send({'type': 'session.updated', 'session': self.session})
+
+    async def on_conversation_item_create(self, event):
+        item = dict(event.get('item') or {})
+        if item.get('type') == 'function_call_output':
+            name = self.calls.pop(item.get('call_id'), None)
+            if name is None:
+                self.server.stats['unknown_call_ids'] += 1
+                await self.error('invalid_call_id', f"No function call with call_id {item.get('call_id')!r}", event)
+                return
+            item['name'] = name
+        elif item.get('type') != 'message':
+            await self.error('invalid_item', f"Unsupported item type {item.get('type')!r}", event)
+            return
+        await self._add_item(item)
+
+    async def on_response_create(self, event):
+        await self._start_response(event)
+
+    async def on_response_cancel(self, event):
+        if self.response is not None:
+            self.response.cancel()
+
+    async def on_input_audio_buffer_append(self, event):
+        try:
+            chunk = base64.b64decode(event.get('audio') or '', validate=True)
+        except ValueError:
+            await self.error('invalid_audio', 'audio is not valid base64', event)
+            return
+        self.audio += chunk
+        self.server.stats['audio_bytes_in'] += len(chunk)
+        if self.server.audio_hook is not None:
+            self.server.audio_hook(chunk)
+
+    async def on_input_audio_buffer_clear(self, event):
+        self.audio.clear()
+        await self.send({'type': 'input_audio_buffer.cleared'})
+
+    async def on_input_audio_buffer_commit(self, event):
+        if not self.audio:
+            await self.error('input_audio_buffer_commit_empty', 'Audio buffer is empty', event)
+            return
+        seconds = len(self.audio) / (AUDIO_RATE * 2)
+        self.audio.clear()
+        item = {'type': 'message', 'role': 'user', 'content': [{'type': 'input_audio', 'transcript': None}]}
+        await self._add_item(item, announce=False)
+        await self.send({'type': 'input_audio_buffer.committed', 'item_id': item['id']})
+        await self.send({'type': 'conversation.item.created', 'item': item})
+        # The transcript stands in for what the student said; the script only needs some text
+        await self.server.latency.sleep('transcription_ms')
+        item['content'][0]['transcript'] = f'(spoken answer, {seconds:.1f} s of audio)'
+        await self.send({'type': 'conversation.item.input_audio_transcription.completed',
+                         'item_id': item['id'], 'content_index': 0, 'transcript': item['content'][0]['transcript']})
+        # With server VAD the server starts the response itself, as it does after speech stops
+        turn_detection = self.session.get('turn_detection')
+        if turn_detection and turn_detection.get('create_response', True):
+            await self._start_response(event)
+
+    async def _add_item(self, item, announce=True):
+        item.setdefault('id', f'item_{uuid.uuid4().hex[:20]}')
+        item['object'] = 'realtime.item'
+        self.items.append(item)
+        self.new_items.append(item)
+        if announce:
+            await self.send({'type': 'conversation.item.created', 'item': item})
+
+    async def _start_response(self, event):
+        if self.response is not None:
+            self.server.stats['rejected'] += 1
+            await self.error('conversation_already_has_active_response',
+                             'Conversation already has an active response', event)
+            return
+        items, self.new_items = self.new_items, []
+        self.response = asyncio.create_task(self._respond(self.script.next_response(items)))
+
+    async def _respond(self, outputs):
+        response = {'id': f'resp_{uuid.uuid4().hex[:20]}', 'object': 'realtime.response',
+                    'status': 'in_progress', 'output': []}
+        latency = self.server.latency
+        try:
+            await latency.sleep('first_event_ms')
+            await self.send({'type': 'response.created', 'response': dict(response)})
+            for index, (kind, *body) in enumerate(outputs):
+                if kind == 'function_call':
+                    item = await self._function_call(response['id'], index, *body)
+                else:
+                    item = await self._message(response['id'], index, *body)
+                response['output'].append(item)
+                self.items.append(item)
+            response['status'] = 'completed'
+        except asyncio.CancelledError:
+            response['status'] = 'cancelled'
+        finally:
+            self.response = None
+            self.server.stats['responses'] += 1
+        if not self.ws.closed:
+            await self.send({'type': 'response.done', 'response': response})
+
+    async def _function_call(self, response_id, index, name, arguments):
+        call_id = f'call_{uuid.uuid4().hex[:16]}'
+        item = {'id': f'item_{uuid.uuid4().hex[:20]}', 'object': 'realtime.item', 'type': 'function_call',
+                'status': 'in_progress', 'name': name, 'call_id': call_id, 'arguments': ''}
+        where = {'response_id': response_id, 'output_index': index}
+        await self.send({'type': 'response.output_item.added', **where, 'item': dict(item)})
+        await self.server.latency.sleep('tool_ms')
+        item.update(status='completed', arguments=json.dumps(arguments))
+        self.calls[call_id] = name
+        await self.send({'type': 'response.function_call_arguments.done', **where, 'item_id': item['id'],
+                         'call_id': call_id, 'name': name, 'arguments': item['arguments']})
+        await self.send({'type': 'response.output_item.done', **where, 'item': item})
+        return item
+
+    async def _message(self, response_id, index, text):
+        item = {'id': f'item_{uuid.uuid4().hex[:20]}', 'object': 'realtime.item', 'type': 'message',
+                'status': 'in_progress', 'role': 'assistant', 'content': []}
+        where = {'response_id': response_id, 'item_id': item['id'], 'output_index': index, 'content_index': 0}
+        await self.send({'type': 'response.output_item.added', 'response_id': response_id,
+                         'output_index': index, 'item': dict(item)})
+        await self.send({'type': 'response.content_part.added', **where, 'part': {'type': 'audio', 'transcript': ''}})
+        chunks = max(1, round(self.server.latency.ms('audio_ms') / AUDIO_CHUNK_MS))
+        words = text.split(' ')
+        for n in range(chunks):
+            # Audio streams in real time; the transcript is spread over the chunks
+            share = words[n * len(words) // chunks:(n + 1) * len(words) // chunks]
+            if share:
+                await self.send({'type': 'response.audio_transcript.delta', **where, 'delta': ' '.join(share) + ' '})
+            if self.server.stamp_audio:
+                delta = base64.b64encode(stamp() + SILENCE_BYTES[8:]).decode('ascii')
+            else:
+                delta = SILENCE_CHUNK
+            await self.send({'type': 'response.audio.delta', **where, 'delta': delta})
+            await asyncio.sleep(AUDIO_CHUNK_MS / 1000)
+        part = {'type': 'audio', 'transcript': text}
+        await self.send({'type': 'response.audio.done', **where})
+        await self.send({'type': 'response.audio_transcript.done', **where, 'transcript': text})
+        await self.send({'type': 'response.content_part.done', **where, 'part': part})
+        item.update(status='completed', content=[part])
+        await self.send({'type': 'response.output_item.done', 'response_id': response_id,
+                         'output_index': index, 'item': item})
+        return item
+
+
+class MockRealtimeServer:
+    """The mock's aiohttp app; start it on the running loop, or run main() as a process.
+
+    ``audio_hook`` is called with every appended audio chunk, and with
+    ``stamp_audio`` each audio delta starts with a ``stamp()``, so a
+    benchmark in the same process can time audio in both directions.
+    """
+
+    def __init__(self, latency=None, api_key='mock-api-key', key_ttl=60, deployment='gpt-realtime',
+                 script=CounselorScript, audio_hook=None, stamp_audio=False):
+        self.latency = latency or Latency()
+        self.api_key = api_key
+        self.key_ttl = key_ttl
+        self.deployment = deployment
+        self.script = script
+        self.audio_hook = audio_hook
+        self.stamp_audio = stamp_audio
+        self.url = None
+        self._keys = {}
+        self._runner = None
+        self.stats = {'minted': 0, 'connections': 0, 'unauthorized': 0, 'events_in': 0, 'events_out': 0,
+                      'responses': 0, 'rejected': 0, 'unknown_call_ids': 0, 'audio_bytes_in': 0}
+
+    @property
+    def sessions_url(self):
+        return self.url + SESSIONS_PATH
+
+    @property
+    def realtime_url(self):
+        return self.url.replace('http', 'ws', 1) + REALTIME_PATH
+
+    def app(self):
+        application = web.Application()
+        application.router.add_post(SESSIONS_PATH, self.mint_session)
+        application.router.add_get(REALTIME_PATH, self.realtime)
+        return application
+
+    async def start(self, host='127.0.0.1', port=None):
+        port = port or free_port()
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.url = f'http://{host}:{port}'
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def mint_session(self, request):
+        if request.headers.get('api-key') != self.api_key:
+            self.stats['unauthorized'] += 1
+            return web.json_response({'error': {'code': '401', 'message': 'Access denied'}}, status=401)
+        body = await request.json()
+        await self.latency.sleep('mint_ms')
+        key = f'ek_{uuid.uuid4().hex}'
+        expires_at = int(time.time()) + self.key_ttl
+        self._keys[key] = expires_at
+        self.stats['minted'] += 1
+        return web.json_response({
+            'id': f'sess_{uuid.uuid4().hex[:20]}', 'object': 'realtime.session',
+            'model': body.get('model', self.deployment), 'voice': body.get('voice'),
+            'client_secret': {'value': key, 'expires_at': expires_at},
+        })
+
+    def _authorized(self, request):
+        if request.headers.get('api-key') == self.api_key:
+            return True
+        scheme, _, key = request.headers.get('Authorization', '').partition(' ')
+        return scheme == 'Bearer' and self._keys.get(key, 0) > time.time()
+
+    async def realtime(self, request):
+        if not self._authorized(request):
+            self.stats['unauthorized'] += 1
+            return web.json_response({'error': {'code': '401', 'message': 'Invalid or expired key'}}, status=401)
+        ws = web.WebSocketResponse(max_msg_size=16 * 1024 * 1024)
+        await ws.prepare(request)
+        self.stats['connections'] += 1
+        await RealtimeConnection(self, ws).run()
+        return ws
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--api-key', default='mock-api-key')
+    parser.add_argument('--mint-ms', type=float, default=150)
+    parser.add_argument('--first-event-ms', type=float, default=300)
+    parser.add_argument('--tool-ms', type=float, default=40)
+    parser.add_argument('--audio-ms', type=float, default=400)
+    parser.add_argument('--transcription-ms', type=float, default=150)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockRealtimeServer(
+        Latency(args.mint_ms, args.first_event_ms, args.tool_ms, args.audio_ms, args.transcription_ms, args.jitter),
+        api_key=args.api_key)
+
+    async def serve():
+        await server.start(args.host, args.port)
+        print("Point the app at the mock with:")
+        print(f"  AZURE_OPENAI_API_KEY={args.api_key} SESSIONS_URL={server.sessions_url}")
+        print(f"Realtime events: {server.realtime_url}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
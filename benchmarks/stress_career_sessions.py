@@ -0,0 +1,187 @@
+"""
+Stress: many threads pausing, resuming, answering and finishing the same career sessions
+
+Runs CareerCounselingManager over a CareerSessionRegistry from many
+threads that all work on a small shared pool of sessions, so the same
+session is hit concurrently. Questions are answered, sessions are paused
+and resumed, depth is changed and sessions are completed (summary and end),
+with new sessions taking their place. A tight capacity forces spills and
+restores at the same time. Afterwards it checks these invariants and exits
+non-zero if any fails:
+
+  - no worker raised
+  - a session is in exactly one place: active, paused or spilled to disk
+  - the email, user and spill indexes match the maps exactly
+  - every session was completed at most once
+  - replaying the journal reproduces every live session's answers
+
+It runs once with a single shard (one lock for everything) and once with
+the default striping, and reports throughput for both.
+
+    python benchmarks/stress_career_sessions.py --threads 32 --sessions 64 --ops 20000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from career_journal import CareerJournal, load_state  # noqa: E402
+from career_registry import CareerSessionRegistry  # noqa: E402
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+from session_shards import DEFAULT_STRIPES  # noqa: E402
+
+QUESTION_IDS = list(QUESTION_BANK)
+EMOTIONS = [None, 'neutral', 'anxious', 'hopeful', 'overwhelmed']
+
+
+def worker(manager, pool, pool_lock, ops, completed, errors, seed):
+    rng = random.Random(seed)
+    try:
+        for n in range(ops):
+            with pool_lock:
+                slot = rng.randrange(len(pool))
+                career_session_id, user_email = pool[slot]
+            action = rng.random()
+            if action < 0.55:
+                manager.save_response(career_session_id, rng.choice(QUESTION_IDS),
+                                      f'answer {seed}/{n}', rng.choice(EMOTIONS))
+            elif action < 0.70:
+                manager.pause_session(career_session_id, rng.choice(QUESTION_IDS))
+            elif action < 0.85:
+                # Resume the way the app does when the client has no id: by email
+                paused = manager.find_paused_session(user_email)
+                if paused:
+                    manager.resume_session(paused)
+            elif action < 0.93:
+                manager.set_depth_action(career_session_id, rng.choice(['go_deeper', 'speed_up']))
+            else:
+                if manager.complete_session(career_session_id, {'session_data': {}}):
+                    completed[career_session_id] += 1
+                    # A new student takes the finished one's place
+                    replacement = manager.create_career_session(f'user_{seed}_{n}', 'Stress', f'{seed}_{n}@example.com')
+                    with pool_lock:
+                        pool[slot] = (replacement, f'{seed}_{n}@example.com')
+    except Exception as e:
+        errors.append(repr(e))
+
+
+def check(registry, journal_dir, completed, errors):
+    failures = list(errors[:5])
+    active, paused = set(), set()
+    for shard in registry._shards:
+        with shard.lock:
+            active.update(shard.active)
+            paused.update(shard.paused)
+    spilled = {path.stem for path in registry.spill_dir.glob('*.json')}
+
+    for name, a, b in (('active/paused', active, paused), ('active/spilled', active, spilled),
+                       ('paused/spilled', paused, spilled)):
+        if a & b:
+            failures.append(f"in both {name}: {sorted(a & b)[:5]}")
+    if len(registry) != len(active) + len(paused):
+        failures.append(f"len() {len(registry)} != {len(active) + len(paused)}")
+
+    paused_index = {member for _, members in registry._paused_by_email.items() for member in members}
+    if paused_index != paused:
+        failures.append(f"paused-by-email index differs from paused map by {len(paused_index ^ paused)} ids")
+    user_index = {member for _, members in registry._by_user.items() for member in members}
+    if user_index != active | paused:
+        failures.append(f"by-user index differs from resident sessions by {len(user_index ^ (active | paused))} ids")
+    spilled_index = {member for _, members in registry._spilled_by_email.items() for member in members}
+    if spilled_index != spilled:
+        failures.append(f"spill index differs from spill files by {len(spilled_index ^ spilled)} ids")
+
+    twice = [career_session_id for career_session_id, count in completed.items() if count > 1]
+    if twice:
+        failures.append(f"completed more than once: {twice[:5]}")
+    finished = set(completed) & (active | paused | spilled)
+    if finished:
+        failures.append(f"completed but still live: {sorted(finished)[:5]}")
+
+    # The session lock keeps journal order equal to apply order, so replay must agree with memory
+    replayed = load_state(journal_dir)['sessions']
+    live = active | paused | spilled
+    if set(replayed) != live:
+        failures.append(f"journal replay has {len(set(replayed) ^ live)} sessions more or fewer than memory")
+    shown = 0
+    for career_session_id in active | paused:
+        session = registry._shard(career_session_id)
+        session = session.active.get(career_session_id) or session.paused.get(career_session_id)
+        other = replayed.get(career_session_id)
+        if other is None:
+            continue
+        mine = (session.completed_questions, session.responses, session.emotional_trajectory, session.depth_action)
+        theirs = (other.completed_questions, other.responses, other.emotional_trajectory, other.depth_action)
+        if mine != theirs and shown < 3:
+            failures.append(f"journal replay of {career_session_id} differs from memory")
+            shown += 1
+    return failures
+
+
+def run(server, args, shards):
+    directory = Path(tempfile.mkdtemp())
+    registry = CareerSessionRegistry(directory / 'paused', max_sessions=args.capacity, shards=shards)
+    journal = CareerJournal(directory / 'journal', segment_entries=args.segment_entries)
+    journal.recover()
+    manager = server.CareerCounselingManager(registry, server.summary_pipeline, journal)
+
+    pool = [(manager.create_career_session(f'user_{n}', 'Stress', f'student{n}@example.com'),
+             f'student{n}@example.com') for n in range(args.sessions)]
+    pool_lock = threading.Lock()
+    completed, errors = Counter(), []
+    per_thread = args.ops // args.threads
+
+    threads = [
+        threading.Thread(target=worker, args=(manager, pool, pool_lock, per_thread, completed, errors, seed))
+        for seed in range(args.threads)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.summary_pipeline.drain(timeout=30)
+    journal.stop()
+
+    failures = check(registry, directory / 'journal', completed, errors)
+    print(f"{shards:>3} shard(s): {per_thread * args.threads / elapsed:>8,.0f} ops/s  "
+          f"{sum(completed.values())} completed, stats {registry.stats}  "
+          f"{'OK' if not failures else 'FAIL'}")
+    for failure in failures:
+        print(f"      {failure}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--sessions', type=int, default=64)
+    parser.add_argument('--ops', type=int, default=20000)
+    parser.add_argument('--capacity', type=int, default=48, help='registry max_sessions, below the pool to force spills')
+    parser.add_argument('--segment-entries', type=int, default=2000)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    logging.disable(logging.WARNING)
+    import app as server
+
+    # Many short critical sections: switch threads often so they really interleave
+    sys.setswitchinterval(1e-5)
+    print(f"{args.threads} threads, {args.sessions} shared sessions, {args.ops} ops, capacity {args.capacity}")
+    ok = all([run(server, args, 1), run(server, args, DEFAULT_STRIPES)])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
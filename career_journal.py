@@ -0,0 +1,311 @@
+"""
+Career Counseling Realtime Voice Assistant - Career Session Journal
+This module keeps a write-ahead journal and compacted snapshots so career sessions survive a restart
+
+    python career_journal.py --dir sessions/journal
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from career_record import CareerSession
+from server_mode import run_blocking
+from summary_pipeline import write_atomic
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the standard library encoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+OPS = ('create', 'response', 'pause', 'resume', 'depth', 'summary', 'end')
+SNAPSHOT_VERSION = 2
+
+_SEGMENT = re.compile(r'^journal-(\d+)\.log$')
+_SNAPSHOT = re.compile(r'^snapshot-(\d+)\.json$')
+
+
+def _dumps(value):
+    """Compact UTF-8 JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def apply_to_session(session, entry):
+    """Apply a field-level journal entry to one CareerSession (shared by live updates and replay)"""
+    op = entry['op']
+    if op == 'response':
+        session.record_response(entry['question_id'], entry['response'], entry['emotion'], entry['at'])
+    elif op == 'pause':
+        session.pause(entry['current_question'], entry['at'])
+    elif op == 'resume':
+        session.resume(entry['at'])
+    elif op == 'depth':
+        session.depth_action = entry['depth_action']
+
+
+def empty_state():
+    return {'seq': 0, 'sessions': {}, 'touched': {}, 'summaries': {}}
+
+
+def apply_entry(state, entry):
+    """Replay one journal entry onto a recovered state"""
+    op, career_session_id = entry['op'], entry['id']
+    state['seq'] = entry['seq']
+    if op == 'create':
+        state['sessions'][career_session_id] = CareerSession.from_dict(entry['session'])
+    elif op == 'end':
+        state['sessions'].pop(career_session_id, None)
+        state['touched'].pop(career_session_id, None)
+        return
+    elif op == 'summary':
+        # Kept until the summary file is known to be on disk
+        state['summaries'][entry['file']] = entry['summary']
+    else:
+        session = state['sessions'].get(career_session_id)
+        if session is None:
+            return
+        apply_to_session(session, entry)
+    state['touched'][career_session_id] = entry['t']
+
+
+def _read_segment(path, last):
+    """Entries of one segment; a torn final line in the newest segment is expected after a crash"""
+    entries = []
+    with open(path, 'rb') as f:
+        lines = f.read().split(b'\n')
+    for n, line in enumerate(lines):
+        if not line:
+            continue
+        try:
+            entries.append(_loads(line))
+        except ValueError:
+            if last and n >= len(lines) - 2:
+                logger.warning(f"Ignoring torn journal entry at the end of {path.name}")
+            else:
+                logger.error(f"Skipping corrupt journal entry {n + 1} in {path.name}")
+    return entries
+
+
+def _segments(directory):
+    return sorted(
+        (int(m.group(1)), path)
+        for path in Path(directory).iterdir() if (m := _SEGMENT.match(path.name))
+    )
+
+
+def _snapshots(directory):
+    return sorted(
+        (int(m.group(1)), path)
+        for path in Path(directory).iterdir() if (m := _SNAPSHOT.match(path.name))
+    )
+
+
+def _load_snapshot(directory):
+    for _, path in reversed(_snapshots(directory)):
+        try:
+            with open(path, 'rb') as f:
+                snapshot = _loads(f.read())
+            state = empty_state()
+            state.update({key: snapshot[key] for key in state})
+            # Version 1 snapshots held sessions in the dict shape
+            load = CareerSession.from_state if snapshot.get('version') == SNAPSHOT_VERSION else CareerSession.from_dict
+            state['sessions'] = {
+                career_session_id: load(session) for career_session_id, session in state['sessions'].items()
+            }
+            return state
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Skipping unreadable journal snapshot {path.name}: {e}")
+    return empty_state()
+
+
+def _replay(state, segments):
+    replayed = 0
+    for n, (_, path) in enumerate(segments):
+        for entry in _read_segment(path, last=n == len(segments) - 1):
+            if entry.get('seq', 0) > state['seq'] and entry.get('op') in OPS:
+                apply_entry(state, entry)
+                replayed += 1
+    return replayed
+
+
+def load_state(directory):
+    """Read-only replay of a journal directory (snapshot plus segments)"""
+    state = _load_snapshot(directory)
+    _replay(state, _segments(directory))
+    return state
+
+
+class CareerJournal:
+    """Append-only journal of career session operations plus periodic snapshots.
+
+    Each operation is one JSON line, written and flushed before the caller
+    continues, so a killed process loses nothing it acknowledged (``fsync``
+    also covers power loss). After ``segment_entries`` lines the segment is
+    closed and a background compaction folds closed segments into a new
+    snapshot, dropping ended sessions, sessions untouched for ``retention``
+    seconds and summaries already on disk. ``recover`` loads the newest
+    snapshot and replays the segments after it.
+    """
+
+    def __init__(self, directory, segment_entries=5000, fsync=False, retention=7 * 86400):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_entries = segment_entries
+        self.fsync = fsync
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._file = None
+        self._segment_count = 0
+        self._seq = None
+        self.stats = {'appended': 0, 'errors': 0, 'compactions': 0, 'recovered_sessions': 0,
+                      'replayed_entries': 0, 'recovery_ms': 0.0}
+
+    def recover(self):
+        """Load the newest snapshot, replay the journal after it and open a new segment.
+
+        Returns the recovered state: ``{'seq', 'sessions', 'touched', 'summaries'}``
+        with sessions as CareerSession records.
+        """
+        start = time.perf_counter()
+        segments = _segments(self.directory)
+        state = _load_snapshot(self.directory)
+        self.stats['replayed_entries'] = _replay(state, segments)
+
+        with self._lock:
+            self._seq = state['seq']
+            self._open_segment()
+        self.stats['recovered_sessions'] = len(state['sessions'])
+        self.stats['recovery_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(f"Recovered {len(state['sessions'])} career sessions from the journal "
+                    f"({self.stats['replayed_entries']} entries replayed in {self.stats['recovery_ms']} ms)")
+        if segments:
+            self._start_compaction()
+        return state
+
+    def append(self, op, career_session_id, **fields):
+        """Journal one operation; returns the entry (also when the write failed)"""
+        entry = {'op': op, 'id': career_session_id, 't': round(time.time(), 3), **fields}
+        with self._lock:
+            if self._seq is None:
+                raise RuntimeError('CareerJournal.recover() must run before append()')
+            self._seq += 1
+            entry['seq'] = self._seq
+            try:
+                self._file.write(_dumps(entry) + b'\n')
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+                self.stats['appended'] += 1
+            except (OSError, ValueError) as e:
+                # The live session still changes; only crash recovery of this step is lost
+                self.stats['errors'] += 1
+                logger.error(f"Error journaling {op} for career session {career_session_id}: {e}")
+                return entry
+            self._segment_count += 1
+            rotate = self._segment_count >= self.segment_entries
+            if rotate:
+                self._open_segment()
+        if rotate:
+            self._start_compaction()
+        return entry
+
+    def compact(self):
+        """Fold closed segments into a new snapshot and delete what it replaces"""
+        with self._compact_lock:
+            # Listed under the lock, so a segment opened by a rotation after this is never taken for closed
+            with self._lock:
+                current = self._file.name if self._file else None
+                closed = [(seq, path) for seq, path in _segments(self.directory) if str(path) != current]
+            if not closed:
+                return False
+            run_blocking(self._write_snapshot, closed)
+            self.stats['compactions'] += 1
+            return True
+
+    def stop(self):
+        """Close the current segment (entries already written are durable)"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write_snapshot(self, closed):
+        state = _load_snapshot(self.directory)
+        _replay(state, closed)
+
+        cutoff = time.time() - self.retention
+        for career_session_id, touched in list(state['touched'].items()):
+            if touched < cutoff:
+                state['sessions'].pop(career_session_id, None)
+                del state['touched'][career_session_id]
+        state['summaries'] = {
+            path: summary for path, summary in state['summaries'].items() if not Path(path).exists()
+        }
+
+        old_snapshots = [path for _, path in _snapshots(self.directory)]
+        snapshot = dict(state, version=SNAPSHOT_VERSION, sessions={
+            career_session_id: session.to_state() for career_session_id, session in state['sessions'].items()
+        })
+        write_atomic(self.directory / f'snapshot-{state["seq"]:012d}.json',
+                     _dumps(snapshot), fsync=True)
+        # Only once the new snapshot is in place is it safe to drop what it covers
+        for path in old_snapshots:
+            path.unlink(missing_ok=True)
+        for _, path in closed:
+            path.unlink(missing_ok=True)
+        logger.info(f"Compacted career journal into snapshot {state['seq']} "
+                    f"({len(state['sessions'])} sessions)")
+
+    def _start_compaction(self):
+        if self._compact_lock.locked():
+            return
+        threading.Thread(target=self._compact_safely, name='career-journal-compact', daemon=True).start()
+
+    def _compact_safely(self):
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Error compacting career journal: {e}")
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        path = self.directory / f'journal-{self._seq + 1:012d}.log'
+        self._file = open(path, 'ab')
+        self._segment_count = 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Print what a restart would recover from the career session journal')
+    parser.add_argument('--dir', default='sessions/journal', help='journal directory')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    start = time.perf_counter()
+    state = load_state(args.dir)
+    states = {}
+    for session in state['sessions'].values():
+        states[session.state] = states.get(session.state, 0) + 1
+    print(json.dumps({
+        'seq': state['seq'],
+        'sessions': states,
+        'unwritten_summaries': len(state['summaries']),
+        'replay_ms': round((time.perf_counter() - start) * 1000, 2)
+    }))
+
+
+if __name__ == '__main__':
+    main()
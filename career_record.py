@@ -0,0 +1,294 @@
+"""
+Career Counseling Realtime Voice Assistant - Career Session Records
+This module holds career sessions as compact slotted records and converts them to the JSON shape on demand
+"""
+
+import sys
+import threading
+from datetime import datetime
+
+from realtime_prompts import QUESTION_BANK
+from realtime_tools import CAREER_COUNSELING_TOOLS
+
+
+class InternTable:
+    """Maps strings to small ints, seeded in a fixed order and extended on first sight.
+
+    The seeded values keep their positions for the life of the process, so
+    question n of QUESTION_BANK is always index n (and bit ``1 << n``, the
+    same layout QuestionScheduler uses). Values outside the seed, such as an
+    emotion the model made up, are appended once. A ``fixed`` table never
+    grows: ``index`` raises KeyError for unknown values and ``get`` returns
+    None, so a made-up question id can never become a bit past the bank.
+    """
+
+    def __init__(self, seed, fixed=False):
+        self._values = [sys.intern(value) for value in seed]
+        self._index = {value: n for n, value in enumerate(self._values)}
+        self._lock = threading.Lock()
+        self.fixed = fixed
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, value):
+        return value in self._index
+
+    def get(self, value):
+        return self._index.get(value)
+
+    def index(self, value):
+        n = self._index.get(value)
+        if n is None:
+            if self.fixed:
+                raise KeyError(value)
+            with self._lock:
+                n = self._index.get(value)
+                if n is None:
+                    n = len(self._values)
+                    self._values.append(sys.intern(value))
+                    self._index[self._values[n]] = n
+        return n
+
+    def value(self, n):
+        return self._values[n]
+
+
+def _emotion_enum():
+    for tool in CAREER_COUNSELING_TOOLS:
+        if tool['name'] == 'record_response_and_get_next':
+            return tool['parameters']['properties']['emotion_detected']['enum']
+    return ['neutral']
+
+
+QUESTIONS = InternTable(QUESTION_BANK, fixed=True)
+# The enum of record_response_and_get_next's emotion_detected, 'neutral' first
+EMOTIONS = InternTable(_emotion_enum())
+NO_EMOTION = -1
+
+
+def timestamp(value):
+    """Seconds since the epoch from a float, a datetime or an ISO string (None stays None)"""
+    if value is None or isinstance(value, float):
+        return value
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+def isoformat(value):
+    return datetime.fromtimestamp(value).isoformat() if value is not None else None
+
+
+class Response:
+    """One answer: interned question, text, emotion index (or NO_EMOTION) and time"""
+    __slots__ = ('question', 'text', 'emotion', 'at')
+
+    def __init__(self, question, text, emotion, at):
+        self.question = question
+        self.text = text
+        self.emotion = emotion
+        self.at = at
+
+    def to_response_dict(self):
+        return {
+            'response': self.text,
+            'timestamp': isoformat(self.at),
+            'emotion': EMOTIONS.value(self.emotion) if self.emotion != NO_EMOTION else 'neutral'
+        }
+
+    def to_trajectory_dict(self):
+        return {
+            'question_id': QUESTIONS.value(self.question),
+            'emotion': EMOTIONS.value(self.emotion),
+            'timestamp': isoformat(self.at)
+        }
+
+
+class CareerSession:
+    """A career counseling session.
+
+    Answered questions are a bitmask over QUESTIONS, answers are keyed by
+    question index, and the emotional trajectory shares the answers'
+    Response objects instead of copying them. Times are epoch floats. The
+    JSON shape the rest of the app and the summary files use is built only
+    when asked for: ``completed_questions``, ``responses`` and
+    ``emotional_trajectory`` are computed properties, and ``to_dict`` /
+    ``from_dict`` convert whole sessions for spill files, SQLite and the
+    journal.
+    """
+    __slots__ = ('id', 'user_id', 'user_name', 'user_email', 'start_time', 'state', 'completed',
+                 'answers', 'trajectory', 'paused_at', 'resumed_at', 'current_question', 'depth_action')
+
+    def __init__(self, career_session_id, user_id, user_name, user_email, start_time=None, state='active'):
+        self.id = career_session_id
+        self.user_id = user_id
+        self.user_name = user_name
+        self.user_email = user_email
+        self.start_time = timestamp(start_time) if start_time is not None else datetime.now().timestamp()
+        self.state = sys.intern(state)
+        self.completed = 0
+        self.answers = {}
+        self.trajectory = []
+        self.paused_at = None
+        self.resumed_at = None
+        self.current_question = None
+        self.depth_action = None
+
+    def record_response(self, question_id, text, emotion=None, at=None):
+        """Store an answer; False (and nothing stored) for a question id outside the bank"""
+        question = QUESTIONS.get(question_id)
+        if question is None:
+            return False
+        at = timestamp(at) if at is not None else datetime.now().timestamp()
+        answer = Response(question, text, EMOTIONS.index(emotion) if emotion else NO_EMOTION, at)
+        self.answers[question] = answer
+        self.completed |= 1 << question
+        if emotion:
+            self.trajectory.append(answer)
+        return True
+
+    def pause(self, current_question=None, at=None):
+        self.state = 'paused'
+        self.paused_at = timestamp(at) if at is not None else datetime.now().timestamp()
+        self.current_question = QUESTIONS.get(current_question) if current_question else None
+
+    def resume(self, at=None):
+        self.state = 'active'
+        self.resumed_at = timestamp(at) if at is not None else datetime.now().timestamp()
+
+    @property
+    def started(self):
+        return datetime.fromtimestamp(self.start_time)
+
+    @property
+    def question_count(self):
+        return self.completed.bit_count()
+
+    @property
+    def current_question_id(self):
+        return QUESTIONS.value(self.current_question) if self.current_question is not None else None
+
+    @property
+    def completed_questions(self):
+        """Answered question ids in the order they were first answered"""
+        # ``answers`` keeps first-answer order; bits without an answer follow in bank order
+        answered = [question for question in self.answers if self.completed >> question & 1]
+        mask = self.completed
+        for question in answered:
+            mask ^= 1 << question
+        result = [QUESTIONS.value(question) for question in answered]
+        while mask:
+            low = mask & -mask
+            result.append(QUESTIONS.value(low.bit_length() - 1))
+            mask ^= low
+        return result
+
+    @property
+    def responses(self):
+        return {QUESTIONS.value(question): answer.to_response_dict() for question, answer in self.answers.items()}
+
+    @property
+    def emotional_trajectory(self):
+        return [answer.to_trajectory_dict() for answer in self.trajectory]
+
+    def to_dict(self):
+        """The session in the original dict-of-dicts JSON shape"""
+        data = {
+            'id': self.id,
+            'user_id': self.user_id,
+            'user_name': self.user_name,
+            'user_email': self.user_email,
+            'start_time': isoformat(self.start_time),
+            'completed_questions': self.completed_questions,
+            'responses': self.responses,
+            'state': self.state,
+            'emotional_trajectory': self.emotional_trajectory,
+        }
+        if self.paused_at is not None:
+            data['paused_at'] = isoformat(self.paused_at)
+            data['current_question'] = self.current_question_id
+        if self.resumed_at is not None:
+            data['resumed_at'] = isoformat(self.resumed_at)
+        if self.depth_action is not None:
+            data['depth_action'] = self.depth_action
+        return data
+
+    def to_state(self):
+        """Compact JSON-ready list for journal snapshots (ids as strings, times as floats)"""
+        return [
+            self.id, self.user_id, self.user_name, self.user_email, self.start_time, self.state,
+            [[QUESTIONS.value(a.question), a.text, EMOTIONS.value(a.emotion) if a.emotion != NO_EMOTION else None, a.at]
+             for a in self.answers.values()],
+            [[QUESTIONS.value(a.question), EMOTIONS.value(a.emotion), a.at] for a in self.trajectory],
+            self.completed_questions, self.paused_at, self.resumed_at, self.current_question_id, self.depth_action
+        ]
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a session from ``to_state`` output"""
+        (career_session_id, user_id, user_name, user_email, start_time, session_state, answers, trajectory,
+         completed, paused_at, resumed_at, current_question, depth_action) = state
+        session = cls(career_session_id, user_id, user_name, user_email, start_time, session_state)
+        # Question ids outside the bank (from an older build) are skipped
+        for question_id, text, emotion, at in answers:
+            question = QUESTIONS.get(question_id)
+            if question is not None:
+                emotion = EMOTIONS.index(emotion) if emotion else NO_EMOTION
+                session.answers[question] = Response(question, text, emotion, at)
+        for question_id, emotion, at in trajectory:
+            question = QUESTIONS.get(question_id)
+            if question is None:
+                continue
+            answer = session.answers.get(question)
+            if answer is None or answer.at != at:
+                answer = Response(question, None, EMOTIONS.index(emotion), at)
+            session.trajectory.append(answer)
+        for question_id in completed:
+            if question_id in QUESTIONS:
+                session.completed |= 1 << QUESTIONS.index(question_id)
+        session.paused_at = paused_at
+        session.resumed_at = resumed_at
+        session.current_question = QUESTIONS.get(current_question) if current_question else None
+        session.depth_action = depth_action
+        return session
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a session from ``to_dict`` output (or a pre-record spill file / row)"""
+        session = cls(data['id'], data['user_id'], data['user_name'], data['user_email'],
+                      data['start_time'], data.get('state', 'active'))
+        responses = data.get('responses', {})
+        # Answers already in the trajectory share its Response objects
+        shared = {}
+        # Question ids outside the bank (from an older build) are skipped
+        for point in data.get('emotional_trajectory', ()):
+            if point['question_id'] not in QUESTIONS:
+                continue
+            answer = Response(QUESTIONS.index(point['question_id']), None,
+                              EMOTIONS.index(point['emotion']), timestamp(point['timestamp']))
+            session.trajectory.append(answer)
+            shared[answer.question] = answer
+        for question_id, response in responses.items():
+            question = QUESTIONS.get(question_id)
+            if question is None:
+                continue
+            answer = shared.get(question)
+            at = timestamp(response['timestamp'])
+            if answer is None or answer.at != at:
+                answer = Response(question, None, EMOTIONS.index(response['emotion']), at)
+                if response['emotion'] == 'neutral' and question not in shared:
+                    answer.emotion = NO_EMOTION
+            answer.text = response['response']
+            session.answers[question] = answer
+        for question_id in data.get('completed_questions', ()):
+            if question_id in QUESTIONS:
+                session.completed |= 1 << QUESTIONS.index(question_id)
+        session.paused_at = timestamp(data.get('paused_at'))
+        session.resumed_at = timestamp(data.get('resumed_at'))
+        current_question = data.get('current_question')
+        session.current_question = QUESTIONS.get(current_question) if current_question else None
+        session.depth_action = data.get('depth_action')
+        return session
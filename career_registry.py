@@ -0,0 +1,320 @@
+"""
+Career Counseling Realtime Voice Assistant - Career Session Registry
+This module keeps career counseling sessions indexed in memory with TTL eviction and disk spill
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from career_record import CareerSession
+from server_mode import run_blocking
+from session_shards import DEFAULT_STRIPES, KeyedLocks, StripedIndex, stripe_of
+
+logger = logging.getLogger(__name__)
+
+
+class _Shard:
+    __slots__ = ('lock', 'active', 'paused', 'last_seen')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = OrderedDict()
+        self.paused = OrderedDict()
+        self.last_seen = {}
+
+
+class CareerSessionRegistry:
+    """In-memory store for active and paused career sessions.
+
+    Sessions are sharded by id; each shard has its own lock and two
+    LRU-ordered maps (active and paused), so moving a session between them
+    is atomic and sessions in different shards never wait on each other.
+    Secondary indexes by ``user_email`` and ``user_id`` are striped the same
+    way, so resume-by-email is a dict lookup rather than a scan. Sessions
+    idle past their TTL, or pushed out of a full shard (``max_sessions`` is
+    split evenly across shards), are paused and spilled to ``spill_dir`` as
+    JSON; they stay resumable from there until ``spill_ttl`` expires.
+
+    ``lock(career_session_id)`` is the session's own lock: hold it around
+    read-modify-write of one session so concurrent handlers for the same
+    student apply their changes one at a time. Eviction skips sessions whose
+    lock is held, so a session is never spilled halfway through a change.
+    """
+
+    def __init__(self, spill_dir, idle_ttl=1800, paused_ttl=900, spill_ttl=7 * 86400,
+                 max_sessions=10000, sweep_interval=30, shards=DEFAULT_STRIPES):
+        self.spill_dir = Path(spill_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self.idle_ttl = idle_ttl
+        self.paused_ttl = paused_ttl
+        self.spill_ttl = spill_ttl
+        self.max_sessions = max_sessions
+        self.sweep_interval = sweep_interval
+
+        self._shards = [_Shard() for _ in range(shards)]
+        self._shard_capacity = max(1, -(-max_sessions // shards))
+        self._session_locks = KeyedLocks(shards)
+        self._by_user = StripedIndex(shards)
+        self._paused_by_email = StripedIndex(shards)
+        self._spilled_by_email = StripedIndex(shards)
+        self._sweep_lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._stats_lock = threading.Lock()
+        self.stats = {'evicted_idle': 0, 'evicted_capacity': 0, 'spilled': 0, 'restored': 0}
+
+        self._load_spill_index()
+
+    def __len__(self):
+        total = 0
+        for shard in self._shards:
+            with shard.lock:
+                total += len(shard.active) + len(shard.paused)
+        return total
+
+    def _shard(self, career_session_id):
+        return self._shards[stripe_of(career_session_id, len(self._shards))]
+
+    def lock(self, career_session_id):
+        """Context manager holding this session's own lock"""
+        return self._session_locks.hold(career_session_id)
+
+    def add(self, session):
+        """Register a new active session"""
+        self._maybe_sweep()
+        shard = self._shard(session.id)
+        with shard.lock:
+            shard.active[session.id] = session
+            shard.last_seen[session.id] = time.monotonic()
+            self._by_user.add(session.user_id, session.id)
+            self._enforce_capacity(shard)
+
+    def get_active(self, career_session_id):
+        """Return an active session and mark it as recently used"""
+        self._maybe_sweep()
+        shard = self._shard(career_session_id)
+        with shard.lock:
+            session = shard.active.get(career_session_id)
+            if session is not None:
+                shard.active.move_to_end(career_session_id)
+                shard.last_seen[career_session_id] = time.monotonic()
+            return session
+
+    @contextmanager
+    def modify(self, career_session_id):
+        """Yield the active session (or None) for a change in place; hold ``lock`` around it"""
+        session = self.get_active(career_session_id)
+        yield session
+        if session is not None:
+            self.save(session)
+
+    def save(self, session):
+        """Record a change to a session; in memory this only refreshes its TTL"""
+        shard = self._shard(session.id)
+        with shard.lock:
+            if session.id in shard.last_seen:
+                shard.last_seen[session.id] = time.monotonic()
+
+    def pause(self, career_session_id, change=None):
+        """Move an active session to the paused map, applying ``change(session)`` as it moves"""
+        shard = self._shard(career_session_id)
+        with shard.lock:
+            session = shard.active.pop(career_session_id, None)
+            if session is None:
+                return None
+            if change is not None:
+                change(session)
+            shard.paused[career_session_id] = session
+            shard.last_seen[career_session_id] = time.monotonic()
+            self._paused_by_email.add(session.user_email, career_session_id)
+            return session
+
+    def resume(self, career_session_id, change=None):
+        """Move a paused session (in memory or spilled) back to active, applying ``change(session)``"""
+        shard = self._shard(career_session_id)
+        with shard.lock:
+            session = shard.paused.pop(career_session_id, None)
+            if session is not None:
+                self._paused_by_email.discard(session.user_email, career_session_id)
+            else:
+                session = self._restore(career_session_id)
+                if session is None:
+                    return None
+                self._by_user.add(session.user_id, career_session_id)
+            if change is not None:
+                change(session)
+            shard.active[career_session_id] = session
+            shard.last_seen[career_session_id] = time.monotonic()
+            self._enforce_capacity(shard)
+            return session
+
+    def complete(self, career_session_id, finish):
+        """Remove the active session once ``finish(session)`` succeeds; hold ``lock`` around it"""
+        session = self.get_active(career_session_id)
+        if session is None:
+            return None
+        result = finish(session)
+        if result:
+            self.remove(career_session_id)
+        return result
+
+    def remove(self, career_session_id):
+        """Drop a session entirely (e.g. once its summary has been saved)"""
+        shard = self._shard(career_session_id)
+        with shard.lock:
+            session = shard.active.pop(career_session_id, None)
+            if session is None:
+                session = shard.paused.pop(career_session_id, None)
+                if session is not None:
+                    self._paused_by_email.discard(session.user_email, career_session_id)
+            if session is not None:
+                self._forget(shard, session)
+            return session
+
+    def find_paused_by_email(self, user_email):
+        """Return the most recently paused session id for an email, if any"""
+        return self._paused_by_email.latest(user_email) or self._spilled_by_email.latest(user_email)
+
+    def is_spilled(self, career_session_id):
+        """Whether a session is parked on disk rather than held in memory"""
+        with self._shard(career_session_id).lock:
+            return self._spill_path(career_session_id).exists()
+
+    def find_by_user(self, user_id):
+        """Return the in-memory career session ids owned by a user session"""
+        return self._by_user.members(user_id)
+
+    def sweep(self):
+        """Spill sessions idle past their TTL and delete expired spill files"""
+        now = time.monotonic()
+        for shard in self._shards:
+            with shard.lock:
+                for sessions, ttl in ((shard.active, self.idle_ttl), (shard.paused, self.paused_ttl)):
+                    for oldest in list(sessions):
+                        if now - shard.last_seen.get(oldest, now) < ttl:
+                            break
+                        if self._session_locks.held(oldest):
+                            continue
+                        self._evict(shard, oldest)
+                        self._count('evicted_idle')
+        self._expire_spill_files()
+        self._next_sweep = now + self.sweep_interval
+
+    def _maybe_sweep(self):
+        # Called before taking a shard lock; one thread sweeps while the rest carry on
+        if time.monotonic() < self._next_sweep or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() >= self._next_sweep:
+                self.sweep()
+        finally:
+            self._sweep_lock.release()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _enforce_capacity(self, shard):
+        while len(shard.active) + len(shard.paused) > self._shard_capacity:
+            # Paused sessions go first, least recently used first; they are the cheapest to bring back
+            victim = self._victim(shard.paused) or self._victim(shard.active)
+            if victim is None:
+                # Everything here is mid-change; the shard stays over capacity until the next add
+                break
+            self._evict(shard, victim)
+            self._count('evicted_capacity')
+
+    def _victim(self, sessions):
+        for career_session_id in sessions:
+            if not self._session_locks.held(career_session_id):
+                return career_session_id
+        return None
+
+    def _evict(self, shard, career_session_id):
+        session = shard.active.pop(career_session_id, None)
+        if session is not None:
+            session.state = 'paused'
+            if session.paused_at is None:
+                session.paused_at = time.time()
+        else:
+            session = shard.paused.pop(career_session_id)
+            self._paused_by_email.discard(session.user_email, career_session_id)
+        self._forget(shard, session)
+        self._spill(session)
+
+    def _forget(self, shard, session):
+        shard.last_seen.pop(session.id, None)
+        self._by_user.discard(session.user_id, session.id)
+
+    def _spill_path(self, career_session_id):
+        return self.spill_dir / f"{career_session_id}.json"
+
+    def _spill(self, session):
+        record = session.to_dict()
+        path = self._spill_path(session.id)
+        try:
+            run_blocking(self._write_spill_file, path, record)
+        except Exception as e:
+            logger.error(f"Error spilling career session {session.id}: {e}")
+            return
+        self._spilled_by_email.add(session.user_email, session.id)
+        self._count('spilled')
+        logger.info(f"Spilled career session {session.id} to disk")
+
+    @staticmethod
+    def _write_spill_file(path, record):
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_spill_file(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            session = json.load(f)
+        os.remove(path)
+        return session
+
+    def _restore(self, career_session_id):
+        path = self._spill_path(career_session_id)
+        try:
+            session = CareerSession.from_dict(run_blocking(self._read_spill_file, path))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error restoring career session {career_session_id}: {e}")
+            return None
+
+        self._spilled_by_email.discard(session.user_email, career_session_id)
+        self._count('restored')
+        logger.info(f"Restored career session {career_session_id} from disk")
+        return session
+
+    def _load_spill_index(self):
+        for path in sorted(self.spill_dir.glob('*.json'), key=lambda p: p.stat().st_mtime):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+                self._spilled_by_email.add(record['user_email'], record['id'])
+            except Exception as e:
+                logger.warning(f"Skipping unreadable spilled session {path}: {e}")
+
+    def _expire_spill_files(self):
+        cutoff = time.time() - self.spill_ttl
+        for user_email, ids in self._spilled_by_email.items():
+            for career_session_id in ids:
+                # The id's shard lock keeps a concurrent resume from reading a half-deleted file
+                with self._shard(career_session_id).lock:
+                    path = self._spill_path(career_session_id)
+                    try:
+                        if path.stat().st_mtime >= cutoff:
+                            continue
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    self._spilled_by_email.discard(user_email, career_session_id)
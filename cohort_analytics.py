@@ -0,0 +1,324 @@
+"""
+Career Counseling Realtime Voice Assistant - Cohort Analytics
+This module aggregates career summaries into cohort reports for counselors
+
+    python cohort_analytics.py --dir sessions/career_summaries --workers 8
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from realtime_prompts import QUESTION_BANK
+from server_mode import ASYNC_MODE
+from summary_pipeline import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Bump when the extracted record layout changes so old cache entries are re-parsed
+CACHE_VERSION = 1
+
+QUESTION_IDS = tuple(QUESTION_BANK)
+REQUIRED_QUESTION_IDS = tuple(q for q, spec in QUESTION_BANK.items() if spec['required'])
+
+# Parser processes are not forked from the (threaded) server, where a child could inherit a lock
+# another thread holds; the fork server imports the main module once and forks clean children
+_POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# Emotions accepted by track_survey_response; anything else counts as "other"
+EMOTIONS = ('neutral', 'anxious', 'confused', 'frustrated', 'hopeful', 'excited', 'overwhelmed', 'other')
+
+# Keyword taxonomies (English and common Hinglish phrasing); one answer can hit several themes
+CAREER_CONFUSION_THEMES = {
+    'too_many_options': ('too many', 'option', 'path', 'choose between', 'kaunsa', 'bahut saare'),
+    'lack_of_information': ('don\'t know', 'no idea', 'not sure', 'unsure', 'pata nahi', 'information', 'guidance'),
+    'unclear_interests': ('passion', 'interest', 'interested', 'what i like', 'what i want', 'enjoy'),
+    'family_pressure': ('parent', 'family', 'father', 'mother', 'papa', 'mummy', 'ghar', 'pressure'),
+    'job_market': ('job market', 'job', 'placement', 'salary', 'hiring', 'naukri', 'competition'),
+    'skills_gap': ('skill', 'experience', 'qualified', 'not good enough', 'prepared', 'preparation'),
+    'ai_and_automation': ('ai', 'automation', 'robot', 'chatgpt', 'replace'),
+    'financial': ('money', 'fees', 'loan', 'afford', 'financial', 'paisa'),
+}
+
+AI_FEAR_THEMES = {
+    'job_replacement': ('replace', 'replaced', 'take my job', 'take over', 'lose my job', 'jobs will',
+                        'unemployed', 'unemployment', 'naukri'),
+    'skills_obsolete': ('obsolete', 'outdated', 'irrelevant', 'useless', 'keep up', 'upskill'),
+    'entry_level_squeeze': ('entry level', 'fresher', 'junior', 'internship', 'first job'),
+    'ethics_and_privacy': ('privacy', 'ethics', 'ethical', 'bias', 'misuse', 'data'),
+    'uncertainty': ('uncertain', 'unpredictable', 'don\'t know', 'not sure', 'future', 'pata nahi'),
+    'optimistic': ('opportunity', 'opportunities', 'excited', 'tool', 'help me', 'not worried', 'not afraid',
+                   'no fear'),
+}
+
+
+def _theme_patterns(themes):
+    # Whole words (plus a plural "s") so e.g. "ai" does not fire on "said" or "aim"
+    return {
+        theme: re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + r')s?\b', re.IGNORECASE)
+        for theme, keywords in themes.items()
+    }
+
+
+_CONFUSION_PATTERNS = _theme_patterns(CAREER_CONFUSION_THEMES)
+_AI_FEAR_PATTERNS = _theme_patterns(AI_FEAR_THEMES)
+
+
+def _themes(text, patterns):
+    return [theme for theme, pattern in patterns.items() if pattern.search(text)]
+
+
+def extract_summary(path):
+    """Parse one summary file into the compact record the aggregates are built from"""
+    with open(path, 'rb') as f:
+        summary = json.loads(f.read())
+
+    responses = summary.get('responses') or {}
+
+    def answer(question_id):
+        response = responses.get(question_id) or {}
+        return str(response.get('response') or '')
+
+    return {
+        'session_id': summary.get('session_id'),
+        'end': (summary.get('timing') or {}).get('end'),
+        'duration_minutes': (summary.get('timing') or {}).get('duration_minutes'),
+        'completed': [q for q in summary.get('completed_questions') or responses if q in QUESTION_BANK],
+        'emotions': {
+            q: (r or {}).get('emotion') or 'neutral' for q, r in responses.items() if q in QUESTION_BANK
+        },
+        'confusion_themes': _themes(answer('career_confusion'), _CONFUSION_PATTERNS),
+        'ai_fear_themes': _themes(answer('ai_fears'), _AI_FEAR_PATTERNS),
+    }
+
+
+def _extract_batch(paths):
+    # Runs in a worker process; a broken file must not lose the rest of the batch
+    results = []
+    for path in paths:
+        try:
+            results.append((path, extract_summary(path), None))
+        except Exception as e:
+            results.append((path, None, str(e)))
+    return results
+
+
+class CohortAnalytics:
+    """Incremental cohort report over a directory of career summary files.
+
+    Parsed records are cached per file, keyed by (mtime_ns, size), in memory
+    and in ``cache_path``, so a refresh only parses new or changed files.
+    Those are spread over a process pool once there are at least
+    ``parallel_threshold`` of them, in threading mode only: starting worker
+    processes under eventlet or gevent hangs or fails, so green servers
+    parse in-process (the app already runs report() through run_blocking).
+    Workers come from a fork server (spawned where there is none), never a
+    fork of the multi-threaded caller.
+    """
+
+    def __init__(self, summary_dir, cache_path=None, workers=None, parallel_threshold=64, batch_size=32):
+        self.summary_dir = Path(summary_dir)
+        self.cache_path = Path(cache_path) if cache_path else self.summary_dir / '.analytics_cache.json'
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.parallel_threshold = parallel_threshold
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._records = None
+        self.last_refresh = {}
+
+    def refresh(self):
+        """Bring the cache up to date with the directory; returns counts of what changed"""
+        with self._lock:
+            start = time.perf_counter()
+            if self._records is None:
+                self._records = self._load_cache()
+
+            current = {}
+            for path in self.summary_dir.glob('*_summary.json'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue  # Removed between listing and stat
+                current[path.name] = (stat.st_mtime_ns, stat.st_size)
+
+            stale = [name for name, stamp in current.items()
+                     if name not in self._records or tuple(self._records[name]['stamp']) != stamp]
+            removed = [name for name in self._records if name not in current]
+            for name in removed:
+                del self._records[name]
+
+            errors = 0
+            for path, record, error in self._parse([str(self.summary_dir / name) for name in stale]):
+                name = Path(path).name
+                if error:
+                    errors += 1
+                    logger.error(f"Error parsing career summary {name}: {error}")
+                    self._records.pop(name, None)
+                    continue
+                self._records[name] = {'stamp': list(current[name]), 'record': record}
+
+            if stale or removed:
+                self._save_cache()
+
+            self.last_refresh = {
+                'files': len(current),
+                'parsed': len(stale) - errors,
+                'removed': len(removed),
+                'errors': errors,
+                'refresh_ms': round((time.perf_counter() - start) * 1000, 1),
+            }
+            return dict(self.last_refresh)
+
+    def report(self, refresh=True):
+        """Cohort aggregates as a JSON-serializable dict"""
+        if refresh or self._records is None:
+            self.refresh()
+        with self._lock:
+            records = [entry['record'] for entry in self._records.values()]
+        report = aggregate(records)
+        report['cache'] = dict(self.last_refresh)
+        return report
+
+    def _parse(self, paths):
+        if not paths:
+            return []
+        if self.workers <= 1 or len(paths) < self.parallel_threshold or ASYNC_MODE != 'threading':
+            return _extract_batch(paths)
+
+        batches = [paths[i:i + self.batch_size] for i in range(0, len(paths), self.batch_size)]
+        results = []
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(batches)), mp_context=_POOL_CONTEXT) as pool:
+            for batch in pool.map(_extract_batch, batches):
+                results.extend(batch)
+        return results
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cache = json.loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Ignoring unreadable analytics cache {self.cache_path}: {e}")
+            return {}
+        if cache.get('version') != CACHE_VERSION:
+            return {}
+        return cache.get('files', {})
+
+    def _save_cache(self):
+        data = json.dumps({'version': CACHE_VERSION, 'files': self._records}, separators=(',', ':'))
+        try:
+            write_atomic(self.cache_path, data.encode('utf-8'), fsync=False)
+        except OSError as e:
+            logger.error(f"Error writing analytics cache {self.cache_path}: {e}")
+
+
+def _membership(records, key, labels):
+    """Boolean matrix (records x labels) of which labels each record lists under ``key``"""
+    index = {label: n for n, label in enumerate(labels)}
+    rows, cols = [], []
+    for row, record in enumerate(records):
+        for label in record.get(key) or ():
+            col = index.get(label)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    matrix = np.zeros((len(records), len(labels)), dtype=bool)
+    matrix[rows, cols] = True
+    return matrix
+
+
+def _ranked(matrix, labels, total):
+    counts = matrix.sum(axis=0)
+    order = np.argsort(-counts, kind='stable')
+    return [
+        {'theme': labels[i], 'sessions': int(counts[i]), 'share': round(float(counts[i]) / total, 4) if total else 0.0}
+        for i in order
+    ]
+
+
+def aggregate(records):
+    """Vectorized cohort aggregates over extracted summary records"""
+    total = len(records)
+    question_index = {q: n for n, q in enumerate(QUESTION_IDS)}
+    emotion_index = {e: n for n, e in enumerate(EMOTIONS)}
+    other = emotion_index['other']
+
+    answered = _membership(records, 'completed', QUESTION_IDS)
+    confusion = _membership(records, 'confusion_themes', tuple(CAREER_CONFUSION_THEMES))
+    ai_fears = _membership(records, 'ai_fear_themes', tuple(AI_FEAR_THEMES))
+
+    # Emotion per (record, question) flattened to question * len(EMOTIONS) + emotion for one bincount
+    codes = [
+        question_index[q] * len(EMOTIONS) + emotion_index.get(emotion, other)
+        for record in records
+        for q, emotion in (record.get('emotions') or {}).items()
+        if q in question_index
+    ]
+    emotion_counts = np.bincount(
+        np.asarray(codes, dtype=np.int64), minlength=len(QUESTION_IDS) * len(EMOTIONS)
+    ).reshape(len(QUESTION_IDS), len(EMOTIONS))
+
+    required_cols = [question_index[q] for q in REQUIRED_QUESTION_IDS]
+    fully_completed = answered[:, required_cols].all(axis=1) if total else np.zeros(0, dtype=bool)
+    per_question = answered.mean(axis=0) if total else np.zeros(len(QUESTION_IDS))
+
+    durations = np.array(
+        [r['duration_minutes'] for r in records if isinstance(r.get('duration_minutes'), (int, float))],
+        dtype=float,
+    )
+
+    return {
+        'sessions': total,
+        'completion': {
+            'fully_completed_rate': round(float(fully_completed.mean()), 4) if total else 0.0,
+            'mean_questions_answered': round(float(answered.sum(axis=1).mean()), 2) if total else 0.0,
+            'per_question': {q: round(float(per_question[n]), 4) for n, q in enumerate(QUESTION_IDS)},
+        },
+        'career_confusion_themes': _ranked(confusion, tuple(CAREER_CONFUSION_THEMES), total),
+        'ai_fears_distribution': _ranked(ai_fears, tuple(AI_FEAR_THEMES), total),
+        'emotion_mix': {
+            q: {e: int(emotion_counts[n, m]) for m, e in enumerate(EMOTIONS) if emotion_counts[n, m]}
+            for n, q in enumerate(QUESTION_IDS)
+        },
+        'duration_minutes': {
+            'median': float(np.median(durations)) if durations.size else None,
+            'p90': float(np.percentile(durations, 90)) if durations.size else None,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cohort report over career counseling summaries')
+    parser.add_argument('--dir', default='sessions/career_summaries', help='directory of *_summary.json files')
+    parser.add_argument('--cache', help='cache file (default: <dir>/.analytics_cache.json)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='parser processes')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    analytics = CohortAnalytics(args.dir, cache_path=args.cache, workers=args.workers)
+    report = analytics.report()
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding='utf-8')
+    else:
+        print(text)
+    cache = report['cache']
+    print(f"{report['sessions']} sessions, parsed {cache['parsed']} new/changed files "
+          f"in {cache['refresh_ms']} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+"""
+Career Counseling Realtime Voice Assistant - Columnar Export
+This module compacts career summaries into date-partitioned columnar files for bulk analysis
+
+    python columnar_export.py --dir sessions/career_summaries --out sessions/export
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from summary_pipeline import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# One row per answered question
+COLUMNS = ('session_id', 'question_id', 'response', 'emotion',
+           'answered_at', 'session_start', 'session_end', 'duration_minutes')
+TEXT_COLUMNS = ('response',)
+CATEGORY_COLUMNS = ('session_id', 'question_id', 'emotion')
+TIMESTAMP_COLUMNS = ('answered_at', 'session_start', 'session_end')
+
+FORMATS = ('npz', 'csv')
+MANIFEST_NAME = '_manifest.json'
+# 2: the manifest lists the committed part files
+MANIFEST_VERSION = 2
+
+
+def summary_rows(summary):
+    """Column lists for one summary (one entry per answered question); ValueError if it is malformed"""
+    if not isinstance(summary, dict):
+        raise ValueError('summary is not a JSON object')
+    timing = summary.get('timing') or {}
+    responses = summary.get('responses') or {}
+    if not isinstance(timing, dict) or not isinstance(responses, dict):
+        raise ValueError('timing and responses must be JSON objects')
+    if not all(response is None or isinstance(response, dict) for response in responses.values()):
+        raise ValueError('every response must be a JSON object')
+    columns = {name: [] for name in COLUMNS}
+    for question_id, response in responses.items():
+        response = response or {}
+        columns['session_id'].append(str(summary.get('session_id') or ''))
+        columns['question_id'].append(str(question_id))
+        columns['response'].append(str(response.get('response') or ''))
+        columns['emotion'].append(str(response.get('emotion') or 'neutral'))
+        columns['answered_at'].append(response.get('timestamp'))
+        columns['session_start'].append(timing.get('start'))
+        columns['session_end'].append(timing.get('end'))
+        columns['duration_minutes'].append(timing.get('duration_minutes'))
+    return columns
+
+
+def _timestamps(values):
+    try:
+        return np.array([v or 'NaT' for v in values], dtype='datetime64[ms]')
+    except ValueError:
+        # One malformed value should not lose the whole column
+        parsed = []
+        for value in values:
+            try:
+                parsed.append(np.datetime64(value or 'NaT', 'ms'))
+            except ValueError:
+                parsed.append(np.datetime64('NaT', 'ms'))
+        return np.array(parsed, dtype='datetime64[ms]')
+
+
+def _encode_text(values):
+    # Arrow-style layout: UTF-8 bytes back to back plus n+1 offsets
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def _decode_text(offsets, data):
+    raw = data.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+
+def _encode_npz(columns):
+    arrays = {}
+    for name in CATEGORY_COLUMNS:
+        categories, codes = np.unique(np.array(columns[name], dtype=str), return_inverse=True)
+        arrays[f'{name}.categories'] = categories
+        arrays[f'{name}.codes'] = codes.astype(np.int32)
+    for name in TEXT_COLUMNS:
+        arrays[f'{name}.offsets'], arrays[f'{name}.data'] = _encode_text(columns[name])
+    for name in TIMESTAMP_COLUMNS:
+        arrays[name] = _timestamps(columns[name]).astype(np.int64)
+    arrays['duration_minutes'] = np.array(
+        [v if isinstance(v, (int, float)) else -1 for v in columns['duration_minutes']], dtype=np.int32)
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def _encode_csv(columns):
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(COLUMNS)
+    writer.writerows(zip(*(['' if v is None else v for v in columns[name]] for name in COLUMNS)))
+    return gzip.compress(text.getvalue().encode('utf-8'), compresslevel=6, mtime=0)
+
+
+def _read_npz(path, columns):
+    result = {}
+    with np.load(path) as part:
+        for name in columns:
+            if name in CATEGORY_COLUMNS:
+                result[name] = (part[f'{name}.codes'], part[f'{name}.categories'])
+            elif name in TEXT_COLUMNS:
+                result[name] = np.array(_decode_text(part[f'{name}.offsets'], part[f'{name}.data']), dtype=object)
+            elif name in TIMESTAMP_COLUMNS:
+                result[name] = part[name].view('datetime64[ms]')
+            else:
+                result[name] = part[name]
+    return result
+
+
+def _read_csv(path, columns):
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    index = {name: n for n, name in enumerate(header)}
+    result = {}
+    for name in columns:
+        values = [row[index[name]] for row in rows]
+        if name in TIMESTAMP_COLUMNS:
+            result[name] = _timestamps(values)
+        elif name == 'duration_minutes':
+            result[name] = np.array([int(v) if v else -1 for v in values], dtype=np.int32)
+        elif name in TEXT_COLUMNS:
+            result[name] = np.array(values, dtype=object)
+        else:
+            categories, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+            result[name] = (codes.astype(np.int32), categories)
+    return result
+
+
+def _concat_categories(chunks):
+    # Merge per-part dictionaries into one sorted dictionary and remap each part's codes
+    categories = np.unique(np.concatenate([part_categories for _, part_categories in chunks]))
+    codes = np.concatenate([
+        np.searchsorted(categories, part_categories).astype(np.int32)[part_codes]
+        for part_codes, part_categories in chunks
+    ])
+    return codes, categories
+
+
+def _part_files(export_dir):
+    """Part files on disk, relative to the export directory"""
+    return sorted(path.relative_to(export_dir).as_posix() for path in export_dir.glob('date=*/part-*'))
+
+
+def _committed_parts(export_dir):
+    """Part files the manifest lists (every one on disk for a version 1 manifest)"""
+    try:
+        with open(export_dir / MANIFEST_NAME, 'rb') as f:
+            manifest = json.loads(f.read())
+    except FileNotFoundError:
+        return []
+    return manifest['parts'] if 'parts' in manifest else _part_files(export_dir)
+
+
+def scan(export_dir, columns=COLUMNS, start_date=None, end_date=None, as_codes=False):
+    """Read the exported rows (optionally a date range of partitions) into column arrays.
+
+    Only part files committed to the manifest are read. With ``as_codes`` the
+    session_id/question_id/emotion columns come back as (int32 codes, sorted
+    categories) pairs, which is much cheaper to group by than arrays of
+    strings.
+    """
+    export_dir = Path(export_dir)
+    parts = []
+    for name in sorted(_committed_parts(export_dir)):
+        date = name.split('/')[0][len('date='):]
+        if (start_date and date < start_date) or (end_date and date > end_date):
+            continue
+        parts.append(export_dir / name)
+
+    chunks = [
+        _read_npz(path, columns) if path.suffix == '.npz' else _read_csv(path, columns)
+        for path in parts
+    ]
+    if not chunks:
+        empty = (np.array([], dtype=np.int32), np.array([], dtype=str))
+        return {name: empty if as_codes and name in CATEGORY_COLUMNS else np.array([]) for name in columns}
+
+    result = {}
+    for name in columns:
+        if name in CATEGORY_COLUMNS:
+            codes, categories = _concat_categories([chunk[name] for chunk in chunks])
+            result[name] = (codes, categories) if as_codes else categories[codes]
+        else:
+            result[name] = np.concatenate([chunk[name] for chunk in chunks])
+    return result
+
+
+class ColumnarExporter:
+    """Append-only export of career summaries into ``date=YYYY-MM-DD`` partitions.
+
+    Each run adds one part file per date it touches and records the exported
+    summary files in a manifest, so nightly runs only read sessions that are
+    new since the last run. Summaries are written once by the summary
+    pipeline; a file that changes after export is reported and left alone
+    rather than exported twice.
+
+    The manifest write is the commit point: it lists the run's part files
+    together with the summaries in them, and ``scan`` reads only listed
+    parts. Parts left by a run that died before its manifest write are
+    removed by the next run, which exports their summaries again.
+    """
+
+    def __init__(self, summary_dir, export_dir, fmt='npz'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported export format {fmt!r}, expected one of {FORMATS}")
+        self.summary_dir = Path(summary_dir)
+        self.export_dir = Path(export_dir)
+        self.fmt = fmt
+        self.manifest_path = self.export_dir / MANIFEST_NAME
+
+    def export(self):
+        """Export summaries not yet in the manifest; returns counts of what was written"""
+        start = time.perf_counter()
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._load_manifest()
+        exported = manifest['files']
+        self._remove_uncommitted(manifest['parts'])
+
+        partitions = {}
+        new_files, changed, errors = {}, 0, 0
+        for path in sorted(self.summary_dir.glob('*_summary.json')):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            if path.name in exported:
+                if exported[path.name] != stamp:
+                    changed += 1
+                    logger.warning(f"Career summary {path.name} changed after export; not re-exported")
+                continue
+
+            try:
+                with open(path, 'rb') as f:
+                    summary = json.loads(f.read())
+                summary_columns = summary_rows(summary)
+            except (OSError, ValueError) as e:
+                errors += 1
+                logger.error(f"Error reading career summary {path.name}: {e}")
+                continue
+
+            columns = partitions.setdefault(self._partition_date(summary, stat), {name: [] for name in COLUMNS})
+            for name, values in summary_columns.items():
+                columns[name].extend(values)
+            new_files[path.name] = stamp
+
+        run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        rows, new_parts = 0, []
+        for date, columns in sorted(partitions.items()):
+            if not columns['session_id']:
+                continue
+            partition_dir = self.export_dir / f'date={date}'
+            partition_dir.mkdir(exist_ok=True)
+            if self.fmt == 'npz':
+                data, suffix = _encode_npz(columns), '.npz'
+            else:
+                data, suffix = _encode_csv(columns), '.csv.gz'
+            name = f'part-{run_id}{suffix}'
+            write_atomic(partition_dir / name, data)
+            new_parts.append(f'date={date}/{name}')
+            rows += len(columns['session_id'])
+
+        # Parts are in place before the manifest commits them and their sessions together
+        if new_files:
+            exported.update(new_files)
+            manifest['parts'].extend(new_parts)
+            write_atomic(self.manifest_path, json.dumps(manifest, separators=(',', ':')).encode('utf-8'))
+
+        return {
+            'sessions': len(new_files),
+            'rows': rows,
+            'partitions': len(partitions),
+            'already_exported': len(exported) - len(new_files),
+            'changed_after_export': changed,
+            'errors': errors,
+            'export_ms': round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    @staticmethod
+    def _partition_date(summary, stat):
+        end = (summary.get('timing') or {}).get('end')
+        try:
+            return datetime.fromisoformat(end).date().isoformat()
+        except (TypeError, ValueError):
+            return datetime.fromtimestamp(stat.st_mtime).date().isoformat()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'rb') as f:
+                manifest = json.loads(f.read())
+        except FileNotFoundError:
+            return {'version': MANIFEST_VERSION, 'format': self.fmt, 'files': {}, 'parts': []}
+        if manifest.get('format') != self.fmt:
+            raise ValueError(f"{self.export_dir} holds a {manifest.get('format')!r} export, not {self.fmt!r}")
+        if 'parts' not in manifest:
+            # Version 1 did not list parts; every part then on disk had been committed
+            manifest['parts'] = _part_files(self.export_dir)
+            manifest['version'] = MANIFEST_VERSION
+        return manifest
+
+    def _remove_uncommitted(self, committed):
+        committed = set(committed)
+        for name in _part_files(self.export_dir):
+            if name not in committed:
+                logger.warning(f"Removing {name} left by an interrupted export")
+                (self.export_dir / name).unlink(missing_ok=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Append new career summaries to a columnar export')
+    parser.add_argument('--dir', default='sessions/career_summaries', help='directory of *_summary.json files')
+    parser.add_argument('--out', default='sessions/export', help='export directory (date=YYYY-MM-DD partitions)')
+    parser.add_argument('--format', choices=FORMATS, default='npz')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    stats = ColumnarExporter(args.dir, args.out, fmt=args.format).export()
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
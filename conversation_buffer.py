@@ -0,0 +1,117 @@
+"""
+Career Counseling Realtime Voice Assistant - Conversation Buffer
+This module keeps a bounded window of recent conversation turns per session in memory
+"""
+
+import sys
+import threading
+from collections import deque
+
+_EMPTY_DEQUE_SIZE = sys.getsizeof(deque())
+# Per-turn cost besides the message: the tuple plus a typical timestamp and role string
+_TURN_OVERHEAD = sys.getsizeof((None, None, None, None)) + sys.getsizeof('00:00:00') + sys.getsizeof('Assistant')
+
+
+def _as_dict(turn):
+    timestamp, role, message, _ = turn
+    return {'timestamp': timestamp, 'role': role, 'message': message}
+
+
+class _Conversation:
+    __slots__ = ('turns', 'total', 'bytes')
+
+    def __init__(self, max_turns):
+        self.turns = deque(maxlen=max_turns)
+        self.total = 0
+        self.bytes = _EMPTY_DEQUE_SIZE
+
+
+class ConversationBuffer:
+    """The last ``max_turns`` turns of each session, with per-session memory accounting.
+
+    Turns are numbered from 0 in the order they were appended, which is
+    only the session's numbering while one process logs all of its turns;
+    sessions in a shared store page their transcript file instead. Older turns
+    fall out of memory once a session passes ``max_turns``; ``history`` reads
+    them back through a ``read_older(start, stop)`` callback (the transcript
+    file) when a caller pages that far. Sizes are added and subtracted as
+    turns come and go, so ``memory_usage`` never walks the messages.
+    """
+
+    def __init__(self, max_turns=100):
+        self.max_turns = max_turns
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self.stats = {'appended': 0, 'evicted': 0, 'disk_reads': 0}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def append(self, session_id, timestamp, role, message):
+        # Each turn carries its own size so eviction does not recompute it
+        size = _TURN_OVERHEAD + sys.getsizeof(message)
+        turn = (timestamp, role, message, size)
+        with self._lock:
+            conversation = self._sessions.get(session_id)
+            if conversation is None:
+                conversation = self._sessions[session_id] = _Conversation(self.max_turns)
+            if len(conversation.turns) == self.max_turns:
+                conversation.bytes -= conversation.turns[0][3]
+                self.stats['evicted'] += 1
+            conversation.turns.append(turn)
+            conversation.bytes += size
+            conversation.total += 1
+            self.stats['appended'] += 1
+
+    def recent(self, session_id, limit=None):
+        """The newest in-memory turns, oldest first"""
+        with self._lock:
+            conversation = self._sessions.get(session_id)
+            turns = list(conversation.turns) if conversation else []
+        if limit is not None:
+            turns = turns[-limit:] if limit > 0 else []
+        return [_as_dict(turn) for turn in turns]
+
+    def history(self, session_id, read_older, before=None, limit=50):
+        """Up to ``limit`` turns numbered below ``before`` (default: all), oldest first.
+
+        Returns ``{'turns': [...], 'start': n, 'total': n}``; pass ``start``
+        back as ``before`` to page further into the past.
+        """
+        with self._lock:
+            conversation = self._sessions.get(session_id)
+            if conversation is None:
+                return {'turns': [], 'start': 0, 'total': 0}
+            total = conversation.total
+            first_in_memory = total - len(conversation.turns)
+            stop = total if before is None else min(max(int(before), 0), total)
+            start = max(stop - max(int(limit), 0), 0)
+            in_memory = list(conversation.turns)[max(start - first_in_memory, 0):max(stop - first_in_memory, 0)]
+
+        turns = []
+        if start < first_in_memory:
+            # Only the transcript on disk still has these turns
+            self.stats['disk_reads'] += 1
+            turns = read_older(start, min(stop, first_in_memory))
+        turns.extend(_as_dict(turn) for turn in in_memory)
+        return {'turns': turns, 'start': start, 'total': total}
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def memory_usage(self):
+        """{session_id: {'bytes': n, 'turns_in_memory': n, 'turns_total': n}}"""
+        with self._lock:
+            return {
+                session_id: {
+                    'bytes': conversation.bytes,
+                    'turns_in_memory': len(conversation.turns),
+                    'turns_total': conversation.total,
+                }
+                for session_id, conversation in self._sessions.items()
+            }
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(conversation.bytes for conversation in self._sessions.values())
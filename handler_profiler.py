@@ -0,0 +1,146 @@
+"""
+Career Counseling Realtime Voice Assistant - Handler Profiler
+This module profiles route and Socket.IO handlers and samples live stacks for flamegraphs
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from server_mode import ASYNC_MODE
+
+MAX_SAMPLE_SECONDS = 60
+DEFAULT_SAMPLE_HZ = 100
+
+
+class HandlerProfiler:
+    """Per-handler wall time, CPU time and allocation counts, off by default.
+
+    ``wrap`` is applied to every handler at import time; while disabled the
+    wrapper is one attribute check before the call. CPU time is the calling
+    OS thread's, so under eventlet/gevent it also includes green threads that
+    ran while the handler was waiting. Allocations are the net change in
+    live memory blocks (``sys.getallocatedblocks``), process-wide.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def wrap(self, handler):
+        name = handler.__name__
+
+        @wraps(handler)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return handler(*args, **kwargs)
+
+            blocks = sys.getallocatedblocks()
+            cpu = time.thread_time()
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = handler(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                self._record(
+                    name,
+                    time.perf_counter() - start,
+                    time.thread_time() - cpu,
+                    sys.getallocatedblocks() - blocks,
+                    failed
+                )
+        return wrapper
+
+    def _record(self, name, wall, cpu, blocks, failed):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = {'calls': 0, 'errors': 0, 'wall': 0.0, 'wall_max': 0.0,
+                                             'cpu': 0.0, 'alloc_blocks': 0}
+            stats['calls'] += 1
+            stats['errors'] += failed
+            stats['wall'] += wall
+            stats['wall_max'] = max(stats['wall_max'], wall)
+            stats['cpu'] += cpu
+            stats['alloc_blocks'] += blocks
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def report(self):
+        """Per-handler totals and means, slowest total wall time first"""
+        with self._lock:
+            stats = {name: dict(values) for name, values in self._stats.items()}
+        handlers = {}
+        for name, values in sorted(stats.items(), key=lambda item: -item[1]['wall']):
+            calls = values['calls']
+            handlers[name] = {
+                'calls': calls,
+                'errors': values['errors'],
+                'wall_ms_total': round(values['wall'] * 1000, 3),
+                'wall_ms_mean': round(values['wall'] * 1000 / calls, 3),
+                'wall_ms_max': round(values['wall_max'] * 1000, 3),
+                'cpu_ms_total': round(values['cpu'] * 1000, 3),
+                'cpu_ms_mean': round(values['cpu'] * 1000 / calls, 3),
+                'alloc_blocks_mean': round(values['alloc_blocks'] / calls, 1),
+            }
+        return {'enabled': self.enabled, 'handlers': handlers}
+
+
+def _native(module, name):
+    # Under eventlet/gevent the sampler runs on a native worker thread and needs the unpatched functions
+    if ASYNC_MODE == 'eventlet':
+        from eventlet import patcher
+        return getattr(patcher.original(module), name)
+    if ASYNC_MODE == 'gevent':
+        from gevent import monkey
+        return monkey.get_original(module, name)
+    return getattr(importlib.import_module(module), name)
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds, hz=DEFAULT_SAMPLE_HZ):
+    """Sample every thread's stack for ``seconds`` and return collapsed stacks.
+
+    The result is the folded format flamegraph.pl / speedscope read: one
+    ``thread;outer;...;inner count`` line per distinct stack. Call it through
+    ``run_blocking`` so that under eventlet/gevent it runs on a native thread
+    and sees whichever green thread the event loop is running.
+    """
+    seconds = min(max(float(seconds), 0.0), MAX_SAMPLE_SECONDS)
+    interval = 1.0 / max(1, min(int(hz), 1000))
+    sleep = _native('time', 'sleep')
+    own = _native('_thread', 'get_ident')()
+    labels = {}
+    counts = Counter()
+
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            stack.append(names.get(ident, f'thread-{ident}'))
+            counts[';'.join(reversed(stack))] += 1
+        sleep(interval)
+
+    return ''.join(f'{stack} {count}\n' for stack, count in counts.most_common())
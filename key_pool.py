@@ -0,0 +1,197 @@
+"""
+Career Counseling Realtime Voice Assistant - Ephemeral Key Pool
+This module mints realtime session keys server-side and keeps a small pool of them ready
+"""
+
+import http.client
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class KeyMintError(Exception):
+    """Raised when the sessions endpoint does not return a usable key"""
+
+
+class KeepAliveHTTPPool:
+    """A few persistent HTTP(S) connections to a single endpoint"""
+
+    def __init__(self, url, size=4, timeout=10):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path + (f'?{parts.query}' if parts.query else '')
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _new_connection(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, body=None, headers=None):
+        """Send one request, reusing an idle connection when there is one"""
+        try:
+            conn, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._new_connection(), False
+
+        sent = False
+        try:
+            conn.request(method, self.path, body=body, headers=headers or {})
+            sent = True
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            # A mint is not idempotent, so only a request the server cannot have answered is
+            # retried: one on an idle keep-alive connection the server had already dropped,
+            # where the send failed or the connection closed before any response byte
+            stale = isinstance(e, http.client.RemoteDisconnected) if sent else isinstance(e, ConnectionError)
+            if not reused or not stale:
+                raise
+            return self.request(method, body, headers)
+
+        if response.will_close:
+            conn.close()
+        else:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+        return response.status, data
+
+
+class EphemeralKeyPool:
+    """Pre-minted realtime session keys per (deployment, voice).
+
+    ``acquire`` hands out a key that still has at least ``min_ttl`` seconds to
+    live, minting one inline only when the pool is empty. A background thread
+    tops every pool back up to ``pool_size`` and discards keys that are about
+    to expire.
+    """
+
+    def __init__(self, sessions_url, api_key, pool_size=2, min_ttl=20, default_ttl=60, http_pool_size=4):
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.min_ttl = min_ttl
+        self.default_ttl = default_ttl
+        self._http = KeepAliveHTTPPool(sessions_url, size=http_pool_size)
+        self._pools = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.stats = {'hits': 0, 'misses': 0, 'minted': 0, 'expired': 0, 'errors': 0}
+
+    def mint(self, deployment, voice):
+        """Create a new realtime session and return its JSON (with client_secret)"""
+        body = json.dumps({'model': deployment, 'voice': voice})
+        headers = {'api-key': self.api_key, 'Content-Type': 'application/json'}
+        try:
+            status, data = self._http.request('POST', body, headers)
+        except (http.client.HTTPException, OSError) as e:
+            raise KeyMintError(f"Sessions endpoint unreachable: {e}") from e
+
+        if status != 200:
+            raise KeyMintError(f"Session API error: {status} - {data[:200].decode('utf-8', 'replace')}")
+        try:
+            session_data = json.loads(data)
+        except ValueError as e:
+            raise KeyMintError(f"Sessions endpoint returned invalid JSON: {e}") from e
+        secret = session_data.get('client_secret') if isinstance(session_data, dict) else None
+        if not isinstance(secret, dict) or not secret.get('value'):
+            raise KeyMintError('Sessions endpoint returned no ephemeral key')
+        secret.setdefault('expires_at', int(time.time()) + self.default_ttl)
+
+        with self._cond:
+            self.stats['minted'] += 1
+        return session_data
+
+    def acquire(self, deployment, voice):
+        """Return a ready key for this deployment/voice, minting one if the pool is empty"""
+        with self._cond:
+            pool = self._pools.setdefault((deployment, voice), deque())
+            session_data = self._pop_fresh(pool)
+            self.stats['hits' if session_data else 'misses'] += 1
+            # Wake the refiller either way: the pool just shrank or is new
+            self._cond.notify()
+        if session_data:
+            return session_data
+        return self.mint(deployment, voice)
+
+    def prewarm(self, deployment, voice):
+        """Start keeping a pool for this deployment/voice"""
+        with self._cond:
+            self._pools.setdefault((deployment, voice), deque())
+            self._cond.notify()
+        self.start()
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='key-pool-refill', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _pop_fresh(self, pool):
+        cutoff = time.time() + self.min_ttl
+        while pool:
+            session_data = pool.popleft()
+            if session_data['client_secret']['expires_at'] > cutoff:
+                return session_data
+            self.stats['expired'] += 1
+        return None
+
+    def _run(self):
+        backoff = 1.0
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                wanted = []
+                cutoff = time.time() + self.min_ttl
+                for key, pool in self._pools.items():
+                    while pool and pool[0]['client_secret']['expires_at'] <= cutoff:
+                        pool.popleft()
+                        self.stats['expired'] += 1
+                    wanted.extend([key] * (self.pool_size - len(pool)))
+
+            failed = False
+            for deployment, voice in wanted:
+                try:
+                    session_data = self.mint(deployment, voice)
+                except Exception as e:
+                    with self._cond:
+                        self.stats['errors'] += 1
+                    logger.error(f"Error refilling key pool for {deployment}/{voice}: {e}")
+                    failed = True
+                    break
+                with self._cond:
+                    self._pools[(deployment, voice)].append(session_data)
+
+            with self._cond:
+                if self._stopped:
+                    return
+                if failed:
+                    timeout = backoff
+                    backoff = min(backoff * 2, 30.0)
+                else:
+                    backoff = 1.0
+                    timeout = self._next_expiry_in()
+                self._cond.wait(timeout)
+
+    def _next_expiry_in(self):
+        expiries = [pool[0]['client_secret']['expires_at'] for pool in self._pools.values() if pool]
+        if not expiries:
+            return 30.0
+        return min(30.0, max(0.5, min(expiries) - self.min_ttl - time.time()))
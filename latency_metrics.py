@@ -0,0 +1,191 @@
+"""
+Career Counseling Realtime Voice Assistant - Latency Metrics
+This module aggregates per-turn and per-handler latencies into histograms in Prometheus text format
+"""
+
+import bisect
+import math
+import threading
+
+# Client-reported turn marks are ms offsets from speech_started
+TURN_MARKS = ('speech_started', 'speech_stopped', 'transcription_completed',
+              'first_tool_call', 'first_response_done', 'response_done')
+
+# Stage -> (from mark, to mark); everything after the user stops is measured from speech_stopped
+TURN_STAGES = {
+    'speech': ('speech_started', 'speech_stopped'),
+    'transcription': ('speech_stopped', 'transcription_completed'),
+    'first_tool_call': ('speech_stopped', 'first_tool_call'),
+    'first_response': ('speech_stopped', 'first_response_done'),
+    'turn': ('speech_stopped', 'response_done'),
+}
+
+TURN_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0)
+TOOL_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+HANDLER_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Client payloads are untrusted: ignore absurd values and oversized tool lists
+MAX_MARK_MS = 10 * 60 * 1000
+MAX_TOOLS_PER_TURN = 32
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels (Prometheus semantics)"""
+
+    def __init__(self, name, help_text, buckets, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series = {}
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self):
+        """{labels: (cumulative bucket counts, sum, count)}"""
+        with self._lock:
+            series = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        result = {}
+        for labels, (counts, total) in series.items():
+            cumulative, running = [], 0
+            for count in counts:
+                running += count
+                cumulative.append(running)
+            result[labels] = (cumulative, total, running)
+        return result
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        bounds = self.buckets + (math.inf,)
+        for labels, (cumulative, total, count) in sorted(self.snapshot().items()):
+            for bound, value in zip(bounds, cumulative):
+                label_text = _format_labels(self.labelnames + ('le',), labels + (_format_value(bound),))
+                lines.append(f'{self.name}_bucket{label_text} {value}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+class Gauge:
+    """Value read at scrape time from a callable (a number or {label value: number})"""
+
+    def __init__(self, name, help_text, read, labelname=None):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+        self.labelname = labelname
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} gauge']
+        value = self.read()
+        if self.labelname:
+            for label, item in sorted(value.items()):
+                lines.append(f'{self.name}{_format_labels((self.labelname,), (label,))} {_format_value(item)}')
+        else:
+            lines.append(f'{self.name} {_format_value(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together for a /metrics scrape"""
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self, prefix='voice_assist_'):
+        self.prefix = prefix
+        self._metrics = []
+
+    def histogram(self, name, help_text, buckets, labelnames=()):
+        metric = Histogram(self.prefix + name, help_text, buckets, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name, help_text, read, labelname=None):
+        metric = Gauge(self.prefix + name, help_text, read, labelname)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # One failing gauge (e.g. a locked database) must not blank the scrape
+                lines.append(f'# {metric.name} unavailable: {type(e).__name__}')
+        return '\n'.join(lines) + '\n'
+
+
+def _mark(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if not math.isfinite(value) or value < 0 or value > MAX_MARK_MS:
+        return None
+    return float(value)
+
+
+class TurnMetrics:
+    """Per-stage latency histograms fed by the client's per-turn timing reports"""
+
+    def __init__(self, registry):
+        self.stage_seconds = registry.histogram(
+            'turn_stage_seconds', 'Realtime turn latency by stage, measured in the browser',
+            TURN_BUCKETS, ('stage',))
+        self.tool_seconds = registry.histogram(
+            'tool_handler_seconds', 'Client tool handler time from arguments done to output sent',
+            TOOL_BUCKETS, ('tool',))
+
+    def record(self, payload, known_tools=()):
+        """Observe one turn report; returns how many values were recorded"""
+        if not isinstance(payload, dict):
+            return 0
+        marks = payload.get('marks')
+        marks = marks if isinstance(marks, dict) else {}
+        marks = {name: _mark(marks.get(name)) for name in TURN_MARKS}
+
+        recorded = 0
+        for stage, (start, end) in TURN_STAGES.items():
+            if marks[start] is not None and marks[end] is not None and marks[end] >= marks[start]:
+                self.stage_seconds.observe((marks[end] - marks[start]) / 1000, stage)
+                recorded += 1
+
+        tools = payload.get('tools')
+        for tool in (tools if isinstance(tools, list) else [])[:MAX_TOOLS_PER_TURN]:
+            if not isinstance(tool, dict):
+                continue
+            duration = _mark(tool.get('ms'))
+            name = tool.get('name')
+            if duration is None or not isinstance(name, str):
+                continue
+            # Keep label cardinality bounded to the tools we actually define
+            if known_tools and name not in known_tools:
+                name = 'other'
+            self.tool_seconds.observe(duration / 1000, name)
+            recorded += 1
+        return recorded
@@ -0,0 +1,223 @@
+"""
+Career Counseling Realtime Voice Assistant - PCM Audio
+This module converts, resamples, meters and segments PCM16 audio streams with NumPy
+"""
+
+from math import gcd
+
+import numpy as np
+
+# The realtime API speaks 24 kHz mono PCM16; browsers capture at 48 kHz, speech models like 16 kHz
+SAMPLE_RATES = (48000, 24000, 16000)
+REALTIME_RATE = 24000
+FRAME_MS = 20
+
+_INT16_SCALE = np.float32(1 / 32768)
+# Levels below this read as silence rather than -inf dBFS
+_FLOOR_DB = -120.0
+
+
+def pcm16_view(data):
+    """Little-endian PCM16 bytes (bytes, bytearray, memoryview) as an int16 array, without copying"""
+    return np.frombuffer(data, dtype='<i2', count=memoryview(data).nbytes // 2)
+
+
+def pcm16_to_float(data, out=None):
+    """PCM16 bytes or int16 samples as float32 in [-1, 1); ``out`` reuses a buffer of the same length"""
+    samples = data if isinstance(data, np.ndarray) else pcm16_view(data)
+    if out is None:
+        out = np.empty(samples.shape, dtype=np.float32)
+    return np.multiply(samples, _INT16_SCALE, out=out)
+
+
+def float_to_pcm16(samples, out=None):
+    """float samples as int16, clipped to full scale; ``memoryview(result)`` sends it without a copy"""
+    if out is None:
+        out = np.empty(samples.shape, dtype=np.int16)
+    scaled = np.multiply(samples, 32768.0, dtype=np.float32)
+    np.clip(scaled, -32768, 32767, out=scaled)
+    return np.rint(scaled, out=out, casting='unsafe')
+
+
+def to_dbfs(level):
+    """RMS or peak level(s) relative to full scale, in dB"""
+    return 20 * np.log10(np.maximum(level, 10 ** (_FLOOR_DB / 20)))
+
+
+def lowpass_filter(up, down, zero_crossings=12, rolloff=0.94, beta=8.0):
+    """Kaiser-windowed sinc anti-aliasing filter for resampling by up/down, at the upsampled rate.
+
+    The sinc keeps ``zero_crossings`` on each side, measured at the lower of
+    the two rates; the length is rounded up to a whole number of phases.
+    """
+    factor = max(up, down)
+    length = -(-2 * zero_crossings * factor // up) * up
+    cutoff = rolloff / (2 * factor)
+    n = np.arange(length) - (length - 1) / 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta)
+    # Unity gain at DC: the taps sum to ``up``, about 1 per output phase
+    return (taps * (up / taps.sum())).astype(np.float32)
+
+
+class Resampler:
+    """Streaming polyphase resampler between two sample rates (e.g. 48k -> 24k, 16k -> 24k).
+
+    The rate ratio is reduced to up/down and one lowpass filter is split
+    into ``up`` phases. An output sample at upsampled position ``t`` is the
+    dot product of phase ``t % up`` with the input ending at ``t // up``, so
+    the zero-stuffed signal is never built. Outputs repeat their phase every
+    ``up`` samples, and within one phase their inputs are ``down`` samples
+    apart: each chunk costs ``up`` strided matrix-vector products over a
+    sliding-window view of the input, with no per-sample Python.
+
+    Chunks can have any length. The last ``taps_per_phase - 1`` input
+    samples carry over between calls, so a stream resampled in 20 ms chunks
+    matches it resampled in one block. Output lags input by ``delay``
+    output samples (the filter's group delay).
+    """
+
+    def __init__(self, from_rate, to_rate, zero_crossings=12):
+        divisor = gcd(from_rate, to_rate)
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self.up = to_rate // divisor
+        self.down = from_rate // divisor
+        taps = lowpass_filter(self.up, self.down, zero_crossings)
+        self.taps_per_phase = len(taps) // self.up
+        # phases[p][k] multiplies x[i - k]; reversed so a window x[i-K+1 .. i] lines up with it
+        self._phases = np.ascontiguousarray(taps.reshape(self.taps_per_phase, self.up).T[:, ::-1])
+        self.delay = 0.0 if self.up == self.down else (len(taps) - 1) / 2 / self.down
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        # Upsampled position of the next output, relative to the next chunk's first sample
+        self._position = 0
+
+    def output_length(self, n):
+        """Samples the next process() call returns for an n-sample chunk"""
+        end = n * self.up
+        return max(0, -(-(end - self._position) // self.down))
+
+    def process(self, samples, out=None):
+        """Resample one float32 chunk; ``out`` may be a buffer of output_length(len(samples))"""
+        samples = np.asarray(samples, dtype=np.float32)
+        count = self.output_length(len(samples))
+        if out is None:
+            out = np.empty(count, dtype=np.float32)
+        if self.up == self.down:
+            out[:] = samples
+            return out
+        if not len(samples):
+            # Nothing to window; the history and position carry over unchanged
+            return out
+
+        history = len(self._history)
+        buffer = np.concatenate((self._history, samples))
+        windows = np.lib.stride_tricks.sliding_window_view(buffer, self.taps_per_phase)
+        for residue in range(min(self.up, count)):
+            position = self._position + residue * self.down
+            first = position // self.up
+            # Outputs residue, residue + up, ...: same phase, inputs `down` apart
+            rows = windows[first:first + (count - residue - 1) // self.up * self.down + 1:self.down]
+            out[residue::self.up] = rows @ self._phases[position % self.up]
+
+        self._position += count * self.down - len(samples) * self.up
+        self._history = buffer[len(buffer) - history:].copy()
+        return out
+
+
+def frame_levels(samples, frame_len):
+    """(rms, peak) of each complete frame of float samples; a trailing partial frame is ignored"""
+    count = len(samples) // frame_len
+    frames = samples[:count * frame_len].reshape(count, frame_len)
+    rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_len)
+    if not count:
+        return rms, rms.copy()
+    peak = np.maximum(frames.max(axis=1), -frames.min(axis=1))
+    return rms, peak
+
+
+def find_runs(mask):
+    """(starts, ends) of the runs of True in a boolean array, ends exclusive"""
+    edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def speech_segments(levels_db, threshold_db=-40.0, min_speech_frames=3, min_silence_frames=15):
+    """(start, end) frame pairs of speech in per-frame dBFS levels.
+
+    Frames above ``threshold_db`` are speech. Pauses shorter than
+    ``min_silence_frames`` are bridged, then segments shorter than
+    ``min_speech_frames`` (clicks, breaths) are dropped.
+    """
+    starts, ends = find_runs(np.asarray(levels_db) > threshold_db)
+    if len(starts) > 1:
+        keep = (starts[1:] - ends[:-1]) >= min_silence_frames
+        starts = np.concatenate((starts[:1], starts[1:][keep]))
+        ends = np.concatenate((ends[:-1][keep], ends[-1:]))
+    long_enough = (ends - starts) >= min_speech_frames
+    return np.column_stack((starts[long_enough], ends[long_enough]))
+
+
+class SpeechSegmenter:
+    """Energy-based speech/silence segmentation of a live PCM16 stream.
+
+    Feed it chunks of any size; it meters complete ``frame_ms`` frames and
+    keeps the partial one for the next chunk. A segment starts after
+    ``min_speech_ms`` of frames above ``threshold_db`` and ends after
+    ``min_silence_ms`` below it, the hysteresis speech_segments() applies
+    offline. The state machine steps over runs of equal frames rather than
+    frames, so a chunk costs a few NumPy calls plus one step per
+    speech/silence change.
+    """
+
+    def __init__(self, rate=REALTIME_RATE, frame_ms=FRAME_MS, threshold_db=-40.0,
+                 min_speech_ms=60, min_silence_ms=300):
+        self.rate = rate
+        self.frame_len = rate * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.threshold_db = threshold_db
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.in_speech = False
+        self.frames = 0
+        self._pending = np.empty(0, dtype=np.float32)
+        # Frame where the current run of speech (or silence, while in speech) began
+        self._run_start = None
+
+    def feed(self, samples):
+        """Process float32 samples; returns [('start' | 'end', frame index), ...] in order"""
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        count = len(samples) // self.frame_len
+        self._pending = samples[count * self.frame_len:].copy()
+        if not count:
+            return []
+        rms, _ = frame_levels(samples, self.frame_len)
+        loud = to_dbfs(rms) > self.threshold_db
+
+        events = []
+        base = self.frames
+        changes = np.flatnonzero(np.diff(loud.astype(np.int8))) + 1
+        for start, end in zip(np.concatenate(([0], changes)), np.concatenate((changes, [count]))):
+            self._step(bool(loud[start]), base + int(start), base + int(end), events)
+        self.frames += count
+        return events
+
+    def _step(self, loud, start, end, events):
+        # A run of equal frames [start, end), continuing a run that began at _run_start
+        if loud != self.in_speech:
+            if self._run_start is None:
+                self._run_start = start
+            needed = self.min_silence_frames if self.in_speech else self.min_speech_frames
+            if end - self._run_start >= needed:
+                self.in_speech = loud
+                events.append(('start' if loud else 'end', self._run_start))
+                self._run_start = None
+        else:
+            self._run_start = None
+
+    def seconds(self, frame):
+        """Stream time of a frame index"""
+        return frame * self.frame_ms / 1000
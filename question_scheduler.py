@@ -0,0 +1,114 @@
+"""
+Career Counseling Realtime Voice Assistant - Question Scheduler
+This module picks the next survey question and checks completion from QUESTION_BANK
+"""
+
+import sys
+
+from realtime_prompts import QUESTION_BANK
+
+# adjust_conversation_depth action -> which unanswered questions are skipped
+DEPTH_ACTIONS = ('go_deeper', 'maintain_pace', 'speed_up', 'wrap_up_soon')
+
+
+class QuestionScheduler:
+    """Next-question and completion logic over a question bank.
+
+    Each question gets one bit, in bank order, so a session's answered and
+    skipped questions are plain ints. The required, optional and essential
+    partitions are precomputed masks: picking the next question is a mask
+    and a lowest-set-bit lookup, and completion is a single subset test.
+    """
+
+    def __init__(self, question_bank):
+        self.question_ids = tuple(sys.intern(question_id) for question_id in question_bank)
+        self.bits = {question_id: 1 << n for n, question_id in enumerate(self.question_ids)}
+        self.questions = question_bank
+
+        self.all_mask = (1 << len(self.question_ids)) - 1
+        self.required_mask = self._mask_where(lambda q: q.get('required'))
+        self.optional_mask = self.all_mask & ~self.required_mask
+        # Questions still asked when the student needs to wrap up soon
+        self.essential_mask = self._mask_where(lambda q: q.get('required') and q.get('essential'))
+        self.required_count = bin(self.required_mask).count('1')
+
+        self._skip_masks = {
+            'go_deeper': 0,
+            'maintain_pace': 0,
+            'speed_up': self.optional_mask,
+            'wrap_up_soon': self.all_mask & ~self.essential_mask,
+        }
+
+    def _mask_where(self, predicate):
+        mask = 0
+        for question_id, question in self.questions.items():
+            if predicate(question):
+                mask |= self.bits[question_id]
+        return mask
+
+    def mask(self, question_ids):
+        """Bitmask for an iterable of question ids (unknown ids are ignored)"""
+        bits = self.bits
+        mask = 0
+        for question_id in question_ids or ():
+            mask |= bits.get(question_id, 0)
+        return mask
+
+    def ids(self, mask):
+        """Question ids in bank order for a bitmask (bits past the bank are ignored)"""
+        mask &= self.all_mask
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self.question_ids[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def skip_mask(self, depth_action=None, skip_optional=False):
+        """Questions skipped for an adjust_conversation_depth action"""
+        skipped = self._skip_masks.get(depth_action, 0)
+        if skip_optional:
+            skipped |= self.optional_mask
+        return skipped
+
+    def next_question(self, completed, skipped=0):
+        """Next question id (required before optional, then bank order), or None when done"""
+        open_questions = ~(completed | skipped)
+        remaining = self.required_mask & open_questions or self.optional_mask & open_questions
+        if not remaining:
+            return None
+        return self.question_ids[(remaining & -remaining).bit_length() - 1]
+
+    def is_complete(self, completed, skipped=0):
+        """True once every required question that is not skipped has been answered"""
+        outstanding = self.required_mask & ~skipped
+        return completed & outstanding == outstanding
+
+    def schedule(self, completed, skipped=0):
+        """Next question with its wording plus completion status, as returned to the client"""
+        next_id = self.next_question(completed, skipped)
+        answered_required = bin(completed & self.required_mask).count('1')
+        result = {
+            'complete': next_id is None,
+            'is_complete': self.is_complete(completed, skipped),
+            'completed_questions': self.ids(completed),
+            'completed_mask': completed,
+            'skipped_questions': self.ids(skipped & ~completed),
+            'percentage': round(answered_required * 100 / self.required_count) if self.required_count else 100,
+        }
+        if next_id is not None:
+            question = self.questions[next_id]
+            open_questions = ~(completed | skipped)
+            pool = self.required_mask if question.get('required') else self.optional_mask
+            result.update({
+                'next_question': next_id,
+                'question_text': question['question'],
+                'follow_up': question.get('follow_up'),
+                'is_optional': not question.get('required'),
+                'questions_remaining': bin(pool & open_questions).count('1'),
+            })
+        return result
+
+
+# Shared scheduler for the built-in question bank
+scheduler = QuestionScheduler(QUESTION_BANK)
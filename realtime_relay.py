@@ -0,0 +1,328 @@
+"""
+Career Counseling Realtime Voice Assistant - Realtime Relay
+This module relays browser audio and events to the realtime API over server-held WebSockets
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import threading
+from collections import deque
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Events a browser may send upstream; tool outputs come from the server only
+CLIENT_EVENTS = frozenset({
+    'session.update', 'conversation.item.create', 'response.create', 'response.cancel',
+    'input_audio_buffer.commit', 'input_audio_buffer.clear',
+})
+MAX_FRAME_BYTES = 64 * 1024
+
+_APPEND_PREFIX = b'{"type":"input_audio_buffer.append","audio":"'
+_APPEND_SUFFIX = b'"}'
+
+
+def _dumps(event):
+    if orjson is not None:
+        return orjson.dumps(event)
+    return json.dumps(event, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class RelayOutbox:
+    """Upstream frames of one session, sent in the order they were queued.
+
+    Only ``input_audio_buffer.append`` frames count against ``max_audio``
+    and are refused when upstream falls behind. Control events (commits,
+    session updates, tool outputs, response.create) are always queued: losing
+    one would stall the conversation, and they keep their place after the
+    audio queued before them, so a commit never overtakes its last frames.
+    """
+
+    def __init__(self, max_audio):
+        self.max_audio = max_audio
+        self.audio = 0
+        self._frames = deque()
+        self._ready = asyncio.Event()
+
+    def put(self, payload, audio=False):
+        """Queue a frame; False if it is audio and the audio budget is used up"""
+        if audio:
+            if self.audio >= self.max_audio:
+                return False
+            self.audio += 1
+        self._frames.append((payload, audio))
+        self._ready.set()
+        return True
+
+    async def get(self):
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        payload, audio = self._frames.popleft()
+        if audio:
+            self.audio -= 1
+        return payload
+
+
+class RelaySession:
+    """One relayed browser connection and its upstream realtime WebSocket"""
+
+    def __init__(self, sid, context, queue_frames):
+        self.sid = sid
+        self.context = context
+        self.outbox = RelayOutbox(queue_frames)
+        self.task = None
+        self.tools = set()
+        # Same continuation rule as the browser client: one response.create per model
+        # response, once it is done and every tool output of it has been sent
+        self.outputs_pending = False
+        self.tools_in_flight = 0
+        self.response_finished = False
+
+
+class RealtimeRelay:
+    """Relays realtime sessions for browsers that cannot reach the API over WebRTC.
+
+    An asyncio loop on its own thread holds one upstream WebSocket per relayed
+    Socket.IO client, so hundreds of sessions cost one thread. The browser
+    streams PCM16 frames as binary Socket.IO messages; ``send_audio`` takes
+    them as memoryviews, base64-encodes them straight into an
+    ``input_audio_buffer.append`` frame (no JSON encoder, no intermediate
+    str) and queues that for the session's writer. Upstream events go back
+    through ``emit``: audio deltas as binary ``relay_audio`` messages, the
+    rest as ``relay_event``. Function calls never reach the browser; they run
+    on the server through ``run_tool(context, name, arguments)`` in a worker
+    thread, and the browser is told the outcome with ``relay_tool``.
+
+    Everything but the constructor is safe to call from any thread.
+    """
+
+    available = aiohttp is not None
+
+    def __init__(self, url, api_key, emit, run_tool, max_sessions=200, queue_frames=500, connect_timeout=10):
+        self.url = url
+        self.api_key = api_key
+        self.emit = emit
+        self.run_tool = run_tool
+        self.max_sessions = max_sessions
+        self.queue_frames = queue_frames
+        self.connect_timeout = connect_timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._http = None
+        self.stats = {'opened': 0, 'failed': 0, 'rejected_events': 0, 'frames_in': 0, 'bytes_in': 0,
+                      'frames_dropped': 0, 'events_up': 0, 'events_down': 0, 'audio_down': 0,
+                      'malformed_events': 0, 'tool_calls': 0, 'tool_errors': 0}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if not self.available:
+            raise RuntimeError('The realtime relay needs aiohttp')
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), name='realtime-relay', daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _run_loop(self, ready):
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    def stop(self, timeout=5):
+        if self._thread is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        try:
+            future.result(timeout)
+        except Exception as e:
+            logger.warning(f"Realtime relay did not shut down cleanly: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def open(self, sid, context, events=()):
+        """Start relaying for a Socket.IO client; ``events`` are sent first (e.g. session.update)"""
+        with self._lock:
+            if sid in self._sessions or len(self._sessions) >= self.max_sessions:
+                return False
+            session = self._sessions[sid] = RelaySession(sid, context, self.queue_frames)
+        for event in events:
+            self.send_event(sid, event)
+        asyncio.run_coroutine_threadsafe(self._start_session(session), self._loop)
+        return True
+
+    def close(self, sid):
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+        if session is not None:
+            self._loop.call_soon_threadsafe(self._cancel, session)
+
+    def send_audio(self, sid, frame):
+        """Queue one PCM16 frame (bytes-like) for the session's upstream input buffer"""
+        # A plain dict read: atomic, and cheaper than the lock on the per-frame path
+        session = self._sessions.get(sid)
+        view = memoryview(frame)
+        if session is None or not view.nbytes or view.nbytes > MAX_FRAME_BYTES or view.nbytes % 2:
+            return False
+        payload = b''.join((_APPEND_PREFIX, base64.b64encode(view), _APPEND_SUFFIX))
+        self._loop.call_soon_threadsafe(self._enqueue_audio, session, payload, view.nbytes)
+        return True
+
+    def send_event(self, sid, event):
+        """Forward a client event upstream if the browser is allowed to send it"""
+        session = self._sessions.get(sid)
+        if session is None:
+            return False
+        kind = event.get('type') if isinstance(event, dict) else None
+        item = event.get('item') if kind == 'conversation.item.create' else None
+        if kind not in CLIENT_EVENTS or (item is not None and not (isinstance(item, dict)
+                                                                   and item.get('type') == 'message')):
+            self._loop.call_soon_threadsafe(self._count, 'rejected_events')
+            return False
+        self._loop.call_soon_threadsafe(self._enqueue, session, _dumps(event))
+        return True
+
+    # Stats are only changed on the loop thread
+    def _count(self, key):
+        self.stats[key] += 1
+
+    def _enqueue_audio(self, session, payload, nbytes):
+        self.stats['frames_in'] += 1
+        self.stats['bytes_in'] += nbytes
+        if not session.outbox.put(payload, audio=True):
+            # Upstream is not keeping up; dropping audio beats unbounded memory
+            self.stats['frames_dropped'] += 1
+
+    def _enqueue(self, session, payload):
+        session.outbox.put(payload)
+
+    def _cancel(self, session):
+        if session.task is not None:
+            session.task.cancel()
+
+    async def _shutdown(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        tasks = [session.task for session in sessions if session.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._http is not None:
+            await self._http.close()
+
+    async def _start_session(self, session):
+        if self._http is None:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(connect=self.connect_timeout))
+        session.task = asyncio.current_task()
+        with self._lock:
+            closed = self._sessions.get(session.sid) is not session
+        if closed:
+            return
+        try:
+            async with self._http.ws_connect(self.url, headers={'api-key': self.api_key},
+                                             max_msg_size=16 * 1024 * 1024) as ws:
+                self.stats['opened'] += 1
+                writer = asyncio.create_task(self._write(session, ws))
+                try:
+                    await self._read(session, ws)
+                finally:
+                    writer.cancel()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.error(f"Realtime relay for {session.sid} failed: {e}")
+            self.emit('relay_event', {'type': 'error', 'error': {'message': 'Realtime connection failed'}},
+                      to=session.sid)
+        finally:
+            with self._lock:
+                if self._sessions.get(session.sid) is session:
+                    del self._sessions[session.sid]
+            self.emit('relay_event', {'type': 'relay.closed'}, to=session.sid)
+
+    async def _write(self, session, ws):
+        while True:
+            payload = await session.outbox.get()
+            await ws.send_frame(payload, aiohttp.WSMsgType.TEXT)
+            self.stats['events_up'] += 1
+
+    async def _read(self, session, ws):
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                if message.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.ERROR):
+                    break
+                continue
+            try:
+                event = _loads(message.data)
+                kind = event.get('type')
+            except (ValueError, AttributeError):
+                # One bad frame is skipped; the session carries on
+                self.stats['malformed_events'] += 1
+                logger.warning(f"Skipped a malformed realtime event for {session.sid}")
+                continue
+            if kind == 'response.audio.delta':
+                self.stats['audio_down'] += 1
+                self.emit('relay_audio', base64.b64decode(event.get('delta') or ''), to=session.sid)
+                continue
+            if kind == 'response.function_call_arguments.done':
+                session.response_finished = False
+                session.tools_in_flight += 1
+                task = asyncio.create_task(self._call_tool(session, event))
+                session.tools.add(task)
+                task.add_done_callback(session.tools.discard)
+                continue
+            if kind == 'response.done':
+                session.response_finished = True
+                self._continue_after_tools(session)
+            self.stats['events_down'] += 1
+            self.emit('relay_event', event, to=session.sid)
+
+    async def _call_tool(self, session, event):
+        name = event.get('name')
+        self.stats['tool_calls'] += 1
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            result = await loop.run_in_executor(None, self.run_tool, session.context, name, event.get('arguments'))
+        except Exception as e:
+            self.stats['tool_errors'] += 1
+            logger.error(f"Relayed tool {name} failed for {session.sid}: {e}")
+            result = {'success': False, 'error': 'Tool failed on the server'}
+        ms = round((loop.time() - started) * 1000, 1)
+        self._enqueue(session, _dumps({'type': 'conversation.item.create', 'item': {
+            'type': 'function_call_output', 'call_id': event.get('call_id'), 'output': json.dumps(result)}}))
+        self.emit('relay_tool', {'name': name, 'arguments': event.get('arguments'), 'result': result, 'ms': ms},
+                  to=session.sid)
+        session.outputs_pending = True
+        session.tools_in_flight -= 1
+        self._continue_after_tools(session)
+
+    def _continue_after_tools(self, session):
+        if session.outputs_pending and session.response_finished and session.tools_in_flight == 0:
+            session.outputs_pending = False
+            self._enqueue(session, b'{"type":"response.create"}')
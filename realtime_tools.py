@@ -5,6 +5,36 @@ This module contains the tool specifications for managing the conversation flow
 
 # Tool definitions for the realtime API
 CAREER_COUNSELING_TOOLS = [
+    {
+        "type": "function",
+        "name": "detect_user_language",
+        "description": "Detect the language used by the user in their response. This tool MUST be called for EVERY user input to determine if they are speaking in English or Hinglish(Hindi). This ensures the counselor responds in the appropriate language.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "user_text": {
+                    "type": "string",
+                    "description": "The user's input text to analyze for language detection"
+                },
+                "detected_language": {
+                    "type": "string",
+                    "description": "The detected language of the user's input",
+                    "enum": ["english", "hinglish"]
+                },
+                "confidence": {
+                    "type": "string",
+                    "description": "Confidence level of the language detection",
+                    "enum": ["high", "medium", "low"]
+                },
+                "Hinglish_words_found": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of Hinglish words or patterns detected in the input"
+                }
+            },
+            "required": ["user_text", "detected_language"]
+        }
+    },
     {
         "type": "function",
         "name": "track_survey_response",
@@ -86,6 +116,46 @@ Preamble sample phrases:
             "required": ["completed_questions", "student_profile"]
         }
     },
+    {
+        "type": "function",
+        "name": "record_response_and_get_next",
+        "description": """Record a student's answer AND get the next question in one step. Use this instead of calling track_survey_response followed by determine_next_question whenever a student gives a substantive answer. The result contains the next question to ask, its follow-up prompt and whether the survey is complete.
+
+Preamble sample phrases:
+- "Let me capture that..."
+- "Got it, let me note that down..."
+""",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "question_id": {
+                    "type": "string",
+                    "description": "The ID of the question being answered",
+                    "enum": [
+                        "intro", "academic_status", "career_confusion", "interests",
+                        "skills", "ai_fears", "industry_preference", "work_values",
+                        "learning_style", "role_models", "obstacles", "timeline",
+                        "experience", "support", "immediate_need"
+                    ]
+                },
+                "response": {
+                    "type": "string",
+                    "description": "The student's complete response to the question"
+                },
+                "emotion_detected": {
+                    "type": "string",
+                    "description": "Any notable emotion detected in the response",
+                    "enum": ["neutral", "anxious", "confused", "frustrated", "hopeful", "excited", "overwhelmed"]
+                },
+                "skip_optional": {
+                    "type": "boolean",
+                    "description": "Whether to skip optional questions to keep survey shorter",
+                    "default": False
+                }
+            },
+            "required": ["question_id", "response"]
+        }
+    },
     {
         "type": "function",
         "name": "check_completion_status",
@@ -120,7 +190,7 @@ Preamble sample phrases:
 Preamble sample phrases:
 - "Let me summarize what we've discussed..."
 - "I'm preparing your session summary..."
-- "Let me compile everything we've covered...""",
+- "Let me compile everything we've covered...\"""",
         "parameters": {
             "type": "object",
             "properties": {
@@ -317,11 +387,56 @@ Preamble sample phrases:
             },
             "required": ["current_engagement", "adjustment_action"]
         }
+    },
+    {
+        "type": "function",
+        "name": "stop_conversation",
+        "description": "Stop the conversation when user wants to pause, stop, or take a break. This ends the current session but preserves data.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "save_progress": {
+                    "type": "boolean",
+                    "description": "Whether to save the conversation progress",
+                    "default": True
+                }
+            },
+            "required": []
+        }
+    },
+    {
+        "type": "function",
+        "name": "trigger_logout",
+        "description": "Trigger logout when user says quit, exit, logout, or similar commands. This will end the session and log the user out.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "confirm_logout": {
+                    "type": "boolean",
+                    "description": "Confirmation to proceed with logout",
+                    "default": True
+                }
+            },
+            "required": []
+        }
     }
 ]
 
+# Tools the browser client exposes to the model, in session.update order
+# (pause/resume are handled through stop_conversation and stored state instead)
+CLIENT_SESSION_TOOLS = [
+    "detect_user_language", "record_response_and_get_next", "track_survey_response",
+    "determine_next_question", "check_completion_status", "end_session_summary", "provide_clarification",
+    "detect_emotional_state", "adjust_conversation_depth", "stop_conversation",
+    "trigger_logout"
+]
+
 # Tool response handlers (to be implemented in the main application)
 TOOL_HANDLERS = {
+    "detect_user_language": {
+        "success_response": None,  # Language state is updated silently
+        "follow_up_action": "respond_in_detected_language"
+    },
     "track_survey_response": {
         "success_response": "I've recorded your response about {topic}.",
         "follow_up_action": "determine_next_question"
@@ -330,6 +445,10 @@ TOOL_HANDLERS = {
         "success_response": None,  # No verbal response, just ask the next question
         "follow_up_action": "ask_question"
     },
+    "record_response_and_get_next": {
+        "success_response": None,  # Acknowledge briefly, then ask the returned question
+        "follow_up_action": "ask_question"
+    },
     "check_completion_status": {
         "success_response": "Let me check if we have enough information...",
         "follow_up_action": "end_or_continue"
@@ -357,6 +476,14 @@ TOOL_HANDLERS = {
     "adjust_conversation_depth": {
         "success_response": None,  # Adjustment happens seamlessly
         "follow_up_action": "modify_approach"
+    },
+    "stop_conversation": {
+        "success_response": "I've saved your progress. We can continue whenever you're ready.",
+        "follow_up_action": "save_state"
+    },
+    "trigger_logout": {
+        "success_response": "Logging you out now. Take care!",
+        "follow_up_action": "close_session"
     }
 }
 
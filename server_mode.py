@@ -0,0 +1,39 @@
+"""
+Career Counseling Realtime Voice Assistant - Server Mode
+This module selects the Socket.IO async mode and keeps blocking I/O off the event loop
+"""
+
+import os
+
+# 'threading' runs one OS thread per connection; 'eventlet' and 'gevent' run
+# every handler as a green-thread coroutine on a single event loop.
+ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+SUPPORTED_MODES = ('threading', 'eventlet', 'gevent')
+
+
+def monkey_patch():
+    """Patch the standard library for the selected mode; call before other imports"""
+    if ASYNC_MODE not in SUPPORTED_MODES:
+        raise ValueError(f"Unsupported SOCKETIO_ASYNC_MODE {ASYNC_MODE!r}, expected one of {SUPPORTED_MODES}")
+
+    if ASYNC_MODE == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
+    elif ASYNC_MODE == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+
+
+def run_blocking(func, *args, **kwargs):
+    """Call ``func`` on a native worker thread when running on an event loop.
+
+    In threading mode this is a plain call. Under eventlet/gevent only the
+    calling green thread waits, so file I/O does not stall other handlers.
+    """
+    if ASYNC_MODE == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(func, *args, **kwargs)
+    if ASYNC_MODE == 'gevent':
+        import gevent
+        return gevent.get_hub().threadpool.apply(func, args, kwargs)
+    return func(*args, **kwargs)
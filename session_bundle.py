@@ -0,0 +1,98 @@
+"""
+Career Counseling Realtime Voice Assistant - Session Bundle
+This module compiles the prompt and tool definitions into one cacheable session.update payload
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import re
+import time
+
+import realtime_prompts
+import realtime_tools
+
+logger = logging.getLogger(__name__)
+
+# Realtime session settings sent alongside the instructions and tools
+SESSION_SETTINGS = {
+    "modalities": ["text", "audio"],
+    "voice": "ash",
+    "input_audio_format": "pcm16",
+    "output_audio_format": "pcm16",
+    "turn_detection": {
+        "type": "server_vad",
+        "threshold": 0.5,
+        "prefix_padding_ms": 300,
+        "silence_duration_ms": 350,
+    },
+}
+
+_TRAILING_SPACE = re.compile(r'[ \t]+$', re.MULTILINE)
+_EXTRA_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def _minify_text(text):
+    text = _TRAILING_SPACE.sub('', text)
+    return _EXTRA_BLANK_LINES.sub('\n\n', text).strip()
+
+
+def _minify(value):
+    if isinstance(value, str):
+        return _minify_text(value)
+    if isinstance(value, dict):
+        return {key: _minify(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_minify(item) for item in value]
+    return value
+
+
+def compile_session_bundle():
+    """Build the minified JSON bundle the browser sends as its session.update"""
+    tools_by_name = {tool['name']: tool for tool in realtime_tools.CAREER_COUNSELING_TOOLS}
+    session = {
+        'instructions': _minify_text(realtime_prompts.CAREER_COUNSELING_PROMPT),
+        **SESSION_SETTINGS,
+        'tools': [_minify(tools_by_name[name]) for name in realtime_tools.CLIENT_SESSION_TOOLS],
+    }
+    bundle = {
+        'session_update': {'type': 'session.update', 'session': session},
+        # Substituted mid-prompt, so keep their surrounding newlines
+        'language_instructions': {
+            language: _TRAILING_SPACE.sub('', text)
+            for language, text in realtime_prompts.LANGUAGE_INSTRUCTIONS.items()
+        },
+        # Question order, wording and follow-ups for the client-side tool handlers
+        'questions': {
+            question_id: {
+                'question': question['question'],
+                'follow_up': question['follow_up'],
+                'required': question['required'],
+            }
+            for question_id, question in realtime_prompts.QUESTION_BANK.items()
+        },
+    }
+    return json.dumps(bundle, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class SessionBundle:
+    """The compiled bundle plus its content hash, built once at startup.
+
+    There is no hot reload. QUESTION_BANK also fixes QuestionScheduler's bit
+    layout, the compiled payload validators, the career record intern tables
+    and the sessions already stored with them, and those cannot be swapped
+    under live sessions, so edits to realtime_prompts or realtime_tools take
+    effect on restart. The gzip representation has its own ETag, so a cache
+    never answers a conditional request with the other encoding.
+    """
+
+    def __init__(self):
+        start = time.perf_counter()
+        self.body = compile_session_bundle()
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.version = hashlib.sha256(self.body).hexdigest()[:16]
+        self.gzip_etag = f"{self.version}-gzip"
+        self.build_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Compiled session bundle {self.version}: {len(self.body)} bytes "
+                    f"({len(self.gzip_body)} gzipped) in {self.build_ms:.1f} ms")
@@ -0,0 +1,102 @@
+"""
+Career Counseling Realtime Voice Assistant - Session Shards
+This module provides the lock-striping primitives the session stores use so independent users never contend
+"""
+
+import threading
+import zlib
+from contextlib import contextmanager
+
+DEFAULT_STRIPES = 16
+
+
+def stripe_of(key, stripes):
+    """Stable stripe number for a string key (the same in every process, unlike hash())"""
+    return zlib.crc32(key.encode('utf-8')) % stripes if isinstance(key, str) else hash(key) % stripes
+
+
+class KeyedLocks:
+    """One reentrant lock per key, created on first use and dropped when its last holder leaves.
+
+    ``hold(key)`` serializes everything done for one session while other
+    sessions proceed; the stripe lock is only held for the dict lookup, not
+    while the session lock is.
+    """
+
+    def __init__(self, stripes=DEFAULT_STRIPES):
+        self._stripes = [(threading.Lock(), {}) for _ in range(stripes)]
+
+    @contextmanager
+    def hold(self, key):
+        guard, locks = self._stripes[stripe_of(key, len(self._stripes))]
+        with guard:
+            entry = locks.get(key)
+            if entry is None:
+                entry = locks[key] = [threading.RLock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del locks[key]
+
+    def held(self, key):
+        """Whether some thread holds (or is waiting for) the lock for ``key``"""
+        guard, locks = self._stripes[stripe_of(key, len(self._stripes))]
+        with guard:
+            return key in locks
+
+    def __len__(self):
+        return sum(len(locks) for _, locks in self._stripes)
+
+
+class StripedIndex:
+    """key -> insertion-ordered ids, striped by key.
+
+    Used for the secondary indexes (by user, by email) next to a sharded
+    store. Callers may hold a shard lock while updating an index, never the
+    other way round, so the two lock kinds cannot deadlock.
+    """
+
+    def __init__(self, stripes=DEFAULT_STRIPES):
+        self._stripes = [(threading.Lock(), {}) for _ in range(stripes)]
+
+    def _stripe(self, key):
+        return self._stripes[stripe_of(key, len(self._stripes))]
+
+    def add(self, key, member):
+        lock, index = self._stripe(key)
+        with lock:
+            index.setdefault(key, {})[member] = True
+
+    def discard(self, key, member):
+        lock, index = self._stripe(key)
+        with lock:
+            members = index.get(key)
+            if members is not None:
+                members.pop(member, None)
+                if not members:
+                    del index[key]
+
+    def latest(self, key):
+        """The most recently added member for ``key``, or None"""
+        lock, index = self._stripe(key)
+        with lock:
+            members = index.get(key)
+            return next(reversed(members)) if members else None
+
+    def members(self, key):
+        lock, index = self._stripe(key)
+        with lock:
+            return list(index.get(key, ()))
+
+    def items(self):
+        """Snapshot of every (key, [members]) pair"""
+        result = []
+        for lock, index in self._stripes:
+            with lock:
+                result.extend((key, list(members)) for key, members in index.items())
+        return result
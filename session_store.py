@@ -0,0 +1,377 @@
+"""
+Career Counseling Realtime Voice Assistant - Session Storage Backends
+This module provides the storage backends shared by SessionManager and CareerCounselingManager
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from career_record import CareerSession
+from session_shards import KeyedLocks
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryUserSessions:
+    """Default user-session store: a dict local to this process"""
+
+    # Only this process serves these sessions, so its memory has every transcript turn
+    shared = False
+
+    def __init__(self):
+        self._sessions = {}
+        self._last_seen = {}
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def add(self, session_data):
+        self._sessions[session_data['id']] = session_data
+
+    def get(self, session_id):
+        return self._sessions.get(session_id)
+
+    def remove(self, session_id):
+        self._last_seen.pop(session_id, None)
+        return self._sessions.pop(session_id, None)
+
+    def touch(self, session_id):
+        """Record activity on a session, for the idle reaper"""
+        if session_id in self._sessions:
+            self._last_seen[session_id] = time.time()
+
+    def last_seen(self, session_id):
+        return self._last_seen.get(session_id)
+
+    def idle(self, cutoff):
+        """Sessions with no activity since ``cutoff`` (a time.time() value)"""
+        return [session_id for session_id, seen in list(self._last_seen.items()) if seen < cutoff]
+
+
+# SQL statements are module constants so every pooled connection reuses its
+# compiled statement cache instead of re-preparing them per call.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_sessions (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_activity (
+    id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS user_activity_seen ON user_activity (last_seen);
+CREATE TABLE IF NOT EXISTS career_sessions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    user_email TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS career_sessions_email ON career_sessions (user_email, state, updated_at);
+CREATE INDEX IF NOT EXISTS career_sessions_user ON career_sessions (user_id);
+CREATE INDEX IF NOT EXISTS career_sessions_state ON career_sessions (state, updated_at);
+"""
+
+_USER_INSERT = "INSERT OR REPLACE INTO user_sessions (id, email, data) VALUES (?, ?, ?)"
+_USER_SELECT = "SELECT data FROM user_sessions WHERE id = ?"
+_USER_DELETE = "DELETE FROM user_sessions WHERE id = ?"
+_USER_COUNT = "SELECT COUNT(*) FROM user_sessions"
+# Only live sessions get an activity row, so a touch racing logout cannot leave one behind
+_USER_TOUCH = ("INSERT OR REPLACE INTO user_activity (id, last_seen) "
+               "SELECT ?, ? WHERE EXISTS (SELECT 1 FROM user_sessions WHERE id = ?)")
+_USER_LAST_SEEN = "SELECT last_seen FROM user_activity WHERE id = ?"
+_USER_IDLE = "SELECT id FROM user_activity WHERE last_seen < ?"
+_USER_ACTIVITY_DELETE = "DELETE FROM user_activity WHERE id = ?"
+
+_CAREER_INSERT = ("INSERT OR REPLACE INTO career_sessions (id, user_id, user_email, state, updated_at, data) "
+                  "VALUES (?, ?, ?, ?, ?, ?)")
+_CAREER_SELECT_STATE = "SELECT data FROM career_sessions WHERE id = ? AND state = ?"
+_CAREER_SELECT = "SELECT data FROM career_sessions WHERE id = ?"
+_CAREER_UPDATE = "UPDATE career_sessions SET state = ?, updated_at = ?, data = ? WHERE id = ?"
+_CAREER_DELETE = "DELETE FROM career_sessions WHERE id = ?"
+_CAREER_CLAIM = "UPDATE career_sessions SET state = 'completing' WHERE id = ? AND state = 'active'"
+_CAREER_UNCLAIM = "UPDATE career_sessions SET state = 'active' WHERE id = ? AND state = 'completing'"
+_CAREER_DELETE_CLAIMED = "DELETE FROM career_sessions WHERE id = ? AND state = 'completing'"
+_CAREER_COUNT = "SELECT COUNT(*) FROM career_sessions"
+_CAREER_FIND_PAUSED = ("SELECT id FROM career_sessions WHERE user_email = ? AND state = 'paused' "
+                       "ORDER BY updated_at DESC LIMIT 1")
+_CAREER_FIND_USER = "SELECT id FROM career_sessions WHERE user_id = ?"
+_CAREER_SELECT_IDLE = "SELECT data FROM career_sessions WHERE state = 'active' AND updated_at < ?"
+_CAREER_EXPIRE_PAUSED = "DELETE FROM career_sessions WHERE state = 'paused' AND updated_at < ?"
+
+
+def _encode(record):
+    data = dict(record)
+    for key, value in data.items():
+        if isinstance(value, datetime):
+            data[key] = value.isoformat()
+        elif isinstance(value, Path):
+            data[key] = str(value)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def _decode(text, datetime_fields=('start_time',), path_fields=()):
+    data = json.loads(text)
+    for key in datetime_fields:
+        if data.get(key):
+            data[key] = datetime.fromisoformat(data[key])
+    for key in path_fields:
+        if data.get(key):
+            data[key] = Path(data[key])
+    return data
+
+
+class SQLiteBackend:
+    """A WAL-mode SQLite database shared by several server processes.
+
+    Connections are pooled and handed out per operation, so handler threads
+    never share a connection and no thread opens its own.
+    """
+
+    def __init__(self, path, pool_size=8, busy_timeout_ms=5000, schema=_SCHEMA):
+        self.path = str(path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._pool = queue.Queue(maxsize=pool_size)
+
+        conn = self._connect()
+        conn.executescript(schema)
+        self._pool.put(conn)
+        for _ in range(pool_size - 1):
+            self._pool.put(self._connect())
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False,
+                               cached_statements=64)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Run statements atomically across processes (BEGIN IMMEDIATE)"""
+        with self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SQLiteUserSessions:
+    """User-session store backed by ``SQLiteBackend``.
+
+    Any worker may serve a session, so last activity is kept in the
+    database, where every worker's idle reaper sees it. Each process writes
+    it at most once per ``touch_interval`` seconds per session.
+    """
+
+    shared = True
+
+    def __init__(self, backend, touch_interval=30):
+        self.backend = backend
+        self.touch_interval = touch_interval
+        # When this process last wrote each session's activity
+        self._written = {}
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def __len__(self):
+        with self.backend.connection() as conn:
+            return conn.execute(_USER_COUNT).fetchone()[0]
+
+    def add(self, session_data):
+        with self.backend.connection() as conn:
+            conn.execute(_USER_INSERT, (session_data['id'], session_data['email'], _encode(session_data)))
+
+    def get(self, session_id):
+        with self.backend.connection() as conn:
+            row = conn.execute(_USER_SELECT, (session_id,)).fetchone()
+        return _decode(row[0], path_fields=('file_path',)) if row else None
+
+    def remove(self, session_id):
+        self._written.pop(session_id, None)
+        with self.backend.transaction() as conn:
+            row = conn.execute(_USER_SELECT, (session_id,)).fetchone()
+            conn.execute(_USER_DELETE, (session_id,))
+            conn.execute(_USER_ACTIVITY_DELETE, (session_id,))
+        return _decode(row[0], path_fields=('file_path',)) if row else None
+
+    def touch(self, session_id):
+        now = time.time()
+        if now - self._written.get(session_id, 0.0) < self.touch_interval:
+            return
+        self._written[session_id] = now
+        with self.backend.connection() as conn:
+            conn.execute(_USER_TOUCH, (session_id, now, session_id))
+
+    def last_seen(self, session_id):
+        with self.backend.connection() as conn:
+            row = conn.execute(_USER_LAST_SEEN, (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def idle(self, cutoff):
+        # Sessions another worker removed would otherwise stay in _written for good
+        for session_id, written in list(self._written.items()):
+            if written < cutoff:
+                self._written.pop(session_id, None)
+        with self.backend.connection() as conn:
+            return [row[0] for row in conn.execute(_USER_IDLE, (cutoff,))]
+
+
+class SQLiteCareerSessions:
+    """Career-session store backed by ``SQLiteBackend``.
+
+    Mirrors the ``CareerSessionRegistry`` interface. Records returned here are
+    copies, so callers must ``save`` them after changing them. A change that
+    depends on the stored record goes through ``modify`` (or the ``change``
+    callback of ``pause``/``resume``): the read, the change and the write
+    share one BEGIN IMMEDIATE transaction, so two workers changing the same
+    session serialize instead of overwriting each other. Active sessions
+    idle past ``idle_ttl`` are marked paused, and paused ones are deleted after
+    ``spill_ttl``; the capacity limit does not apply since nothing is resident.
+    """
+
+    def __init__(self, backend, idle_ttl=1800, spill_ttl=7 * 86400, sweep_interval=30):
+        self.backend = backend
+        self.idle_ttl = idle_ttl
+        self.spill_ttl = spill_ttl
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+        self._session_locks = KeyedLocks()
+
+    def __len__(self):
+        with self.backend.connection() as conn:
+            return conn.execute(_CAREER_COUNT).fetchone()[0]
+
+    def lock(self, career_session_id):
+        """Context manager serializing changes to one session within this process"""
+        return self._session_locks.hold(career_session_id)
+
+    def add(self, session):
+        self._maybe_sweep()
+        with self.backend.connection() as conn:
+            conn.execute(_CAREER_INSERT, (session.id, session.user_id, session.user_email,
+                                          session.state, time.time(), _encode(session.to_dict())))
+
+    def save(self, session):
+        with self.backend.connection() as conn:
+            conn.execute(_CAREER_UPDATE, (session.state, time.time(), _encode(session.to_dict()), session.id))
+
+    @contextmanager
+    def modify(self, career_session_id):
+        """Yield the active session (None if it is not active) and write it back on exit"""
+        self._maybe_sweep()
+        with self.backend.transaction() as conn:
+            row = conn.execute(_CAREER_SELECT_STATE, (career_session_id, 'active')).fetchone()
+            session = CareerSession.from_dict(json.loads(row[0])) if row else None
+            yield session
+            if session is not None:
+                conn.execute(_CAREER_UPDATE, (session.state, time.time(), _encode(session.to_dict()), session.id))
+
+    def get_active(self, career_session_id):
+        self._maybe_sweep()
+        with self.backend.connection() as conn:
+            row = conn.execute(_CAREER_SELECT_STATE, (career_session_id, 'active')).fetchone()
+        return CareerSession.from_dict(json.loads(row[0])) if row else None
+
+    def pause(self, career_session_id, change=None):
+        return self._move(career_session_id, 'active', 'paused', change)
+
+    def resume(self, career_session_id, change=None):
+        return self._move(career_session_id, 'paused', 'active', change)
+
+    def complete(self, career_session_id, finish):
+        """Remove the active session once ``finish(session)`` succeeds; returns its result (None if not active)"""
+        # Claiming the row, ``finish`` and the delete share one write transaction, so when
+        # two workers complete the same session only the one whose claim updates the row finishes it
+        with self.backend.transaction() as conn:
+            if conn.execute(_CAREER_CLAIM, (career_session_id,)).rowcount != 1:
+                return None
+            row = conn.execute(_CAREER_SELECT, (career_session_id,)).fetchone()
+            result = finish(CareerSession.from_dict(json.loads(row[0])))
+            conn.execute(_CAREER_DELETE_CLAIMED if result else _CAREER_UNCLAIM, (career_session_id,))
+        return result
+
+    def remove(self, career_session_id):
+        with self.backend.transaction() as conn:
+            row = conn.execute(_CAREER_SELECT, (career_session_id,)).fetchone()
+            conn.execute(_CAREER_DELETE, (career_session_id,))
+        return CareerSession.from_dict(json.loads(row[0])) if row else None
+
+    def find_paused_by_email(self, user_email):
+        with self.backend.connection() as conn:
+            row = conn.execute(_CAREER_FIND_PAUSED, (user_email,)).fetchone()
+        return row[0] if row else None
+
+    def find_by_user(self, user_id):
+        with self.backend.connection() as conn:
+            return [row[0] for row in conn.execute(_CAREER_FIND_USER, (user_id,))]
+
+    def sweep(self):
+        now = time.time()
+        with self.backend.transaction() as conn:
+            # Paused the way pause() does it, so the row's data agrees with its state column
+            idle = 0
+            for (data,) in conn.execute(_CAREER_SELECT_IDLE, (now - self.idle_ttl,)).fetchall():
+                session = CareerSession.from_dict(json.loads(data))
+                session.pause(session.current_question_id)
+                conn.execute(_CAREER_UPDATE, (session.state, now, _encode(session.to_dict()), session.id))
+                idle += 1
+            expired = conn.execute(_CAREER_EXPIRE_PAUSED, (now - self.spill_ttl,)).rowcount
+        if idle or expired:
+            logger.info(f"Career session sweep: {idle} paused as idle, {expired} expired")
+
+    def _maybe_sweep(self):
+        if time.monotonic() < self._next_sweep or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_sweep = time.monotonic() + self.sweep_interval
+            self.sweep()
+        finally:
+            self._sweep_lock.release()
+
+    def _move(self, career_session_id, from_state, to_state, change=None):
+        # The state check, ``change`` and the update share one write transaction,
+        # so two workers cannot both pause (or resume) the same session.
+        with self.backend.transaction() as conn:
+            row = conn.execute(_CAREER_SELECT_STATE, (career_session_id, from_state)).fetchone()
+            if row is None:
+                return None
+            session = CareerSession.from_dict(json.loads(row[0]))
+            session.state = to_state
+            if change is not None:
+                change(session)
+            conn.execute(_CAREER_UPDATE, (to_state, time.time(), _encode(session.to_dict()), career_session_id))
+        return session
@@ -0,0 +1,81 @@
+"""
+Career Counseling Realtime Voice Assistant - State Coalescer
+This module rate-limits animation/state fan-out so only the latest state per frame is sent
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class StateCoalescer:
+    """Coalesce bursts of state events per (room, event) to one per frame.
+
+    The first state in a frame is emitted immediately. States that arrive
+    before ``frame_interval`` has passed replace each other, and only the most
+    recent one is emitted when the frame ends, so clients always settle on the
+    latest state without receiving every intermediate one.
+    """
+
+    def __init__(self, emit, start_task, sleep, frame_interval=0.05):
+        self._emit = emit
+        self._start_task = start_task
+        self._sleep = sleep
+        self.frame_interval = frame_interval
+        self._lock = threading.Lock()
+        self._slots = {}
+        self.stats = {'submitted': 0, 'emitted': 0, 'dropped': 0}
+
+    def submit(self, room, event, payload):
+        """Emit ``payload`` to ``room`` now, or defer it to the end of the current frame"""
+        key = (room, event)
+        with self._lock:
+            self.stats['submitted'] += 1
+            slot = self._slots.setdefault(key, {'last': 0.0, 'pending': None, 'scheduled': False})
+
+            if slot['scheduled']:
+                if slot['pending'] is not None:
+                    self.stats['dropped'] += 1
+                slot['pending'] = payload
+                return
+
+            wait = slot['last'] + self.frame_interval - time.monotonic()
+            if wait <= 0:
+                slot['last'] = time.monotonic()
+                self.stats['emitted'] += 1
+            else:
+                slot['pending'] = payload
+                slot['scheduled'] = True
+
+        if wait <= 0:
+            self._emit(event, payload, to=room)
+        else:
+            self._start_task(self._flush_later, key, wait)
+
+    def discard(self, room):
+        """Forget coalescing state for a room (e.g. after logout)"""
+        with self._lock:
+            for key in [k for k in self._slots if k[0] == room]:
+                del self._slots[key]
+
+    def _flush_later(self, key, wait):
+        self._sleep(wait)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                return
+            payload = slot['pending']
+            slot['pending'] = None
+            slot['scheduled'] = False
+            slot['last'] = time.monotonic()
+            if payload is None:
+                return
+            self.stats['emitted'] += 1
+
+        room, event = key
+        try:
+            self._emit(event, payload, to=room)
+        except Exception as e:
+            logger.error(f"Error emitting coalesced {event} to {room}: {e}")
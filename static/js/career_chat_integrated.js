@@ -24,8 +24,44 @@ document.addEventListener('DOMContentLoaded', function() {
     let audioStream = null;
     let dataChannel = null;
     let config = null;
+    let sessionBundle = null;
     let currentUserMessage = null;
     let isConnected = false;
+    let toolOutputsPending = false;
+    let toolCallsInFlight = 0;
+    let responseFinished = false;
+    let turnTiming = null;
+    let relayActive = false;  // Audio and events go through our server instead of WebRTC
+    let relayAudio = null;
+
+    // Relay audio: 24 kHz mono PCM16 both ways, sent up in 20 ms frames
+    const RELAY_SAMPLE_RATE = 24000;
+    const RELAY_FRAME_SAMPLES = 480;
+    const RELAY_CAPTURE_WORKLET = `
+        class RelayCapture extends AudioWorkletProcessor {
+            constructor() {
+                super();
+                this.frame = new Int16Array(${RELAY_FRAME_SAMPLES});
+                this.filled = 0;
+            }
+            process(inputs) {
+                const channel = inputs[0][0];
+                if (channel) {
+                    for (let i = 0; i < channel.length; i++) {
+                        const sample = Math.max(-1, Math.min(1, channel[i]));
+                        this.frame[this.filled++] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+                        if (this.filled === this.frame.length) {
+                            this.port.postMessage(this.frame.buffer, [this.frame.buffer]);
+                            this.frame = new Int16Array(${RELAY_FRAME_SAMPLES});
+                            this.filled = 0;
+                        }
+                    }
+                }
+                return true;
+            }
+        }
+        registerProcessor('relay-capture', RelayCapture);
+    `;
 
     // Animation States
     const AnimationStates = {
@@ -45,12 +81,9 @@ document.addEventListener('DOMContentLoaded', function() {
         isPaused: false,
         isResuming: false,  // Flag to indicate if we're resuming a session
         questionQueue: [],
-        requiredQuestions: [
-            'intro', 'academic_status', 'career_confusion', 'interests',
-            'skills', 'ai_fears', 'industry_preference', 'work_values',
-            'learning_style', 'obstacles', 'timeline', 'immediate_need'
-        ],
-        optionalQuestions: ['role_models', 'experience', 'support'],
+        requiredQuestions: [],  // Filled from QUESTION_BANK via the session bundle
+        optionalQuestions: [],
+        depthAction: null,  // Latest adjust_conversation_depth action, used by the question scheduler
         currentLanguage: 'english',  // Track current language: 'english' or 'hinglish'
         previousLanguage: 'english'   // Track previous turn language
     };
@@ -67,7 +100,14 @@ document.addEventListener('DOMContentLoaded', function() {
             const response = await fetch('/api/config');
             config = await response.json();
             
-            if (!config.api_key) {
+            // Prompt and tools compiled server-side; the versioned URL is cached long-term
+            const bundleResponse = await fetch(config.session_bundle_url);
+            sessionBundle = await bundleResponse.json();
+            const questions = sessionBundle.questions;
+            CareerState.requiredQuestions = Object.keys(questions).filter(q => questions[q].required);
+            CareerState.optionalQuestions = Object.keys(questions).filter(q => !questions[q].required);
+            
+            if (!config.realtime_configured) {
                 showError('API key not configured. Please check your environment variables.');
                 startBtn.disabled = true;
             }
@@ -222,6 +262,7 @@ document.addEventListener('DOMContentLoaded', function() {
         CareerState.responses = {};
         CareerState.isPaused = false;
         CareerState.isResuming = false;
+        CareerState.depthAction = null;
         CareerState.questionQueue = [...CareerState.requiredQuestions];
         console.log('Career state reset to initial values');
     }
@@ -299,17 +340,9 @@ document.addEventListener('DOMContentLoaded', function() {
         updateConnectionStatus('Connecting...');
 
         try {
-            // Step 1: Get ephemeral key from Azure OpenAI
-            const sessionResponse = await fetch(config.sessions_url, {
-                method: "POST",
-                headers: {
-                    "api-key": config.api_key,
-                    "Content-Type": "application/json"
-                },
-                body: JSON.stringify({
-                    model: config.deployment,
-                    voice: config.voice
-                })
+            // Step 1: Get a pre-minted ephemeral key from our server
+            const sessionResponse = await fetch(config.session_key_url, {
+                method: "POST"
             });
 
             if (!sessionResponse.ok) {
@@ -337,6 +370,14 @@ document.addEventListener('DOMContentLoaded', function() {
             
             // Set up data channel
             setupDataChannel();
+            
+            // Networks that block WebRTC fail here after the offer/answer succeeded
+            peerConnection.onconnectionstatechange = () => {
+                if (peerConnection?.connectionState === 'failed' && config.relay_enabled && !relayActive) {
+                    console.warn('WebRTC connection failed, switching to the server relay');
+                    startRelay().catch(handleConnectionError);
+                }
+            };
 
             // Create offer
             const offer = await peerConnection.createOffer();
@@ -375,11 +416,119 @@ document.addEventListener('DOMContentLoaded', function() {
 
         } catch (error) {
             console.error('Connection error:', error);
-            showError(error.message);
-            startBtn.disabled = false;
-            stopBtn.disabled = true;
-            updateConnectionStatus('Disconnected');
-            setAnimationState(AnimationStates.IDLE);
+            // With a microphone but no WebRTC, stream the audio through our server instead
+            if (config.relay_enabled && audioStream && !relayActive) {
+                try {
+                    await startRelay();
+                    return;
+                } catch (relayError) {
+                    console.error('Relay connection error:', relayError);
+                }
+            }
+            handleConnectionError(error);
+        }
+    }
+
+    function handleConnectionError(error) {
+        if (peerConnection) {
+            peerConnection.close();
+            peerConnection = null;
+        }
+        if (relayActive) {
+            relayActive = false;
+            socket.emit('relay_stop');
+        }
+        stopRelayAudio();
+        showError(error.message);
+        startBtn.disabled = false;
+        stopBtn.disabled = true;
+        updateConnectionStatus('Disconnected');
+        setAnimationState(AnimationStates.IDLE);
+    }
+
+    // Relay the realtime session through our server (relay_* Socket.IO events)
+    async function startRelay() {
+        if (peerConnection) {
+            const failed = peerConnection;
+            peerConnection = null;
+            dataChannel = null;
+            failed.close();
+        }
+        
+        // The server opens the realtime connection and sends the session setup first
+        const reply = await new Promise((resolve) => {
+            socket.timeout(10000).emit('relay_start', { events: buildStartEvents() }, (err, reply) => {
+                resolve(err ? { success: false, error: 'Relay unavailable, please try again' } : reply);
+            });
+        });
+        if (!reply.success) {
+            throw new Error(reply.error);
+        }
+        relayActive = true;
+        await startRelayAudio();
+
+        stopBtn.disabled = false;
+        isConnected = true;
+        updateConnectionStatus('Connected');
+        setAnimationState(AnimationStates.IDLE);
+        hideError();
+        addMessage('system', 'Connected through the server! The career counselor will start the conversation now.');
+    }
+
+    async function startRelayAudio() {
+        const context = new AudioContext({ sampleRate: RELAY_SAMPLE_RATE });
+        const workletUrl = URL.createObjectURL(new Blob([RELAY_CAPTURE_WORKLET], { type: 'application/javascript' }));
+        try {
+            await context.audioWorklet.addModule(workletUrl);
+        } finally {
+            URL.revokeObjectURL(workletUrl);
+        }
+        await context.resume();
+        
+        // No outputs: the node runs for as long as the microphone feeds it
+        const capture = new AudioWorkletNode(context, 'relay-capture', { numberOfOutputs: 0 });
+        capture.port.onmessage = (event) => socket.emit('relay_audio', event.data);
+        const source = context.createMediaStreamSource(audioStream);
+        source.connect(capture);
+        relayAudio = { context, source, capture, playhead: 0, playing: new Set() };
+    }
+
+    // Queue one PCM16 chunk of the counselor's voice right after the previous one
+    function playRelayAudio(buffer) {
+        const samples = new Int16Array(buffer, 0, buffer.byteLength >> 1);
+        const { context } = relayAudio;
+        const audioBuffer = context.createBuffer(1, samples.length, RELAY_SAMPLE_RATE);
+        const channel = audioBuffer.getChannelData(0);
+        for (let i = 0; i < samples.length; i++) {
+            channel[i] = samples[i] / 0x8000;
+        }
+        
+        const node = context.createBufferSource();
+        node.buffer = audioBuffer;
+        node.connect(context.destination);
+        relayAudio.playhead = Math.max(relayAudio.playhead, context.currentTime);
+        node.start(relayAudio.playhead);
+        relayAudio.playhead += audioBuffer.duration;
+        relayAudio.playing.add(node);
+        node.onended = () => relayAudio?.playing.delete(node);
+    }
+
+    // The student talked over the counselor: drop what is still queued
+    function stopRelayPlayback() {
+        if (relayAudio) {
+            relayAudio.playing.forEach(node => node.stop());
+            relayAudio.playing.clear();
+            relayAudio.playhead = 0;
+        }
+    }
+
+    function stopRelayAudio() {
+        if (relayAudio) {
+            stopRelayPlayback();
+            relayAudio.source.disconnect();
+            relayAudio.capture.port.onmessage = null;
+            relayAudio.context.close();
+            relayAudio = null;
         }
     }
 
@@ -434,24 +583,12 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Send Career Counselor Session Update
     function sendCareerSessionUpdate() {
-        const sessionUpdate = {
-            type: "session.update",
-            session: {
-                instructions: getCareerCounselorPrompt(),
-                modalities: ["text", "audio"],
-                tools: getCareerTools(),
-                voice: "ash",
-                input_audio_format: "pcm16",
-                output_audio_format: "pcm16",
-                turn_detection: {
-                    type: "server_vad",
-                    threshold: 0.5,
-                    prefix_padding_ms: 300,
-                    silence_duration_ms: 350,
-                }
-            }
-        };
-        sendMessage(sessionUpdate);
+        buildStartEvents().forEach(sendMessage);
+    }
+
+    // session.update, the resume context if any, and the response.create that starts the conversation
+    function buildStartEvents() {
+        const events = [buildSessionUpdate()];
         
         // If resuming, send context about the session
         if (CareerState.isResuming) {
@@ -470,356 +607,41 @@ document.addEventListener('DOMContentLoaded', function() {
                     }]
                 }
             };
-            sendMessage(resumeContext);
+            events.push(resumeContext);
             
             // Reset the resuming flag
             CareerState.isResuming = false;
         }
         
         // Start the conversation
-        sendMessage({ type: "response.create" });
+        events.push({ type: "response.create" });
+        return events;
     }
 
-    // Get Career Counselor System Prompt (from realtime_prompts.py)
-    function getCareerCounselorPrompt() {
-        // Get the stored user name from localStorage or CareerState
-        const userName = CareerState.studentName || localStorage.getItem('user_name') || null;
-        
-        return `
-# Role & Objective
-You are a warm, empathetic career counselor specifically designed to help university students who feel lost about their career path. Your goal is to gather comprehensive information about their concerns, interests, skills, and fears through a structured but conversational interview.
-
-You are conducting a survey interview with 8-15 questions to understand:
-- Their current academic situation
-- Career aspirations and confusion points  
-- Skills and interests
-- Fears about AI and job automation
-- Industry preferences
-- Learning style and motivation
-
-# Personality & Tone
-## Personality
-- Empathetic, understanding career counselor who genuinely cares about student success
-- Patient listener who validates feelings of uncertainty
-- Knowledgeable about modern career paths and AI impact
-
-## Tone  
-- Warm, supportive, never judgmental
-- Encouraging but realistic
-- Professional yet approachable like a trusted mentor
-
-## Length
-- 2-3 sentences per response
-- Acknowledge their answer briefly before moving to next question
-
-## Language
-# CRITICAL LANGUAGE INSTRUCTIONS
-Current Turn Language Detected: ${CareerState.currentLanguage.toUpperCase()}
-Previous Turn Language: ${CareerState.previousLanguage.toUpperCase()}
-
-RESPONSE LANGUAGE RULES:
-${CareerState.currentLanguage === 'hinglish' ? `
-- YOU MUST RESPOND IN HINGLISH for this turn
-- Hinglish is a casual mix of English and Hindi used by Indian students
-- Example Hinglish: "Aapka interest kis field mein hai? Like tech, business ya kuch aur?"
-- Use Hinglish words naturally mixed with English: bhi, kya, kaise, achha, thik hai, matlab, samjh
-- Keep it semi-formal and friendly, not too formal as Indians prefer casual tone
-- Examples of Hinglish responses:
-  * "Achha, that's interesting! Aap currently kya padh rahe hain?"
-  * "Main samjh sakti hun, bahut students ko yeh confusion hota hai"
-  * "Thik hai, let me note that down. Ab bataiye ki..."
-  * "Bilkul sahi! Aapke skills kaafi achhe lag rahe hain"
-` : `
-- YOU MUST RESPOND IN ENGLISH for this turn
-- Use clear, simple English appropriate for university students
-- Keep the tone professional yet friendly
-- Avoid complex vocabulary unless necessary for career terms
-- Examples of English responses:
-  * "That's really insightful! What subjects interest you the most?"
-  * "I understand completely, many students face this confusion"
-  * "Great, let me capture that. Now, could you tell me about..."
-  * "Excellent! Your skills seem quite promising"
-`}
-
-- Always start the first conversation in English
-- If no language detected in current turn, use the previous turn's language
-- Students are from India, so adjust formality accordingly (semi-formal is preferred)
-- Avoid overly formal language as Indian students prefer friendly communication
-
-## Pacing
-- Speak at a moderate, calming pace
-- Allow natural pauses for student to think
-
-## Variety
-- Vary acknowledgments to avoid sounding robotic
-- Use different transition phrases between questions
-
-# Reference Pronunciations
-- Pronounce "AI" as "A-I" (letters separately)
-- Pronounce "UI/UX" as "U-I U-X"  
-- Pronounce "DevOps" as "dev-ops"
-- Pronounce "SQL" as "sequel"
-- Pronounce "API" as "A-P-I"
-etc..
-
-# Tools
-- Before any tool call, provide a brief acknowledgment like "Let me note that down" or "I'm capturing that"
-
-## CRITICAL: Language Detection Requirement
-- You MUST call detect_user_language for EVERY user input FIRST before any other actions
-- This is mandatory for every turn to ensure you respond in the correct language
-- Do not skip this step even if the language seems obvious
-- The tool will update the language state and ensure proper language continuity
-
-## detect_user_language(user_text, detected_language, confidence, Hinglish_words_found)
-Use when: ALWAYS - for EVERY user input as the FIRST action
-Do NOT skip: This is mandatory for proper language detection
-Purpose: Detects if user is speaking English or Hindi/Hinglish and updates language state
-
-## track_survey_response(question_id, response)
-Use when: Student provides a substantive answer to a survey question
-Do NOT use when: Student asks for clarification or makes small talk
-Preamble: "Let me capture that..."
-
-## determine_next_question(completed_questions, student_profile)  
-Use when: After recording a response, to determine the next question
-Do NOT use when: Student is still answering or asking for clarification
-Call immediately after track_survey_response
-
-## check_completion_status()
-Use when: Need to verify if enough information has been gathered
-Do NOT use when: In the middle of a question flow
-
-## end_session_summary()
-Use when: All necessary questions answered OR student requests to end
-Do NOT use when: Still gathering initial information
-
-## stop_conversation()
-Use when: User wants to pause, take a break, stop, or similar commands
-Do NOT use when: User is just taking time to think
-
-## trigger_logout()
-Use when: User says quit, exit, logout, or similar commands
-Do NOT use when: User just wants to pause or take a break
-
-# Instructions/Rules
-- ALWAYS introduce yourself and explain the purpose at the start
-- Ask ONE question at a time and wait for complete response
-- If answer is unclear or too brief, ask a gentle follow-up
-- Acknowledge emotions when students express fear or uncertainty
-- Use student's name occasionally if provided
-- Track which questions have been asked to avoid repetition
-- Be PROACTIVE with tool calls - don't ask for permission
-- When user wants to stop/pause, call stop_conversation tool
-- When user wants to quit/exit, call trigger_logout tool
-
-## Unclear Audio
-- If audio is unintelligible, say "I didn't quite catch that, could you repeat?"
-- After 2 unclear attempts, offer to move to next question
-
-## Emotional Support
-- When student expresses fear about outdated university syllabus/AI/jobs/: "That's a very valid concern that many students share"
-- When expressing confusion: "It's completely normal to feel uncertain at this stage"
-- When frustrated: "I understand this can feel overwhelming"
-
-# Conversation Flow
-
-## 1) Introduction
-Goal: Welcome student and explain the process
-How to respond:
-- Introduce yourself as their career counseling assistant
-- Explain you'll ask 10-15 questions to understand their situation
-- Assure them there are no wrong answers, mention what language you support that is english and Hindi do not mention Hinglish here buy always response in Hinglish as student think Hinglish is Hindi.
-- Use the student's name "${userName.split(" ")[0]}" throughout the conversation.
-Sample phrases:
-- "Hello ${userName.split(" ")[0]}! I'm your career counseling assistant, and I'm here to help you navigate your career path."
-- "We'll go through some questions to understand your interests and concerns better."
-Exit when: Introduction is acknowledged
-
-## 2) Academic_Status  
-Goal: Understand current education level and field
-How to respond:
-- Ask about year of study and major/field
-- If undecided major, acknowledge that's okay
-Sample phrases:
-- "Thanks [Name]! Let's start with where you are academically."
-- "What year are you in, and what's your major or field of study?"
-Exit when: Academic status is captured
-
-## 3) Career_Confusion
-Goal: Identify specific pain points about career decisions
-How to respond:
-- Ask what aspects of career planning feel most confusing
-- Probe for specific concerns
-Sample phrases:
-- "What aspects of choosing a career path feel most challenging for you right now?"
-- "Tell me about what makes you feel lost regarding your career."
-Exit when: Main confusion points identified
-
-## 4) Current_Interests
-Goal: Discover passions and interests
-How to respond:
-- Ask about subjects/activities they enjoy
-- Include both academic and personal interests
-Sample phrases:
-- "What subjects or activities do you find yourself most engaged with?"
-- "What do you enjoy learning about, even in your free time?"
-Exit when: 2-3 interests captured
-
-## 5) Skills_Assessment
-Goal: Identify perceived strengths
-How to respond:
-- Ask about skills they feel confident in
-- Encourage both technical and soft skills
-Sample phrases:
-- "What skills do you feel you're naturally good at?"
-- "What do others often ask for your help with?"
-Exit when: Key skills identified
-
-## 6) AI_Fears
-Goal: Understand concerns about automation
-How to respond:
-- Ask directly about AI/automation concerns
-- Validate feelings and probe for specifics
-Sample phrases:
-- "How do you feel about AI and automation affecting future job opportunities?"
-- "What specific concerns do you have about technology replacing human jobs?"
-Exit when: AI concerns thoroughly explored
-
-## 7) Industry_Preferences
-Goal: Identify sectors of interest
-How to respond:
-- Ask about industries that appeal to them
-- If unsure, ask what they definitely don't want
-Sample phrases:
-- "Are there any industries or sectors that particularly interest you?"
-- "What kind of work environment appeals to you?"
-Exit when: Industry preferences noted
-
-## 8) Work_Values
-Goal: Understand what matters in a career
-How to respond:
-- Ask about priorities (salary, impact, flexibility, etc.)
-- Get ranking of importance
-Sample phrases:
-- "What's most important to you in a career - things like salary, work-life balance, making an impact?"
-- "How would you prioritize those values?"
-Exit when: Core values identified
-
-## 9) Learning_Style
-Goal: Understand how they prefer to learn
-How to respond:
-- Ask about learning preferences
-- Include formal vs self-directed learning
-Sample phrases:
-- "How do you prefer to learn new skills - through courses, hands-on practice, or self-study?"
-- "What learning approach has worked best for you?"
-Exit when: Learning style captured
-
-## 10) Role_Models
-Goal: Identify career inspirations
-How to respond:
-- Ask about people they admire professionally
-- Can be anyone - real or fictional
-Sample phrases:
-- "Is there anyone whose career path you admire or find inspiring?"
-- "What about their journey appeals to you?"
-Exit when: Role model discussion complete
-
-## 11) Obstacles
-Goal: Identify perceived barriers
-How to respond:
-- Ask what they see as biggest obstacles
-- Include internal and external barriers
-Sample phrases:
-- "What do you see as the biggest obstacles to achieving your career goals?"
-- "What's holding you back from moving forward?"
-Exit when: Main obstacles identified
-
-## 12) Timeline_Pressure
-Goal: Understand urgency and pressure
-How to respond:
-- Ask about timeline expectations
-- Explore pressure from family/peers
-Sample phrases:
-- "Do you feel pressure to make career decisions by a certain time?"
-- "How does this timeline pressure affect you?"
-Exit when: Timeline concerns addressed
-
-## 13) Previous_Experience
-Goal: Learn about work/internship experience
-How to respond:
-- Ask about any work experience
-- Include internships, projects, volunteering
-Sample phrases:
-- "Have you had any work experience, internships, or projects that influenced your thinking?"
-- "What did you learn from those experiences?"
-Exit when: Experience documented
-
-## 14) Support_System
-Goal: Understand available support
-How to respond:
-- Ask about career guidance resources
-- Include family, mentors, career services
-Sample phrases:
-- "What kind of career support do you currently have access to?"
-- "Who do you turn to for career advice?"
-Exit when: Support system mapped
-
-## 15) Next_Steps
-Goal: Understand their immediate needs
-How to respond:
-- Ask what help would be most valuable
-- Get specific about next steps
-Sample phrases:
-- "What kind of guidance would be most helpful for you right now?"
-- "What's one thing that would make you feel less lost about your career?"
-Exit when: Immediate needs identified
-
-## Summary
-Goal: Confirm information and close
-How to respond:
-- Briefly summarize key points heard
-- Thank them for sharing
-- Explain next steps with the data
-Sample phrases:
-- "Thank you for sharing all of this with me, [Name]."
-- "I've captured your concerns about [main points]."
-- "This information will help create personalized career guidance for you."
-Exit when: Student acknowledges summary
-
-# Safety & Escalation
-When to suggest human support:
-- Expressions of severe anxiety or depression
-- Mentions of self-harm or hopelessness
-- Requests for specific job placement
-- Legal or financial advice needed
-- Academic emergency (failing, expulsion risk)
-
-What to say:
-- "It sounds like you could benefit from speaking with a human counselor who can provide more personalized support."
-- "I'd recommend connecting with your university's career services for hands-on assistance."
-
-# Sample Phrases
-Acknowledgments:
-- "That's really insightful."
-- "I appreciate you sharing that."
-- "That makes complete sense."
-- "Many students feel the same way."
-- "That's a great point."
-
-Transitions:
-- "Let's explore another aspect..."
-- "Building on that..."
-- "Now I'd like to understand..."
-- "Moving forward..."
-
-Empathy:
-- "That must be challenging."
-- "It's understandable to feel that way."
-- "You're not alone in this."
-
-# Current Session State
+    // Fill the per-session placeholders of the precompiled session.update bundle
+    function buildSessionUpdate() {
+        const userName = CareerState.studentName || localStorage.getItem('user_name') || '';
+        const language = CareerState.currentLanguage === 'hinglish' ? 'hinglish' : 'english';
+        const values = {
+            current_language: CareerState.currentLanguage.toUpperCase(),
+            previous_language: CareerState.previousLanguage.toUpperCase(),
+            language_instructions: sessionBundle.language_instructions[language],
+            student_first_name: userName.split(" ")[0],
+            session_state: getSessionStateContext()
+        };
+        
+        const template = sessionBundle.session_update;
+        const instructions = template.session.instructions.replace(
+            /\{(\w+)\}/g, (match, key) => (key in values ? values[key] : match)
+        );
+        // Turn detection tuned on recorded sessions (vad_tuning.py) comes with /api/config
+        const turn_detection = config.turn_detection || template.session.turn_detection;
+        return { ...template, session: { ...template.session, instructions, turn_detection } };
+    }
+
+    // Session state appended to the instructions (changes every session)
+    function getSessionStateContext() {
+        return `# Current Session State
 Session ID: ${CareerState.sessionId}
 Completed Questions: ${JSON.stringify(CareerState.completedQuestions)}
 Current Question: ${CareerState.currentQuestion || 'intro'}
@@ -843,316 +665,18 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
 `;
     }
 
-    // Get Career Tools Definition (from realtime_tools.py)
-    function getCareerTools() {
-        return [
-            {
-                type: "function",
-                name: "detect_user_language",
-                description: "Detect the language used by the user in their response. This tool MUST be called for EVERY user input to determine if they are speaking in English or Hinglish(Hindi). This ensures the counselor responds in the appropriate language.",
-                parameters: {
-                    type: "object",
-                    properties: {
-                        user_text: {
-                            type: "string",
-                            description: "The user's input text to analyze for language detection"
-                        },
-                        detected_language: {
-                            type: "string",
-                            description: "The detected language of the user's input",
-                            enum: ["english", "hinglishhinglish"]
-                        },
-                        confidence: {
-                            type: "string",
-                            description: "Confidence level of the language detection",
-                            enum: ["high", "medium", "low"]
-                        },
-                        Hinglish_words_found: {
-                            type: "array",
-                            items: { type: "string" },
-                            description: "List of Hinglish words or patterns detected in the input"
-                        }
-                    },
-                    required: ["user_text", "detected_language"]
-                }
-            },
-            {
-                type: "function",
-                name: "track_survey_response",
-                description: "Record a student's response to a survey question. Use this whenever a student provides a substantive answer to one of your questions.\n\nPreamble sample phrases:\n- \"Let me capture that...\"\n- \"I'm noting that down...\"\n- \"Let me record your response...\"\n- \"Got it, let me save that...\"",
-                parameters: {
-                    type: "object",
-                    properties: {
-                        question_id: {
-                            type: "string",
-                            description: "The ID of the question being answered (e.g., 'intro', 'academic_status', 'career_confusion')",
-                            enum: [
-                                "intro", "academic_status", "career_confusion", "interests",
-                                "skills", "ai_fears", "industry_preference", "work_values",
-                                "learning_style", "role_models", "obstacles", "timeline",
-                                "experience", "support", "immediate_need"
-                            ]
-                        },
-                        response: {
-                            type: "string",
-                            description: "The student's complete response to the question"
-                        },
-                        emotion_detected: {
-                            type: "string",
-                            description: "Any notable emotion detected in the response",
-                            enum: ["neutral", "anxious", "confused", "frustrated", "hopeful", "excited", "overwhelmed"]
-                        }
-                    },
-                    required: ["question_id", "response"]
-                }
-            },
-            {
-                type: "function",
-                name: "determine_next_question",
-                description: "Determine which question to ask next based on what has been covered and the student's profile. Call this immediately after tracking a response.",
-                parameters: {
-                    type: "object",
-                    properties: {
-                        completed_questions: {
-                            type: "array",
-                            items: { type: "string" },
-                            description: "List of question IDs that have already been asked"
-                        },
-                        student_profile: {
-                            type: "object",
-                            properties: {
-                                name: {
-                                    type: "string",
-                                    description: "Student's first name"
-                                },
-                                year: {
-                                    type: "string",
-                                    description: "Academic year (e.g., 'freshman', 'sophomore', 'junior', 'senior')"
-                                },
-                                major: {
-                                    type: "string",
-                                    description: "Current major or 'undecided'"
-                                },
-                                primary_concern: {
-                                    type: "string",
-                                    description: "Main career-related concern identified"
-                                }
-                            }
-                        },
-                        skip_optional: {
-                            type: "boolean",
-                            description: "Whether to skip optional questions to keep survey shorter",
-                            default: false
-                        }
-                    },
-                    required: ["completed_questions", "student_profile"]
-                }
-            },
-            {
-                type: "function",
-                name: "check_completion_status",
-                description: "Check if enough information has been gathered to complete the survey. Returns whether minimum required questions have been answered.",
-                parameters: {
-                    type: "object",
-                    properties: {
-                        responses_count: {
-                            type: "integer",
-                            description: "Number of substantive responses collected"
-                        },
-                        required_questions_answered: {
-                            type: "array",
-                            items: { type: "string" },
-                            description: "List of required question IDs that have been answered"
-                        },
-                        conversation_duration: {
-                            type: "integer",
-                            description: "Duration of conversation in minutes"
-                        }
-                    },
-                    required: ["responses_count", "required_questions_answered"]
-                }
-            },
-            {
-                type: "function",
-                name: "end_session_summary",
-                description: "Generate and save a comprehensive summary of the career counseling session. Use when all necessary questions are answered or student requests to end.\n\nPreamble sample phrases:\n- \"Let me summarize what we've discussed...\"\n- \"I'm preparing your session summary...\"\n- \"Let me compile everything we've covered...\"",
-                parameters: {
-                    type: "object",
-                    properties: {
-                        student_name: {
-                            type: "string",
-                            description: "Student's name"
-                        },
-                        session_data: {
-                            type: "object",
-                            properties: {
-                                academic_info: {
-                                    type: "object",
-                                    properties: {
-                                        year: { type: "string" },
-                                        major: { type: "string" }
-                                    }
-                                },
-                                career_concerns: {
-                                    type: "array",
-                                    items: { type: "string" },
-                                    description: "List of career-related concerns"
-                                },
-                                interests: {
-                                    type: "array",
-                                    items: { type: "string" },
-                                    description: "Identified interests and passions"
-                                },
-                                skills: {
-                                    type: "array",
-                                    items: { type: "string" },
-                                    description: "Self-identified skills"
-                                },
-                                ai_automation_fears: {
-                                    type: "string",
-                                    description: "Concerns about AI and job automation"
-                                },
-                                preferred_industries: {
-                                    type: "array",
-                                    items: { type: "string" }
-                                },
-                                work_values: {
-                                    type: "array",
-                                    items: { type: "string" },
-                                    description: "Prioritized career values"
-                                },
-                                obstacles: {
-                                    type: "array",
-                                    items: { type: "string" }
-                                },
-                                immediate_needs: {
-                                    type: "string",
-                                    description: "Most pressing need for career guidance"
-                                }
-                            }
-                        },
-                        recommendations: {
-                            type: "array",
-                            items: { type: "string" },
-                            description: "Initial recommendations based on the conversation"
-                        }
-                    },
-                    required: ["student_name", "session_data"]
-                }
-            },
-            {
-                type: "function",
-                name: "provide_clarification",
-                description: "Provide clarification or examples when a student doesn't understand a question or needs more context.",
-                parameters: {
-                    type: "object",
-                    properties: {
-                        question_id: {
-                            type: "string",
-                            description: "The question that needs clarification"
-                        },
-                        clarification_type: {
-                            type: "string",
-                            description: "Type of clarification needed",
-                            enum: ["definition", "example", "rephrase", "context"]
-                        }
-                    },
-                    required: ["question_id", "clarification_type"]
-                }
-            },
-            {
-                type: "function",
-                name: "detect_emotional_state",
-                description: "Detect and respond to student's emotional state, especially if they seem overwhelmed, anxious, or need support.",
-                parameters: {
-                    type: "object",
-                    properties: {
-                        detected_emotion: {
-                            type: "string",
-                            description: "Primary emotion detected",
-                            enum: ["anxiety", "overwhelm", "frustration", "confusion", "hopelessness", "neutral", "positive"]
-                        },
-                        intensity: {
-                            type: "string",
-                            description: "Intensity of the emotion",
-                            enum: ["mild", "moderate", "severe"]
-                        },
-                        trigger: {
-                            type: "string",
-                            description: "What triggered this emotional response"
-                        },
-                        support_needed: {
-                            type: "boolean",
-                            description: "Whether professional support should be suggested"
-                        }
-                    },
-                    required: ["detected_emotion", "intensity"]
-                }
-            },
-            {
-                type: "function",
-                name: "adjust_conversation_depth",
-                description: "Adjust the depth and pace of questioning based on student engagement and responses.",
-                parameters: {
-                    type: "object",
-                    properties: {
-                        current_engagement: {
-                            type: "string",
-                            description: "Student's current engagement level",
-                            enum: ["highly_engaged", "moderately_engaged", "low_engagement", "disengaged"]
-                        },
-                        adjustment_action: {
-                            type: "string",
-                            description: "How to adjust the conversation",
-                            enum: ["go_deeper", "maintain_pace", "speed_up", "wrap_up_soon"]
-                        },
-                        reason: {
-                            type: "string",
-                            description: "Reason for the adjustment"
-                        }
-                    },
-                    required: ["current_engagement", "adjustment_action"]
-                }
-            },
-            {
-                type: "function",
-                name: "stop_conversation",
-                description: "Stop the conversation when user wants to pause, stop, or take a break. This ends the current session but preserves data.",
-                parameters: {
-                    type: "object",
-                    properties: {
-                        save_progress: {
-                            type: "boolean",
-                            description: "Whether to save the conversation progress",
-                            default: true
-                        }
-                    },
-                    required: []
-                }
-            },
-            {
-                type: "function",
-                name: "trigger_logout",
-                description: "Trigger logout when user says quit, exit, logout, or similar commands. This will end the session and log the user out.",
-                parameters: {
-                    type: "object",
-                    properties: {
-                        confirm_logout: {
-                            type: "boolean",
-                            description: "Confirmation to proceed with logout",
-                            default: true
-                        }
-                    },
-                    required: []
-                }
-            }
-        ];
-    }
-
     // Handle Data Channel Messages with Career Tool Support
     function handleDataChannelMessage(event) {
         try {
-            const message = JSON.parse(event.data);
+            handleRealtimeEvent(JSON.parse(event.data));
+        } catch (error) {
+            console.error('Error processing message:', error);
+        }
+    }
+
+    // Realtime server events, from the data channel or relayed by our server
+    function handleRealtimeEvent(message) {
+        try {
             console.log('Received message:', message.type);
 
             switch (message.type) {
@@ -1165,17 +689,23 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
                     break;
                 case "input_audio_buffer.speech_started":
                     console.log("User started speaking");
+                    stopRelayPlayback();
+                    startTurnTiming();
                     setAnimationState(AnimationStates.USER_SPEAKING);
                     createUserMessageContainer();
                     break;
                 case "input_audio_buffer.speech_ended":
+                case "input_audio_buffer.speech_stopped":
                     console.log("User stopped speaking");
+                    markTurn('speech_stopped');
                     setAnimationState(AnimationStates.PROCESSING);
                     break;
                 case "conversation.item.input_audio_transcription.completed":
+                    markTurn('transcription_completed');
                     handleUserTranscript(message);
                     break;
                 case "response.function_call_arguments.done":
+                    markTurn('first_tool_call');
                     handleToolCall(message);
                     break;
                 case "error":
@@ -1183,6 +713,12 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
                     showError(message.error.message);
                     setAnimationState(AnimationStates.IDLE);
                     break;
+                case "relay.closed":
+                    // The server's realtime connection ended; a stop we asked for already cleared relayActive
+                    if (relayActive) {
+                        stopConversation();
+                    }
+                    break;
                 default:
                     console.log('Unhandled message type:', message.type);
             }
@@ -1192,51 +728,120 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
     }
 
     // Handle Tool Calls from the AI
-    function handleToolCall(message) {
+    async function handleToolCall(message) {
         console.log('Tool call received:', message);
         
         if (message.name && message.arguments) {
-            const args = JSON.parse(message.arguments);
+            // The response that made this call is still running
+            responseFinished = false;
+            toolCallsInFlight++;
+            const toolStarted = performance.now();
             let result = {};
-
-            switch(message.name) {
-                case 'detect_user_language':
-                    result = detectUserLanguage(args);
-                    break;
-                case 'track_survey_response':
-                    result = trackResponse(args);
-                    break;
-                case 'determine_next_question':
-                    result = getNextQuestion(args);
-                    break;
-                case 'check_completion_status':
-                    result = checkCompletion(args);
-                    break;
-                case 'end_session_summary':
-                    result = generateSummary(args);
-                    break;
-                case 'provide_clarification':
-                    result = provideClarification(args);
-                    break;
-                case 'detect_emotional_state':
-                    result = detectEmotionalState(args);
-                    break;
-                case 'adjust_conversation_depth':
-                    result = adjustConversationDepth(args);
-                    break;
-                case 'stop_conversation':
-                    result = handleStopConversation(args);
-                    break;
-                case 'trigger_logout':
-                    result = handleTriggerLogout(args);
-                    break;
-                default:
-                    console.warn('Unknown tool:', message.name);
-                    result = { success: false, error: 'Unknown tool' };
+            
+            try {
+                const args = JSON.parse(message.arguments);
+
+                switch(message.name) {
+                    case 'detect_user_language':
+                        result = detectUserLanguage(args);
+                        break;
+                    case 'record_response_and_get_next':
+                        result = await recordResponseAndGetNext(args);
+                        break;
+                    case 'track_survey_response':
+                        result = trackResponse(args);
+                        break;
+                    case 'determine_next_question':
+                        result = await getNextQuestion(args);
+                        break;
+                    case 'check_completion_status':
+                        result = await checkCompletion(args);
+                        break;
+                    case 'end_session_summary':
+                        result = generateSummary(args);
+                        break;
+                    case 'provide_clarification':
+                        result = provideClarification(args);
+                        break;
+                    case 'detect_emotional_state':
+                        result = detectEmotionalState(args);
+                        break;
+                    case 'adjust_conversation_depth':
+                        result = adjustConversationDepth(args);
+                        break;
+                    case 'stop_conversation':
+                        result = handleStopConversation(args);
+                        break;
+                    case 'trigger_logout':
+                        result = handleTriggerLogout(args);
+                        break;
+                    default:
+                        console.warn('Unknown tool:', message.name);
+                        result = { success: false, error: 'Unknown tool' };
+                }
+            } catch (error) {
+                console.error('Tool call failed:', error);
+                result = { success: false, error: error.message };
             }
 
             // Send tool result back
             sendToolResult(message.call_id, result);
+            if (turnTiming) {
+                turnTiming.tools.push({ name: message.name, ms: Math.round(performance.now() - toolStarted) });
+            }
+            toolCallsInFlight--;
+            continueAfterTools();
+        }
+    }
+
+    // A tool the server ran for a relayed session: bring the page's state up to date
+    function applyRelayToolResult(tool) {
+        markTurn('first_tool_call');
+        let args = {};
+        try {
+            args = JSON.parse(tool.arguments || '{}');
+        } catch (error) {
+            console.error('Relayed tool arguments are not JSON:', error);
+        }
+        const result = tool.result || {};
+        
+        switch (tool.name) {
+            case 'record_response_and_get_next':
+            case 'track_survey_response':
+            case 'determine_next_question':
+                if (result.success && tool.name !== 'determine_next_question') {
+                    trackResponse(args);
+                }
+                if (result.next_question) {
+                    CareerState.currentQuestion = result.next_question;
+                    saveSessionToStorage();
+                }
+                break;
+            case 'detect_user_language':
+                detectUserLanguage(args);
+                break;
+            case 'adjust_conversation_depth':
+                adjustConversationDepth(args);
+                break;
+            case 'detect_emotional_state':
+                detectEmotionalState(args);
+                break;
+            case 'end_session_summary':
+                if (result.success) {
+                    clearSessionFromStorage();
+                    addMessage('system', 'Session summary has been generated and saved.');
+                }
+                break;
+            case 'stop_conversation':
+                handleStopConversation(args);
+                break;
+            case 'trigger_logout':
+                handleTriggerLogout(args);
+                break;
+        }
+        
+        if (turnTiming) {
+            turnTiming.tools.push({ name: tool.name, ms: Math.round(tool.ms) });
         }
     }
 
@@ -1252,8 +857,50 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
         };
         sendMessage(toolResponse);
         
-        // Trigger response generation
-        sendMessage({ type: "response.create" });
+        // One response.create per model response (sent on response.done), however many tools it called
+        toolOutputsPending = true;
+    }
+
+    // Per-turn latency marks (ms since speech started), reported to the server's /metrics histograms
+    function startTurnTiming() {
+        // A turn interrupted by new speech is reported with the marks it reached
+        reportTurnTiming();
+        turnTiming = { started: performance.now(), marks: { speech_started: 0 }, tools: [] };
+    }
+
+    function markTurn(name) {
+        // Keep the first occurrence; response_done is overwritten until the turn ends
+        if (turnTiming && (name === 'response_done' || !(name in turnTiming.marks))) {
+            turnTiming.marks[name] = Math.round(performance.now() - turnTiming.started);
+        }
+    }
+
+    function reportTurnTiming() {
+        if (turnTiming) {
+            socket.emit('turn_timing', { marks: turnTiming.marks, tools: turnTiming.tools });
+            turnTiming = null;
+        }
+    }
+
+    // Let the model continue once its response is done and every tool output of it is sent
+    function continueAfterTools() {
+        if (toolOutputsPending && responseFinished && toolCallsInFlight === 0) {
+            toolOutputsPending = false;
+            sendMessage({ type: "response.create" });
+        }
+    }
+
+    // Ask the server-side scheduler (built from QUESTION_BANK) for the next question and completion status
+    function requestSchedule(params = {}) {
+        return new Promise((resolve) => {
+            socket.timeout(5000).emit('career_next_question', {
+                completed_questions: CareerState.completedQuestions,
+                adjustment_action: CareerState.depthAction,
+                skip_optional: !!params.skip_optional
+            }, (err, reply) => {
+                resolve(err ? { success: false, error: 'Question scheduler unavailable, please try again' } : reply);
+            });
+        });
     }
 
     // Career Counselor Tool Implementations
@@ -1290,82 +937,91 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
         };
     }
 
-    function getNextQuestion(params) {
+    // Fused track_survey_response + determine_next_question: one model round trip per answer
+    async function recordResponseAndGetNext(params) {
+        const recorded = trackResponse(params);
+        const schedule = await requestSchedule(params);
+        if (!schedule.success) {
+            return { ...schedule, recorded: params.question_id };
+        }
+        
+        if (schedule.next_question) {
+            CareerState.currentQuestion = schedule.next_question;
+            saveSessionToStorage();
+        }
+        
+        const result = {
+            success: true,
+            recorded: params.question_id,
+            completedCount: recorded.completedCount,
+            complete: schedule.complete,
+            is_complete: schedule.is_complete,
+            percentage: schedule.percentage,
+            student_name: CareerState.studentName || null
+        };
+        if (!schedule.complete) {
+            Object.assign(result, {
+                next_question: schedule.next_question,
+                question_text: schedule.question_text,
+                follow_up: schedule.follow_up,
+                is_optional: schedule.is_optional,
+                questions_remaining: schedule.questions_remaining
+            });
+        }
+        return result;
+    }
+
+    async function getNextQuestion(params) {
         const { completed_questions, skip_optional } = params;
         
         // Use the saved completed questions if resuming, otherwise use the passed parameter
-        const actualCompletedQuestions = CareerState.completedQuestions.length > 0 ? 
-            CareerState.completedQuestions : completed_questions;
-        
-        // Update completed questions
-        CareerState.completedQuestions = actualCompletedQuestions;
+        if (CareerState.completedQuestions.length === 0 && Array.isArray(completed_questions)) {
+            CareerState.completedQuestions = [...completed_questions];
+        }
         
-        // Find next unanswered required question
-        const unansweredRequired = CareerState.requiredQuestions.filter(
-            q => !actualCompletedQuestions.includes(q)
-        );
+        const schedule = await requestSchedule({ skip_optional });
+        if (!schedule.success) {
+            return schedule;
+        }
         
-        if (unansweredRequired.length > 0) {
-            CareerState.currentQuestion = unansweredRequired[0];
-            
-            // Save the updated state
-            saveSessionToStorage();
-            
+        if (schedule.complete) {
             return {
                 success: true,
-                next_question: unansweredRequired[0],
-                questions_remaining: unansweredRequired.length,
-                already_completed: actualCompletedQuestions,
-                student_name: CareerState.studentName || null
+                complete: true,
+                message: "All questions completed",
+                total_answered: schedule.completed_questions.length
             };
         }
         
-        // If all required done, check optional questions
-        if (!skip_optional) {
-            const unansweredOptional = CareerState.optionalQuestions.filter(
-                q => !actualCompletedQuestions.includes(q)
-            );
-            
-            if (unansweredOptional.length > 0) {
-                CareerState.currentQuestion = unansweredOptional[0];
-                
-                // Save the updated state
-                saveSessionToStorage();
-                
-                return {
-                    success: true,
-                    next_question: unansweredOptional[0],
-                    questions_remaining: unansweredOptional.length,
-                    is_optional: true,
-                    already_completed: actualCompletedQuestions,
-                    student_name: CareerState.studentName || null
-                };
-            }
-        }
+        CareerState.currentQuestion = schedule.next_question;
+        
+        // Save the updated state
+        saveSessionToStorage();
         
-        // All questions completed
         return {
             success: true,
-            complete: true,
-            message: "All questions completed",
-            total_answered: actualCompletedQuestions.length
+            next_question: schedule.next_question,
+            questions_remaining: schedule.questions_remaining,
+            is_optional: schedule.is_optional,
+            already_completed: schedule.completed_questions,
+            student_name: CareerState.studentName || null
         };
     }
 
-    function checkCompletion(params) {
-        const { responses_count, required_questions_answered } = params;
+    async function checkCompletion(params) {
+        const { responses_count } = params;
         
-        const minRequired = 8; // Minimum number of questions
-        const allRequiredCore = ['intro', 'academic_status', 'career_confusion', 'ai_fears', 'immediate_need'];
-        
-        const hasMinimum = responses_count >= minRequired;
-        const hasCoreQuestions = allRequiredCore.every(q => required_questions_answered.includes(q));
+        const schedule = await requestSchedule();
+        if (!schedule.success) {
+            return schedule;
+        }
         
         return {
             success: true,
-            is_complete: hasMinimum && hasCoreQuestions,
+            is_complete: schedule.is_complete,
             responses_count: responses_count,
-            percentage: Math.round((required_questions_answered.length / CareerState.requiredQuestions.length) * 100)
+            percentage: schedule.percentage,
+            skipped_questions: schedule.skipped_questions
         };
     }
 
@@ -1495,6 +1151,10 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
         
         console.log(`Adjusting conversation: ${adjustment_action} due to ${reason}`);
         
+        // The question scheduler skips optional (speed_up) or non-essential (wrap_up_soon) questions
+        CareerState.depthAction = adjustment_action;
+        saveSessionToStorage();
+        
         return {
             success: true,
             adjustment_made: true,
@@ -1607,6 +1267,20 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
 
     // Handle response done
     function handleResponseDone(message) {
+        markTurn('first_response_done');
+        markTurn('response_done');
+        
+        // Let the model continue once all tool outputs of this response are in
+        // (the server does that for relayed sessions)
+        const modelContinues = toolOutputsPending || toolCallsInFlight > 0 ||
+            (relayActive && !!message.response?.output?.some(item => item.type === 'function_call'));
+        responseFinished = true;
+        continueAfterTools();
+        if (!modelContinues) {
+            // The model's answer to this turn is complete
+            reportTurnTiming();
+        }
+        
         if (message.response?.output?.[0]?.content?.[0]?.transcript) {
             const transcript = message.response.output[0].content[0].transcript;
             
@@ -1652,9 +1326,12 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
         scrollToBottom();
     }
 
-    // Send message through data channel
+    // Send message through data channel (or the server relay)
     function sendMessage(message) {
-        if (dataChannel?.readyState === "open") {
+        if (relayActive) {
+            socket.emit('relay_send', message);
+            console.log('Relayed message:', message.type);
+        } else if (dataChannel?.readyState === "open") {
             dataChannel.send(JSON.stringify(message));
             console.log('Sent message:', message.type);
         }
@@ -1674,10 +1351,19 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
             dataChannel.close();
             dataChannel = null;
         }
+        if (relayActive) {
+            relayActive = false;
+            socket.emit('relay_stop');
+        }
+        stopRelayAudio();
         
         startBtn.disabled = false;
         stopBtn.disabled = true;
         isConnected = false;
+        toolOutputsPending = false;
+        toolCallsInFlight = 0;
+        responseFinished = false;
+        turnTiming = null;
         updateConnectionStatus('Disconnected');
         setAnimationState(AnimationStates.IDLE);
         
@@ -1782,6 +1468,37 @@ ${Object.entries(CareerState.responses).map(([qId, resp]) =>
         console.log('Animation state update:', data.state);
     });
 
+    socket.on('summary_persisted', (data) => {
+        console.log('Career summary persisted:', data);
+        if (!data.success) {
+            showError('Your session summary could not be saved on the server.');
+        }
+    });
+
+    socket.on('session_expired', (data) => {
+        // The server ended this session after a long idle period; career progress stays in localStorage
+        console.log('Session expired:', data);
+        if (isConnected) {
+            stopConversation();
+        }
+        addMessage('system', 'Your session ended after a period of inactivity. Please sign in again to continue where you left off.');
+        setTimeout(() => {
+            window.location.href = data.redirect || '/register';
+        }, 3000);
+    });
+
+    // Server relay: the counselor's audio, its other events and the tools the server ran
+    socket.on('relay_audio', (buffer) => {
+        if (relayAudio) {
+            playRelayAudio(buffer);
+            setAnimationState(AnimationStates.AI_SPEAKING);
+        }
+    });
+
+    socket.on('relay_event', handleRealtimeEvent);
+
+    socket.on('relay_tool', applyRelayToolResult);
+
     socket.on('career_session_saved', (data) => {
         console.log('Career session saved:', data);
         addMessage('system', 'Your career counseling session has been saved to the server.');
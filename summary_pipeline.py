@@ -0,0 +1,144 @@
+"""
+Career Counseling Realtime Voice Assistant - Summary Pipeline
+This module persists career counseling summaries from a bounded pool of background workers
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+from pathlib import Path
+
+from server_mode import run_blocking
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the standard library encoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def encode_summary(summary):
+    """Serialize a summary to indented UTF-8 JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(summary, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def write_atomic(path, data, fsync=True):
+    """Write ``data`` to a temp file next to ``path`` and rename it into place.
+
+    Readers (and the analytics scans) only ever see a missing or a complete
+    file, never a half-written one.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class SummaryPipeline:
+    """Bounded worker pool that encodes and writes summaries off the request path.
+
+    ``submit`` returns a job id straight away; ``on_done(job_id, path, error,
+    context)`` is called from the worker once the file is in place (``error``
+    is None on success). The queue is bounded so a burst applies backpressure
+    instead of growing memory, and ``stop`` drains it before returning.
+    """
+
+    def __init__(self, workers=4, max_queue=1000, on_done=None, fsync=True):
+        self.on_done = on_done
+        self.fsync = fsync
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._cond = threading.Condition()
+        self._unfinished = 0
+        self._stopped = False
+        self.stats = {'queued': 0, 'written': 0, 'errors': 0, 'backpressure_waits': 0}
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f'summary-writer-{n}', daemon=True)
+            for n in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, path, summary, context=None):
+        """Queue ``summary`` to be written to ``path`` and return its job id"""
+        job_id = uuid.uuid4().hex
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError('Summary pipeline is stopped')
+            self._unfinished += 1
+            self.stats['queued'] += 1
+            if self._queue.full():
+                self.stats['backpressure_waits'] += 1
+        self._queue.put((job_id, path, summary, context))
+        return job_id
+
+    def pending(self):
+        """Number of summaries queued or being written"""
+        with self._cond:
+            return self._unfinished
+
+    def drain(self, timeout=None):
+        """Wait until every submitted summary is written; False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def stop(self, timeout=10.0):
+        """Refuse new jobs, drain the queue and stop the workers"""
+        with self._cond:
+            if self._stopped:
+                return self._unfinished == 0
+            self._stopped = True
+        drained = self.drain(timeout)
+        if not drained:
+            logger.error(f"Summary pipeline stopped with {self.pending()} summaries unwritten")
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                # Workers still stuck on a full queue are daemon threads; do not block exit on them
+                break
+        return drained
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job_id, path, summary, context = item
+
+            error = None
+            try:
+                run_blocking(self._write, path, summary)
+            except Exception as e:
+                error = str(e)
+                logger.error(f"Error saving career summary {path}: {e}")
+
+            with self._cond:
+                self.stats['errors' if error else 'written'] += 1
+            if self.on_done is not None:
+                try:
+                    self.on_done(job_id, str(path), error, context)
+                except Exception as e:
+                    logger.error(f"Error in summary completion callback for {job_id}: {e}")
+
+            with self._cond:
+                self._unfinished -= 1
+                if self._unfinished == 0:
+                    self._cond.notify_all()
+
+    def _write(self, path, summary):
+        write_atomic(path, encode_summary(summary), fsync=self.fsync)
@@ -0,0 +1,16 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The app is flat top-level modules; make them importable however pytest is started
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """The app, imported once with its relative sessions/ directory in a temporary one"""
+    os.chdir(tmp_path_factory.mktemp('app'))
+    import app
+    return app
@@ -0,0 +1,46 @@
+"""
+Career journal compaction: a segment opened by a rotation while compaction
+runs stays live, so nothing appended to it is lost.
+"""
+
+import threading
+
+import career_journal
+from career_journal import CareerJournal
+from career_record import CareerSession
+
+
+def create(journal, n):
+    session = CareerSession(f'career_{n}', 'user_1', 'Student', 'student@example.com')
+    journal.append('create', session.id, session=session.to_dict())
+
+
+def test_rotation_during_compaction_keeps_the_live_segment(tmp_path, monkeypatch):
+    journal = CareerJournal(tmp_path, segment_entries=3)
+    journal.recover()
+    create(journal, 0)
+    create(journal, 1)
+
+    real_segments = career_journal._segments
+
+    def rotate_while_listing(directory):
+        # Another handler's append fills the segment and rotates, racing compaction's listing
+        rotation = threading.Thread(target=create, args=(journal, 2))
+        rotation.start()
+        rotation.join(0.5)
+        listed = real_segments(directory)
+        rotations.append(rotation)
+        return listed
+
+    rotations = []
+    monkeypatch.setattr(career_journal, '_segments', rotate_while_listing)
+    journal.compact()
+    monkeypatch.setattr(career_journal, '_segments', real_segments)
+    rotations[0].join(5)
+
+    for n in range(3, 5):
+        create(journal, n)
+    journal.stop()
+
+    recovered = CareerJournal(tmp_path).recover()
+    assert sorted(recovered['sessions']) == [f'career_{n}' for n in range(5)]
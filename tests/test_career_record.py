@@ -0,0 +1,51 @@
+"""
+Career session records: made-up question ids never become bits past the
+question bank, and completed questions keep the order they were answered in.
+"""
+
+from career_record import QUESTIONS, CareerSession
+from question_scheduler import scheduler
+from realtime_prompts import QUESTION_BANK
+
+
+def new_session():
+    return CareerSession('career_1', 'user_1', 'Student', 'student@example.com')
+
+
+def test_unknown_question_id_is_skipped():
+    session = new_session()
+    size = len(QUESTIONS)
+    assert not session.record_response('favourite_colour', 'blue', 'hopeful')
+    assert len(QUESTIONS) == size
+    assert session.completed == 0 and session.responses == {} and session.emotional_trajectory == []
+    assert scheduler.schedule(session.completed)['next_question'] == next(iter(QUESTION_BANK))
+
+
+def test_scheduler_ignores_bits_past_the_bank():
+    past_the_bank = 1 << len(QUESTION_BANK)
+    assert scheduler.ids(past_the_bank | 1) == [next(iter(QUESTION_BANK))]
+    assert scheduler.schedule(past_the_bank)['completed_questions'] == []
+
+
+def test_completed_questions_keep_answer_order():
+    session = new_session()
+    for question_id in ('career_confusion', 'intro', 'ai_fears', 'intro'):
+        assert session.record_response(question_id, 'an answer', 'neutral')
+    assert session.completed_questions == ['career_confusion', 'intro', 'ai_fears']
+    restored = CareerSession.from_dict(session.to_dict())
+    assert restored.completed_questions == ['career_confusion', 'intro', 'ai_fears']
+    assert CareerSession.from_state(session.to_state()).completed_questions == restored.completed_questions
+
+
+def test_old_records_with_unknown_ids_still_load():
+    data = new_session().to_dict()
+    data['completed_questions'] = ['intro', 'retired_question']
+    data['responses'] = {
+        'intro': {'response': 'hi', 'timestamp': '2025-01-01T10:00:00', 'emotion': 'neutral'},
+        'retired_question': {'response': 'old', 'timestamp': '2025-01-01T10:01:00', 'emotion': 'neutral'},
+    }
+    data['emotional_trajectory'] = [
+        {'question_id': 'retired_question', 'emotion': 'anxious', 'timestamp': '2025-01-01T10:01:00'}]
+    session = CareerSession.from_dict(data)
+    assert session.completed_questions == ['intro']
+    assert list(session.responses) == ['intro'] and session.emotional_trajectory == []
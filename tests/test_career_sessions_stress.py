@@ -0,0 +1,58 @@
+"""
+A bounded run of benchmarks/stress_career_sessions.py: threads pausing,
+resuming, answering and completing the same career sessions must leave
+every session in one place, the indexes consistent, each session
+completed at most once and the journal replaying to the same state.
+"""
+
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+from career_journal import CareerJournal  # noqa: E402
+from career_registry import CareerSessionRegistry  # noqa: E402
+from session_shards import DEFAULT_STRIPES  # noqa: E402
+from stress_career_sessions import check, worker  # noqa: E402
+
+THREADS = 8
+OPS = 300
+SESSIONS = 16
+
+
+@pytest.fixture
+def switch_often():
+    # Many short critical sections: switch threads often so they really interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.mark.parametrize('shards', [1, DEFAULT_STRIPES])
+def test_concurrent_session_operations_keep_invariants(app_module, tmp_path, switch_often, shards):
+    # Capacity below the pool, so sessions spill and come back while they are being worked on
+    registry = CareerSessionRegistry(tmp_path / 'paused', max_sessions=12, shards=shards)
+    journal = CareerJournal(tmp_path / 'journal', segment_entries=200)
+    journal.recover()
+    manager = app_module.CareerCounselingManager(registry, app_module.summary_pipeline, journal)
+
+    pool = [(manager.create_career_session(f'user_{n}', 'Stress', f'student{n}@example.com'),
+             f'student{n}@example.com') for n in range(SESSIONS)]
+    pool_lock = threading.Lock()
+    completed, errors = Counter(), []
+    threads = [threading.Thread(target=worker, args=(manager, pool, pool_lock, OPS, completed, errors, seed))
+               for seed in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    app_module.summary_pipeline.drain(timeout=30)
+    journal.stop()
+
+    assert sum(completed.values()) > 0
+    assert check(registry, tmp_path / 'journal', completed, errors) == []
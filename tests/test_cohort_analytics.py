@@ -0,0 +1,139 @@
+"""
+Cohort report: the aggregates counselors read (confusion themes, AI fears,
+emotion mix per question, completion), under each Socket.IO async mode (the
+process pool must not be used once eventlet or gevent has patched the
+process), and from the app started as a script, where the parser processes
+must not repeat the app's startup work.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from realtime_prompts import QUESTION_BANK
+
+ROOT = Path(__file__).resolve().parent.parent
+REQUIRED = [q for q, spec in QUESTION_BANK.items() if spec['required']]
+
+# Runs in a fresh interpreter so monkey patching does not leak into pytest
+SCRIPT = """
+import json, sys
+import server_mode
+server_mode.monkey_patch()
+from cohort_analytics import CohortAnalytics
+analytics = CohortAnalytics(sys.argv[1], workers=2, parallel_threshold=1, batch_size=2)
+report = server_mode.run_blocking(analytics.report)
+print(json.dumps(report))
+"""
+
+# Three kinds of student; write_summaries repeats them ``copies`` times
+STUDENTS = [
+    # Every required question answered
+    {q: ('final year engineering student', 'neutral') for q in REQUIRED} | {
+        'career_confusion': ('Too many options and my parents pressure me', 'confused'),
+        'ai_fears': ('AI will replace my job', 'anxious'),
+    },
+    {q: ('I like building things', 'hopeful') for q in REQUIRED} | {
+        'career_confusion': ('No idea what the job market wants', 'overwhelmed'),
+        'ai_fears': ('I see it as an opportunity', 'excited'),
+    },
+    # Stopped after two questions
+    {
+        'academic_status': ('second year commerce', 'neutral'),
+        'career_confusion': ('So many paths, not sure', 'confused'),
+    },
+]
+
+
+def write_summaries(directory, copies=2):
+    directory.mkdir(parents=True, exist_ok=True)
+    for n in range(copies * len(STUDENTS)):
+        answers = STUDENTS[n % len(STUDENTS)]
+        summary = {
+            'session_id': f'session-{n}',
+            'timing': {'end': '2025-01-01T10:00:00', 'duration_minutes': 10 + n},
+            'completed_questions': list(answers),
+            'responses': {q: {'response': text, 'emotion': emotion} for q, (text, emotion) in answers.items()},
+        }
+        (directory / f'session-{n}_summary.json').write_text(json.dumps(summary), encoding='utf-8')
+
+
+def check_report(report, copies=2):
+    assert report['sessions'] == 3 * copies
+    assert report['cache']['errors'] == 0
+
+    confusion = {row['theme']: row['sessions'] for row in report['career_confusion_themes'] if row['sessions']}
+    assert confusion == {'too_many_options': 2 * copies, 'family_pressure': copies,
+                         'lack_of_information': 2 * copies, 'job_market': copies}
+    assert report['career_confusion_themes'][0]['share'] == pytest.approx(2 / 3, abs=1e-4)
+
+    fears = {row['theme']: row['sessions'] for row in report['ai_fears_distribution'] if row['sessions']}
+    assert fears == {'job_replacement': copies, 'optimistic': copies}
+
+    mix = report['emotion_mix']
+    assert mix['career_confusion'] == {'confused': 2 * copies, 'overwhelmed': copies}
+    assert mix['ai_fears'] == {'anxious': copies, 'excited': copies}
+    assert mix['academic_status'] == {'neutral': 2 * copies, 'hopeful': copies}
+
+    completion = report['completion']
+    assert completion['fully_completed_rate'] == pytest.approx(2 / 3, abs=1e-4)
+    assert completion['per_question']['academic_status'] == 1.0
+    assert completion['per_question']['ai_fears'] == pytest.approx(2 / 3, abs=1e-4)
+    assert completion['per_question']['role_models'] == 0.0
+    assert completion['mean_questions_answered'] == pytest.approx((2 * len(REQUIRED) + 2) / 3, abs=0.01)
+
+
+def test_parser_processes_are_not_forked_from_the_server():
+    import cohort_analytics
+    assert cohort_analytics._POOL_CONTEXT.get_start_method() in ('forkserver', 'spawn')
+
+
+@pytest.mark.parametrize('mode', ['threading', 'eventlet', 'gevent'])
+def test_report_under_async_mode(tmp_path, mode):
+    if mode != 'threading':
+        pytest.importorskip(mode)
+    write_summaries(tmp_path)
+    env = dict(os.environ, SOCKETIO_ASYNC_MODE=mode, PYTHONPATH=str(ROOT))
+    result = subprocess.run([sys.executable, '-c', SCRIPT, str(tmp_path)], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report['cache']['parsed'] == 6
+    check_report(report)
+
+
+def test_app_script_parses_in_a_pool_without_repeating_startup(tmp_path):
+    sys.path.insert(0, str(ROOT / 'benchmarks'))
+    from harness import free_port, wait_for_port
+
+    # Enough files for the pool (parallel_threshold is 64)
+    copies = 30
+    write_summaries(tmp_path / 'sessions' / 'career_summaries', copies)
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=str(ROOT), FLASK_ENV='development', PORT=str(port),
+               ADMIN_TOKEN='admin', ANALYTICS_WORKERS='2')
+    # A terminal on stdin, as when a developer runs it; Flask-SocketIO refuses Werkzeug otherwise
+    terminal, stdin = os.openpty()
+    server = subprocess.Popen([sys.executable, str(ROOT / 'app.py')], cwd=tmp_path, env=env, stdin=stdin,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        wait_for_port(port)
+        request = urllib.request.Request(f'http://127.0.0.1:{port}/api/admin/analytics',
+                                         headers={'X-Admin-Token': 'admin'})
+        with urllib.request.urlopen(request, timeout=60) as response:
+            report = json.loads(response.read())
+        time.sleep(0.5)
+    finally:
+        server.terminate()
+        _, log = server.communicate(timeout=30)
+        os.close(terminal)
+        os.close(stdin)
+    check_report(report, copies)
+    # The fork server imports app.py too, but only the server recovers the journal
+    assert log.count('career sessions from the journal') == 1, log
@@ -0,0 +1,85 @@
+"""
+Columnar export: a run that dies before its manifest write leaves nothing
+that scan reads twice, and malformed summaries are skipped and counted.
+"""
+
+import json
+
+import pytest
+
+import columnar_export
+from columnar_export import ColumnarExporter, scan
+
+
+def write_summary(directory, session_id, answers, end='2026-10-01T10:00:00'):
+    summary = {
+        'session_id': session_id,
+        'timing': {'start': '2026-10-01T09:30:00', 'end': end, 'duration_minutes': 30},
+        'responses': {
+            f'q{n}': {'response': f'answer {n}', 'emotion': 'hopeful', 'timestamp': '2026-10-01T09:40:00'}
+            for n in range(answers)
+        },
+    }
+    (directory / f'{session_id}_summary.json').write_text(json.dumps(summary), encoding='utf-8')
+
+
+@pytest.fixture(params=columnar_export.FORMATS)
+def exporter(request, tmp_path):
+    summaries = tmp_path / 'career_summaries'
+    summaries.mkdir()
+    return ColumnarExporter(summaries, tmp_path / 'export', fmt=request.param)
+
+
+def test_crash_before_manifest_write_does_not_duplicate_rows(exporter, monkeypatch):
+    write_summary(exporter.summary_dir, 'first', answers=3)
+    assert exporter.export()['rows'] == 3
+    write_summary(exporter.summary_dir, 'second', answers=2, end='2026-10-02T10:00:00')
+
+    real_write_atomic = columnar_export.write_atomic
+
+    def crash_on_manifest(path, data):
+        if path == exporter.manifest_path:
+            raise OSError('killed')
+        real_write_atomic(path, data)
+
+    monkeypatch.setattr(columnar_export, 'write_atomic', crash_on_manifest)
+    with pytest.raises(OSError):
+        exporter.export()
+    monkeypatch.setattr(columnar_export, 'write_atomic', real_write_atomic)
+
+    # The orphaned part is on disk but not committed
+    assert len(list(exporter.export_dir.glob('date=*/part-*'))) == 2
+    assert len(scan(exporter.export_dir)['session_id']) == 3
+
+    stats = exporter.export()
+    assert stats['sessions'] == 1 and stats['rows'] == 2
+    assert len(list(exporter.export_dir.glob('date=*/part-*'))) == 2
+    sessions = list(scan(exporter.export_dir)['session_id'])
+    assert sorted(sessions) == ['first'] * 3 + ['second'] * 2
+
+
+def test_version_1_manifest_keeps_its_parts(exporter):
+    write_summary(exporter.summary_dir, 'first', answers=3)
+    exporter.export()
+    manifest = json.loads(exporter.manifest_path.read_text())
+    del manifest['parts']
+    manifest['version'] = 1
+    exporter.manifest_path.write_text(json.dumps(manifest))
+
+    assert len(scan(exporter.export_dir)['session_id']) == 3
+    write_summary(exporter.summary_dir, 'second', answers=1)
+    assert exporter.export()['sessions'] == 1
+    assert len(scan(exporter.export_dir)['session_id']) == 4
+    assert json.loads(exporter.manifest_path.read_text())['version'] == columnar_export.MANIFEST_VERSION
+
+
+@pytest.mark.parametrize('responses', [['q1', 'q2'], 'not a dict', {'q1': 'plain string'}, {'q1': ['a']}])
+def test_malformed_responses_are_skipped(exporter, responses):
+    write_summary(exporter.summary_dir, 'good', answers=2)
+    (exporter.summary_dir / 'bad_summary.json').write_text(
+        json.dumps({'session_id': 'bad', 'responses': responses}), encoding='utf-8')
+
+    stats = exporter.export()
+    assert stats['errors'] == 1
+    assert stats['sessions'] == 1 and stats['rows'] == 2
+    assert list(scan(exporter.export_dir)['session_id']) == ['good', 'good']
@@ -0,0 +1,82 @@
+"""
+Conversation buffer: paging history back past the turns kept in memory
+reads the rest through ``read_older`` with the right turn numbers, and the
+memory accounting follows eviction.
+"""
+
+from conversation_buffer import ConversationBuffer
+
+SESSION = 'session-1'
+
+
+def turn(n):
+    return {'timestamp': f'10:00:{n:02d}', 'role': 'user' if n % 2 else 'assistant', 'message': f'turn {n:02d}'}
+
+
+class Transcript:
+    """Stands in for the transcript file: every turn ever logged, numbered from 0"""
+
+    def __init__(self, count):
+        self.turns = [turn(n) for n in range(count)]
+        self.reads = []
+
+    def read_older(self, start, stop):
+        self.reads.append((start, stop))
+        return self.turns[start:stop]
+
+
+def fill(count, max_turns):
+    buffer = ConversationBuffer(max_turns=max_turns)
+    for n in range(count):
+        entry = turn(n)
+        buffer.append(SESSION, entry['timestamp'], entry['role'], entry['message'])
+    return buffer
+
+
+def test_paging_back_past_max_turns_reads_the_transcript():
+    buffer, transcript = fill(25, max_turns=10), Transcript(25)
+
+    pages, before = [], None
+    while True:
+        page = buffer.history(SESSION, transcript.read_older, before=before, limit=4)
+        assert page['total'] == 25
+        pages.append(page['turns'])
+        if page['start'] == 0:
+            break
+        before = page['start']
+
+    # Newest page first; together they are every turn exactly once, in order
+    assert [entry for page in reversed(pages) for entry in page] == transcript.turns
+    assert [len(page) for page in pages] == [4, 4, 4, 4, 4, 4, 1]
+    # Turns 15-24 are in memory; pages reaching below 15 read only what memory lacks
+    assert transcript.reads == [(13, 15), (9, 13), (5, 9), (1, 5), (0, 1)]
+    assert buffer.stats['disk_reads'] == 5
+
+
+def test_page_straddling_memory_and_transcript():
+    buffer, transcript = fill(25, max_turns=10), Transcript(25)
+    page = buffer.history(SESSION, transcript.read_older, before=18, limit=6)
+    assert page['start'] == 12
+    assert page['turns'] == transcript.turns[12:18]
+    assert transcript.reads == [(12, 15)]
+
+
+def test_recent_pages_do_not_read_the_transcript():
+    buffer, transcript = fill(25, max_turns=10), Transcript(25)
+    page = buffer.history(SESSION, transcript.read_older, limit=10)
+    assert page['turns'] == transcript.turns[15:] and page['start'] == 15
+    assert transcript.reads == []
+    assert buffer.recent(SESSION, limit=3) == transcript.turns[22:]
+
+
+def test_memory_accounting_follows_eviction():
+    small, large = fill(10, max_turns=10), fill(40, max_turns=10)
+    usage = large.memory_usage()[SESSION]
+    assert usage['turns_in_memory'] == 10 and usage['turns_total'] == 40
+    # Same message lengths in memory, so the same bytes however many were evicted
+    assert usage['bytes'] == small.memory_usage()[SESSION]['bytes']
+    assert large.stats['evicted'] == 30
+
+    large.discard(SESSION)
+    assert SESSION not in large.memory_usage()
+    assert large.history(SESSION, Transcript(0).read_older) == {'turns': [], 'start': 0, 'total': 0}
@@ -0,0 +1,147 @@
+"""
+A career session survives the server being killed mid-session, and the
+development server does its startup work (journal recovery) only once.
+
+The crash test starts the app as a real server, has a student answer part
+of the survey, kills the server with SIGKILL (no atexit, no flush beyond
+what the journal already did), starts it again in the same directory and
+checks that the student can resume by email with every answer and emotion
+intact, then finishes the session and checks the written summary.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+socketio = pytest.importorskip('socketio')
+aiohttp = pytest.importorskip('aiohttp')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+from harness import ROOT, free_port, spawn_server, wait_for_port  # noqa: E402
+from realtime_prompts import QUESTION_BANK  # noqa: E402
+
+EMAIL = 'crash@example.com'
+EMOTIONS = ['anxious', 'confused', 'hopeful', 'excited', 'overwhelmed', 'neutral']
+REPLIES = ('career_started', 'career_response_saved', 'career_resumed', 'career_progress',
+           'summary_saved', 'career_error')
+
+
+class Student:
+    def __init__(self, url):
+        self.url = url
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.replies = asyncio.Queue()
+        for reply in REPLIES:
+            self.client.on(reply, self._make_handler(reply))
+
+    def _make_handler(self, reply):
+        async def handler(data=None):
+            await self.replies.put((reply, data))
+        return handler
+
+    async def connect(self, http):
+        async with http.post(f'{self.url}/api/register', json={'email': EMAIL, 'name': 'Crash Test'}) as r:
+            r.raise_for_status()
+        cookie = '; '.join(f'{c.key}={c.value}' for c in http.cookie_jar)
+        await self.client.connect(self.url, headers={'Cookie': cookie}, transports=['websocket'])
+
+    async def call(self, event, data=None, expect=None):
+        await self.client.emit(event, data) if data is not None else await self.client.emit(event)
+        reply, payload = await asyncio.wait_for(self.replies.get(), timeout=30)
+        assert reply == expect, f"{event}: expected {expect}, got {reply} {payload}"
+        return payload
+
+    async def ack(self, event, data):
+        return await self.client.call(event, data, timeout=30)
+
+
+async def answer(student, question_ids, when, emotions):
+    for n, question_id in enumerate(question_ids):
+        await student.call('career_response', {
+            'question_id': question_id,
+            'response': f'Answer to {question_id} {when}',
+            'emotion': emotions[n % len(emotions)],
+        }, expect='career_response_saved')
+
+
+async def crash_and_resume(workdir, answers):
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as http:
+        server, url = spawn_server(cwd=workdir)
+        student = Student(url)
+        try:
+            await student.connect(http)
+            started = await student.call('career_start', expect='career_started')
+            career_session_id = started['career_session_id']
+            await answer(student, list(QUESTION_BANK)[:answers], 'before the crash', EMOTIONS)
+            await student.ack('career_next_question', {'adjustment_action': 'go_deeper'})
+            before = await student.call('career_progress', expect='career_progress')
+        finally:
+            # The server dies under a live session
+            server.send_signal(signal.SIGKILL)
+            server.wait()
+            await student.client.disconnect()
+
+    # A new browser session: the old cookie was signed with the dead process's secret
+    async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as http:
+        server, url = spawn_server(cwd=workdir)
+        student = Student(url)
+        try:
+            await student.connect(http)
+            resumed = await student.call('career_resume', {}, expect='career_resumed')
+            assert resumed['career_session_id'] == career_session_id
+            after = await student.call('career_progress', expect='career_progress')
+            for key in ('completed_questions', 'emotional_trajectory'):
+                assert after[key] == before[key], key
+
+            # The session carries on where it stopped
+            remaining = [q for q in QUESTION_BANK if q not in after['completed_questions']]
+            await answer(student, remaining, 'after the restart', ['hopeful'])
+            saved = await student.call('career_summary', {
+                'session_data': {'career_concerns': ['crash test']}, 'recommendations': ['keep going']
+            }, expect='summary_saved')
+            summary_file = Path(workdir) / saved['file']
+            for _ in range(100):
+                if summary_file.exists():
+                    break
+                await asyncio.sleep(0.1)
+            await student.client.disconnect()
+        finally:
+            server.terminate()
+            server.wait()
+    return before, json.loads(summary_file.read_text())
+
+
+def test_session_survives_sigkill(tmp_path):
+    before, summary = asyncio.run(crash_and_resume(tmp_path, answers=6))
+    assert len(before['completed_questions']) == 6
+    assert summary['questions_answered'] == len(QUESTION_BANK)
+    pre_crash = [q for q, r in summary['responses'].items() if r['response'].endswith('before the crash')]
+    assert pre_crash == before['completed_questions']
+
+
+def test_development_server_starts_once(tmp_path):
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=str(ROOT), FLASK_ENV='development', PORT=str(port))
+    # A terminal on stdin, as when a developer runs it; Flask-SocketIO refuses Werkzeug otherwise
+    terminal, stdin = os.openpty()
+    server = subprocess.Popen([sys.executable, str(ROOT / 'app.py')], cwd=tmp_path, env=env, stdin=stdin,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        wait_for_port(port)
+        time.sleep(1.0)
+    finally:
+        server.terminate()
+        _, log = server.communicate(timeout=30)
+        os.close(terminal)
+        os.close(stdin)
+    # The reloader would re-run app.py in a child process, recovering the journal twice
+    assert log.count('Starting Flask app') == 1, log
+    assert 'Restarting with' not in log
@@ -0,0 +1,134 @@
+"""
+Ephemeral key minting against a local stand-in for the sessions endpoint:
+any unusable 200 response is a KeyMintError, keep-alive connections are
+reused, and a mint is retried only when the server dropped an idle
+connection without answering, never once it may have minted a key.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from key_pool import EphemeralKeyPool, KeyMintError
+
+SESSION = b'{"id": "sess_1", "client_secret": {"value": "ek_1"}}'
+
+
+class SessionsHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        endpoint = self.server.endpoint
+        self.rfile.read(int(self.headers['Content-Length']))
+        with endpoint.lock:
+            endpoint.posts.append(self.client_address[1])
+            behaviour = endpoint.behaviours.pop(0) if endpoint.behaviours else 'ok'
+        if behaviour == 'slow':
+            endpoint.release.wait(5)
+        if behaviour == 'truncated':
+            # Headers promise more body than arrives: the key may exist, the client cannot know
+            self.send_response(200)
+            self.send_header('Content-Length', '100')
+            self.end_headers()
+            self.wfile.write(SESSION[:10])
+            self.close_connection = True
+            return
+        self.send_response(endpoint.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(endpoint.body)))
+        self.end_headers()
+        self.wfile.write(endpoint.body)
+        if behaviour == 'drop_after':
+            # Drop the connection without telling the client, as an idle timeout would
+            self.close_connection = True
+
+
+class SessionsEndpoint:
+    def __init__(self):
+        self.status = 200
+        self.body = SESSION
+        self.behaviours = []
+        self.posts = []
+        self.lock = threading.Lock()
+        self.release = threading.Event()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), SessionsHandler)
+        self.server.daemon_threads = True
+        self.server.endpoint = self
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/openai/realtimeapi/sessions'
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def endpoint():
+    endpoint = SessionsEndpoint()
+    yield endpoint
+    endpoint.close()
+
+
+@pytest.fixture
+def pool(endpoint):
+    pool = EphemeralKeyPool(endpoint.url, 'test-key', pool_size=0)
+    pool._http.timeout = 1
+    return pool
+
+
+@pytest.mark.parametrize('body', [
+    b'<html>gateway timeout</html>',
+    b'\xff\xfe not utf-8',
+    b'[]',
+    b'{"client_secret": "plain string"}',
+    b'{"client_secret": {}}',
+    b'{"id": "sess_1"}',
+])
+def test_unusable_success_body_raises_key_mint_error(endpoint, pool, body):
+    endpoint.body = body
+    with pytest.raises(KeyMintError):
+        pool.mint('gpt-realtime', 'ash')
+
+
+def test_error_status_raises_key_mint_error(endpoint, pool):
+    endpoint.status, endpoint.body = 503, b'busy'
+    with pytest.raises(KeyMintError, match='503'):
+        pool.mint('gpt-realtime', 'ash')
+
+
+def test_valid_session_gets_an_expiry(pool):
+    session = pool.mint('gpt-realtime', 'ash')
+    assert session['client_secret']['value'] == 'ek_1' and session['client_secret']['expires_at'] > 0
+
+
+def test_mints_reuse_one_keep_alive_connection(endpoint, pool):
+    for _ in range(3):
+        pool.mint('gpt-realtime', 'ash')
+    assert len(endpoint.posts) == 3
+    assert len(set(endpoint.posts)) == 1
+
+
+def test_dropped_idle_connection_is_retried_on_a_fresh_one(endpoint, pool):
+    endpoint.behaviours = ['drop_after']
+    pool.mint('gpt-realtime', 'ash')
+    # The pooled connection is dead; the server never saw the request sent on it
+    assert pool.mint('gpt-realtime', 'ash')['client_secret']['value'] == 'ek_1'
+    assert len(endpoint.posts) == 2
+    assert endpoint.posts[0] != endpoint.posts[1]
+
+
+@pytest.mark.parametrize('behaviour', ['slow', 'truncated'])
+def test_mint_the_server_may_have_made_is_not_retried(endpoint, pool, behaviour):
+    pool.mint('gpt-realtime', 'ash')
+    endpoint.behaviours = [behaviour]
+    with pytest.raises(KeyMintError):
+        pool.mint('gpt-realtime', 'ash')
+    endpoint.release.set()
+    # One POST for the first mint and exactly one for the failed one
+    assert len(endpoint.posts) == 2
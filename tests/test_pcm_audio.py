@@ -0,0 +1,138 @@
+"""
+PCM audio: streaming resampling matches one-block resampling at every
+supported rate pair, float-to-PCM16 conversion clips at full scale, and
+speech segmentation applies the same hysteresis offline and live, however
+the stream is chunked.
+"""
+
+import numpy as np
+import pytest
+
+from pcm_audio import (Resampler, SpeechSegmenter, find_runs, float_to_pcm16, pcm16_to_float,
+                       speech_segments, to_dbfs)
+
+RATE_PAIRS = [(48000, 24000), (16000, 24000), (24000, 16000)]
+
+
+def tone(rate, seconds, frequency=440.0, amplitude=0.5):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def chunks(samples, sizes):
+    start, n = 0, 0
+    while start < len(samples):
+        size = sizes[n % len(sizes)]
+        yield samples[start:start + size]
+        start += size
+        n += 1
+
+
+@pytest.mark.parametrize('from_rate, to_rate', RATE_PAIRS)
+def test_chunked_resampling_matches_one_block(from_rate, to_rate):
+    rng = np.random.default_rng(7)
+    samples = tone(from_rate, 1.0) + rng.normal(0, 0.05, from_rate).astype(np.float32)
+    whole = Resampler(from_rate, to_rate).process(samples)
+    assert len(whole) == to_rate
+
+    streaming = Resampler(from_rate, to_rate)
+    # 20 ms frames, odd sizes, single samples and empty chunks
+    frame = from_rate * 20 // 1000
+    parts = []
+    for chunk in chunks(samples, [frame, 1, 0, 7, frame * 3 + 5, 2, 331]):
+        expected = streaming.output_length(len(chunk))
+        out = streaming.process(chunk)
+        assert len(out) == expected
+        parts.append(out)
+    chunked = np.concatenate(parts)
+
+    assert len(chunked) == len(whole)
+    np.testing.assert_allclose(chunked, whole, atol=1e-5)
+
+
+@pytest.mark.parametrize('from_rate, to_rate', RATE_PAIRS)
+def test_resampled_tone_keeps_its_pitch_and_level(from_rate, to_rate):
+    resampler = Resampler(from_rate, to_rate)
+    out = resampler.process(tone(from_rate, 0.5))
+    # Past the filter's warm-up the output is the same tone at the new rate, ``delay`` samples late
+    t = (np.arange(len(out)) - resampler.delay) / to_rate
+    expected = 0.5 * np.sin(2 * np.pi * 440.0 * t)
+    settled = slice(int(resampler.delay) * 2 + 1, None)
+    np.testing.assert_allclose(out[settled], expected[settled], atol=5e-3)
+
+
+def test_float_to_pcm16_clips_at_full_scale():
+    samples = np.array([-2.0, -1.0, -0.5, 0.0, 0.5, 0.999, 1.0, 3.0, -1.00001], dtype=np.float32)
+    pcm = float_to_pcm16(samples)
+    assert pcm.dtype == np.int16
+    assert pcm.tolist() == [-32768, -32768, -16384, 0, 16384, 32735, 32767, 32767, -32768]
+
+    out = np.empty(len(samples), dtype=np.int16)
+    assert float_to_pcm16(samples, out=out) is out
+
+
+def test_pcm16_round_trip():
+    pcm = np.array([-32768, -1, 0, 1, 12345, 32767], dtype='<i2')
+    assert float_to_pcm16(pcm16_to_float(pcm.tobytes())).tolist() == pcm.tolist()
+
+
+def test_find_runs():
+    starts, ends = find_runs(np.array([1, 1, 0, 0, 1, 0, 1, 1, 1], dtype=bool))
+    assert starts.tolist() == [0, 4, 6] and ends.tolist() == [2, 5, 9]
+    starts, ends = find_runs(np.zeros(4, dtype=bool))
+    assert not len(starts) and not len(ends)
+
+
+def test_speech_segments_bridge_short_pauses_and_drop_clicks():
+    loud, quiet = -20.0, -60.0
+    levels = ([quiet] * 5 + [loud] * 10      # speech at 5
+              + [quiet] * 4 + [loud] * 6     # a 4-frame pause is bridged
+              + [quiet] * 20                 # a long pause ends the segment at 25
+              + [loud] * 2                   # a 2-frame click is dropped
+              + [quiet] * 20
+              + [loud] * 3)                  # 3 frames is enough, up to the end
+    segments = speech_segments(levels, threshold_db=-40.0, min_speech_frames=3, min_silence_frames=5)
+    assert segments.tolist() == [[5, 25], [67, 70]]
+
+
+def levels_to_stream(segmenter, levels_db):
+    """PCM whose frames meter at (roughly) the given dBFS levels"""
+    amplitude = 10 ** (np.asarray(levels_db) / 20) * np.sqrt(2)
+    t = np.arange(segmenter.frame_len) / segmenter.rate
+    carrier = np.sin(2 * np.pi * 1000.0 * t).astype(np.float32)
+    return np.concatenate([level * carrier for level in amplitude]).astype(np.float32)
+
+
+@pytest.mark.parametrize('sizes', [[10 ** 9], [480], [1000, 37, 480 * 3 + 11], [13]])
+def test_segmenter_events_do_not_depend_on_chunking(sizes):
+    loud, quiet = -20.0, -60.0
+    # 20 ms frames: speech needs 3 frames, silence 15
+    levels = ([quiet] * 10 + [loud] * 2      # a click: no start
+              + [quiet] * 20 + [loud] * 30   # start at 32
+              + [quiet] * 10 + [loud] * 5    # a short pause does not end it
+              + [quiet] * 40)                # end at 77
+    segmenter = SpeechSegmenter(threshold_db=-40.0, min_speech_ms=60, min_silence_ms=300)
+    stream = levels_to_stream(segmenter, levels)
+    assert np.allclose(to_dbfs(np.sqrt(np.mean(stream[:segmenter.frame_len] ** 2))), quiet, atol=0.1)
+
+    events = []
+    for chunk in chunks(stream, sizes):
+        events.extend(segmenter.feed(chunk))
+    assert events == [('start', 32), ('end', 77)]
+    assert segmenter.frames == len(levels) and not segmenter.in_speech
+    assert segmenter.seconds(32) == pytest.approx(0.64)
+
+    # The live events are the offline segments
+    assert speech_segments(levels, -40.0, segmenter.min_speech_frames,
+                           segmenter.min_silence_frames).tolist() == [[32, 77]]
+
+
+def test_segmenter_holds_an_open_segment_across_chunks():
+    segmenter = SpeechSegmenter()
+    speech = levels_to_stream(segmenter, [-20.0] * 10)
+    silence = levels_to_stream(segmenter, [-80.0] * 10)
+    assert segmenter.feed(speech[:700]) == []
+    assert segmenter.feed(speech[700:]) == [('start', 0)]
+    assert segmenter.feed(silence) == []
+    # The pause that ends the segment is counted from its first quiet frame
+    assert segmenter.feed(silence) == [('end', 10)]
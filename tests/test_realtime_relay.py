@@ -0,0 +1,180 @@
+"""
+Realtime relay: outbox backpressure (audio is dropped when upstream falls
+behind, control and tool events never are), and the relay against
+benchmarks/mock_realtime.py, the local stand-in for the realtime endpoint.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from realtime_relay import RealtimeRelay, RelayOutbox
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+SID = 'sid-1'
+FRAME = bytes(range(256)) * 19  # 4864 bytes of PCM16
+
+
+def test_full_audio_budget_keeps_control_events_in_order():
+    async def scenario():
+        outbox = RelayOutbox(max_audio=2)
+        assert outbox.put(b'audio-1', audio=True)
+        assert outbox.put(b'audio-2', audio=True)
+        assert not outbox.put(b'audio-3', audio=True)
+        assert outbox.put(b'commit')
+        assert outbox.put(b'function_call_output')
+        assert outbox.put(b'response.create')
+        sent = [await outbox.get() for _ in range(5)]
+        # Draining audio frees the budget again
+        assert outbox.put(b'audio-4', audio=True)
+        sent.append(await outbox.get())
+        return sent
+
+    assert asyncio.run(scenario()) == [b'audio-1', b'audio-2', b'commit', b'function_call_output',
+                                       b'response.create', b'audio-4']
+
+
+def test_get_waits_for_a_frame():
+    async def scenario():
+        outbox = RelayOutbox(max_audio=1)
+        waiter = asyncio.create_task(outbox.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        outbox.put(b'response.create')
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(scenario()) == b'response.create'
+
+
+class Browser:
+    """Collects what the relay emits to the Socket.IO client"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.emitted = []
+
+    def emit(self, name, data, to=None):
+        with self.lock:
+            self.emitted.append((name, data, to))
+
+    def events(self, kind=None):
+        with self.lock:
+            return [data for name, data, _ in self.emitted
+                    if name == 'relay_event' and (kind is None or data.get('type') == kind)]
+
+    def tools(self):
+        with self.lock:
+            return [data for name, data, _ in self.emitted if name == 'relay_tool']
+
+
+async def until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        await asyncio.sleep(0.01)
+
+
+def test_relay_against_the_mock_realtime_endpoint():
+    pytest.importorskip('aiohttp')
+    from mock_realtime import Latency, MockRealtimeServer
+
+    browser = Browser()
+    tool_calls = []
+    appended = []
+
+    def run_tool(context, name, arguments):
+        tool_calls.append((context, name, json.loads(arguments)))
+        if name == 'record_response_and_get_next':
+            return {'success': True, 'next_question': 'academic_status', 'question_text': 'What are you studying?'}
+        return {'success': True}
+
+    async def scenario():
+        mock = MockRealtimeServer(Latency(mint_ms=0, first_event_ms=5, tool_ms=1, audio_ms=100, transcription_ms=1),
+                                  audio_hook=appended.append)
+        await mock.start()
+        relay = RealtimeRelay(mock.realtime_url, mock.api_key, browser.emit, run_tool)
+        relay.start()
+        try:
+            assert relay.open(SID, {'user_id': 'user-1'}, [{'type': 'session.update', 'session': {'voice': 'ash'}}])
+            await until(lambda: browser.events('session.updated'))
+
+            # Browsers may not send tool outputs or raw appends, nor non-message items
+            assert not relay.send_event(SID, {'type': 'conversation.item.create', 'item': {
+                'type': 'function_call_output', 'call_id': 'call_1', 'output': '{}'}})
+            assert not relay.send_event(SID, {'type': 'input_audio_buffer.append', 'audio': 'AAAA'})
+            assert not relay.send_event(SID, {'type': 'session.delete'})
+
+            for _ in range(3):
+                assert relay.send_audio(SID, FRAME)
+            await until(lambda: len(appended) == 3)
+            assert appended == [FRAME] * 3
+
+            # The student's turn: the model calls two tools, the relay runs them and continues once
+            assert relay.send_event(SID, {'type': 'input_audio_buffer.commit'})
+            assert relay.send_event(SID, {'type': 'response.create'})
+            await until(lambda: len(browser.events('response.done')) == 2)
+            await asyncio.sleep(0.3)
+            return mock.stats, dict(relay.stats)
+        finally:
+            relay.stop()
+            await mock.stop()
+
+    mock_stats, relay_stats = asyncio.run(scenario())
+
+    assert relay_stats['rejected_events'] == 3
+    assert mock_stats['audio_bytes_in'] == 3 * len(FRAME)
+    assert [name for _, name, _ in tool_calls] == ['detect_user_language', 'record_response_and_get_next']
+    assert all(context == {'user_id': 'user-1'} for context, _, _ in tool_calls)
+    assert tool_calls[1][2]['question_id'] == 'intro'
+    assert [tool['name'] for tool in browser.tools()] == ['detect_user_language', 'record_response_and_get_next']
+    # One response.create after both outputs: the mock answered it and nothing more
+    assert mock_stats['responses'] == 2 and mock_stats['rejected'] == 0
+    assert mock_stats['unknown_call_ids'] == 0
+    # Function calls are run on the server, never handed to the browser
+    assert not browser.events('response.function_call_arguments.done')
+
+
+def test_malformed_upstream_frame_is_skipped():
+    web = pytest.importorskip('aiohttp.web')
+    from harness import free_port
+
+    browser = Browser()
+
+    async def upstream(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str('{"type": "session.created", "session": {}')
+        await ws.send_str('["not", "an", "event"]')
+        await ws.send_str('{"type": "session.created", "session": {}}')
+        async for _ in ws:
+            pass
+        return ws
+
+    async def scenario():
+        application = web.Application()
+        application.router.add_get('/openai/realtime', upstream)
+        runner = web.AppRunner(application, access_log=None)
+        await runner.setup()
+        port = free_port()
+        await web.TCPSite(runner, '127.0.0.1', port).start()
+        relay = RealtimeRelay(f'ws://127.0.0.1:{port}/openai/realtime', 'key', browser.emit, lambda *args: {})
+        relay.start()
+        try:
+            relay.open(SID, {})
+            await until(lambda: browser.events('session.created'))
+            await asyncio.sleep(0.1)
+            return dict(relay.stats), len(relay), browser.events('relay.closed')
+        finally:
+            relay.stop()
+            await runner.cleanup()
+
+    stats, open_sessions, closed = asyncio.run(scenario())
+    assert stats['malformed_events'] == 2
+    # The session outlived the bad frames
+    assert open_sessions == 1 and not closed
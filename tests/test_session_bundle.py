@@ -0,0 +1,23 @@
+"""
+Session bundle serving: the gzip and identity representations carry
+different ETags, and each revalidates against its own.
+"""
+
+
+def test_gzip_and_identity_have_their_own_etags(app_module):
+    http = app_module.app.test_client()
+    bundle = app_module.session_bundle
+    url = f'/api/session-bundle?v={bundle.version}'
+
+    identity = http.get(url, headers={'Accept-Encoding': 'identity'})
+    gzipped = http.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert identity.headers['ETag'] == f'"{bundle.version}"'
+    assert gzipped.headers['ETag'] == f'"{bundle.gzip_etag}"'
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert identity.get_data() == bundle.body
+
+    assert http.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzipped.headers['ETag']}).status_code == 304
+    # A cached identity body must not validate a gzip request, nor the other way round
+    assert http.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': identity.headers['ETag']}).status_code == 200
+    assert http.get(url, headers={'Accept-Encoding': 'identity',
+                                  'If-None-Match': gzipped.headers['ETag']}).status_code == 200
@@ -0,0 +1,132 @@
+"""
+SQLite session stores shared by several worker processes: concurrent
+read-modify-write of one session must not lose either worker's changes, and
+activity on one worker must keep the session alive for the others, and a
+session completed by two workers at once is completed (and summarized) once.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime
+
+from career_record import CareerSession
+from realtime_prompts import QUESTION_BANK
+from session_store import SQLiteBackend, SQLiteCareerSessions, SQLiteUserSessions
+
+ROUNDS = 20
+SESSIONS = 30
+
+
+def answer(db_path, question_ids):
+    store = SQLiteCareerSessions(SQLiteBackend(db_path, pool_size=2))
+    for _ in range(ROUNDS):
+        for question_id in question_ids:
+            with store.modify('career_1') as session:
+                session.record_response(question_id, 'an answer', 'neutral')
+
+
+class RecordingPipeline:
+    """Stands in for the summary pipeline; every queued summary is a line in one shared file"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def submit(self, summary_file, summary, context=None):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(f"{summary['session_id']}\n")
+        return summary['session_id']
+
+
+def complete_all(workdir, db_path, queued_path, start):
+    os.environ.update(SESSION_BACKEND='sqlite', SESSION_DB_PATH=db_path)
+    os.chdir(workdir)
+    import app
+    app.career_manager.pipeline = RecordingPipeline(queued_path)
+    # Both workers have imported the app before either starts completing
+    start.wait(60)
+    for n in range(SESSIONS):
+        app.career_manager.complete_session(f'career_{n}', {'recommendations': ['keep going']})
+
+
+def run_workers(*workers):
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=target, args=args) for target, args in workers]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    assert [process.exitcode for process in processes] == [0] * len(processes)
+
+
+def new_store(tmp_path):
+    db_path = str(tmp_path / 'sessions.db')
+    store = SQLiteCareerSessions(SQLiteBackend(db_path, pool_size=2))
+    store.add(CareerSession('career_1', 'user_1', 'Student', 'student@example.com'))
+    return db_path, store
+
+
+def test_two_workers_modifying_one_session_keep_every_change(tmp_path):
+    db_path, store = new_store(tmp_path)
+    questions = list(QUESTION_BANK)
+    first, second = questions[:len(questions) // 2], questions[len(questions) // 2:]
+
+    run_workers((answer, (db_path, first)), (answer, (db_path, second)))
+
+    session = store.get_active('career_1')
+    assert sorted(session.completed_questions) == sorted(questions)
+    # Every write appended one trajectory entry; a lost update would drop some
+    assert len(session.emotional_trajectory) == ROUNDS * len(questions)
+
+
+
+def test_activity_on_another_worker_keeps_a_session_alive(tmp_path):
+    db_path = str(tmp_path / 'sessions.db')
+    creator = SQLiteUserSessions(SQLiteBackend(db_path, pool_size=2), touch_interval=0)
+    server = SQLiteUserSessions(SQLiteBackend(db_path, pool_size=2), touch_interval=0)
+    creator.add({'id': 'user_1', 'email': 'student@example.com', 'start_time': datetime.now()})
+    creator.touch('user_1')
+    seen = creator.last_seen('user_1')
+
+    time.sleep(0.01)
+    server.touch('user_1')
+    # The creator's reaper sees the newer activity logged by the other worker
+    assert creator.last_seen('user_1') > seen
+    assert creator.idle(seen + 0.005) == []
+    assert creator.idle(time.time() + 1) == ['user_1']
+
+    server.remove('user_1')
+    creator.touch('user_1')
+    assert creator.last_seen('user_1') is None
+    assert creator.idle(time.time() + 1) == []
+
+
+def test_two_workers_completing_one_session_complete_it_once(tmp_path):
+    db_path = str(tmp_path / 'sessions.db')
+    store = SQLiteCareerSessions(SQLiteBackend(db_path, pool_size=2))
+    for n in range(SESSIONS):
+        store.add(CareerSession(f'career_{n}', 'user_1', 'Student', 'student@example.com'))
+    queued_path = tmp_path / 'queued.txt'
+    start = multiprocessing.get_context('spawn').Barrier(2)
+    for name in ('a', 'b'):
+        (tmp_path / name).mkdir()
+
+    run_workers(*[(complete_all, (str(tmp_path / name), db_path, str(queued_path), start)) for name in ('a', 'b')])
+
+    assert sorted(queued_path.read_text().split()) == sorted(f'career_{n}' for n in range(SESSIONS))
+    assert len(store) == 0
+
+
+def test_sweep_pauses_the_stored_record_too(tmp_path):
+    store = SQLiteCareerSessions(SQLiteBackend(str(tmp_path / 'sessions.db'), pool_size=2), idle_ttl=0)
+    store.add(CareerSession('career_1', 'user_1', 'Student', 'student@example.com'))
+    time.sleep(0.01)
+    store.sweep()
+
+    with store.backend.connection() as conn:
+        state, data = conn.execute("SELECT state, data FROM career_sessions").fetchone()
+    # The record itself says paused, not just the row's state column
+    assert state == 'paused'
+    assert json.loads(data)['state'] == 'paused' and 'paused_at' in json.loads(data)
+    assert store.resume('career_1').state == 'active'
@@ -0,0 +1,95 @@
+"""
+Socket.IO handlers driven through the Flask-SocketIO test client.
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+@pytest.fixture
+def student(app_module):
+    http = app_module.app.test_client()
+    http.post('/api/register', json={'email': 'handler@example.com', 'name': 'Handler Test'})
+    client = app_module.socketio.test_client(app_module.app, flask_test_client=http)
+    yield client
+    if client.is_connected():
+        client.disconnect()
+    http.post('/api/logout')
+
+def replies(client, name):
+    return [message['args'][0] for message in client.get_received() if message['name'] == name]
+
+def test_career_response_uses_the_saved_session(app_module, student, monkeypatch):
+    student.emit('career_start')
+    assert replies(student, 'career_started')
+    # The session can end between saving the answer and replying; the reply must not re-fetch it
+    monkeypatch.setattr(app_module.career_manager, 'get_session', lambda career_session_id: None)
+    student.emit('career_response', {'question_id': 'intro', 'response': 'Hi, I am Sam', 'emotion': 'hopeful'})
+    assert replies(student, 'career_response_saved') == [
+        {'success': True, 'question_id': 'intro', 'questions_completed': 1}]
+
+
+def test_summary_is_journaled_only_once_queued(app_module, student, monkeypatch):
+    student.emit('career_start')
+    assert replies(student, 'career_started')
+    journaled = []
+    record = app_module.career_manager._record
+
+    def spy(op, career_session_id, **fields):
+        journaled.append(op)
+        return record(op, career_session_id, **fields)
+    monkeypatch.setattr(app_module.career_manager, '_record', spy)
+
+    def refuse(*args, **kwargs):
+        raise RuntimeError('Summary pipeline is stopped')
+    monkeypatch.setattr(app_module.career_manager.pipeline, 'submit', refuse)
+    student.emit('career_summary', {'session_data': {}, 'recommendations': []})
+    assert replies(student, 'career_error') == [{'error': 'Failed to save summary'}]
+    assert 'summary' not in journaled
+
+
+def test_disconnect_discards_coalescer_slots(app_module, student):
+    second = app_module.socketio.test_client(app_module.app, flask_test_client=student.flask_test_client)
+    student.emit('state_change', {'state': 'listening'})
+    rooms = {room for room, _ in app_module.state_coalescer._slots}
+    assert rooms
+
+    # Another tab of the same student is still connected: its room keeps its slot
+    student.disconnect()
+    assert {room for room, _ in app_module.state_coalescer._slots} == rooms
+    second.disconnect()
+    assert not {room for room, _ in app_module.state_coalescer._slots} & rooms
+
+
+class StopReaper(Exception):
+    pass
+
+
+def test_idle_reaper_ends_only_idle_sessions(app_module, student, monkeypatch):
+    with student.flask_test_client.session_transaction() as flask_session:
+        idle_id = flask_session['user_id']
+    busy_id = app_module.session_manager.create_session('busy@example.com', 'Busy Student')
+    file_path = app_module.session_manager.active_sessions.get(idle_id)['file_path']
+
+    # One pass of the reaper loop: the first sleep returns, the second stops it
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) > 1:
+            raise StopReaper
+    monkeypatch.setattr(app_module, 'SESSION_IDLE_TIMEOUT', 0.2)
+    monkeypatch.setattr(app_module.socketio, 'sleep', sleep)
+    time.sleep(0.3)
+    app_module.session_manager.log_conversation(busy_id, 'user', 'Still here')
+    student.get_received()
+
+    with pytest.raises(StopReaper):
+        app_module.reap_idle_sessions()
+
+    assert app_module.session_manager.active_sessions.get(idle_id) is None
+    assert app_module.session_manager.active_sessions.get(busy_id) is not None
+    assert replies(student, 'session_expired') == [{'redirect': '/register'}]
+    assert 'Session Ended:' in Path(file_path).read_text(encoding='utf-8')
+    app_module.session_manager.end_session(busy_id)
@@ -0,0 +1,24 @@
+"""
+Summary pipeline shutdown: stop() returns even when the queue is still full.
+"""
+
+import threading
+
+from summary_pipeline import SummaryPipeline
+
+
+def test_stop_does_not_block_on_a_full_queue(tmp_path):
+    release = threading.Event()
+    pipeline = SummaryPipeline(workers=1, max_queue=1)
+    # Wedge the only worker so the queue stays full past the drain timeout
+    pipeline._write = lambda path, summary: release.wait(10)
+    pipeline.submit(tmp_path / 'a.json', {})
+    pipeline.submit(tmp_path / 'b.json', {})
+
+    results = []
+    stopper = threading.Thread(target=lambda: results.append(pipeline.stop(timeout=0.2)))
+    stopper.start()
+    stopper.join(5)
+    release.set()
+    assert not stopper.is_alive()
+    assert results == [False]
@@ -0,0 +1,69 @@
+"""
+Socket.IO payload validation: over-long transcript messages and summary
+fields are truncated, not rejected, while other fields keep their length limit.
+"""
+
+import json
+
+import pytest
+
+from tool_schemas import MAX_ITEMS, MAX_TEXT_CHARS, SchemaError, validate_arguments, validate_payload
+
+
+def test_long_conversation_message_is_truncated():
+    message = 'a' * (MAX_TEXT_CHARS + 500)
+    data = validate_payload('conversation_update', {'role': 'user', 'message': message, 'state': 'speaking'})
+    assert data == {'role': 'user', 'message': message[:MAX_TEXT_CHARS], 'state': 'speaking'}
+
+
+def test_truncated_field_still_checks_its_type():
+    with pytest.raises(SchemaError, match='message must be a string'):
+        validate_payload('conversation_update', {'role': 'user', 'message': 42})
+
+
+def test_other_long_strings_are_rejected():
+    with pytest.raises(SchemaError, match='role is longer than'):
+        validate_payload('conversation_update', {'role': 'r' * (MAX_TEXT_CHARS + 1), 'message': 'hi'})
+    with pytest.raises(SchemaError, match='response is longer than'):
+        validate_payload('career_response', {'question_id': 'intro', 'response': 'x' * (MAX_TEXT_CHARS + 1)})
+
+
+def test_overlong_summary_fields_are_truncated():
+    summary = {
+        'student_name': 'n' * (MAX_TEXT_CHARS + 1),
+        'session_data': {
+            'academic_info': {'year': 'final', 'major': 'm' * (MAX_TEXT_CHARS + 10)},
+            'interests': [f'interest {n}' for n in range(MAX_ITEMS + 5)],
+            'skills': ['s' * (MAX_TEXT_CHARS + 1)],
+            'immediate_needs': 'x' * (MAX_TEXT_CHARS * 2),
+        },
+        'recommendations': ['r' * (MAX_TEXT_CHARS + 1)] * (MAX_ITEMS + 1),
+        'total_questions_answered': 12,
+    }
+    data = validate_payload('career_summary', summary)
+    assert data['student_name'] == 'n' * MAX_TEXT_CHARS
+    session_data = data['session_data']
+    assert session_data['academic_info'] == {'year': 'final', 'major': 'm' * MAX_TEXT_CHARS}
+    assert session_data['interests'] == [f'interest {n}' for n in range(MAX_ITEMS)]
+    assert session_data['skills'] == ['s' * MAX_TEXT_CHARS]
+    assert session_data['immediate_needs'] == 'x' * MAX_TEXT_CHARS
+    assert data['recommendations'] == ['r' * MAX_TEXT_CHARS] * MAX_ITEMS
+    assert data['total_questions_answered'] == 12
+
+
+def test_summary_types_are_still_checked():
+    with pytest.raises(SchemaError, match=r'session_data.interests must be an array'):
+        validate_payload('career_summary', {'student_name': 'Sam', 'session_data': {'interests': 'coding'}})
+    with pytest.raises(SchemaError, match=r'recommendations\[\] must be a string'):
+        validate_payload('career_summary', {'student_name': 'Sam', 'session_data': {}, 'recommendations': [1]})
+    with pytest.raises(SchemaError, match='session_id is longer than'):
+        validate_payload('career_summary', {'session_data': {}, 'session_id': 'i' * (MAX_TEXT_CHARS + 1)})
+
+
+def test_tool_definitions_sent_to_the_model_are_unchanged():
+    from realtime_tools import CAREER_COUNSELING_TOOLS
+    assert 'truncate' not in json.dumps(CAREER_COUNSELING_TOOLS)
+    # The model's own end_session_summary arguments keep the strict limits
+    with pytest.raises(SchemaError, match='has more than'):
+        validate_arguments('end_session_summary', {'student_name': 'Sam', 'session_data': {},
+                                                   'recommendations': ['r'] * (MAX_ITEMS + 1)})
@@ -0,0 +1,126 @@
+"""
+Transcript search: word/phrase matches narrowed by email and time range,
+cursor pages that neither repeat nor skip lines, the backfill of transcripts
+written before the index, and a warning (not one per line) when lines are
+dropped because indexing fell behind.
+"""
+
+import logging
+from datetime import datetime
+
+import pytest
+
+from transcript_index import TranscriptIndex
+
+DAY = datetime(2025, 3, 10, 9, 0).timestamp()
+HOUR = 3600
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TranscriptIndex(tmp_path / 'transcripts.db', flush_interval=0.01)
+    yield index
+    index.stop()
+
+
+def add_lines(index):
+    lines = [
+        ('s1', 'asha@example.com', 'user', 'I want to study data science abroad', 0),
+        ('s1', 'asha@example.com', 'assistant', 'Data science is a broad field', 1),
+        ('s2', 'ravi@example.com', 'user', 'Maybe science, maybe data engineering', 2),
+        ('s3', 'asha@example.com', 'user', 'My parents want me to study medicine', 26),
+        ('s3', 'asha@example.com', 'user', 'Data science still excites me', 27),
+    ]
+    for session_id, email, role, message, hours in lines:
+        index.add(session_id, email, role, message, f'{session_id}.txt', ts=DAY + hours * HOUR)
+    assert index.flush()
+
+
+def messages(result):
+    return [row['message'] for row in result['results']]
+
+
+def test_phrase_for_one_student(index):
+    add_lines(index)
+    result = index.search(phrase='data science', email='asha@example.com')
+    # Newest first; Ravi's line has both words but not the phrase, and is someone else's
+    assert messages(result) == ['Data science still excites me', 'Data science is a broad field',
+                                'I want to study data science abroad']
+    assert result['next_cursor'] is None
+    assert result['results'][0]['snippet'] == '[Data science] still excites me'
+
+
+def test_words_match_in_any_order(index):
+    add_lines(index)
+    result = index.search(text='science data', email='ravi@example.com')
+    assert messages(result) == ['Maybe science, maybe data engineering']
+
+
+def test_date_range_is_half_open(index):
+    add_lines(index)
+    result = index.search(email='asha@example.com', start=DAY + HOUR, end=DAY + 26 * HOUR)
+    assert messages(result) == ['Data science is a broad field']
+    result = index.search(text='study', start=DAY + 24 * HOUR)
+    assert messages(result) == ['My parents want me to study medicine']
+    assert result['results'][0]['timestamp'] == datetime.fromtimestamp(DAY + 26 * HOUR).isoformat()
+
+
+@pytest.mark.parametrize('query', [{}, {'text': 'data'}, {'text': 'data', 'email': 'asha@example.com'}])
+def test_cursor_pages_cover_every_match_once(index, query):
+    add_lines(index)
+    expected = messages(index.search(limit=100, **query))
+    assert len(expected) >= 3
+
+    pages, cursor = [], None
+    while True:
+        result = index.search(cursor=cursor, limit=2, **query)
+        pages.extend(messages(result))
+        cursor = result['next_cursor']
+        if cursor is None:
+            break
+    assert pages == expected
+
+
+def test_backfill_indexes_an_existing_transcript_once(index, tmp_path):
+    path = tmp_path / 'session_20250310_090000.txt'
+    path.write_text(
+        "Session Started: 2025-03-10T09:00:00.123456\n"
+        "User: Asha (asha@example.com)\n"
+        "Session ID: s9\n"
+        + "-" * 80 + "\n\n"
+        "[09:00:05] user: I am in my final year\n"
+        "[09:00:09] assistant: What would you like to do next?\n"
+        "Perhaps think about what you enjoy.\n"
+        "[09:01:00] user: Something with robotics\n"
+        "\nSession Ended: 2025-03-10T09:05:00\n"
+        "Duration: 0:05:00\n",
+        encoding='utf-8')
+
+    assert index.index_file(path) == 3
+    assert index.index_file(path) == 0
+    assert len(index) == 3
+
+    result = index.search(phrase='what you enjoy', email='asha@example.com')
+    assert [(row['session_id'], row['role'], row['timestamp'], row['file']) for row in result['results']] == [
+        ('s9', 'assistant', '2025-03-10T09:00:09', str(path))]
+    assert result['results'][0]['message'] == 'What would you like to do next?\nPerhaps think about what you enjoy.'
+
+
+def test_dropped_lines_are_counted_and_warned_about_once_per_interval(tmp_path, caplog):
+    index = TranscriptIndex(tmp_path / 'transcripts.db', max_queue=1, drop_warning_interval=60)
+    # With the indexing thread gone nothing drains the queue
+    index.stop()
+    with caplog.at_level(logging.WARNING, logger='transcript_index'):
+        for n in range(5):
+            index.add('s1', 'asha@example.com', 'user', f'line {n}', 's1.txt')
+    assert index.stats['dropped'] == 4
+    warnings = [record.getMessage() for record in caplog.records]
+    assert len(warnings) == 1 and 'dropped 1 line(s)' in warnings[0]
+
+    caplog.clear()
+    index.drop_warning_interval = 0
+    with caplog.at_level(logging.WARNING, logger='transcript_index'):
+        index.add('s1', 'asha@example.com', 'user', 'line 5', 's1.txt')
+    # The next warning reports the drops it held back
+    assert [record.getMessage() for record in caplog.records][0].startswith(
+        'Transcript index queue is full; dropped 4 line(s)')
@@ -0,0 +1,43 @@
+"""
+VAD tuning sweep: recordings without a single reference turn (silence, or
+labels with an empty turn list) count for nothing instead of breaking the
+sweep.
+"""
+
+import numpy as np
+
+from vad_tuning import Recording, sweep
+
+RATE = 24000
+
+
+def low_noise(seconds, seed=0):
+    return np.random.default_rng(seed).normal(0, 1e-4, int(seconds * RATE)).astype(np.float32)
+
+
+def talking(seconds, seed=1):
+    """Low noise with a loud second of speech every three seconds"""
+    samples = low_noise(seconds, seed)
+    turns = []
+    for start in range(1, int(seconds) - 1, 3):
+        samples[start * RATE:(start + 1) * RATE] += np.random.default_rng(start).normal(0, 0.1, RATE)
+        turns.append([start * 1000, (start + 1) * 1000])
+    return samples, turns
+
+
+def test_silent_recording_sweeps_to_empty_results():
+    grid = sweep([Recording('silent', low_noise(5), RATE)])
+    assert grid
+    for row in grid:
+        assert row['false_cut_rate'] == 0 and row['missed_end_rate'] == 0
+        assert row['latency_p90_ms'] is None
+
+
+def test_recordings_without_turns_do_not_change_the_results():
+    samples, turns = talking(20)
+    speech = Recording('speech', samples, RATE, turns)
+    assert len(speech.turns) == len(turns)
+
+    alone = sweep([speech])
+    mixed = sweep([speech, Recording('silent', low_noise(5), RATE), Recording('unlabeled', low_noise(5), RATE, [])])
+    assert mixed == alone
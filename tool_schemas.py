@@ -0,0 +1,211 @@
+"""
+Career Counseling Realtime Voice Assistant - Tool Schemas
+This module compiles the tool parameter schemas into validators for tool arguments and Socket.IO payloads
+"""
+
+import json
+
+from realtime_tools import CAREER_COUNSELING_TOOLS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Caps on what a schema's "string" and "array" allow; enums are bounded by their values
+MAX_TEXT_CHARS = 4000
+MAX_ITEMS = 64
+# A function call's arguments as sent by the model, before parsing
+MAX_ARGUMENT_BYTES = 64 * 1024
+
+
+class SchemaError(ValueError):
+    """A payload that does not match its schema; ``path`` names the offending field"""
+
+    def __init__(self, path, message):
+        super().__init__(f"{path or 'payload'} {message}")
+        self.path = path
+
+
+def _join(path, name):
+    return f"{path}.{name}" if path else name
+
+
+def compile_schema(schema, path='', max_text=MAX_TEXT_CHARS, max_items=MAX_ITEMS):
+    """Turn a tool parameter schema into a function that checks a value and returns a clean copy.
+
+    Supports the subset the tool definitions use: object (properties,
+    required), array (items), string (enum), integer, number and boolean.
+    A string or array schema with ``"truncate": true`` is cut to ``max_text``
+    characters or ``max_items`` items rather than rejected when it is too long.
+    Each node becomes one closure, so validating a payload is a walk over
+    prebuilt checks with no schema lookups. Objects keep only the properties
+    their schema declares, and a property that is null counts as absent, the
+    way JSON.stringify drops undefined ones.
+    """
+    kind = schema.get('type')
+
+    if kind == 'string' and 'enum' in schema:
+        allowed = frozenset(schema['enum'])
+        message = f"must be one of {', '.join(schema['enum'])}"
+
+        def check(value):
+            if value.__class__ is not str or value not in allowed:
+                raise SchemaError(path, message)
+            return value
+
+    elif kind == 'string' and schema.get('truncate'):
+        def check(value):
+            if value.__class__ is not str:
+                raise SchemaError(path, 'must be a string')
+            return value[:max_text]
+
+    elif kind == 'string':
+        def check(value):
+            if value.__class__ is not str:
+                raise SchemaError(path, 'must be a string')
+            if len(value) > max_text:
+                raise SchemaError(path, f"is longer than {max_text} characters")
+            return value
+
+    elif kind == 'integer':
+        def check(value):
+            if value.__class__ is not int:
+                raise SchemaError(path, 'must be an integer')
+            return value
+
+    elif kind == 'number':
+        def check(value):
+            if value.__class__ is not int and value.__class__ is not float:
+                raise SchemaError(path, 'must be a number')
+            return value
+
+    elif kind == 'boolean':
+        def check(value):
+            if value is not True and value is not False:
+                raise SchemaError(path, 'must be true or false')
+            return value
+
+    elif kind == 'array':
+        check_item = compile_schema(schema.get('items', {'type': 'string'}), f"{path}[]", max_text, max_items)
+        truncate = bool(schema.get('truncate'))
+
+        def check(value):
+            if value.__class__ is not list:
+                raise SchemaError(path, 'must be an array')
+            if len(value) > max_items:
+                if not truncate:
+                    raise SchemaError(path, f"has more than {max_items} items")
+                value = value[:max_items]
+            return [check_item(item) for item in value]
+
+    elif kind == 'object':
+        properties = {
+            name: compile_schema(subschema, _join(path, name), max_text, max_items)
+            for name, subschema in schema.get('properties', {}).items()
+        }
+        required = tuple(schema.get('required', ()))
+
+        def check(value):
+            if value.__class__ is not dict:
+                raise SchemaError(path, 'must be an object')
+            for name in required:
+                if value.get(name) is None:
+                    raise SchemaError(_join(path, name), 'is required')
+            return {
+                name: properties[name](item)
+                for name, item in value.items()
+                if item is not None and name in properties
+            }
+
+    else:
+        raise ValueError(f"Unsupported schema type {kind!r} at {path or 'top level'}")
+
+    return check
+
+
+_TOOLS = {tool['name']: tool for tool in CAREER_COUNSELING_TOOLS}
+
+# Tool name -> validator for the arguments of a call to it
+TOOL_VALIDATORS = {name: compile_schema(tool['parameters']) for name, tool in _TOOLS.items()}
+
+
+def _properties(tool_name):
+    return _TOOLS[tool_name]['parameters']['properties']
+
+
+def _payload(properties, required=()):
+    return {'type': 'object', 'properties': properties, 'required': list(required)}
+
+
+def _truncating(schema):
+    """A copy of a schema whose free-text strings and arrays are truncated instead of rejected"""
+    schema = dict(schema)
+    kind = schema.get('type')
+    if (kind == 'string' and 'enum' not in schema) or kind == 'array':
+        schema['truncate'] = True
+    if kind == 'array' and 'items' in schema:
+        schema['items'] = _truncating(schema['items'])
+    if kind == 'object':
+        schema['properties'] = {name: _truncating(sub) for name, sub in schema.get('properties', {}).items()}
+    return schema
+
+
+# Socket.IO events whose data comes from the client's tool handlers, described with
+# the tool schemas they relay; only the fields a handler needs are required
+_record = _properties('record_response_and_get_next')
+PAYLOAD_SCHEMAS = {
+    # track_survey_response / record_response_and_get_next arguments
+    'career_response': _payload({
+        'question_id': _record['question_id'],
+        'response': _record['response'],
+        'emotion': _record['emotion_detected'],
+    }, required=('question_id', 'response')),
+    # The end_session_summary tool result; the model writes its free text and lists,
+    # so an overlong one is cut down rather than losing the whole summary
+    'career_summary': _payload({
+        **{name: _truncating(schema) for name, schema in _properties('end_session_summary').items()},
+        'session_id': {'type': 'string'},
+        'timestamp': {'type': 'string'},
+        'total_questions_answered': {'type': 'integer'},
+    }),
+    'career_next_question': _payload({
+        'completed_questions': _properties('determine_next_question')['completed_questions'],
+        # Checked against DEPTH_ACTIONS by the handler: an unknown action is ignored, not an error
+        'adjustment_action': {'type': 'string'},
+        'skip_optional': _record['skip_optional'],
+    }),
+    'career_pause': _payload({'current_question': _record['question_id']}),
+    'career_resume': _payload({'career_session_id': {'type': 'string'}}),
+    # Transcript lines, appended to the conversation log on disk; a long message
+    # loses its tail instead of the whole line
+    'conversation_update': _payload({
+        'role': {'type': 'string'},
+        'message': {'type': 'string', 'truncate': True},
+        'state': {'type': 'string'},
+    }),
+}
+PAYLOAD_VALIDATORS = {event: compile_schema(schema) for event, schema in PAYLOAD_SCHEMAS.items()}
+
+
+def validate_payload(event, data):
+    """Check a Socket.IO event's data; returns the cleaned dict or raises SchemaError"""
+    return PAYLOAD_VALIDATORS[event]({} if data is None else data)
+
+
+def validate_arguments(tool_name, arguments):
+    """Parse and check a function call's arguments (a JSON string, bytes or dict) for a tool"""
+    validator = TOOL_VALIDATORS.get(tool_name)
+    if validator is None:
+        raise SchemaError('name', f"is not a known tool: {tool_name!r}")
+    if isinstance(arguments, (str, bytes, bytearray, memoryview)):
+        if len(arguments) > MAX_ARGUMENT_BYTES:
+            raise SchemaError('arguments', f"are larger than {MAX_ARGUMENT_BYTES} bytes")
+        try:
+            if orjson is not None:
+                arguments = orjson.loads(arguments)
+            else:
+                arguments = json.loads(bytes(arguments) if isinstance(arguments, memoryview) else arguments)
+        except ValueError as e:
+            raise SchemaError('arguments', f"are not valid JSON: {e}") from e
+    return validator(arguments)
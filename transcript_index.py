@@ -0,0 +1,308 @@
+"""
+Career Counseling Realtime Voice Assistant - Transcript Search Index
+This module keeps an SQLite FTS5 index of transcript lines for searching past conversations
+
+    python transcript_index.py --backfill sessions
+"""
+
+import argparse
+import logging
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from server_mode import run_blocking
+from session_store import SQLiteBackend
+
+logger = logging.getLogger(__name__)
+
+# Lines live in a plain table (filterable by email/role/time); the FTS5 table
+# indexes their text as external content keyed by the same rowid.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcript_lines (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    email TEXT NOT NULL,
+    ts REAL NOT NULL,
+    role TEXT NOT NULL,
+    message TEXT NOT NULL,
+    file TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcript_lines_email ON transcript_lines (email, ts);
+CREATE INDEX IF NOT EXISTS transcript_lines_ts ON transcript_lines (ts);
+CREATE INDEX IF NOT EXISTS transcript_lines_file ON transcript_lines (file);
+CREATE VIRTUAL TABLE IF NOT EXISTS transcript_fts USING fts5(
+    message, content='transcript_lines', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+_INSERT_LINE = ("INSERT INTO transcript_lines (session_id, email, ts, role, message, file) "
+                "VALUES (?, ?, ?, ?, ?, ?)")
+_INSERT_FTS = "INSERT INTO transcript_fts (rowid, message) VALUES (?, ?)"
+_FILE_INDEXED = "SELECT 1 FROM transcript_lines WHERE file = ? LIMIT 1"
+_COUNT = "SELECT COUNT(*) FROM transcript_lines"
+
+# Transcript file layout written by SessionManager
+_HEADER_STARTED = re.compile(r'^Session Started: (\S+)')
+_HEADER_USER = re.compile(r'^User: .* \((.+)\)$')
+_HEADER_SESSION = re.compile(r'^Session ID: (\S+)')
+_LINE = re.compile(r'^\[(\d\d):(\d\d):(\d\d)\] ([^:]+): (.*)$')
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def _fts_terms(text):
+    # Quote every word so user input can never be parsed as FTS5 query syntax
+    return ' '.join(f'"{word}"' for word in _WORD.findall(text))
+
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def read_transcript(path):
+    """Yield (session_id, email, datetime, role, message) for each line of a transcript file"""
+    session_id, email, day = '', '', None
+    pending = None
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for raw in f:
+            line = raw.rstrip('\n')
+            if day is None:
+                if (m := _HEADER_STARTED.match(line)):
+                    day = datetime.fromisoformat(m.group(1))
+                continue
+            if not email and (m := _HEADER_USER.match(line)):
+                email = m.group(1)
+            elif not session_id and (m := _HEADER_SESSION.match(line)):
+                session_id = m.group(1)
+            elif (m := _LINE.match(line)):
+                if pending is not None:
+                    yield pending
+                hour, minute, second, role, message = m.groups()
+                ts = day.replace(hour=int(hour), minute=int(minute), second=int(second), microsecond=0)
+                pending = (session_id, email, ts, role, message)
+            elif pending is not None and line and not line.startswith(('Session Ended:', 'Duration:', '-' * 80)):
+                # Messages can span several lines
+                pending = pending[:4] + (f'{pending[4]}\n{line}',)
+    if pending is not None:
+        yield pending
+
+
+class TranscriptIndex:
+    """Incremental full-text index over session transcripts.
+
+    ``add`` only enqueues; a background thread inserts queued lines in one
+    transaction every ``flush_interval`` seconds or ``max_batch`` lines.
+    Searches filter by words/phrase, email, role and time range, newest first,
+    and page with an id cursor so deep pages cost the same as the first.
+    """
+
+    def __init__(self, path, flush_interval=0.5, max_batch=1000, max_queue=50000, pool_size=4,
+                 drop_warning_interval=60.0):
+        self.backend = SQLiteBackend(path, pool_size=pool_size, schema=_SCHEMA)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.drop_warning_interval = drop_warning_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._drop_lock = threading.Lock()
+        self._dropped_since_warning = 0
+        self._last_drop_warning = None
+        self.stats = {'indexed': 0, 'batches': 0, 'dropped': 0, 'errors': 0}
+
+        self._thread = threading.Thread(target=self._run, name='transcript-index', daemon=True)
+        self._thread.start()
+
+    def add(self, session_id, email, role, message, file, ts=None):
+        """Queue one transcript line for indexing; never blocks the caller"""
+        try:
+            self._queue.put_nowait((session_id, email, ts or time.time(), role, message, str(file)))
+        except queue.Full:
+            # Search lags behind rather than slowing the conversation down
+            self._dropped(file)
+
+    def _dropped(self, file):
+        # A full queue drops lines in bursts: warn once per interval, not once per line
+        now = time.monotonic()
+        with self._drop_lock:
+            self.stats['dropped'] += 1
+            self._dropped_since_warning += 1
+            if self._last_drop_warning is not None and now - self._last_drop_warning < self.drop_warning_interval:
+                return
+            dropped, self._dropped_since_warning = self._dropped_since_warning, 0
+            self._last_drop_warning = now
+        logger.warning(f"Transcript index queue is full; dropped {dropped} line(s), latest from {file} "
+                       f"({self.stats['dropped']} in total). Those lines will not be searchable")
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far is searchable"""
+        if not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self, timeout=5.0):
+        """Index what is queued and stop the background thread"""
+        if not self._thread.is_alive():
+            return True
+        flushed = self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self.backend.close()
+        return flushed
+
+    def __len__(self):
+        with self.backend.connection() as conn:
+            return conn.execute(_COUNT).fetchone()[0]
+
+    def search(self, text=None, phrase=None, email=None, role=None, start=None, end=None,
+               cursor=None, limit=20):
+        """Matching lines, newest first: {'results': [...], 'next_cursor': id or None}"""
+        match = ' '.join(part for part in (
+            _fts_terms(text) if text else '',
+            _fts_phrase(phrase) if phrase else '',
+        ) if part)
+
+        where, params = [], []
+        if match:
+            where.append('transcript_fts MATCH ?')
+            params.append(match)
+        if email and match:
+            # One student's lines are few; look them up by email and probe
+            # FTS5 per rowid instead of walking a common term's whole doclist
+            where.append('transcript_fts.rowid IN (SELECT id FROM transcript_lines WHERE email = ?)')
+            params.append(email)
+        elif email:
+            where.append('l.email = ?')
+            params.append(email)
+        if role:
+            where.append('l.role = ?')
+            params.append(role)
+        if start is not None:
+            where.append('l.ts >= ?')
+            params.append(start)
+        if end is not None:
+            where.append('l.ts < ?')
+            params.append(end)
+
+        # With a text match, keep the cursor and ordering on the FTS rowid so
+        # FTS5 walks its doclists newest first and stops at the page limit
+        key = 'transcript_fts.rowid' if match and not email else 'l.id'
+        if cursor is not None:
+            where.append(f'{key} < ?')
+            params.append(int(cursor))
+
+        if match:
+            sql = ("SELECT l.id, l.session_id, l.email, l.ts, l.role, l.message, l.file, "
+                   "snippet(transcript_fts, 0, '[', ']', '...', 16) "
+                   "FROM transcript_fts JOIN transcript_lines l ON l.id = transcript_fts.rowid")
+        else:
+            sql = ("SELECT l.id, l.session_id, l.email, l.ts, l.role, l.message, l.file, NULL "
+                   "FROM transcript_lines l")
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY {key} DESC LIMIT ?'
+        params.append(int(limit) + 1)
+
+        with self.backend.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'results': [
+                {
+                    'id': row[0],
+                    'session_id': row[1],
+                    'email': row[2],
+                    'timestamp': datetime.fromtimestamp(row[3]).isoformat(timespec='seconds'),
+                    'role': row[4],
+                    'message': row[5],
+                    'file': row[6],
+                    'snippet': row[7],
+                }
+                for row in rows
+            ],
+            'next_cursor': rows[-1][0] if has_more else None,
+        }
+
+    def index_file(self, path):
+        """Index an existing transcript file once (for transcripts written before the index)"""
+        path = Path(path)
+        with self.backend.connection() as conn:
+            if conn.execute(_FILE_INDEXED, (str(path),)).fetchone():
+                return 0
+
+        rows = [
+            (session_id, email, ts.timestamp(), role, message, str(path))
+            for session_id, email, ts, role, message in read_transcript(path)
+        ]
+        if rows:
+            self._insert(rows)
+        return len(rows)
+
+    def _insert(self, rows):
+        with self.backend.transaction() as conn:
+            for row in rows:
+                rowid = conn.execute(_INSERT_LINE, row).lastrowid
+                conn.execute(_INSERT_FTS, (rowid, row[4]))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch, waiters, stop = [], [], False
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or waiters or len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    run_blocking(self._insert, batch)
+                    self.stats['indexed'] += len(batch)
+                    self.stats['batches'] += 1
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Error indexing {len(batch)} transcript lines: {e}")
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Index existing session transcripts for search')
+    parser.add_argument('--backfill', default='sessions', help='directory of transcript .txt files')
+    parser.add_argument('--db', help='index database (default: <backfill>/transcripts.db)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    index = TranscriptIndex(args.db or Path(args.backfill) / 'transcripts.db')
+    start = time.perf_counter()
+    files = lines = 0
+    for path in sorted(Path(args.backfill).glob('*.txt')):
+        try:
+            added = index.index_file(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error indexing transcript {path}: {e}")
+            continue
+        files += bool(added)
+        lines += added
+    index.stop()
+    logger.info(f"Indexed {lines} lines from {files} transcripts in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Career Counseling Realtime Voice Assistant - Transcript Writer
+This module batches session transcript lines and writes them from a background thread
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from server_mode import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Queue operations understood by the writer thread
+_WRITE = 'write'
+_FLUSH = 'flush'
+_CLOSE = 'close'
+_STOP = 'stop'
+
+
+class TranscriptWriter:
+    """Buffered, background writer for per-session transcript files.
+
+    Handler threads only enqueue lines. A single writer thread groups them by
+    file and appends each batch through a long-lived buffered handle, flushing
+    every ``flush_interval`` seconds or once ``max_batch_lines`` are pending.
+    The queue is bounded: when it is full, ``write`` blocks until the writer
+    catches up instead of letting memory grow without limit.
+    """
+
+    def __init__(self, flush_interval=0.5, max_batch_lines=256, max_queue=10000,
+                 max_open_files=256, buffer_size=64 * 1024):
+        self.flush_interval = flush_interval
+        self.max_batch_lines = max_batch_lines
+        self.max_open_files = max_open_files
+        self.buffer_size = buffer_size
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending = {}
+        self._pending_lines = 0
+        self._handles = OrderedDict()
+        self.stats = {'lines': 0, 'batches': 0, 'backpressure_waits': 0, 'errors': 0}
+
+        self._thread = threading.Thread(target=self._run, name='transcript-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, path, line):
+        """Queue one transcript line for ``path`` (applies backpressure when full)"""
+        if self._queue.full():
+            self.stats['backpressure_waits'] += 1
+        self._queue.put((_WRITE, path, line))
+
+    def flush(self, path=None, timeout=5.0):
+        """Write everything queued so far for ``path`` (or all files) and wait for it"""
+        return self._submit(_FLUSH, path, timeout)
+
+    def close(self, path, timeout=5.0):
+        """Flush and release the handle for ``path``, e.g. when a session ends"""
+        return self._submit(_CLOSE, path, timeout)
+
+    def stop(self, timeout=5.0):
+        """Drain the queue, close every handle and stop the writer thread"""
+        if not self._thread.is_alive():
+            return True
+        done = self._submit(_STOP, None, timeout)
+        self._thread.join(timeout)
+        return done
+
+    def _submit(self, op, path, timeout):
+        if not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put((op, path, done))
+        return done.wait(timeout)
+
+    def _run(self):
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            # Drain whatever else is already queued so it lands in the same batch
+            while item is not None:
+                op, path, arg = item
+                if op == _WRITE:
+                    self._pending.setdefault(path, []).append(arg)
+                    self._pending_lines += 1
+                elif op == _FLUSH:
+                    self._flush_pending(path)
+                    arg.set()
+                elif op == _CLOSE:
+                    self._flush_pending(path)
+                    self._close_handle(path)
+                    arg.set()
+                elif op == _STOP:
+                    self._flush_pending()
+                    for open_path in list(self._handles):
+                        self._close_handle(open_path)
+                    arg.set()
+                    return
+
+                if self._pending_lines >= self.max_batch_lines:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+
+            if self._pending_lines >= self.max_batch_lines or time.monotonic() >= deadline:
+                self._flush_pending()
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush_pending(self, path=None):
+        paths = [path] if path is not None else list(self._pending)
+        for file_path in paths:
+            lines = self._pending.pop(file_path, None)
+            if not lines:
+                continue
+            self._pending_lines -= len(lines)
+            try:
+                run_blocking(self._append, file_path, lines)
+                self.stats['lines'] += len(lines)
+                self.stats['batches'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error writing transcript batch to {file_path}: {e}")
+
+    def _append(self, path, lines):
+        handle = self._get_handle(path)
+        handle.writelines(lines)
+        handle.flush()
+
+    def _get_handle(self, path):
+        handle = self._handles.get(path)
+        if handle is not None:
+            self._handles.move_to_end(path)
+            return handle
+
+        # Keep the number of open descriptors bounded; least recently used goes first
+        while len(self._handles) >= self.max_open_files:
+            oldest = next(iter(self._handles))
+            self._close_handle(oldest)
+
+        handle = open(path, 'a', encoding='utf-8', buffering=self.buffer_size)
+        self._handles[path] = handle
+        return handle
+
+    def _close_handle(self, path):
+        handle = self._handles.pop(path, None)
+        if handle is None:
+            return
+        try:
+            run_blocking(handle.close)
+        except Exception as e:
+            logger.error(f"Error closing transcript file {path}: {e}")
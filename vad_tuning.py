@@ -0,0 +1,310 @@
+"""
+Career Counseling Realtime Voice Assistant - VAD Tuning
+This module replays recorded student audio through a server_vad simulation to tune turn detection
+
+    python vad_tuning.py --dir recordings --max-false-cut 0.05 --write sessions/turn_detection.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from pcm_audio import REALTIME_RATE, Resampler, frame_levels, pcm16_to_float, speech_segments, to_dbfs
+from session_bundle import SESSION_SETTINGS
+from summary_pipeline import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# server_vad decides on short frames; 10 ms keeps latencies at that resolution
+VAD_FRAME_MS = 10
+# The server's speech probability is modeled from energy above the recording's noise floor:
+# 0.5 at MIDPOINT dB above it, rising by a factor of e every SLOPE dB
+PROBABILITY_MIDPOINT_DB = 18.0
+PROBABILITY_SLOPE_DB = 4.0
+NOISE_FLOOR_PERCENTILE = 10
+# Reference turns without a label file: speech this far above the floor, split at pauses of --turn-gap-ms
+LABEL_MARGIN_DB = 12.0
+# A silence starting this close to a labeled turn end is that turn's end, not a pause in it
+LABEL_TOLERANCE_MS = 150
+
+THRESHOLDS = (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+SILENCE_DURATIONS_MS = (200, 250, 300, 350, 400, 500, 600, 700, 800, 1000, 1200)
+PREFIX_PADDINGS_MS = (100, 200, 300, 400, 500)
+
+DEFAULT_TURN_DETECTION = SESSION_SETTINGS['turn_detection']
+
+
+def load_turn_detection(path):
+    """server_vad settings from a file written by ``--write``, or the bundle defaults.
+
+    Only the tuned keys are taken, and out-of-range values are ignored, so a
+    bad file cannot break every student's session.update.
+    """
+    settings = dict(DEFAULT_TURN_DETECTION)
+    try:
+        with open(path, 'rb') as f:
+            tuned = json.loads(f.read())
+    except FileNotFoundError:
+        return settings
+    except (OSError, ValueError) as e:
+        logger.error(f"Ignoring turn detection settings in {path}: {e}")
+        return settings
+
+    threshold = tuned.get('threshold')
+    if isinstance(threshold, (int, float)) and 0 < threshold < 1:
+        settings['threshold'] = float(threshold)
+    for key, low, high in (('prefix_padding_ms', 0, 2000), ('silence_duration_ms', 100, 3000)):
+        value = tuned.get(key)
+        if isinstance(value, int) and low <= value <= high:
+            settings[key] = value
+    logger.info(f"Turn detection from {path}: {settings}")
+    return settings
+
+
+def read_pcm16(path):
+    """Mono float32 samples at the realtime rate from a .wav or raw 24 kHz .pcm file"""
+    path = Path(path)
+    if path.suffix == '.pcm':
+        return pcm16_to_float(path.read_bytes()), REALTIME_RATE
+    with wave.open(str(path), 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path.name} is not 16-bit PCM")
+        channels, rate = wav.getnchannels(), wav.getframerate()
+        samples = pcm16_to_float(wav.readframes(wav.getnframes()))
+    if channels > 1:
+        samples = samples[:len(samples) // channels * channels].reshape(-1, channels)[:, 0].copy()
+    if rate != REALTIME_RATE:
+        samples = Resampler(rate, REALTIME_RATE).process(samples)
+    return samples, REALTIME_RATE
+
+
+class Recording:
+    """One conversation's per-frame levels and reference turns, in VAD frames"""
+
+    def __init__(self, name, samples, rate, turns_ms=None, turn_gap_ms=1200):
+        self.name = name
+        frame_len = rate * VAD_FRAME_MS // 1000
+        rms, _ = frame_levels(samples, frame_len)
+        self.levels_db = to_dbfs(rms)
+        self.frames = len(self.levels_db)
+        self.noise_db = float(np.percentile(self.levels_db, NOISE_FLOOR_PERCENTILE)) if self.frames else 0.0
+        self.probability = 1 / (1 + np.exp(
+            -(self.levels_db - self.noise_db - PROBABILITY_MIDPOINT_DB) / PROBABILITY_SLOPE_DB))
+        if turns_ms is not None:
+            turns = np.asarray(turns_ms, dtype=np.int64).reshape(-1, 2) // VAD_FRAME_MS
+        else:
+            turns = speech_segments(self.levels_db, self.noise_db + LABEL_MARGIN_DB,
+                                    min_speech_frames=100 // VAD_FRAME_MS,
+                                    min_silence_frames=turn_gap_ms // VAD_FRAME_MS)
+        self.turns = turns[np.argsort(turns[:, 0])] if len(turns) else turns.reshape(0, 2)
+
+    @property
+    def seconds(self):
+        return self.frames * VAD_FRAME_MS / 1000
+
+    @classmethod
+    def load(cls, path, turn_gap_ms=1200):
+        """A recording plus its ``<name>.json`` labels ({"turns": [[start_ms, end_ms], ...]}) if present"""
+        path = Path(path)
+        samples, rate = read_pcm16(path)
+        labels = path.with_suffix('.json')
+        turns_ms = json.loads(labels.read_text(encoding='utf-8'))['turns'] if labels.exists() else None
+        return cls(path.stem, samples, rate, turns_ms, turn_gap_ms)
+
+
+def simulate(recording, threshold, silence_frames, prefix_frames):
+    """Replay one recording through server_vad at one threshold, for every silence duration and prefix.
+
+    speech_stopped fires once the probability has stayed at or below
+    ``threshold`` for a silence duration. A stop inside a reference turn
+    cuts the student off; the first stop in the gap after a turn ends it,
+    and its latency is from the end of speech to the stop. A turn with no
+    stop before the next one starts is missed (the two merge). A turn's
+    onset is clipped when the first frame above the threshold comes more
+    than the prefix padding after the turn starts.
+    """
+    turns = recording.turns
+    if not len(turns):
+        # Nothing to cut off, end or clip (a silent file, or one labeled with no turns)
+        zeros = np.zeros(len(silence_frames), dtype=np.int64)
+        return {
+            'false_cuts': zeros,
+            'turns_cut': zeros,
+            'latencies_ms': [np.empty(0, dtype=np.int64) for _ in silence_frames],
+            'missed_ends': zeros,
+            'clipped_onsets': np.zeros(len(prefix_frames), dtype=np.int64),
+        }
+    starts, ends = turns[:, 0], turns[:, 1]
+    tolerance = LABEL_TOLERANCE_MS // VAD_FRAME_MS
+    loud = recording.probability > threshold
+
+    # Every run of silence, and how each silence duration treats it
+    edges = np.diff((~loud).astype(np.int8), prepend=0, append=0)
+    quiet_starts, quiet_ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    fires = (quiet_ends - quiet_starts)[:, None] >= silence_frames[None, :]
+
+    # The gap after turn k runs from its end (less the tolerance) to the next turn's start
+    gap = np.searchsorted(ends - tolerance, quiet_starts, side='right') - 1
+    next_starts = np.append(starts[1:], recording.frames + 1)
+    in_gap = (gap >= 0) & (quiet_starts < next_starts[np.maximum(gap, 0)])
+    turn = np.searchsorted(starts, quiet_starts, side='right') - 1
+    inside = ~in_gap & (turn >= 0) & (quiet_starts > starts[np.maximum(turn, 0)])
+
+    cut = np.zeros((len(turns), len(silence_frames)), dtype=bool)
+    np.logical_or.at(cut, turn[inside], fires[inside])
+    latencies, missed = [], np.zeros(len(silence_frames), dtype=np.int64)
+    for column, frames in enumerate(silence_frames):
+        ending = in_gap & fires[:, column]
+        ended, first = np.unique(gap[ending], return_index=True)
+        stops = quiet_starts[ending][first] + frames
+        latencies.append((stops - ends[ended]) * VAD_FRAME_MS)
+        missed[column] = len(turns) - len(ended)
+
+    loud_frames = np.flatnonzero(loud)
+    onset = np.searchsorted(loud_frames, np.maximum(starts - tolerance, 0))
+    detected = np.append(loud_frames, np.iinfo(np.int64).max)[onset]
+    late = np.where(detected < ends, detected - starts, np.iinfo(np.int64).max)
+    clipped = late[:, None] > prefix_frames[None, :]
+
+    return {
+        'false_cuts': (fires & inside[:, None]).sum(axis=0),
+        'turns_cut': cut.sum(axis=0),
+        'latencies_ms': latencies,
+        'missed_ends': missed,
+        'clipped_onsets': clipped.sum(axis=0),
+    }
+
+
+def sweep(recordings, thresholds=THRESHOLDS, silence_ms=SILENCE_DURATIONS_MS, prefix_ms=PREFIX_PADDINGS_MS):
+    """Aggregate simulate() over recordings for every threshold x silence duration (x prefix padding)"""
+    silence_frames = np.asarray(silence_ms) // VAD_FRAME_MS
+    prefix_frames = np.asarray(prefix_ms) // VAD_FRAME_MS
+    turns = sum(len(recording.turns) for recording in recordings)
+    speech_minutes = sum(int((r.turns[:, 1] - r.turns[:, 0]).sum()) for r in recordings) * VAD_FRAME_MS / 60000
+    grid = []
+    for threshold in thresholds:
+        runs = [simulate(recording, threshold, silence_frames, prefix_frames) for recording in recordings]
+        clipped = sum(run['clipped_onsets'] for run in runs)
+        for column, silence in enumerate(silence_ms):
+            latencies = np.concatenate([run['latencies_ms'][column] for run in runs] or [np.empty(0)])
+            grid.append({
+                'threshold': threshold,
+                'silence_duration_ms': int(silence),
+                'false_cut_rate': sum(int(run['turns_cut'][column]) for run in runs) / max(turns, 1),
+                'false_cuts_per_minute': sum(int(run['false_cuts'][column]) for run in runs) / max(speech_minutes, 1e-9),
+                'missed_end_rate': sum(int(run['missed_ends'][column]) for run in runs) / max(turns, 1),
+                'latency_p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+                'latency_p90_ms': float(np.percentile(latencies, 90)) if len(latencies) else None,
+                'onset_clip_rate': {int(p): int(c) / max(turns, 1) for p, c in zip(prefix_ms, clipped)},
+            })
+    return grid
+
+
+def recommend(grid, max_false_cut=0.05, max_missed=0.02, max_onset_clip=0.02):
+    """The setting with the lowest p90 end-of-turn latency within the cut-off and missed-end limits.
+
+    The prefix padding is the shortest that keeps clipped onsets within
+    limit at that threshold (it costs nothing in latency, only audio sent).
+    Returns None when no setting meets the limits.
+    """
+    eligible = [row for row in grid if row['latency_p90_ms'] is not None
+                and row['false_cut_rate'] <= max_false_cut and row['missed_end_rate'] <= max_missed]
+    if not eligible:
+        return None
+    best = min(eligible, key=lambda row: (row['latency_p90_ms'], row['latency_p50_ms'], -row['threshold']))
+    clips = best['onset_clip_rate']
+    prefix = next((p for p in sorted(clips) if clips[p] <= max_onset_clip), max(clips))
+    return {
+        'type': 'server_vad',
+        'threshold': best['threshold'],
+        'prefix_padding_ms': prefix,
+        'silence_duration_ms': best['silence_duration_ms'],
+    }
+
+
+def _row_for(grid, threshold, silence_ms):
+    return next((row for row in grid if row['threshold'] == threshold
+                 and row['silence_duration_ms'] == silence_ms), None)
+
+
+def _format(row, prefix_ms):
+    def ms(value):
+        return f"{value:>8.0f}" if value is not None else f"{'-':>8}"
+    clip = row['onset_clip_rate'].get(prefix_ms)
+    return (f"{row['threshold']:>9.2f} {row['silence_duration_ms']:>10} {row['false_cut_rate']:>9.1%} "
+            f"{row['false_cuts_per_minute']:>9.2f} {row['missed_end_rate']:>8.1%} "
+            f"{ms(row['latency_p50_ms'])} {ms(row['latency_p90_ms'])} "
+            + (f"{clip:>9.1%}" if clip is not None else f"{'-':>9}"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tune server_vad turn detection on recorded student audio')
+    parser.add_argument('--dir', required=True, help='directory of .wav / raw 24 kHz .pcm recordings '
+                                                     '(optional <name>.json turn labels)')
+    parser.add_argument('--turn-gap-ms', type=int, default=1200,
+                        help='without labels, pauses at least this long end a turn')
+    parser.add_argument('--max-false-cut', type=float, default=0.05, help='share of turns cut off at least once')
+    parser.add_argument('--max-missed', type=float, default=0.02, help='share of turn ends merged into the next')
+    parser.add_argument('--max-onset-clip', type=float, default=0.02, help='share of turns with a clipped start')
+    parser.add_argument('--all', action='store_true', help='print every threshold, not just the frontier')
+    parser.add_argument('--write', help='write the recommended settings here (TURN_DETECTION_FILE)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    paths = sorted(p for p in Path(args.dir).iterdir() if p.suffix in ('.wav', '.pcm'))
+    if not paths:
+        parser.error(f"no .wav or .pcm recordings in {args.dir}")
+    start = time.perf_counter()
+    recordings = [Recording.load(path, args.turn_gap_ms) for path in paths]
+    loaded = time.perf_counter()
+    grid = sweep(recordings)
+    swept = time.perf_counter()
+
+    audio_minutes = sum(r.seconds for r in recordings) / 60
+    turns = sum(len(r.turns) for r in recordings)
+    print(f"{len(recordings)} recordings, {audio_minutes:.1f} min of audio, {turns} turns; "
+          f"loaded in {loaded - start:.1f}s, swept {len(grid)} settings in {swept - loaded:.2f}s\n")
+
+    current = DEFAULT_TURN_DETECTION
+    print(f"{'threshold':>9} {'silence':>10} {'cut off':>9} {'cuts/min':>9} {'missed':>8} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'clipped':>9}")
+    for threshold in sorted({row['threshold'] for row in grid}):
+        if not args.all and threshold != current['threshold']:
+            # Frontier only: the shortest silence within the cut-off limit at this threshold,
+            # or the longest one when none is
+            rows = [row for row in grid if row['threshold'] == threshold]
+            within = [row for row in rows if row['false_cut_rate'] <= args.max_false_cut]
+            rows = within[:1] or rows[-1:]
+        else:
+            rows = [row for row in grid if row['threshold'] == threshold]
+        for row in rows:
+            print(_format(row, current['prefix_padding_ms']))
+
+    recommended = recommend(grid, args.max_false_cut, args.max_missed, args.max_onset_clip)
+    baseline = _row_for(grid, current['threshold'], current['silence_duration_ms'])
+    if baseline is not None:
+        print(f"\ncurrent:     threshold {current['threshold']}, prefix {current['prefix_padding_ms']} ms, "
+              f"silence {current['silence_duration_ms']} ms\n{_format(baseline, current['prefix_padding_ms'])}")
+    if recommended is None:
+        print(f"\nno setting keeps cut-offs within {args.max_false_cut:.0%} and missed ends within "
+              f"{args.max_missed:.0%}", file=sys.stderr)
+        return 1
+    chosen = _row_for(grid, recommended['threshold'], recommended['silence_duration_ms'])
+    print(f"recommended: threshold {recommended['threshold']}, prefix {recommended['prefix_padding_ms']} ms, "
+          f"silence {recommended['silence_duration_ms']} ms\n{_format(chosen, recommended['prefix_padding_ms'])}")
+    if args.write:
+        tuned = {**recommended, 'tuned_on': {'recordings': len(recordings), 'turns': turns,
+                                             'audio_minutes': round(audio_minutes, 1)}}
+        write_atomic(args.write, json.dumps(tuned, indent=2).encode('utf-8'))
+        print(f"\nwrote {args.write}; the server sends it to clients in /api/config")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())